@@ -3,6 +3,8 @@ Archivo principal para iniciar la aplicación de conversión de documentos.
 Punto de entrada principal que sigue el patrón MVP con PyQt5.
 """
 
+import argparse
+import multiprocessing
 import sys
 import os
 from PyQt5.QtWidgets import QApplication
@@ -11,19 +13,44 @@ from PyQt5.QtWidgets import QApplication
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from src.presenters import MainPresenter
-from src.utils import setup_logging, get_logger, get_app_icon
+from src.utils import (setup_logging, get_logger, get_app_icon, SettingsError,
+                       add_settings_arguments, settings_from_args, log_settings)
+
+
+def parse_arguments():
+    """Separa las opciones de configuración de los argumentos propios de Qt."""
+    parser = argparse.ArgumentParser(description="DocToPDF Manager")
+    add_settings_arguments(parser)
+    parser.add_argument("--mostrar-config", action="store_true",
+                        help="Mostrar la configuración efectiva y salir")
+    return parser.parse_known_args()
 
 
 def main():
     """Función principal de la aplicación."""
+    args, qt_arguments = parse_arguments()
+    
+    # Cargar y validar la configuración antes de abrir la ventana
+    try:
+        settings = settings_from_args(args)
+    except SettingsError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+    
+    if args.mostrar_config:
+        print("\n".join(settings.describe()))
+        return 0
+    
     try:
         # Configurar logging
-        setup_logging()
+        setup_logging(settings.log_level, settings.page_log_every, settings.log_dir,
+                      settings.log_max_bytes, settings.log_backup_count)
         logger = get_logger("main")
         logger.info("Iniciando DocToPDF Manager...")
+        log_settings(settings, logger)
         
         # Crear aplicación Qt
-        app = QApplication(sys.argv)
+        app = QApplication(sys.argv[:1] + qt_arguments)
         
         # Configurar icono de la aplicación
         icon_path = get_app_icon()
@@ -36,7 +63,7 @@ def main():
         app.setStyle('Fusion')  # Estilo moderno
         
         # Crear y mostrar el presentador principal
-        presenter = MainPresenter()
+        presenter = MainPresenter(settings)
         presenter.run()
         logger.info("Aplicación mostrada exitosamente")
         
@@ -56,4 +83,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Necesario para el proceso de trabajo en el ejecutable empaquetado de Windows
+    multiprocessing.freeze_support()
     sys.exit(main())
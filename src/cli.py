@@ -0,0 +1,517 @@
+"""
+Interfaz de línea de comandos para las tareas de DocToPDF Manager que no
+requieren la interfaz gráfica.
+
+Uso:
+    python -m src.cli conciliar --nomina formatos/formato_diplomas.xlsx carpeta_salida
+    python -m src.cli indexar carpeta_salida [otra_carpeta ...]
+    python -m src.cli buscar "ana perez"
+    python -m src.cli reexpedir carpeta_salida --registros 101 102 --fuente corregido.docx
+    python -m src.cli planificar documento.docx [--nomina formatos/formato_diplomas.xlsx]
+    python -m src.cli dividir combinado.pdf [--simular] [--perfil web]
+    python -m src.cli revisar documento.docx [otro.docx ...]
+    python -m src.cli optimizar documento.docx [--salida liviano.docx] [--dpi 300]
+    python -m src.cli nomina formatos/formato_diplomas.xlsx [--mostrar]
+    python -m src.cli rendimiento [documento.docx otro.pdf ...] [--perfil web]
+    python -m src.cli vigilar carpeta_entrada [--nomina nomina.xlsx] [--estabilidad 2]
+    python -m src.cli distribuir combinado.pdf --carpeta-trabajo //servidor/cola [--nodos-locales 4]
+    python -m src.cli nodo //servidor/cola
+    python -m src.cli [--config ajustes.json] [--conversion-timeout 60 ...] configuracion
+"""
+
+import argparse
+import multiprocessing
+import os
+import signal
+import sys
+from typing import List, Optional
+import time
+from src.models import (
+    PDFProcessor, RosterReconciler, RosterReader, DiplomaIndex, RecordPlanner, DocxPreflight, DocxOptimizer,
+    ConversionJob, DocumentProcessingModel, HotFolderService, DistributedCoordinator, ShardWorker,
+    get_output_profile,
+    DocumentConversionError, PDFProcessingError, FileNotFoundError
+)
+from src.models.output_profile import OUTPUT_PROFILES
+from src.models.hot_folder import DEFAULT_STABLE_SECONDS
+from src.models.distributed import DEFAULT_SHARD_PAGES, DEFAULT_LEASE_SECONDS, run_local_worker
+from src.models.pdf_processor import PAGE_STATUS_COLLISION, PAGE_STATUS_FALLBACK
+from src.models.performance_history import format_duration
+from src.models.docx_optimizer import DEFAULT_IMAGE_DPI
+from src.utils import (setup_logging, get_logger, add_settings_arguments, settings_from_args, SettingsError,
+                       get_process_log_queue)
+
+logger = get_logger("cli")
+
+
+def _command_reconcile(args: argparse.Namespace) -> int:
+    """Concilia una carpeta de salida ya generada contra la nómina."""
+    pages = PDFProcessor().scan_output_folder(args.carpeta)
+    reconciler = RosterReconciler.from_file(args.nomina, RosterReader.from_settings(args.settings))
+    report = reconciler.reconcile(pages)
+    
+    if args.reporte:
+        reconciler.write_report(report, args.reporte)
+    
+    print(report.summary())
+    for entry in report.missing:
+        print(f"  Faltante: fila {entry.row_number} • {entry.registration_number} - {entry.name}")
+    for item in report.duplicated:
+        files = ", ".join(page.filename for page in item["pages"])
+        print(f"  Duplicado: {item['roster'].registration_number} • {files}")
+    for item in report.mismatched_name:
+        print(f"  Nombre distinto: {item['page'].filename} • nómina: {item['roster'].name}")
+    for page in report.unparsed:
+        print(f"  Sin datos: {page.filename}")
+    for page in report.unknown:
+        print(f"  No está en la nómina: {page.filename}")
+    
+    return 0 if report.is_clean() else 2
+
+
+def _command_index(args: argparse.Namespace) -> int:
+    """Indexa carpetas de salida generadas anteriormente."""
+    index = DiplomaIndex(args.indice)
+    processor = PDFProcessor()
+    total = 0
+    
+    for folder in args.carpetas:
+        total += index.index_job(folder, processor.scan_output_folder(folder))
+    
+    print(f"✅ {total} diplomas indexados • Total en el índice: {index.count()}")
+    return 0
+
+
+def _command_search(args: argparse.Namespace) -> int:
+    """Busca diplomas en el índice por nombre, registro o cédula parcial."""
+    index = DiplomaIndex(args.indice)
+    
+    start = time.perf_counter()
+    results = index.search(args.consulta, args.limite)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    
+    for diploma in results:
+        print(f"{diploma.registration_number or '-'}\t{diploma.name or '-'}\t"
+              f"{diploma.cedula or '-'}\t{diploma.created_at}\t{diploma.output_path}")
+    print(f"{len(results)} resultados en {elapsed_ms:.1f} ms", file=sys.stderr)
+    return 0 if results else 3
+
+
+def _command_reissue(args: argparse.Namespace) -> int:
+    """Regenera solo los diplomas indicados de un trabajo anterior."""
+    model = DocumentProcessingModel(args.settings)
+    model.index_path = args.indice
+    report = model.reissue(args.carpeta, args.registros, args.fuente)
+    
+    for previous_filename, new_filename in report.replaced.items():
+        print(f"  {previous_filename} -> {new_filename}")
+    for registration_number in report.not_found:
+        print(f"  No encontrado: {registration_number}")
+    print(report.summary())
+    return 0 if not report.not_found else 2
+
+
+def _command_plan(args: argparse.Namespace) -> int:
+    """Revisa los registros de un documento combinado sin convertirlo."""
+    start = time.perf_counter()
+    plan = RecordPlanner().plan(args.documento)
+    predicted = plan.predicted_results()
+    elapsed = time.perf_counter() - start
+    
+    if args.listar:
+        for page in predicted:
+            print(f"  {page.page_number}\t{page.filename}")
+    for record in plan.incomplete_records():
+        print(f"  Incompleto: registro {record.index} • campos: {record.fields or 'ninguno'}")
+    for page in predicted:
+        if page.status == PAGE_STATUS_COLLISION:
+            print(f"  Nombre duplicado: registro {page.page_number} • {page.filename}")
+    
+    clean = not plan.incomplete_records()
+    if args.nomina:
+        reconciler = RosterReconciler.from_file(args.nomina, RosterReader.from_settings(args.settings))
+        report = reconciler.reconcile(predicted)
+        print(report.summary())
+        for entry in report.missing:
+            print(f"  Faltante: fila {entry.row_number} • {entry.registration_number} - {entry.name}")
+        for item in report.mismatched_name:
+            print(f"  Nombre distinto: {item['page'].filename} • nómina: {item['roster'].name}")
+        for page in report.unknown:
+            print(f"  No está en la nómina: {page.filename}")
+        clean = clean and report.is_clean()
+    
+    print(f"{plan.summary()} • Trabajadores sugeridos: {plan.suggested_workers(args.trabajadores)}")
+    print(f"Planificado en {elapsed:.2f} s", file=sys.stderr)
+    return 0 if clean else 2
+
+
+def _command_preflight(args: argparse.Namespace) -> int:
+    """Revisa documentos Word en milisegundos, sin convertirlos."""
+    preflight = DocxPreflight()
+    rejected = warned = 0
+    for document in args.documentos:
+        report = preflight.inspect(document)
+        for error in report.errors:
+            print(f"  ❌ {error}")
+        for warning in report.warnings:
+            print(f"  ⚠️ {warning}")
+        print(report.summary())
+        rejected += not report.ok
+        warned += bool(report.warnings)
+    if rejected:
+        return 1
+    return 2 if warned else 0
+
+
+def _command_optimize(args: argparse.Namespace) -> int:
+    """Escribe una copia más liviana de un DOCX (imágenes, repetidas y partes sin uso)."""
+    output_filename = args.salida or os.path.splitext(args.documento)[0] + "_optimizado.docx"
+    report = DocxOptimizer(args.dpi or args.settings.docx_image_dpi or DEFAULT_IMAGE_DPI).optimize(
+        args.documento, output_filename)
+    for image in report.downsampled:
+        print(f"  Reducida: {image}")
+    for duplicate in report.deduplicated:
+        print(f"  Repetida: {duplicate}")
+    for part in report.removed:
+        print(f"  Sin uso: {part}")
+    print(report.summary())
+    if report.changed:
+        print(f"Copia optimizada: {output_filename}")
+    return 0
+
+
+def _command_roster(args: argparse.Namespace) -> int:
+    """Lee la nómina fila por fila y muestra sus repeticiones y filas vacías."""
+    reader = RosterReader.from_settings(args.settings)
+    start = time.perf_counter()
+    for entry in reader.iter_entries(args.nomina):
+        if args.mostrar:
+            print(f"  {entry.row_number}\t{entry.registration_number or '-'}\t{entry.name or '-'}\t"
+                  f"{entry.cedula or '-'}")
+    elapsed = time.perf_counter() - start
+    
+    stats = reader.stats
+    print(stats.summary())
+    print(f"Leída en {elapsed:.2f} s", file=sys.stderr)
+    return 2 if stats.duplicate_registrations or stats.duplicate_cedulas else 0
+
+
+def _command_performance(args: argparse.Namespace) -> int:
+    """Muestra los modelos de costo del historial y estima la duración de un lote."""
+    model = DocumentProcessingModel(args.settings)
+    history = model.performance_history
+    if history is None:
+        print("El historial de rendimiento está desactivado (history_path vacío)", file=sys.stderr)
+        return 1
+    if args.perfil:
+        model.set_output_profile(get_output_profile(args.perfil))
+    
+    stage_models = history.models()
+    if not stage_models:
+        print(f"Todavía no hay historial en {history.history_path}")
+    for stage_model in stage_models:
+        print(f"  {stage_model.summary()}")
+    for throughput in history.host_throughput():
+        print(f"  {throughput.summary()}")
+    
+    if not args.documentos:
+        return 0
+    total = 0.0
+    unknown = 0
+    for document in args.documentos:
+        seconds = model.estimate_seconds(document)
+        if seconds is None:
+            unknown += 1
+            print(f"  {os.path.basename(document)}: sin historial suficiente")
+        else:
+            total += seconds
+            print(f"  {os.path.basename(document)}: {format_duration(seconds)}")
+    slots = model.settings.max_concurrent_jobs
+    print(f"Lote de {len(args.documentos)} documentos: {format_duration(total)} uno tras otro • "
+          f"{format_duration(total / slots)} con {slots} trabajos simultáneos si los recursos alcanzan"
+          + (f" • {unknown} sin estimar" if unknown else ""))
+    return 0
+
+
+def _command_split(args: argparse.Namespace) -> int:
+    """Divide un PDF ya combinado (o lo simula sin escribir archivos)."""
+    model = DocumentProcessingModel(args.settings)
+    model.index_path = args.indice
+    job = ConversionJob.create(args.archivo, args.nomina, get_output_profile(args.perfil or model.output_profile.name),
+                               args.simular, model.output_root)
+    
+    start = time.perf_counter()
+    results = model.run_job(job)
+    elapsed = time.perf_counter() - start
+    
+    for page in results:
+        if args.simular:
+            print(f"  {page.page_number}\t{page.filename}")
+        if page.status == PAGE_STATUS_FALLBACK:
+            print(f"  Sin datos: página {page.page_number} • {page.filename}")
+        elif page.status == PAGE_STATUS_COLLISION:
+            print(f"  Nombre duplicado: página {page.page_number} • {page.filename}")
+    
+    problems = sum(1 for page in results if page.status in (PAGE_STATUS_FALLBACK, PAGE_STATUS_COLLISION))
+    action = "simuladas" if args.simular else f"publicadas en {job.output_folder}"
+    print(f"{len(results)} páginas {action} • {problems} con problemas • {elapsed:.2f} s")
+    return 0 if not problems else 2
+
+
+def _command_watch(args: argparse.Namespace) -> int:
+    """Procesa los documentos que lleguen a una carpeta hasta recibir Ctrl+C o SIGTERM."""
+    model = DocumentProcessingModel(args.settings)
+    model.index_path = args.indice
+    model.set_roster_file(args.nomina)
+    service = HotFolderService(args.carpeta, model, max_workers=args.trabajadores,
+                               stable_seconds=args.estabilidad, use_inotify=not args.sin_inotify)
+    
+    def request_stop(signum, frame):
+        print("Deteniendo: se esperan los trabajos en curso...", file=sys.stderr)
+        service.stop()
+    
+    signal.signal(signal.SIGINT, request_stop)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, request_stop)
+    
+    print(f"Vigilando {service.watch_dir} • salida: {service.output_root} (Ctrl+C para detener)")
+    service.run()
+    print(f"{service.processed_count} documentos procesados • {service.failed_count} fallidos")
+    print(f"Regulador de recursos: {model.resource_governor.metrics().summary()}")
+    return 0 if not service.failed_count else 2
+
+
+def _command_distribute(args: argparse.Namespace) -> int:
+    """Reparte la división de un documento entre los nodos que atienden la carpeta de trabajo."""
+    model = DocumentProcessingModel(args.settings)
+    model.index_path = args.indice
+    job = ConversionJob.create(args.archivo, args.nomina, get_output_profile(args.perfil or model.output_profile.name),
+                               output_root=model.output_root)
+    coordinator = DistributedCoordinator(args.carpeta_trabajo, model, args.paginas_por_fragmento,
+                                         args.arrendamiento)
+    
+    start = time.perf_counter()
+    coordinator.submit(job)
+    
+    # Nodos locales: procesos de esta máquina que se comportan como nodos independientes
+    processes = [
+        multiprocessing.Process(target=run_local_worker,
+                                args=(args.carpeta_trabajo, get_process_log_queue(), 2.0, args.arrendamiento),
+                                name=f"nodo-local-{number + 1}")
+        for number in range(args.nodos_locales)
+    ]
+    for process in processes:
+        process.start()
+    
+    def show_progress(progress):
+        print(f"  {progress.done}/{progress.total} fragmentos terminados", file=sys.stderr)
+    
+    try:
+        results = coordinator.wait(job, args.tiempo_maximo, show_progress)
+    finally:
+        for process in processes:
+            process.join(timeout=30)
+            if process.is_alive():
+                process.terminate()
+    
+    elapsed = time.perf_counter() - start
+    problems = sum(1 for page in results if page.status in (PAGE_STATUS_FALLBACK, PAGE_STATUS_COLLISION))
+    print(f"{len(results)} páginas publicadas en {job.output_folder} • {problems} con problemas • {elapsed:.2f} s")
+    return 0 if not problems else 2
+
+
+def _command_node(args: argparse.Namespace) -> int:
+    """Atiende la carpeta de trabajo compartida como nodo hasta recibir Ctrl+C o SIGTERM."""
+    worker = ShardWorker(args.carpeta_trabajo, args.id, args.arrendamiento)
+    
+    def request_stop(signum, frame):
+        print("Deteniendo al terminar el fragmento en curso...", file=sys.stderr)
+        worker.stop()
+    
+    signal.signal(signal.SIGINT, request_stop)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, request_stop)
+    
+    print(f"Nodo {worker.worker_id} atendiendo {worker.queue.work_dir} (Ctrl+C para detener)")
+    processed = worker.run(args.terminar_inactivo)
+    print(f"{processed} fragmentos procesados")
+    return 0
+
+
+def _command_settings(args: argparse.Namespace) -> int:
+    """Muestra la configuración efectiva y el origen de cada valor."""
+    for line in args.settings.describe():
+        print(f"  {line}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Construye el analizador de argumentos con todos los subcomandos."""
+    parser = argparse.ArgumentParser(
+        prog="doctopdf",
+        description="Herramientas de línea de comandos de DocToPDF Manager"
+    )
+    add_settings_arguments(parser)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    reconcile_parser = subparsers.add_parser(
+        "conciliar", help="Concilia una carpeta de diplomas contra la nómina"
+    )
+    reconcile_parser.add_argument("carpeta", help="Carpeta con los PDFs individuales")
+    reconcile_parser.add_argument("--nomina", required=True, help="Archivo .xlsx o .csv con la nómina")
+    reconcile_parser.add_argument("--reporte", help="Ruta opcional para guardar el reporte JSON")
+    reconcile_parser.set_defaults(handler=_command_reconcile)
+    
+    index_parser = subparsers.add_parser(
+        "indexar", help="Agrega carpetas de diplomas existentes al índice de búsqueda"
+    )
+    index_parser.add_argument("carpetas", nargs="+", help="Carpetas con los PDFs individuales")
+    index_parser.add_argument("--indice", help="Ruta del índice SQLite (por defecto la configurada)")
+    index_parser.set_defaults(handler=_command_index)
+    
+    search_parser = subparsers.add_parser(
+        "buscar", help="Busca diplomas por nombre, registro o cédula parcial"
+    )
+    search_parser.add_argument("consulta", help="Texto a buscar")
+    search_parser.add_argument("--indice", help="Ruta del índice SQLite (por defecto la configurada)")
+    search_parser.add_argument("--limite", type=int, default=50, help="Número máximo de resultados")
+    search_parser.set_defaults(handler=_command_search)
+    
+    reissue_parser = subparsers.add_parser(
+        "reexpedir", help="Regenera solo ciertos registros de un trabajo anterior"
+    )
+    reissue_parser.add_argument("carpeta", help="Carpeta de salida del trabajo anterior")
+    reissue_parser.add_argument("--registros", nargs="+", required=True, help="Números de registro a reexpedir")
+    reissue_parser.add_argument("--fuente", required=True, help="PDF o DOCX corregido con los registros a reexpedir")
+    reissue_parser.add_argument("--indice", help="Ruta del índice SQLite (por defecto la configurada)")
+    reissue_parser.set_defaults(handler=_command_reissue)
+    
+    plan_parser = subparsers.add_parser(
+        "planificar", help="Revisa los registros de un DOCX combinado antes de convertirlo"
+    )
+    plan_parser.add_argument("documento", help="Documento Word combinado (.docx)")
+    plan_parser.add_argument("--nomina", help="Archivo .xlsx o .csv con la nómina para conciliar los nombres previstos")
+    plan_parser.add_argument("--listar", action="store_true", help="Muestra el nombre previsto de cada registro")
+    plan_parser.add_argument("--trabajadores", type=int, default=os.cpu_count() or 1,
+                             help="Máximo de trabajadores disponibles")
+    plan_parser.set_defaults(handler=_command_plan)
+    
+    preflight_parser = subparsers.add_parser(
+        "revisar", help="Revisa documentos Word (estructura, campos sin combinar, imágenes) sin convertirlos"
+    )
+    preflight_parser.add_argument("documentos", nargs="+", help="Documentos Word (.docx)")
+    preflight_parser.set_defaults(handler=_command_preflight)
+    
+    optimize_parser = subparsers.add_parser(
+        "optimizar", help="Genera una copia más liviana de un DOCX (imágenes a la resolución de impresión)"
+    )
+    optimize_parser.add_argument("documento", help="Documento Word (.docx)")
+    optimize_parser.add_argument("--salida", help="Ruta de la copia (por defecto <documento>_optimizado.docx)")
+    optimize_parser.add_argument("--dpi", type=int,
+                                 help=f"Resolución de impresión (por defecto docx_image_dpi o {DEFAULT_IMAGE_DPI})")
+    optimize_parser.set_defaults(handler=_command_optimize)
+    
+    roster_parser = subparsers.add_parser(
+        "nomina", help="Lee la nómina (.xlsx o .csv) y detecta registros y cédulas repetidos"
+    )
+    roster_parser.add_argument("nomina", help="Archivo .xlsx o .csv con la nómina")
+    roster_parser.add_argument("--mostrar", action="store_true", help="Muestra cada fila normalizada")
+    roster_parser.set_defaults(handler=_command_roster)
+    
+    performance_parser = subparsers.add_parser(
+        "rendimiento", help="Muestra el historial de rendimiento por etapa y equipo y estima la duración de un lote"
+    )
+    performance_parser.add_argument("documentos", nargs="*", help="Documentos (.docx o .pdf) cuya duración estimar")
+    performance_parser.add_argument("--perfil", choices=sorted(OUTPUT_PROFILES),
+                                    help="Perfil de salida de las páginas (por defecto el configurado)")
+    performance_parser.set_defaults(handler=_command_performance)
+    
+    split_parser = subparsers.add_parser(
+        "dividir", help="Divide un PDF ya combinado sin pasar por la conversión"
+    )
+    split_parser.add_argument("archivo", help="PDF combinado (un .docx se convierte primero)")
+    split_parser.add_argument("--simular", action="store_true",
+                              help="Solo muestra los nombres propuestos y las páginas sin datos; no escribe archivos")
+    split_parser.add_argument("--perfil", choices=sorted(OUTPUT_PROFILES),
+                              help="Perfil de salida de las páginas (por defecto el configurado)")
+    split_parser.add_argument("--nomina", help="Archivo .xlsx con la nómina para conciliar")
+    split_parser.add_argument("--indice", help="Ruta del índice SQLite (por defecto la configurada)")
+    split_parser.set_defaults(handler=_command_split)
+    
+    watch_parser = subparsers.add_parser(
+        "vigilar", help="Procesa automáticamente los documentos que se copien en una carpeta"
+    )
+    watch_parser.add_argument("carpeta", help="Carpeta donde se depositan los documentos combinados")
+    watch_parser.add_argument("--nomina", help="Archivo .xlsx con la nómina para conciliar cada trabajo")
+    watch_parser.add_argument("--trabajadores", type=int,
+                              help="Trabajos simultáneos (por defecto max_concurrent_jobs)")
+    watch_parser.add_argument("--estabilidad", type=float, default=DEFAULT_STABLE_SECONDS,
+                              help="Segundos sin cambios de tamaño antes de procesar un archivo")
+    watch_parser.add_argument("--sin-inotify", action="store_true",
+                              help="Revisar la carpeta periódicamente en lugar de usar inotify")
+    watch_parser.add_argument("--indice", help="Ruta del índice SQLite (por defecto la configurada)")
+    watch_parser.set_defaults(handler=_command_watch)
+    
+    distribute_parser = subparsers.add_parser(
+        "distribuir", help="Reparte la división de un documento entre varios nodos"
+    )
+    distribute_parser.add_argument("archivo", help="PDF combinado (un .docx se convierte primero en este nodo)")
+    distribute_parser.add_argument("--carpeta-trabajo", required=True,
+                                   help="Carpeta compartida con la cola y las páginas de cada fragmento")
+    distribute_parser.add_argument("--paginas-por-fragmento", type=int, default=DEFAULT_SHARD_PAGES,
+                                   help="Páginas de cada fragmento")
+    distribute_parser.add_argument("--nodos-locales", type=int, default=0,
+                                   help="Procesos de esta máquina que actúan como nodos adicionales")
+    distribute_parser.add_argument("--arrendamiento", type=float, default=DEFAULT_LEASE_SECONDS,
+                                   help="Segundos de arrendamiento de cada fragmento")
+    distribute_parser.add_argument("--tiempo-maximo", type=float, help="Segundos máximos de espera")
+    distribute_parser.add_argument("--perfil", choices=sorted(OUTPUT_PROFILES),
+                                   help="Perfil de salida de las páginas (por defecto el configurado)")
+    distribute_parser.add_argument("--nomina", help="Archivo .xlsx con la nómina para conciliar")
+    distribute_parser.add_argument("--indice", help="Ruta del índice SQLite (por defecto la configurada)")
+    distribute_parser.set_defaults(handler=_command_distribute)
+    
+    node_parser = subparsers.add_parser(
+        "nodo", help="Procesa fragmentos de la carpeta de trabajo compartida"
+    )
+    node_parser.add_argument("carpeta_trabajo", help="Carpeta compartida con la cola")
+    node_parser.add_argument("--id", help="Identificador del nodo (por defecto equipo-pid)")
+    node_parser.add_argument("--arrendamiento", type=float, default=DEFAULT_LEASE_SECONDS,
+                             help="Segundos de arrendamiento de cada fragmento")
+    node_parser.add_argument("--terminar-inactivo", type=float,
+                             help="Terminar tras estos segundos sin fragmentos pendientes")
+    node_parser.set_defaults(handler=_command_node)
+    
+    settings_parser = subparsers.add_parser(
+        "configuracion", help="Muestra la configuración efectiva (archivo, entorno y opciones)"
+    )
+    settings_parser.set_defaults(handler=_command_settings)
+    
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Punto de entrada de la línea de comandos."""
+    args = build_parser().parse_args(argv)
+    try:
+        args.settings = settings_from_args(args)
+    except SettingsError as e:
+        print(f"❌ {str(e)}", file=sys.stderr)
+        return 1
+    
+    settings = args.settings
+    setup_logging(settings.log_level, settings.page_log_every, settings.log_dir,
+                  settings.log_max_bytes, settings.log_backup_count)
+    if getattr(args, "indice", None) is None:
+        args.indice = settings.index_path
+    
+    try:
+        return args.handler(args)
+    except (DocumentConversionError, PDFProcessingError, FileNotFoundError) as e:
+        logger.error(str(e))
+        print(f"❌ {str(e)}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
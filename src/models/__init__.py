@@ -3,14 +3,79 @@ Módulo de modelos para la aplicación de conversión de documentos.
 """
 
 from .document_converter import DocumentConverter
-from .pdf_processor import PDFProcessor
+from .converter_backends import ConverterBackend, ConverterRegistry, BackendStats
+from .pdf_processor import PDFProcessor, PageResult
+from .output_stager import OutputStager
+from .scratch_space import ScratchSpace
+from .resource_governor import ResourceGovernor, GovernorMetrics
+from .job_scheduler import JobScheduler, JobTicket
+from .performance_history import PerformanceHistory, StageModel, HostThroughput, JobEta
+from .output_profile import OutputProfile, PROFILE_STANDARD, PROFILE_WEB, get_output_profile
+from .roster_reader import RosterReader, RosterColumns, RosterStats, RosterEntry
+from .roster_reconciler import RosterReconciler, ReconciliationReport
+from .docx_preflight import DocxPreflight, PreflightReport
+from .docx_optimizer import DocxOptimizer, DocxOptimizationReport
+from .record_planner import RecordPlanner, RecordPlan, PlannedRecord
+from .diploma_index import DiplomaIndex, IndexedDiploma
+from .job_artifacts import JobArtifactStore
+from .reissue import ReissueService, ReissueReport
+from .conversion_job import ConversionJob
 from .document_processing_model import DocumentProcessingModel
+from .hot_folder import HotFolderService
+from .distributed import DistributedCoordinator, ShardWorker, WorkQueue
+from .async_processing import AsyncDocumentProcessor
+from .stream_processing import StreamProcessor
+from .worker_host import WorkerHost
 from .exceptions import DocumentConversionError, PDFProcessingError, FileNotFoundError
 
 __all__ = [
     'DocumentConverter',
+    'ConverterBackend',
+    'ConverterRegistry',
+    'BackendStats',
     'PDFProcessor', 
+    'PageResult',
+    'OutputStager',
+    'ScratchSpace',
+    'ResourceGovernor',
+    'GovernorMetrics',
+    'JobScheduler',
+    'JobTicket',
+    'PerformanceHistory',
+    'StageModel',
+    'HostThroughput',
+    'JobEta',
+    'OutputProfile',
+    'PROFILE_STANDARD',
+    'PROFILE_WEB',
+    'get_output_profile',
+    'RosterReader',
+    'RosterColumns',
+    'RosterStats',
+    'RosterEntry',
+    'RosterReconciler',
+    'ReconciliationReport',
+    'DocxPreflight',
+    'PreflightReport',
+    'DocxOptimizer',
+    'DocxOptimizationReport',
+    'RecordPlanner',
+    'RecordPlan',
+    'PlannedRecord',
+    'DiplomaIndex',
+    'IndexedDiploma',
+    'JobArtifactStore',
+    'ReissueService',
+    'ReissueReport',
+    'ConversionJob',
     'DocumentProcessingModel',
+    'HotFolderService',
+    'DistributedCoordinator',
+    'ShardWorker',
+    'WorkQueue',
+    'AsyncDocumentProcessor',
+    'StreamProcessor',
+    'WorkerHost',
     'DocumentConversionError',
     'PDFProcessingError',
     'FileNotFoundError'
@@ -0,0 +1,196 @@
+"""
+API asíncrona (asyncio) para integrar la conversión en servicios asíncronos.
+LibreOffice se controla con subprocesos de asyncio, sin ocupar un hilo por
+conversión, y el trabajo de páginas (CPU) se delega a un ejecutor de hilos.
+Los semáforos limitan cuántas conversiones y divisiones corren a la vez, de
+modo que pueden quedar cientos de trabajos en espera con pocos hilos. Al
+cancelar una tarea se termina el proceso de LibreOffice o se descarta la
+división en curso sin publicar salidas parciales.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, List, Optional, Union
+from .conversion_job import ConversionJob
+from .document_processing_model import DocumentProcessingModel
+from .output_profile import OutputProfile
+from .pdf_processor import PageResult
+from .exceptions import PDFProcessingError
+from src.utils import get_logger
+
+logger = get_logger("async_processing")
+
+# Divisiones simultáneas por defecto (trabajo de CPU en el ejecutor)
+DEFAULT_MAX_SPLITS = min(4, os.cpu_count() or 1)
+
+
+class _SplitCancelled(PDFProcessingError):
+    """Interrumpe una división desde su hilo cuando la tarea asíncrona se cancela."""
+    pass
+
+
+class AsyncDocumentProcessor:
+    """Convierte, divide y procesa documentos desde código asyncio."""
+    
+    def __init__(self, model: Optional[DocumentProcessingModel] = None,
+                 max_conversions: Optional[int] = None, max_splits: int = DEFAULT_MAX_SPLITS,
+                 executor: Optional[Executor] = None):
+        """
+        Args:
+            model: Modelo con la configuración, el conversor y el procesador de PDF
+            max_conversions: Conversiones simultáneas (por defecto max_concurrent_jobs)
+            max_splits: Divisiones simultáneas
+            executor: Ejecutor para el trabajo de CPU (por defecto uno propio con max_splits hilos)
+        """
+        self.model = model or DocumentProcessingModel()
+        self.max_conversions = max(1, max_conversions or self.model.settings.max_concurrent_jobs)
+        self.max_splits = max(1, max_splits)
+        self._own_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=self.max_splits,
+                                                        thread_name_prefix="async-pages")
+        # Los semáforos se crean dentro del bucle de eventos que los usa
+        self._conversion_slots: Optional[asyncio.Semaphore] = None
+        self._split_slots: Optional[asyncio.Semaphore] = None
+    
+    async def __aenter__(self) -> "AsyncDocumentProcessor":
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+    
+    async def close(self) -> None:
+        """Libera el ejecutor propio (espera a que terminen sus hilos)."""
+        if self._own_executor:
+            await asyncio.get_running_loop().run_in_executor(None, partial(self._executor.shutdown, wait=True))
+    
+    async def convert(self, docx_filename: str, output_pdf_filename: Optional[str] = None,
+                      preflight: bool = True) -> str:
+        """
+        Convierte un documento Word a PDF.
+        
+        Args:
+            docx_filename: Documento Word
+            output_pdf_filename: PDF de salida (por defecto junto al documento)
+            preflight: Revisar el documento antes de convertirlo
+        
+        Returns:
+            Ruta del PDF generado
+        
+        Raises:
+            DocumentConversionError: Si la conversión falla
+            FileNotFoundError: Si el documento no existe
+        """
+        output_pdf_filename = output_pdf_filename or os.path.splitext(docx_filename)[0] + ".pdf"
+        async with self._conversions():
+            await self.model.document_converter.convert_word_to_pdf_async(docx_filename, output_pdf_filename,
+                                                                          preflight)
+        return output_pdf_filename
+    
+    async def split(self, pdf_filename: str, output_folder: str, job_id: Optional[str] = None,
+                    output_profile: Optional[OutputProfile] = None,
+                    on_page: Optional[Callable[[PageResult], None]] = None,
+                    on_progress: Optional[Callable[[int, int], None]] = None,
+                    work_folder: Optional[str] = None) -> List[PageResult]:
+        """
+        Divide un PDF combinado en páginas en un hilo del ejecutor.
+        
+        Los callbacks se invocan en el bucle de eventos. Si la tarea se cancela,
+        la división se detiene en la página siguiente y no publica nada.
+        
+        Returns:
+            Resultado de cada página
+        
+        Raises:
+            PDFProcessingError: Si hay un error dividiendo el PDF
+            FileNotFoundError: Si el PDF no existe
+        """
+        loop = asyncio.get_running_loop()
+        cancelled = threading.Event()
+        
+        def page_callback(result: PageResult) -> None:
+            if on_page:
+                loop.call_soon_threadsafe(on_page, result)
+        
+        def progress_callback(done: int, total: int) -> None:
+            if on_progress:
+                loop.call_soon_threadsafe(on_progress, done, total)
+            if cancelled.is_set():
+                raise _SplitCancelled(f"División de {os.path.basename(pdf_filename)} cancelada")
+        
+        task = partial(self.model.pdf_processor.split_pdf_by_page, pdf_filename, output_folder, job_id,
+                       delete_input=False, on_page=page_callback, on_progress=progress_callback,
+                       output_profile=output_profile, work_folder=work_folder)
+        async with self._splits():
+            future = loop.run_in_executor(self._executor, task)
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # El hilo no se puede interrumpir: se le avisa y se espera a que descarte lo preparado
+                cancelled.set()
+                try:
+                    await future
+                except Exception:
+                    pass
+                raise
+    
+    async def process(self, job: Union[ConversionJob, str],
+                      on_page: Optional[Callable[[PageResult], None]] = None,
+                      on_progress: Optional[Callable[[int, int], None]] = None) -> List[PageResult]:
+        """
+        Ejecuta un trabajo completo: revisión, conversión, división, artefactos, índice y conciliación.
+        
+        Equivale a `DocumentProcessingModel.run_job`, pero la concurrencia la
+        limitan los semáforos de esta instancia en lugar del planificador.
+        
+        Args:
+            job: Trabajo a ejecutar, o ruta del documento (se crea con la configuración del modelo)
+            on_page: Callback opcional invocado en el bucle con el resultado de cada página
+            on_progress: Callback opcional invocado en el bucle con (páginas procesadas, total)
+        
+        Returns:
+            Resultado de cada página
+        
+        Raises:
+            DocumentConversionError: Si hay error en la conversión
+            PDFProcessingError: Si hay error procesando el PDF
+        """
+        if isinstance(job, str):
+            job = self.model.create_job(job)
+        loop = asyncio.get_running_loop()
+        
+        if job.dry_run:
+            async with self._splits():
+                return await loop.run_in_executor(self._executor, self.model.run_job, job, on_page)
+        
+        # Una nómina ilegible debe fallar antes de publicar nada
+        reconciler = None
+        if job.roster_file:
+            reconciler = await loop.run_in_executor(self._executor, self.model.load_roster, job.roster_file)
+        if not job.is_split_only:
+            await loop.run_in_executor(self._executor, self.model.prepare_job, job)
+        
+        scratch_space = self.model.scratch_space
+        with scratch_space.job_area(job.job_id, scratch_space.estimate_bytes(job.source_file)) as work_folder:
+            merged_pdf_filename = job.merged_pdf_path(work_folder)
+            if not job.is_split_only:
+                await self.convert(job.source_file, merged_pdf_filename, preflight=False)
+            results = await self.split(merged_pdf_filename, job.output_folder, job.job_id, job.output_profile,
+                                       on_page, on_progress, work_folder)
+        
+        await loop.run_in_executor(self._executor, self.model.retain_job_artifacts, job, results)
+        await loop.run_in_executor(self._executor, self.model.publish_results, job, results, reconciler)
+        logger.info("Trabajo %s terminado: %d páginas en %s", job.job_id, len(results), job.output_folder)
+        return results
+    
+    def _conversions(self) -> asyncio.Semaphore:
+        if self._conversion_slots is None:
+            self._conversion_slots = asyncio.Semaphore(self.max_conversions)
+        return self._conversion_slots
+    
+    def _splits(self) -> asyncio.Semaphore:
+        if self._split_slots is None:
+            self._split_slots = asyncio.Semaphore(self.max_splits)
+        return self._split_slots
@@ -0,0 +1,99 @@
+"""
+Hojas de contacto para revisar visualmente un trabajo completo.
+Coloca en mosaico la primera página de cada diploma de una carpeta de salida.
+"""
+
+import os
+from typing import List, Optional
+import fitz
+from .exceptions import FileNotFoundError, PDFProcessingError
+from src.utils import get_logger
+
+logger = get_logger("contact_sheet")
+
+# A4 horizontal en puntos
+SHEET_WIDTH = 842
+SHEET_HEIGHT = 595
+SHEET_MARGIN = 24
+CAPTION_HEIGHT = 12
+
+
+class ContactSheetBuilder:
+    """Genera un PDF con miniaturas de todos los diplomas de un trabajo."""
+    
+    def __init__(self, columns: int = 4, rows: int = 3):
+        if columns < 1 or rows < 1:
+            raise ValueError("La hoja de contacto requiere al menos una fila y una columna.")
+        self.columns = columns
+        self.rows = rows
+    
+    def build(self, output_folder: str, contact_sheet_filename: str,
+              pdf_files: Optional[List[str]] = None) -> int:
+        """
+        Crea la hoja de contacto de una carpeta de salida.
+        
+        Las páginas se incrustan como contenido vectorial (show_pdf_page), por lo que
+        la hoja es liviana y se genera sin rasterizar cada diploma.
+        
+        Args:
+            output_folder: Carpeta con los PDFs individuales
+            contact_sheet_filename: Ruta del PDF de la hoja de contacto
+            pdf_files: Lista opcional de archivos (por defecto todos los PDFs de la carpeta)
+        
+        Returns:
+            Número de diplomas incluidos
+        
+        Raises:
+            FileNotFoundError: Si la carpeta no existe
+            PDFProcessingError: Si no se pudo generar la hoja
+        """
+        if not os.path.isdir(output_folder):
+            raise FileNotFoundError(f"La carpeta {output_folder} no existe.")
+        
+        if pdf_files is None:
+            pdf_files = sorted(f for f in os.listdir(output_folder) if f.lower().endswith(".pdf"))
+        
+        cell_width = (SHEET_WIDTH - 2 * SHEET_MARGIN) / self.columns
+        cell_height = (SHEET_HEIGHT - 2 * SHEET_MARGIN) / self.rows
+        per_sheet = self.columns * self.rows
+        
+        sheet = fitz.open()
+        try:
+            page = None
+            for position, filename in enumerate(pdf_files):
+                slot = position % per_sheet
+                if slot == 0:
+                    page = sheet.new_page(width=SHEET_WIDTH, height=SHEET_HEIGHT)
+                
+                column, row = slot % self.columns, slot // self.columns
+                left = SHEET_MARGIN + column * cell_width
+                top = SHEET_MARGIN + row * cell_height
+                thumbnail_rect = fitz.Rect(left + 4, top + 4,
+                                           left + cell_width - 4, top + cell_height - CAPTION_HEIGHT - 4)
+                
+                source = fitz.open(os.path.join(output_folder, filename))
+                try:
+                    if source.page_count:
+                        page.show_pdf_page(thumbnail_rect, source, 0)
+                finally:
+                    source.close()
+                
+                page.draw_rect(thumbnail_rect, color=(0.8, 0.8, 0.8), width=0.5)
+                caption_rect = fitz.Rect(left + 4, top + cell_height - CAPTION_HEIGHT - 2,
+                                         left + cell_width - 4, top + cell_height)
+                page.insert_textbox(caption_rect, filename, fontsize=6, align=fitz.TEXT_ALIGN_CENTER)
+            
+            if not pdf_files:
+                sheet.new_page(width=SHEET_WIDTH, height=SHEET_HEIGHT)
+            
+            os.makedirs(os.path.dirname(os.path.abspath(contact_sheet_filename)), exist_ok=True)
+            sheet.save(contact_sheet_filename, garbage=3, deflate=True)
+        except Exception as e:
+            if isinstance(e, (FileNotFoundError, PDFProcessingError)):
+                raise
+            raise PDFProcessingError(f"Error al generar la hoja de contacto: {str(e)}")
+        finally:
+            sheet.close()
+        
+        logger.info("Hoja de contacto con %s diplomas guardada en: %s", len(pdf_files), contact_sheet_filename)
+        return len(pdf_files)
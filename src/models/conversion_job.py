@@ -0,0 +1,90 @@
+"""
+Trabajos de conversión.
+Cada trabajo es un objeto inmutable que describe por completo qué procesar,
+de modo que puede encolarse y ejecutarse en cualquier hilo sin leer el
+estado compartido del modelo.
+"""
+
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Optional
+from .output_profile import OutputProfile, PROFILE_STANDARD
+
+JOB_STATUS_QUEUED = "queued"
+JOB_STATUS_RUNNING = "running"
+JOB_STATUS_COMPLETED = "completed"
+JOB_STATUS_FAILED = "failed"
+
+# Prioridades (menor es más urgente)
+PRIORITY_URGENT = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+PRIORITY_NAMES = {"urgente": PRIORITY_URGENT, "normal": PRIORITY_NORMAL, "baja": PRIORITY_LOW}
+
+
+@dataclass(frozen=True)
+class ConversionJob:
+    """Descripción inmutable de un trabajo de conversión."""
+    job_id: str
+    source_file: str
+    roster_file: Optional[str] = None
+    output_profile: OutputProfile = PROFILE_STANDARD
+    dry_run: bool = False
+    output_root: Optional[str] = None
+    priority: int = PRIORITY_NORMAL
+    created_at: float = field(default_factory=time.time, compare=False)
+    
+    @classmethod
+    def create(cls, source_file: str, roster_file: Optional[str] = None,
+               output_profile: OutputProfile = PROFILE_STANDARD,
+               dry_run: bool = False, output_root: Optional[str] = None,
+               priority: int = PRIORITY_NORMAL) -> "ConversionJob":
+        """
+        Crea un trabajo nuevo con un identificador único.
+        
+        Args:
+            source_file: Documento Word a convertir, o PDF ya combinado (solo se divide)
+            roster_file: Nómina opcional (.xlsx) para conciliar el resultado
+            output_profile: Perfil de escritura de las páginas individuales
+            dry_run: Solo extraer los datos y proponer nombres, sin escribir archivos
+            output_root: Carpeta donde publicar las salidas (por defecto junto al origen)
+            priority: Prioridad del trabajo (PRIORITY_URGENT, PRIORITY_NORMAL o PRIORITY_LOW)
+        
+        Returns:
+            Trabajo listo para encolar
+        """
+        return cls(
+            job_id=uuid.uuid4().hex[:12],
+            source_file=os.path.abspath(source_file),
+            roster_file=os.path.abspath(roster_file) if roster_file else None,
+            output_profile=output_profile,
+            dry_run=dry_run,
+            output_root=os.path.abspath(output_root) if output_root else None,
+            priority=priority
+        )
+    
+    @property
+    def display_name(self) -> str:
+        """Nombre del documento de origen."""
+        return os.path.basename(self.source_file)
+    
+    @property
+    def is_split_only(self) -> bool:
+        """Indica si el origen ya es el PDF combinado y no hace falta convertirlo."""
+        return self.source_file.lower().endswith(".pdf")
+    
+    @property
+    def output_folder(self) -> str:
+        """Carpeta donde se publicarán las páginas del trabajo."""
+        base_folder = os.path.splitext(self.source_file)[0]
+        if self.output_root:
+            return os.path.join(self.output_root, os.path.basename(base_folder))
+        return base_folder
+    
+    def merged_pdf_path(self, work_folder: str) -> str:
+        """PDF combinado: el intermedio dentro del área de trabajo o el propio origen si ya es PDF."""
+        if self.is_split_only:
+            return self.source_file
+        return os.path.join(work_folder, os.path.splitext(os.path.basename(self.source_file))[0] + ".pdf")
@@ -0,0 +1,690 @@
+"""
+Motores de conversión de Word a PDF.
+Cada motor implementa la misma interfaz; el registro lleva estadísticas de
+salud y latencia por motor, elige el más rápido que cumpla la fidelidad
+requerida y pasa al siguiente si uno falla o se cuelga.
+"""
+
+import asyncio
+import os
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional
+from .exceptions import DocumentConversionError
+from src.utils import AppSettings, get_logger
+
+logger = get_logger("converter_backends")
+
+# Niveles de fidelidad del PDF generado
+FIDELITY_TEXT = 1   # Solo texto plano
+FIDELITY_FULL = 2   # Formato, tablas e imágenes
+
+# Tiempo máximo por conversión (segundos)
+DEFAULT_CONVERSION_TIMEOUT = 30
+
+# Tiempo máximo para comprobar si un motor externo responde (segundos)
+DEFAULT_PROBE_TIMEOUT = 5
+
+# Fallos consecutivos tras los que un motor se considera no saludable
+UNHEALTHY_AFTER_FAILURES = 2
+
+# Tiempo (segundos) antes de volver a probar un motor no saludable
+UNHEALTHY_COOLDOWN_SECONDS = 120
+
+# Peso de la última medición en el promedio móvil de latencia
+LATENCY_SMOOTHING = 0.3
+
+# Cada cuántas conversiones se prueba primero un motor aún sin mediciones
+EXPLORE_EVERY = 10
+
+
+class ConverterBackend:
+    """Interfaz común de los motores de conversión."""
+    
+    name = "base"
+    fidelity = FIDELITY_TEXT
+    # Latencia estimada (segundos por MB) mientras no haya mediciones
+    nominal_seconds_per_mb = 10.0
+    
+    def is_available(self) -> bool:
+        """Indica si el motor puede usarse en este equipo."""
+        raise NotImplementedError
+    
+    def convert(self, docx_filename: str, output_pdf_filename: str, timeout: float) -> None:
+        """
+        Convierte un documento Word a PDF.
+        
+        Raises:
+            DocumentConversionError: Si la conversión falla
+            subprocess.TimeoutExpired: Si el motor excede el tiempo máximo
+        """
+        raise NotImplementedError
+    
+    async def is_available_async(self) -> bool:
+        """Versión asíncrona de `is_available` (por defecto en un hilo del ejecutor)."""
+        return await asyncio.get_running_loop().run_in_executor(None, self.is_available)
+    
+    async def convert_async(self, docx_filename: str, output_pdf_filename: str, timeout: float) -> None:
+        """
+        Versión asíncrona de `convert`.
+        
+        Por defecto ejecuta `convert` en un hilo del ejecutor; los motores que
+        lanzan procesos externos la reemplazan para no ocupar un hilo por conversión.
+        
+        Raises:
+            DocumentConversionError: Si la conversión falla
+            asyncio.TimeoutError: Si el motor excede el tiempo máximo
+        """
+        loop = asyncio.get_running_loop()
+        await asyncio.wait_for(
+            loop.run_in_executor(None, self.convert, docx_filename, output_pdf_filename, timeout),
+            timeout
+        )
+
+
+class WordBackend(ConverterBackend):
+    """Microsoft Word vía COM (solo Windows). Mantiene formato e imágenes."""
+    
+    name = "word"
+    fidelity = FIDELITY_FULL
+    nominal_seconds_per_mb = 8.0
+    
+    def is_available(self) -> bool:
+        try:
+            import comtypes.client
+            import pythoncom
+        except ImportError as e:
+            logger.warning("Word no disponible: %s", e)
+            return False
+        
+        pythoncom.CoInitialize()
+        try:
+            word_app = comtypes.client.CreateObject('Word.Application')
+            word_app.Visible = False
+            word_app.Quit()
+            return True
+        except Exception as e:
+            logger.warning("Word no disponible: %s...", str(e)[:100])
+            return False
+        finally:
+            pythoncom.CoUninitialize()
+    
+    def convert(self, docx_filename: str, output_pdf_filename: str, timeout: float) -> None:
+        """
+        Convierte con Word en un hilo aparte para poder respetar el tiempo máximo.
+        
+        Una llamada COM bloqueada no se puede interrumpir: si Word no responde a
+        tiempo se abandona el hilo y se lanza TimeoutExpired para pasar al
+        siguiente motor. Word exporta a un archivo temporal que solo se mueve al
+        destino si terminó a tiempo, así un Word tardío no pisa la salida de otro motor.
+        """
+        fd, partial_pdf = tempfile.mkstemp(suffix=".pdf", prefix=".word-",
+                                           dir=os.path.dirname(os.path.abspath(output_pdf_filename)))
+        os.close(fd)
+        
+        abandoned = threading.Event()
+        errors: List[BaseException] = []
+        
+        def run() -> None:
+            try:
+                self._export(docx_filename, partial_pdf)
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                if abandoned.is_set():
+                    self._discard(partial_pdf)
+        
+        worker = threading.Thread(target=run, name="word-export", daemon=True)
+        worker.start()
+        worker.join(timeout)
+        
+        if worker.is_alive():
+            abandoned.set()
+            self._discard(partial_pdf)
+            logger.warning("Word no respondió en %.0f s; el proceso WINWORD puede seguir abierto", timeout)
+            raise subprocess.TimeoutExpired("Word.Application", timeout)
+        
+        if errors:
+            self._discard(partial_pdf)
+            raise errors[0]
+        if os.path.getsize(partial_pdf) == 0:
+            self._discard(partial_pdf)
+            raise DocumentConversionError("No se pudo generar el archivo PDF.")
+        os.replace(partial_pdf, output_pdf_filename)
+    
+    @staticmethod
+    def _discard(path: str) -> None:
+        """Elimina un archivo temporal si existe (Word puede tenerlo abierto)."""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    
+    @staticmethod
+    def _export(docx_filename: str, output_pdf_filename: str) -> None:
+        """Exporta el documento a PDF con Word (bloqueante)."""
+        import comtypes.client
+        import pythoncom
+        
+        word_app = None
+        doc = None
+        
+        try:
+            # Inicializar COM en el thread actual
+            pythoncom.CoInitialize()
+            
+            # Crear aplicación de Word
+            word_app = comtypes.client.CreateObject('Word.Application')
+            word_app.Visible = False
+            word_app.DisplayAlerts = False
+            
+            # Abrir el documento
+            doc = word_app.Documents.Open(docx_filename, ReadOnly=True)
+            
+            # Exportar a PDF con configuración optimizada (7 argumentos exactos)
+            doc.ExportAsFixedFormat(
+                OutputFileName=output_pdf_filename,
+                ExportFormat=17,  # wdExportFormatPDF
+                OptimizeFor=0,    # wdExportOptimizeForMinimumSize
+                BitmapMissingFonts=True,
+                DocStructureTags=True,
+                CreateBookmarks=0  # wdExportCreateNoBookmarks
+            )
+        
+        finally:
+            # Cerrar documento y aplicación de forma segura
+            try:
+                if doc:
+                    doc.Close(SaveChanges=False)
+            except Exception:
+                pass
+            
+            try:
+                if word_app:
+                    word_app.Quit()
+            except Exception:
+                pass
+            
+            # Limpiar COM
+            try:
+                pythoncom.CoUninitialize()
+            except Exception:
+                pass
+
+
+class LibreOfficeBackend(ConverterBackend):
+    """LibreOffice en modo headless. Mantiene formato e imágenes."""
+    
+    name = "libreoffice"
+    fidelity = FIDELITY_FULL
+    nominal_seconds_per_mb = 10.0
+    
+    def __init__(self, executable: str = "soffice", probe_timeout: float = DEFAULT_PROBE_TIMEOUT,
+                 scratch_dir: Optional[str] = None):
+        self.executable = executable
+        self.probe_timeout = probe_timeout
+        self.scratch_dir = scratch_dir
+    
+    def is_available(self) -> bool:
+        try:
+            subprocess.run([self.executable, '--version'],
+                           capture_output=True, check=True, timeout=self.probe_timeout)
+            return True
+        except Exception as e:
+            logger.warning("LibreOffice no disponible: %s...", str(e)[:50])
+            return False
+    
+    async def is_available_async(self) -> bool:
+        process = None
+        try:
+            process = await asyncio.create_subprocess_exec(
+                self.executable, '--version',
+                stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+            )
+            return await asyncio.wait_for(process.wait(), self.probe_timeout) == 0
+        except Exception as e:
+            logger.warning("LibreOffice no disponible: %s...", str(e)[:50])
+            return False
+        finally:
+            if process is not None and process.returncode is None:
+                self._kill(process)
+                await process.wait()
+    
+    def convert(self, docx_filename: str, output_pdf_filename: str, timeout: float) -> None:
+        # Perfil propio por conversión: con el perfil compartido, una segunda
+        # instancia simultánea de soffice se delega a la primera y no convierte
+        profile_dir = tempfile.mkdtemp(prefix="doctopdf-lo-", dir=self.scratch_dir)
+        
+        # Sesión propia para poder terminar también soffice.bin si LibreOffice se cuelga
+        process = subprocess.Popen(self._command(docx_filename, output_pdf_filename, profile_dir),
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                                   start_new_session=os.name != "nt")
+        try:
+            _, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self._kill(process)
+            process.communicate()
+            raise
+        finally:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+        
+        self._finish(process.returncode, stderr, docx_filename, output_pdf_filename)
+    
+    async def convert_async(self, docx_filename: str, output_pdf_filename: str, timeout: float) -> None:
+        profile_dir = tempfile.mkdtemp(prefix="doctopdf-lo-", dir=self.scratch_dir)
+        process = None
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *self._command(docx_filename, output_pdf_filename, profile_dir),
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+                start_new_session=os.name != "nt"
+            )
+            _, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        finally:
+            # Al vencer el tiempo o cancelar la tarea no debe quedar ningún soffice vivo
+            if process is not None and process.returncode is None:
+                self._kill(process)
+                await process.wait()
+            shutil.rmtree(profile_dir, ignore_errors=True)
+        
+        self._finish(process.returncode, stderr.decode(errors="replace"), docx_filename, output_pdf_filename)
+    
+    def _command(self, docx_filename: str, output_pdf_filename: str, profile_dir: str) -> List[str]:
+        """Línea de comandos de soffice para convertir a PDF en la carpeta del archivo de salida."""
+        return [
+            self.executable,
+            f'-env:UserInstallation=file:///{profile_dir.replace(os.sep, "/").lstrip("/")}',
+            '--headless',
+            '--convert-to', 'pdf',
+            '--outdir', os.path.dirname(output_pdf_filename),
+            docx_filename
+        ]
+    
+    @staticmethod
+    def _finish(returncode: int, stderr: str, docx_filename: str, output_pdf_filename: str) -> None:
+        """Comprueba el resultado de soffice y deja el PDF con el nombre pedido."""
+        if returncode != 0:
+            raise DocumentConversionError(f"LibreOffice falló: {stderr}")
+        
+        # LibreOffice genera el PDF con el mismo nombre base
+        generated_pdf = os.path.join(os.path.dirname(output_pdf_filename),
+                                     os.path.splitext(os.path.basename(docx_filename))[0] + '.pdf')
+        
+        # Si el nombre es diferente, renombrar
+        if generated_pdf != output_pdf_filename:
+            os.replace(generated_pdf, output_pdf_filename)
+    
+    @staticmethod
+    def _kill(process) -> None:
+        """Termina el proceso de LibreOffice y sus hijos (subprocess o asyncio)."""
+        try:
+            if os.name != "nt":
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        except OSError:
+            pass
+
+
+class Docx2txtBackend(ConverterBackend):
+    """docx2txt + reportlab. SOLO TEXTO PLANO, sin formato ni imágenes."""
+    
+    name = "docx2txt"
+    fidelity = FIDELITY_TEXT
+    nominal_seconds_per_mb = 1.0
+    
+    def is_available(self) -> bool:
+        try:
+            import docx2txt
+            from reportlab.pdfgen import canvas
+            return True
+        except ImportError as e:
+            logger.error("docx2txt no disponible: %s...", str(e)[:50])
+            return False
+    
+    def convert(self, docx_filename: str, output_pdf_filename: str, timeout: float) -> None:
+        import docx2txt
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib.utils import simpleSplit
+        
+        # Extraer texto del documento Word
+        text = docx2txt.process(docx_filename)
+        
+        if not text.strip():
+            raise DocumentConversionError("No se pudo extraer texto del documento Word.")
+        
+        # Crear PDF usando reportlab
+        c = canvas.Canvas(output_pdf_filename, pagesize=letter)
+        width, height = letter
+        
+        # Configurar fuente y tamaño
+        c.setFont("Helvetica", 12)
+        
+        # Dividir texto en líneas
+        lines = text.split('\n')
+        y_position = height - 50  # Empezar desde arriba
+        
+        for line in lines:
+            if not line.strip():
+                y_position -= 15  # Línea vacía
+                continue
+            
+            # Dividir líneas largas
+            wrapped_lines = simpleSplit(line, "Helvetica", 12, width - 100)
+            
+            for wrapped_line in wrapped_lines:
+                if y_position < 50:  # Nueva página si no hay espacio
+                    c.showPage()
+                    c.setFont("Helvetica", 12)
+                    y_position = height - 50
+                
+                c.drawString(50, y_position, wrapped_line)
+                y_position -= 15
+        
+        c.save()
+
+
+@dataclass
+class BackendStats:
+    """Estadísticas de salud y latencia de un motor."""
+    name: str
+    available: Optional[bool] = None
+    successes: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    consecutive_failures: int = 0
+    seconds_per_mb: Optional[float] = None
+    last_error: Optional[str] = None
+    unhealthy_since: Optional[float] = None
+    
+    def is_healthy(self, now: float) -> bool:
+        """Un motor deja de estar en cuarentena al vencer el tiempo de espera."""
+        if self.unhealthy_since is None:
+            return True
+        return now - self.unhealthy_since >= UNHEALTHY_COOLDOWN_SECONDS
+
+
+class ConverterRegistry:
+    """Registro de motores con selección por fidelidad y latencia, y conmutación por error."""
+    
+    def __init__(self, backends: Optional[List[ConverterBackend]] = None,
+                 timeout: float = DEFAULT_CONVERSION_TIMEOUT):
+        self.timeout = timeout
+        self._backends: Dict[str, ConverterBackend] = {}
+        self._stats: Dict[str, BackendStats] = {}
+        self._lock = threading.Lock()
+        self._probe_lock = threading.Lock()
+        self._selections = 0
+        for backend in backends or []:
+            self.register(backend)
+    
+    @classmethod
+    def default(cls, timeout: float = DEFAULT_CONVERSION_TIMEOUT, probe_timeout: float = DEFAULT_PROBE_TIMEOUT,
+                libreoffice_executable: str = "soffice",
+                scratch_dir: Optional[str] = None) -> "ConverterRegistry":
+        """Registro con los motores incluidos (Word, LibreOffice, docx2txt)."""
+        libreoffice = LibreOfficeBackend(libreoffice_executable, probe_timeout, scratch_dir)
+        return cls([WordBackend(), libreoffice, Docx2txtBackend()], timeout)
+    
+    @classmethod
+    def from_settings(cls, settings: AppSettings) -> "ConverterRegistry":
+        """Registro con los tiempos de espera, ejecutable y carpeta temporal de la configuración."""
+        return cls.default(settings.conversion_timeout, settings.probe_timeout,
+                           settings.libreoffice_executable, settings.scratch_dir)
+    
+    def register(self, backend: ConverterBackend) -> None:
+        """Agrega (o reemplaza) un motor."""
+        with self._lock:
+            self._backends[backend.name] = backend
+            self._stats[backend.name] = BackendStats(backend.name)
+    
+    def unregister(self, name: str) -> None:
+        """Quita un motor del registro."""
+        with self._lock:
+            self._backends.pop(name, None)
+            self._stats.pop(name, None)
+    
+    def backend_names(self) -> List[str]:
+        """Nombres de los motores registrados, en orden de registro."""
+        return list(self._backends)
+    
+    def stats(self) -> Dict[str, BackendStats]:
+        """Copia de las estadísticas de cada motor."""
+        with self._lock:
+            return {name: replace(stats) for name, stats in self._stats.items()}
+    
+    def select(self, docx_filename: str, min_fidelity: int = FIDELITY_FULL,
+               allow_degraded: bool = False) -> List[ConverterBackend]:
+        """
+        Ordena los motores candidatos para un documento.
+        
+        Primero los motores saludables que cumplen la fidelidad, del más rápido
+        estimado para el tamaño del archivo al más lento (cada EXPLORE_EVERY
+        selecciones se adelanta uno sin mediciones); luego los que la cumplen
+        pero están en cuarentena; y solo si se permite, los de menor fidelidad
+        (primero los saludables).
+        
+        Args:
+            docx_filename: Documento a convertir
+            min_fidelity: Fidelidad mínima requerida
+            allow_degraded: Si se aceptan motores de menor fidelidad como último recurso
+        
+        Returns:
+            Motores en el orden en que deben intentarse
+        """
+        size_mb = max(os.path.getsize(docx_filename) / (1024 * 1024), 0.05) \
+            if os.path.exists(docx_filename) else 1.0
+        
+        candidates = [backend for backend in self._backends.values() if self._is_available(backend)]
+        with self._lock:
+            self._selections += 1
+            explore = self._selections % EXPLORE_EVERY == 0
+            return self._order(candidates, size_mb, min_fidelity, allow_degraded, explore)
+    
+    def preferred_backends(self, min_fidelity: int = FIDELITY_FULL, allow_degraded: bool = False,
+                           probe: bool = False) -> List[str]:
+        """
+        Motores que se intentarían para un documento típico, en orden, sin convertir nada.
+        
+        No cuenta como selección (no altera la exploración de motores sin
+        mediciones). Sin `probe` tampoco comprueba motores: usa la disponibilidad
+        ya conocida e incluye los aún no comprobados, para poder llamarse desde
+        la interfaz sin esperar a Word o LibreOffice.
+        
+        Args:
+            min_fidelity: Fidelidad mínima requerida
+            allow_degraded: Si se aceptan motores de menor fidelidad como último recurso
+            probe: Comprobar la disponibilidad de los motores aún no comprobados
+        
+        Returns:
+            Nombres de los motores en el orden en que se intentarían
+        """
+        if probe:
+            candidates = [backend for backend in self._backends.values() if self._is_available(backend)]
+        else:
+            candidates = [backend for backend in self._backends.values()
+                          if self._stats[backend.name].available is not False]
+        with self._lock:
+            return [backend.name for backend in self._order(candidates, 1.0, min_fidelity, allow_degraded, False)]
+    
+    def _order(self, candidates: List[ConverterBackend], size_mb: float, min_fidelity: int,
+               allow_degraded: bool, explore: bool) -> List[ConverterBackend]:
+        """Ordena los motores disponibles como se describe en `select` (con el candado tomado)."""
+        now = time.monotonic()
+        
+        def estimate(backend: ConverterBackend) -> float:
+            stats = self._stats[backend.name]
+            per_mb = stats.seconds_per_mb if stats.seconds_per_mb is not None \
+                else backend.nominal_seconds_per_mb
+            return per_mb * size_mb
+        
+        candidates = [b for b in candidates if b.name in self._stats]
+        healthy = [b for b in candidates if self._stats[b.name].is_healthy(now)]
+        quarantined = [b for b in candidates if b not in healthy]
+        unmeasured = [b for b in healthy if self._stats[b.name].seconds_per_mb is None]
+        
+        preferred = sorted((b for b in healthy if b.fidelity >= min_fidelity), key=estimate)
+        # De vez en cuando se mide un motor nunca usado para no depender solo de su estimación
+        unmeasured_preferred = [b for b in preferred if b in unmeasured]
+        if explore and unmeasured_preferred:
+            preferred.remove(unmeasured_preferred[0])
+            preferred.insert(0, unmeasured_preferred[0])
+        # Un motor en cuarentena con la fidelidad pedida vale más que un PDF de solo texto
+        ordered = preferred + [b for b in quarantined if b.fidelity >= min_fidelity]
+        if allow_degraded:
+            ordered += sorted((b for b in healthy if b.fidelity < min_fidelity),
+                              key=lambda b: (-b.fidelity, estimate(b)))
+            ordered += [b for b in quarantined if b.fidelity < min_fidelity]
+        return ordered
+    
+    def convert(self, docx_filename: str, output_pdf_filename: str,
+                min_fidelity: int = FIDELITY_FULL, allow_degraded: bool = False) -> str:
+        """
+        Convierte un documento con el mejor motor disponible, pasando al siguiente si falla.
+        
+        Returns:
+            Nombre del motor que generó el PDF
+        
+        Raises:
+            DocumentConversionError: Si ningún motor pudo convertir el documento
+        """
+        candidates = self.select(docx_filename, min_fidelity, allow_degraded)
+        if not candidates:
+            raise self._no_backend_error()
+        
+        errors = []
+        for backend in candidates:
+            started = time.monotonic()
+            try:
+                backend.convert(docx_filename, output_pdf_filename, self.timeout)
+                if not os.path.exists(output_pdf_filename):
+                    raise DocumentConversionError("No se pudo generar el archivo PDF.")
+            except subprocess.TimeoutExpired:
+                self._record_failure(backend, f"sin respuesta tras {self.timeout:.0f} s", timed_out=True)
+                errors.append(f"{backend.name}: sin respuesta tras {self.timeout:.0f} s")
+                continue
+            except Exception as e:
+                self._record_failure(backend, str(e))
+                errors.append(f"{backend.name}: {str(e)}")
+                continue
+            
+            self._record_success(backend, docx_filename, time.monotonic() - started)
+            self._log_completion(backend, min_fidelity, errors)
+            return backend.name
+        
+        raise DocumentConversionError("Ningún método de conversión funcionó:\n" + "\n".join(errors))
+    
+    async def convert_async(self, docx_filename: str, output_pdf_filename: str,
+                            min_fidelity: int = FIDELITY_FULL, allow_degraded: bool = False) -> str:
+        """
+        Versión asíncrona de `convert`: mismos motores, estadísticas y conmutación.
+        
+        Los procesos externos (LibreOffice) se controlan con asyncio, sin ocupar
+        un hilo por conversión; si la tarea se cancela, el proceso se termina.
+        
+        Returns:
+            Nombre del motor que generó el PDF
+        
+        Raises:
+            DocumentConversionError: Si ningún motor pudo convertir el documento
+            asyncio.CancelledError: Si la tarea se cancela
+        """
+        for backend in self._backends.values():
+            await self._probe_async(backend)
+        candidates = self.select(docx_filename, min_fidelity, allow_degraded)
+        if not candidates:
+            raise self._no_backend_error()
+        
+        errors = []
+        for backend in candidates:
+            started = time.monotonic()
+            try:
+                await backend.convert_async(docx_filename, output_pdf_filename, self.timeout)
+                if not os.path.exists(output_pdf_filename):
+                    raise DocumentConversionError("No se pudo generar el archivo PDF.")
+            except asyncio.TimeoutError:
+                self._record_failure(backend, f"sin respuesta tras {self.timeout:.0f} s", timed_out=True)
+                errors.append(f"{backend.name}: sin respuesta tras {self.timeout:.0f} s")
+                continue
+            except Exception as e:
+                self._record_failure(backend, str(e))
+                errors.append(f"{backend.name}: {str(e)}")
+                continue
+            
+            self._record_success(backend, docx_filename, time.monotonic() - started)
+            self._log_completion(backend, min_fidelity, errors)
+            return backend.name
+        
+        raise DocumentConversionError("Ningún método de conversión funcionó:\n" + "\n".join(errors))
+    
+    @staticmethod
+    def _no_backend_error() -> DocumentConversionError:
+        return DocumentConversionError(
+            "No se encontró un método de conversión disponible.\n"
+            "Instala Microsoft Word, LibreOffice, o las dependencias de Python:\n"
+            "pip install docx2txt reportlab"
+        )
+    
+    @staticmethod
+    def _log_completion(backend: ConverterBackend, min_fidelity: int, errors: List[str]) -> None:
+        if backend.fidelity < min_fidelity:
+            logger.warning("Conversión con %s: SOLO TEXTO PLANO, sin formato ni imágenes", backend.name)
+        if errors:
+            logger.warning("Conversión completada con %s tras fallar: %s", backend.name, "; ".join(errors))
+    
+    async def _probe_async(self, backend: ConverterBackend) -> None:
+        """Comprueba la disponibilidad de un motor sin bloquear el bucle de eventos (una sola vez)."""
+        stats = self._stats.get(backend.name)
+        if stats is None or stats.available is not None:
+            return
+        available = await backend.is_available_async()
+        with self._probe_lock:
+            if stats.available is None:
+                stats.available = available
+                if available:
+                    logger.info("Motor de conversión disponible: %s", backend.name)
+    
+    def _is_available(self, backend: ConverterBackend) -> bool:
+        """Comprueba la disponibilidad una sola vez por motor."""
+        stats = self._stats.get(backend.name)
+        if stats is None:
+            return False
+        with self._probe_lock:
+            if stats.available is None:
+                stats.available = backend.is_available()
+                if stats.available:
+                    logger.info("Motor de conversión disponible: %s", backend.name)
+        return stats.available
+    
+    def _record_success(self, backend: ConverterBackend, docx_filename: str, elapsed: float) -> None:
+        size_mb = max(os.path.getsize(docx_filename) / (1024 * 1024), 0.05)
+        with self._lock:
+            stats = self._stats.get(backend.name)
+            if stats is None:
+                return
+            stats.successes += 1
+            stats.consecutive_failures = 0
+            stats.unhealthy_since = None
+            sample = elapsed / size_mb
+            stats.seconds_per_mb = sample if stats.seconds_per_mb is None else \
+                LATENCY_SMOOTHING * sample + (1 - LATENCY_SMOOTHING) * stats.seconds_per_mb
+    
+    def _record_failure(self, backend: ConverterBackend, error_message: str, timed_out: bool = False) -> None:
+        logger.warning("El motor %s falló: %s", backend.name, error_message)
+        with self._lock:
+            stats = self._stats.get(backend.name)
+            if stats is None:
+                return
+            stats.failures += 1
+            stats.timeouts += int(timed_out)
+            stats.consecutive_failures += 1
+            stats.last_error = error_message
+            # Un motor colgado queda en cuarentena de inmediato; los demás tras fallos repetidos
+            if timed_out or stats.consecutive_failures >= UNHEALTHY_AFTER_FAILURES:
+                stats.unhealthy_since = time.monotonic()
@@ -0,0 +1,190 @@
+"""
+Índice de búsqueda de texto completo de los diplomas generados.
+Usa SQLite FTS5 para encontrar diplomas por nombre, registro o cédula
+en todas las carpetas de salida procesadas.
+"""
+
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional
+from .exceptions import PDFProcessingError
+from .pdf_processor import PageResult
+from src.utils import get_logger
+
+logger = get_logger("diploma_index")
+
+# Ubicación por defecto del índice (relativa al directorio de trabajo, como los logs)
+DEFAULT_INDEX_PATH = os.path.join("data", "diplomas_index.db")
+
+_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS diplomas USING fts5(
+    registration_number,
+    name,
+    cedula,
+    text,
+    output_path UNINDEXED,
+    output_folder UNINDEXED,
+    job_id UNINDEXED,
+    created_at UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+)
+"""
+
+
+@dataclass(frozen=True)
+class IndexedDiploma:
+    """Diploma encontrado en el índice."""
+    output_path: str
+    registration_number: Optional[str]
+    name: Optional[str]
+    cedula: Optional[str]
+    job_id: Optional[str]
+    created_at: str
+
+
+class DiplomaIndex:
+    """Índice SQLite FTS5 con los campos y el texto de cada diploma generado."""
+    
+    def __init__(self, index_path: str = DEFAULT_INDEX_PATH):
+        self.index_path = os.path.abspath(index_path)
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        
+        try:
+            with self._connect() as connection:
+                connection.execute(_SCHEMA)
+        except sqlite3.Error as e:
+            raise PDFProcessingError(f"No se pudo abrir el índice de diplomas {self.index_path}: {str(e)}")
+    
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Abre una conexión por operación (segura entre hilos) y confirma los cambios."""
+        connection = sqlite3.connect(self.index_path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+    
+    def index_job(self, output_folder: str, results: Iterable[PageResult],
+                  job_id: Optional[str] = None) -> int:
+        """
+        Indexa las páginas de un trabajo reemplazando lo indexado para esa carpeta.
+        
+        Args:
+            output_folder: Carpeta donde se publicaron las páginas
+            results: Resultados de las páginas generadas
+            job_id: Identificador del trabajo
+        
+        Returns:
+            Número de diplomas indexados
+        """
+        output_folder = os.path.abspath(output_folder)
+        created_at = datetime.now().isoformat(timespec="seconds")
+        rows = [
+            (
+                page.registration_number or "",
+                page.name or "",
+                page.cedula or "",
+                page.text,
+                os.path.join(output_folder, page.filename),
+                output_folder,
+                job_id or "",
+                created_at
+            )
+            for page in results
+        ]
+        
+        with self._connect() as connection:
+            # La carpeta se publica completa, así que su contenido anterior ya no existe
+            connection.execute("DELETE FROM diplomas WHERE output_folder = ?", (output_folder,))
+            connection.executemany(
+                "INSERT INTO diplomas (registration_number, name, cedula, text, output_path, "
+                "output_folder, job_id, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        
+        logger.info("%s diplomas indexados desde %s", len(rows), output_folder)
+        return len(rows)
+    
+    def replace_entry(self, previous_output_path: str, page: PageResult,
+                      job_id: Optional[str] = None) -> None:
+        """
+        Reemplaza la entrada de un único diploma (por ejemplo, tras una reexpedición).
+        
+        Args:
+            previous_output_path: Ruta anterior del diploma
+            page: Resultado de la página regenerada
+            job_id: Identificador del trabajo al que pertenece
+        """
+        previous_output_path = os.path.abspath(previous_output_path)
+        output_folder = os.path.dirname(previous_output_path)
+        with self._connect() as connection:
+            connection.execute("DELETE FROM diplomas WHERE output_path = ?", (previous_output_path,))
+            connection.execute(
+                "INSERT INTO diplomas (registration_number, name, cedula, text, output_path, "
+                "output_folder, job_id, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    page.registration_number or "",
+                    page.name or "",
+                    page.cedula or "",
+                    page.text,
+                    os.path.join(output_folder, page.filename),
+                    output_folder,
+                    job_id or "",
+                    datetime.now().isoformat(timespec="seconds")
+                )
+            )
+    
+    def search(self, query: str, limit: int = 50) -> List[IndexedDiploma]:
+        """
+        Busca diplomas por nombre, registro o cédula parcial.
+        
+        Cada palabra de la consulta se busca como prefijo, de modo que
+        "ana per" encuentra "ANA PÉREZ" y "1234" encuentra el registro 12345.
+        
+        Args:
+            query: Texto a buscar
+            limit: Número máximo de resultados
+        
+        Returns:
+            Diplomas encontrados, ordenados por relevancia
+        """
+        match_expression = self._build_match_expression(query)
+        if not match_expression:
+            return []
+        
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT output_path, registration_number, name, cedula, job_id, created_at "
+                "FROM diplomas WHERE diplomas MATCH ? ORDER BY bm25(diplomas, 10.0, 5.0, 5.0, 1.0) "
+                "LIMIT ?",
+                (match_expression, limit)
+            ).fetchall()
+        
+        return [
+            IndexedDiploma(
+                output_path=row[0],
+                registration_number=row[1] or None,
+                name=row[2] or None,
+                cedula=row[3] or None,
+                job_id=row[4] or None,
+                created_at=row[5]
+            )
+            for row in rows
+        ]
+    
+    def _build_match_expression(self, query: str) -> str:
+        """Convierte una consulta libre en una expresión FTS5 de prefijos."""
+        # Los separadores de miles de la cédula no deben partir el número
+        query = re.sub(r"(?<=\d)[.,](?=\d)", "", query)
+        tokens = re.findall(r"\w+", query)
+        return " AND ".join(f'"{token}"*' for token in tokens)
+    
+    def count(self) -> int:
+        """Devuelve el número total de diplomas indexados."""
+        with self._connect() as connection:
+            return connection.execute("SELECT count(*) FROM diplomas").fetchone()[0]
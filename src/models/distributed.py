@@ -0,0 +1,533 @@
+"""
+Procesamiento distribuido sobre una carpeta de trabajo compartida.
+El coordinador divide cada trabajo en fragmentos de páginas y los registra en
+una cola SQLite dentro de la carpeta compartida. Cada nodo de trabajo toma un
+fragmento con un arrendamiento que renueva mientras lo procesa; si el nodo
+desaparece, el arrendamiento vence y otro nodo lo retoma. Al terminar todos los
+fragmentos, el coordinador resuelve los nombres en el orden de las páginas y
+publica la carpeta de salida de una sola vez.
+"""
+
+import json
+import os
+import shutil
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, replace
+from typing import Callable, Iterator, List, Optional
+import fitz
+from .conversion_job import ConversionJob
+from .document_processing_model import DocumentProcessingModel
+from .output_profile import OutputProfile
+from .output_stager import OutputStager
+from .pdf_processor import PDFProcessor, PageResult, PAGE_STATUS_OK, PAGE_STATUS_COLLISION
+from .exceptions import PDFProcessingError, FileNotFoundError
+from src.utils import get_logger, log_context
+
+logger = get_logger("distributed")
+
+QUEUE_FILENAME = "cola.db"
+MERGED_PDF_FILENAME = "combinado.pdf"
+RESULTS_FILENAME = "resultados.json"
+
+# Páginas por fragmento
+DEFAULT_SHARD_PAGES = 250
+
+# Duración del arrendamiento de un fragmento; se renueva cada tercio de este tiempo
+DEFAULT_LEASE_SECONDS = 60.0
+
+# Intentos por fragmento antes de marcar el trabajo como fallido
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Intervalo de consulta de la cola (nodos y coordinador)
+DEFAULT_POLL_INTERVAL = 1.0
+
+SHARD_PENDING = "pending"
+SHARD_LEASED = "leased"
+SHARD_DONE = "done"
+SHARD_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    source_file TEXT NOT NULL,
+    output_folder TEXT NOT NULL,
+    output_profile TEXT NOT NULL,
+    total_pages INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS shards (
+    shard_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL REFERENCES jobs(job_id),
+    first_page INTEGER NOT NULL,
+    last_page INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    worker_id TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result_dir TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS shards_by_status ON shards(status, lease_expires);
+CREATE INDEX IF NOT EXISTS shards_by_job ON shards(job_id, first_page);
+"""
+
+
+class LeaseLostError(PDFProcessingError):
+    """El arrendamiento del fragmento venció y otro nodo puede haberlo tomado."""
+    pass
+
+
+@dataclass(frozen=True)
+class Shard:
+    """Rango de páginas (desde 1, inclusivo) de un trabajo distribuido."""
+    shard_id: int
+    job_id: str
+    first_page: int
+    last_page: int
+    attempts: int
+    
+    @property
+    def page_count(self) -> int:
+        """Número de páginas del fragmento."""
+        return self.last_page - self.first_page + 1
+
+
+@dataclass(frozen=True)
+class DistributedProgress:
+    """Estado de los fragmentos de un trabajo."""
+    total: int
+    pending: int
+    leased: int
+    done: int
+    failed: int
+    
+    @property
+    def finished(self) -> bool:
+        """Indica si ya no queda ningún fragmento por procesar."""
+        return self.pending == 0 and self.leased == 0
+
+
+class WorkQueue:
+    """Cola de fragmentos en SQLite dentro de la carpeta de trabajo compartida."""
+    
+    def __init__(self, work_dir: str, lease_seconds: float = DEFAULT_LEASE_SECONDS,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.work_dir = os.path.abspath(work_dir)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        os.makedirs(self.work_dir, exist_ok=True)
+        self.queue_path = os.path.join(self.work_dir, QUEUE_FILENAME)
+        
+        try:
+            with self._connect() as connection:
+                connection.executescript(_SCHEMA)
+        except sqlite3.Error as e:
+            raise PDFProcessingError(f"No se pudo abrir la cola de trabajo {self.queue_path}: {str(e)}")
+    
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Abre una conexión por operación; el diario clásico funciona en carpetas de red."""
+        connection = sqlite3.connect(self.queue_path, timeout=30, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        try:
+            yield connection
+        finally:
+            connection.close()
+    
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Transacción con bloqueo de escritura inmediato para que dos nodos no tomen el mismo fragmento."""
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+    
+    def job_dir(self, job_id: str) -> str:
+        """Carpeta compartida de un trabajo (PDF combinado y páginas de cada fragmento)."""
+        return os.path.join(self.work_dir, job_id)
+    
+    def merged_pdf_path(self, job_id: str) -> str:
+        """PDF combinado de un trabajo, visible para todos los nodos."""
+        return os.path.join(self.job_dir(job_id), MERGED_PDF_FILENAME)
+    
+    def add_job(self, job_id: str, source_file: str, output_folder: str, output_profile: OutputProfile,
+                total_pages: int, shard_pages: int = DEFAULT_SHARD_PAGES) -> int:
+        """
+        Registra un trabajo y sus fragmentos.
+        
+        Returns:
+            Número de fragmentos creados
+        """
+        shard_pages = max(1, shard_pages)
+        ranges = [(first, min(first + shard_pages - 1, total_pages))
+                  for first in range(1, total_pages + 1, shard_pages)]
+        with self._transaction() as connection:
+            connection.execute(
+                "INSERT INTO jobs (job_id, source_file, output_folder, output_profile, total_pages, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, source_file, output_folder, json.dumps(asdict(output_profile)), total_pages, time.time())
+            )
+            connection.executemany(
+                "INSERT INTO shards (job_id, first_page, last_page, status) VALUES (?, ?, ?, ?)",
+                [(job_id, first, last, SHARD_PENDING) for first, last in ranges]
+            )
+        return len(ranges)
+    
+    def lease(self, worker_id: str) -> Optional[Shard]:
+        """
+        Toma el siguiente fragmento libre o cuyo arrendamiento venció.
+        
+        Returns:
+            Fragmento arrendado al nodo, o None si no hay trabajo
+        """
+        now = time.time()
+        with self._transaction() as connection:
+            # Los fragmentos abandonados demasiadas veces se dan por fallidos
+            connection.execute(
+                "UPDATE shards SET status = ?, error = 'Arrendamiento vencido demasiadas veces' "
+                "WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+                (SHARD_FAILED, SHARD_LEASED, now, self.max_attempts)
+            )
+            row = connection.execute(
+                "SELECT shard_id, job_id, first_page, last_page, attempts FROM shards "
+                "WHERE status = ? OR (status = ? AND lease_expires < ?) "
+                "ORDER BY shard_id LIMIT 1",
+                (SHARD_PENDING, SHARD_LEASED, now)
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                "UPDATE shards SET status = ?, worker_id = ?, lease_expires = ?, attempts = attempts + 1 "
+                "WHERE shard_id = ?",
+                (SHARD_LEASED, worker_id, now + self.lease_seconds, row["shard_id"])
+            )
+        return Shard(row["shard_id"], row["job_id"], row["first_page"], row["last_page"], row["attempts"] + 1)
+    
+    def renew(self, shard: Shard, worker_id: str) -> bool:
+        """Renueva el arrendamiento; False si el fragmento ya no pertenece al nodo."""
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                "UPDATE shards SET lease_expires = ? WHERE shard_id = ? AND worker_id = ? AND status = ?",
+                (time.time() + self.lease_seconds, shard.shard_id, worker_id, SHARD_LEASED)
+            )
+            return cursor.rowcount == 1
+    
+    def complete(self, shard: Shard, worker_id: str, result_dir: str) -> bool:
+        """Marca el fragmento como terminado si el nodo todavía lo tiene arrendado."""
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                "UPDATE shards SET status = ?, result_dir = ?, lease_expires = NULL "
+                "WHERE shard_id = ? AND worker_id = ? AND status = ?",
+                (SHARD_DONE, result_dir, shard.shard_id, worker_id, SHARD_LEASED)
+            )
+            return cursor.rowcount == 1
+    
+    def fail(self, shard: Shard, worker_id: str, error: str) -> None:
+        """Devuelve el fragmento a la cola, o lo marca fallido si agotó los intentos."""
+        status = SHARD_FAILED if shard.attempts >= self.max_attempts else SHARD_PENDING
+        with self._transaction() as connection:
+            connection.execute(
+                "UPDATE shards SET status = ?, error = ?, worker_id = NULL, lease_expires = NULL "
+                "WHERE shard_id = ? AND worker_id = ? AND status = ?",
+                (status, error, shard.shard_id, worker_id, SHARD_LEASED)
+            )
+    
+    def job_profile(self, job_id: str) -> OutputProfile:
+        """Perfil de salida con el que se registró el trabajo."""
+        with self._connect() as connection:
+            row = connection.execute("SELECT output_profile FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"El trabajo distribuido {job_id} no existe.")
+        return OutputProfile(**json.loads(row["output_profile"]))
+    
+    def progress(self, job_id: str) -> DistributedProgress:
+        """Cuenta los fragmentos del trabajo por estado."""
+        with self._connect() as connection:
+            counts = dict(connection.execute(
+                "SELECT status, COUNT(*) FROM shards WHERE job_id = ? GROUP BY status", (job_id,)
+            ).fetchall())
+        return DistributedProgress(
+            total=sum(counts.values()),
+            pending=counts.get(SHARD_PENDING, 0),
+            leased=counts.get(SHARD_LEASED, 0),
+            done=counts.get(SHARD_DONE, 0),
+            failed=counts.get(SHARD_FAILED, 0)
+        )
+    
+    def shard_errors(self, job_id: str) -> List[str]:
+        """Errores de los fragmentos fallidos de un trabajo."""
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT first_page, last_page, error FROM shards WHERE job_id = ? AND status = ?",
+                (job_id, SHARD_FAILED)
+            ).fetchall()
+        return [f"páginas {row['first_page']}-{row['last_page']}: {row['error']}" for row in rows]
+    
+    def result_dirs(self, job_id: str) -> List[str]:
+        """Carpetas con las páginas de cada fragmento terminado, en orden de página."""
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT result_dir FROM shards WHERE job_id = ? AND status = ? ORDER BY first_page",
+                (job_id, SHARD_DONE)
+            ).fetchall()
+        return [row["result_dir"] for row in rows]
+    
+    def has_job(self, job_id: str) -> bool:
+        """Indica si el trabajo sigue registrado en la cola."""
+        with self._connect() as connection:
+            return connection.execute("SELECT 1 FROM jobs WHERE job_id = ?", (job_id,)).fetchone() is not None
+    
+    def remove_job(self, job_id: str) -> None:
+        """Elimina el trabajo de la cola y su carpeta compartida."""
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM shards WHERE job_id = ?", (job_id,))
+            connection.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+        shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+
+
+class ShardWorker:
+    """Nodo de trabajo: toma fragmentos de la cola compartida y escribe sus páginas."""
+    
+    def __init__(self, work_dir: str, worker_id: Optional[str] = None,
+                 lease_seconds: float = DEFAULT_LEASE_SECONDS,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 pdf_processor: Optional[PDFProcessor] = None):
+        self.queue = WorkQueue(work_dir, lease_seconds)
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.poll_interval = poll_interval
+        self.pdf_processor = pdf_processor or PDFProcessor()
+        self.processed_shards = 0
+        self._stop_event = threading.Event()
+    
+    def stop(self) -> None:
+        """Pide terminar después del fragmento en curso."""
+        self._stop_event.set()
+    
+    def run(self, idle_exit_seconds: Optional[float] = None) -> int:
+        """
+        Procesa fragmentos hasta que se llame a `stop`.
+        
+        Args:
+            idle_exit_seconds: Terminar tras este tiempo sin trabajo (None = nunca)
+        
+        Returns:
+            Número de fragmentos procesados
+        """
+        logger.info("Nodo %s atendiendo la cola %s", self.worker_id, self.queue.queue_path)
+        idle_since = time.monotonic()
+        while not self._stop_event.is_set():
+            if self.run_once():
+                idle_since = time.monotonic()
+                continue
+            if idle_exit_seconds is not None and time.monotonic() - idle_since >= idle_exit_seconds:
+                break
+            self._stop_event.wait(self.poll_interval)
+        logger.info("Nodo %s detenido • %d fragmentos procesados", self.worker_id, self.processed_shards)
+        return self.processed_shards
+    
+    def run_once(self) -> bool:
+        """Procesa un fragmento si hay alguno disponible; indica si lo hubo."""
+        shard = self.queue.lease(self.worker_id)
+        if shard is None:
+            return False
+        
+        with log_context(job_id=shard.job_id):
+            result_dir = os.path.join(self.queue.job_dir(shard.job_id), "fragmentos",
+                                      f"{shard.first_page:06d}-{self.worker_id}-{shard.attempts}")
+            lease_lost = threading.Event()
+            heartbeat_stop = threading.Event()
+            heartbeat = threading.Thread(target=self._heartbeat, args=(shard, lease_lost, heartbeat_stop),
+                                         name=f"heartbeat-{shard.shard_id}", daemon=True)
+            heartbeat.start()
+            try:
+                self._process(shard, result_dir, lease_lost)
+                if not self.queue.complete(shard, self.worker_id, result_dir):
+                    raise LeaseLostError("El arrendamiento venció antes de terminar el fragmento")
+                self.processed_shards += 1
+                logger.info("Nodo %s terminó las páginas %d-%d", self.worker_id, shard.first_page, shard.last_page)
+            except LeaseLostError as e:
+                logger.warning("Fragmento %d-%d abandonado: %s", shard.first_page, shard.last_page, e)
+                self._discard(shard, result_dir)
+            except Exception as e:
+                logger.error("Error en las páginas %d-%d (intento %d): %s",
+                             shard.first_page, shard.last_page, shard.attempts, e)
+                self._discard(shard, result_dir)
+                self.queue.fail(shard, self.worker_id, str(e))
+            finally:
+                heartbeat_stop.set()
+                heartbeat.join()
+        return True
+    
+    def _discard(self, shard: Shard, result_dir: str) -> None:
+        """Borra las páginas escritas; si el coordinador retiró el trabajo, también su carpeta."""
+        shutil.rmtree(result_dir, ignore_errors=True)
+        try:
+            removed = not self.queue.has_job(shard.job_id)
+        except sqlite3.Error as e:
+            logger.warning("No se pudo consultar la cola: %s", e)
+            return
+        if removed:
+            shutil.rmtree(self.queue.job_dir(shard.job_id), ignore_errors=True)
+    
+    def _process(self, shard: Shard, result_dir: str, lease_lost: threading.Event) -> None:
+        """Escribe las páginas del fragmento y sus datos extraídos."""
+        def check_lease(result: PageResult) -> None:
+            if lease_lost.is_set():
+                raise LeaseLostError("Otro nodo retomó el fragmento")
+        
+        exported = self.pdf_processor.export_pages(
+            self.queue.merged_pdf_path(shard.job_id),
+            range(shard.first_page, shard.last_page + 1),
+            result_dir,
+            self.queue.job_profile(shard.job_id),
+            on_page=check_lease
+        )
+        pages = [dict(asdict(result), temp_file=os.path.basename(temp_file)) for temp_file, result in exported]
+        with open(os.path.join(result_dir, RESULTS_FILENAME), "w", encoding="utf-8") as results_file:
+            json.dump(pages, results_file, ensure_ascii=False)
+    
+    def _heartbeat(self, shard: Shard, lease_lost: threading.Event, stop: threading.Event) -> None:
+        """Renueva el arrendamiento mientras se procesa el fragmento."""
+        while not stop.wait(self.queue.lease_seconds / 3):
+            try:
+                if not self.queue.renew(shard, self.worker_id):
+                    lease_lost.set()
+                    return
+            except sqlite3.Error as e:
+                # Un fallo puntual de la carpeta compartida no invalida el arrendamiento todavía
+                logger.warning("No se pudo renovar el arrendamiento: %s", e)
+
+
+class DistributedCoordinator:
+    """Registra trabajos en la cola compartida y publica sus salidas cuando los nodos terminan."""
+    
+    def __init__(self, work_dir: str, model: Optional[DocumentProcessingModel] = None,
+                 shard_pages: int = DEFAULT_SHARD_PAGES, lease_seconds: float = DEFAULT_LEASE_SECONDS,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL):
+        self.queue = WorkQueue(work_dir, lease_seconds)
+        self.model = model or DocumentProcessingModel()
+        self.shard_pages = shard_pages
+        self.poll_interval = poll_interval
+    
+    def submit(self, job: ConversionJob) -> int:
+        """
+        Prepara el PDF combinado en la carpeta compartida y registra sus fragmentos.
+        
+        Un DOCX se convierte una sola vez en este nodo; la división, que se
+        reparte entre los nodos, trabaja sobre el PDF combinado.
+        
+        Returns:
+            Número de fragmentos registrados
+        """
+        if not os.path.exists(job.source_file):
+            raise FileNotFoundError(f"El archivo {job.source_file} no existe.")
+        
+        merged_pdf = self.queue.merged_pdf_path(job.job_id)
+        os.makedirs(os.path.dirname(merged_pdf), exist_ok=True)
+        if job.is_split_only:
+            shutil.copyfile(job.source_file, merged_pdf)
+        else:
+            self.model.document_converter.convert_word_to_pdf(job.source_file, merged_pdf)
+        
+        try:
+            with fitz.open(merged_pdf) as doc:
+                total_pages = doc.page_count
+        except Exception as e:
+            raise PDFProcessingError(f"Error al leer el PDF combinado de {job.display_name}: {str(e)}")
+        
+        shard_count = self.queue.add_job(job.job_id, job.source_file, job.output_folder, job.output_profile,
+                                         total_pages, self.shard_pages)
+        logger.info("Trabajo distribuido %s: %d páginas en %d fragmentos", job.display_name, total_pages, shard_count)
+        return shard_count
+    
+    def wait(self, job: ConversionJob, timeout: Optional[float] = None,
+             on_progress: Optional[Callable[[DistributedProgress], None]] = None) -> List[PageResult]:
+        """
+        Espera a que los nodos terminen el trabajo y publica la carpeta de salida.
+        
+        Si algún fragmento falla o se agota el tiempo de espera, el trabajo se
+        retira de la cola compartida y hay que volver a enviarlo.
+        
+        Raises:
+            PDFProcessingError: Si algún fragmento falló o se agotó el tiempo de espera
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        last_done = -1
+        while True:
+            progress = self.queue.progress(job.job_id)
+            if on_progress and progress.done != last_done:
+                on_progress(progress)
+                last_done = progress.done
+            if progress.failed:
+                errors = "; ".join(self.queue.shard_errors(job.job_id))
+                self.queue.remove_job(job.job_id)
+                raise PDFProcessingError(f"Fallaron fragmentos de {job.display_name}: {errors}")
+            if progress.finished:
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                # Sin quitarlo de la cola, los nodos seguirían tomando fragmentos que nadie publicará
+                self.queue.remove_job(job.job_id)
+                raise PDFProcessingError(f"Tiempo de espera agotado para {job.display_name} "
+                                         f"({progress.done}/{progress.total} fragmentos); trabajo retirado de la cola")
+            time.sleep(self.poll_interval)
+        
+        with log_context(job_id=job.job_id):
+            results = self._assemble(job)
+        self._finish(job, results)
+        return results
+    
+    def run_job(self, job: ConversionJob, timeout: Optional[float] = None,
+                on_progress: Optional[Callable[[DistributedProgress], None]] = None) -> List[PageResult]:
+        """Registra el trabajo y espera su resultado."""
+        self.submit(job)
+        return self.wait(job, timeout, on_progress)
+    
+    def _assemble(self, job: ConversionJob) -> List[PageResult]:
+        """Resuelve los nombres en orden de página y publica la carpeta de salida."""
+        results: List[PageResult] = []
+        with OutputStager(job.output_folder, job.job_id) as stager:
+            for result_dir in self.queue.result_dirs(job.job_id):
+                with open(os.path.join(result_dir, RESULTS_FILENAME), "r", encoding="utf-8") as results_file:
+                    pages = json.load(results_file)
+                for page in pages:
+                    temp_file = os.path.join(result_dir, page.pop("temp_file"))
+                    proposed = PageResult(**page)
+                    filename, collided = stager.stage_file(temp_file, proposed.filename)
+                    status = PAGE_STATUS_COLLISION if collided and proposed.status == PAGE_STATUS_OK else proposed.status
+                    results.append(replace(proposed, filename=filename, status=status))
+            stager.commit()
+        return results
+    
+    def _finish(self, job: ConversionJob, results: List[PageResult]) -> None:
+        """Conserva el manifiesto, indexa, concilia y libera la carpeta compartida."""
+        self.model.retain_job_artifacts(job, results)
+        self.model.publish_results(job, results)
+        self.queue.remove_job(job.job_id)
+        logger.info("Trabajo distribuido %s publicado en %s (%d páginas)",
+                    job.display_name, job.output_folder, len(results))
+
+
+def run_local_worker(work_dir: str, log_queue=None, idle_exit_seconds: Optional[float] = None,
+                     lease_seconds: float = DEFAULT_LEASE_SECONDS) -> int:
+    """
+    Punto de entrada de un nodo lanzado como proceso local (pruebas o una sola máquina con muchos núcleos).
+    
+    Args:
+        work_dir: Carpeta de trabajo compartida
+        log_queue: Cola de logging del proceso principal (ver `get_process_log_queue`)
+        idle_exit_seconds: Terminar tras este tiempo sin trabajo
+        lease_seconds: Duración del arrendamiento de cada fragmento
+    """
+    if log_queue is not None:
+        from src.utils import configure_worker_logging
+        configure_worker_logging(log_queue)
+    return ShardWorker(work_dir, lease_seconds=lease_seconds).run(idle_exit_seconds)
@@ -3,11 +3,27 @@ Modelo principal que coordina las operaciones de conversión y procesamiento.
 """
 
 import os
-from typing import Optional
+import time
+import uuid
+from typing import Callable, List, Optional, Tuple
+from .conversion_job import ConversionJob, PRIORITY_URGENT
 from .document_converter import DocumentConverter
-from .pdf_processor import PDFProcessor
+from .converter_backends import ConverterRegistry
+from .docx_optimizer import DocxOptimizer
+from .pdf_processor import PDFProcessor, PageResult, PAGE_STATUS_FALLBACK, PAGE_STATUS_COLLISION
+from .output_profile import OutputProfile, get_output_profile
+from .roster_reconciler import RosterReconciler, ReconciliationReport
+from .roster_reader import RosterReader
+from .record_planner import RecordPlanner, RecordPlan
+from .diploma_index import DiplomaIndex
+from .job_artifacts import JobArtifactStore
+from .reissue import ReissueService, ReissueReport
+from .scratch_space import ScratchSpace
+from .resource_governor import ResourceGovernor, TASK_CONVERSION, TASK_SPLIT
+from .job_scheduler import JobScheduler, JobTicket
+from .performance_history import PerformanceHistory, JobEta, StageModel, STAGE_CONVERSION, STAGE_SPLIT
 from .exceptions import DocumentConversionError, PDFProcessingError
-from src.utils import get_logger
+from src.utils import AppSettings, get_logger, log_context
 
 logger = get_logger("document_processing")
 
@@ -15,74 +31,479 @@ logger = get_logger("document_processing")
 class DocumentProcessingModel:
     """Modelo principal que coordina todas las operaciones de procesamiento de documentos."""
     
-    def __init__(self):
-        self.document_converter = DocumentConverter()
+    def __init__(self, settings: Optional[AppSettings] = None):
+        """
+        Args:
+            settings: Configuración de la aplicación (tiempos de espera, rutas,
+                retención); por defecto los valores predeterminados
+        """
+        settings = settings or AppSettings()
+        self.settings = settings
+        optimizer = DocxOptimizer(settings.docx_image_dpi) if settings.docx_image_dpi else None
+        self.document_converter = DocumentConverter(ConverterRegistry.from_settings(settings),
+                                                    allow_degraded=bool(settings.allow_degraded_conversion),
+                                                    optimizer=optimizer)
         self.pdf_processor = PDFProcessor()
-        self.selected_file: Optional[str] = None
+        self.selected_files: List[str] = []
+        self.roster_file: Optional[str] = None
+        self.output_profile: OutputProfile = get_output_profile(settings.output_profile)
+        self.output_root: Optional[str] = settings.output_root
+        self.dry_run = False
+        self.index_path: Optional[str] = settings.index_path
+        self.artifact_store = JobArtifactStore(settings.artifacts_dir, settings.retained_jobs)
+        self.scratch_space = ScratchSpace(settings.scratch_dir)
+        self.resource_governor = ResourceGovernor.from_settings(settings)
+        self.job_scheduler = JobScheduler(settings.max_concurrent_jobs)
+        self.performance_history: Optional[PerformanceHistory] = (
+            PerformanceHistory(settings.history_path) if settings.history_path else None
+        )
+        self.retain_artifacts = True
+        self.record_planner = RecordPlanner()
+        self.strict_planning = False
+    
+    @property
+    def selected_file(self) -> Optional[str]:
+        """Primer archivo seleccionado (compatibilidad con la selección única)."""
+        return self.selected_files[0] if self.selected_files else None
     
     def set_selected_file(self, file_path: str) -> None:
         """Establece el archivo seleccionado para procesar."""
-        self.selected_file = file_path
+        self.selected_files = [file_path]
+    
+    def set_selected_files(self, file_paths: List[str]) -> None:
+        """Establece varios archivos seleccionados para procesar."""
+        self.selected_files = list(file_paths)
     
     def get_selected_file(self) -> Optional[str]:
         """Obtiene el archivo actualmente seleccionado."""
         return self.selected_file
     
+    def get_selected_files(self) -> List[str]:
+        """Obtiene todos los archivos seleccionados."""
+        return list(self.selected_files)
+    
     def has_selected_file(self) -> bool:
         """Verifica si hay un archivo seleccionado."""
-        return self.selected_file is not None
+        return bool(self.selected_files)
+    
+    def set_roster_file(self, roster_path: Optional[str]) -> None:
+        """Establece la nómina (.xlsx) contra la que se conciliarán las páginas."""
+        self.roster_file = roster_path
+    
+    def set_output_profile(self, output_profile: OutputProfile) -> None:
+        """Establece el perfil de salida de los próximos trabajos (por ejemplo el perfil web)."""
+        self.output_profile = output_profile
+    
+    def set_dry_run(self, dry_run: bool) -> None:
+        """Activa la simulación: los próximos trabajos solo proponen nombres, sin escribir archivos."""
+        self.dry_run = dry_run
     
     def clear_selected_file(self) -> None:
         """Limpia el archivo seleccionado."""
-        self.selected_file = None
+        self.selected_files = []
         logger.info("Archivo seleccionado limpiado del modelo")
     
-    def process_document(self) -> None:
+    def create_job(self, source_file: Optional[str] = None) -> ConversionJob:
+        """
+        Crea un trabajo inmutable a partir de un archivo (por defecto el seleccionado).
+        
+        Args:
+            source_file: Documento Word a convertir o PDF ya combinado
+            
+        Returns:
+            Trabajo con la nómina, el perfil de salida y el modo simulación configurados en este momento
+            
+        Raises:
+            DocumentConversionError: Si no hay archivo que procesar
+        """
+        source_file = source_file or self.selected_file
+        if not source_file:
+            raise DocumentConversionError("No se ha seleccionado ningún archivo.")
+        return ConversionJob.create(source_file, self.roster_file, self.output_profile, self.dry_run,
+                                    self.output_root)
+    
+    def create_jobs(self) -> List[ConversionJob]:
+        """Crea un trabajo por cada archivo seleccionado."""
+        return [self.create_job(file_path) for file_path in self.selected_files]
+    
+    def process_document(self, on_page: Optional[Callable[[PageResult], None]] = None) -> List[PageResult]:
         """
         Procesa el documento seleccionado: convierte a PDF y divide en páginas.
         
+        Args:
+            on_page: Callback opcional invocado con el resultado de cada página
+            
+        Returns:
+            Lista con el resultado de cada página generada
+            
         Raises:
             DocumentConversionError: Si no hay archivo seleccionado o error en conversión
             PDFProcessingError: Si hay error procesando el PDF
         """
-        if not self.has_selected_file():
-            raise DocumentConversionError("No se ha seleccionado ningún archivo.")
+        return self.run_job(self.create_job(), on_page)
+    
+    def run_job(self, job: ConversionJob,
+                on_page: Optional[Callable[[PageResult], None]] = None,
+                on_progress: Optional[Callable[[int, int], None]] = None,
+                on_start: Optional[Callable[[], None]] = None) -> List[PageResult]:
+        """
+        Ejecuta un trabajo: convierte a PDF y divide en páginas.
         
-        # Generar nombres de archivos y carpetas
-        output_pdf_filename = self._get_output_pdf_filename()
-        output_folder = self._get_output_folder()
+        Si el origen ya es un PDF combinado se omite la conversión; en modo
+        simulación solo se extraen los datos y no se escribe ningún archivo.
         
-        try:
-            # Convertir Word a PDF
-            self.document_converter.convert_word_to_pdf(
-                self.selected_file, 
-                output_pdf_filename
-            )
+        Solo usa los datos del trabajo, por lo que varios trabajos pueden
+        ejecutarse a la vez en hilos distintos. Antes de empezar espera turno
+        en el planificador (por prioridad y tamaño), y durante la división
+        puede ceder el turno entre páginas a un trabajo urgente o mucho más corto.
+        
+        Args:
+            job: Trabajo a ejecutar
+            on_page: Callback opcional invocado con el resultado de cada página
+            on_progress: Callback opcional invocado con (páginas procesadas, total)
+            on_start: Callback opcional invocado cuando el trabajo obtiene turno
+            
+        Returns:
+            Lista con el resultado de cada página generada
+            
+        Raises:
+            DocumentConversionError: Si hay error en la conversión
+            PDFProcessingError: Si hay error procesando el PDF
+        """
+        with log_context(job_id=job.job_id):
+            cost = self.job_scheduler.estimate_cost(job.source_file)
+            with self.job_scheduler.turn(job.job_id, job.display_name, job.priority, cost, on_start) as ticket:
+                return self._run_job(job, on_page, on_progress, ticket)
+    
+    def _run_job(self, job: ConversionJob, on_page: Optional[Callable[[PageResult], None]],
+                 on_progress: Optional[Callable[[int, int], None]],
+                 ticket: Optional[JobTicket] = None) -> List[PageResult]:
+        """Ejecuta las etapas del trabajo (los registros de log llevan su job_id)."""
+        if job.dry_run:
+            return self._preview_job(job, on_page, on_progress)
+        
+        def on_split_progress(done: int, total: int) -> None:
+            if on_progress:
+                on_progress(done, total)
+            # Punto seguro entre páginas: en pausa no cuenta para el regulador de recursos
+            if ticket is not None and done < total:
+                self.job_scheduler.checkpoint(ticket, total - done, self.resource_governor.paused)
+        
+        output_folder = job.output_folder
+        
+        # Una nómina ilegible debe fallar antes de publicar nada
+        reconciler = self.load_roster(job.roster_file) if job.roster_file else None
+        if not job.is_split_only:
+            self.prepare_job(job, on_progress)
+        
+        # Los intermedios (PDF combinado y páginas temporales) se escriben en un área
+        # local del trabajo, que se elimina al terminar aunque el trabajo falle
+        with self.scratch_space.job_area(job.job_id, self.scratch_space.estimate_bytes(job.source_file)) as work_folder:
+            output_pdf_filename = job.merged_pdf_path(work_folder)
+            
+            # Convertir Word a PDF (un PDF ya combinado se divide directamente);
+            # cada etapa espera turno en el regulador si la memoria o la CPU están al límite
+            backend = None
+            conversion_seconds = 0.0
+            if not job.is_split_only:
+                with self.resource_governor.slot(TASK_CONVERSION, job.display_name):
+                    conversion_started = time.perf_counter()
+                    backend = self.document_converter.convert_word_to_pdf(
+                        job.source_file, 
+                        output_pdf_filename,
+                        preflight=False
+                    )
+                    conversion_seconds = time.perf_counter() - conversion_started
             
             # Dividir PDF en páginas individuales
-            self.pdf_processor.split_pdf_by_page(
-                output_pdf_filename, 
-                output_folder
-            )
+            with self.resource_governor.slot(TASK_SPLIT, job.display_name):
+                split_started = time.perf_counter()
+                paused_before = ticket.waited_seconds if ticket is not None else 0.0
+                results = self.pdf_processor.split_pdf_by_page(
+                    output_pdf_filename, 
+                    output_folder,
+                    job.job_id,
+                    delete_input=False,
+                    on_page=on_page,
+                    on_progress=on_split_progress,
+                    output_profile=job.output_profile,
+                    work_folder=work_folder
+                )
+                # Las pausas cedidas a otros trabajos no cuentan como duración de la división
+                split_seconds = time.perf_counter() - split_started
+                if ticket is not None:
+                    split_seconds -= ticket.waited_seconds - paused_before
             
-        finally:
-            # Limpiar archivo temporal si existe
-            self._cleanup_temp_file(output_pdf_filename)
+            self.record_performance(job, backend, conversion_seconds, split_seconds, len(results))
+        
+        # Conservar el manifiesto para reexpediciones selectivas
+        self.retain_job_artifacts(job, results)
+        self.publish_results(job, results, reconciler)
+        logger.debug("Regulador de recursos: %s", self.resource_governor.metrics().summary())
+        return results
+    
+    def prepare_job(self, job: ConversionJob,
+                    on_progress: Optional[Callable[[int, int], None]] = None) -> Optional[RecordPlan]:
+        """
+        Revisa el documento y sus registros antes de la conversión, que es la etapa costosa.
+        
+        Args:
+            job: Trabajo con un DOCX de origen
+            on_progress: Callback opcional que recibe (0, páginas estimadas)
+        
+        Returns:
+            Plan de registros, o None si no se pudo planificar
+        
+        Raises:
+            DocumentConversionError: Si el documento no pasa la revisión previa (o
+                la planificación, con `strict_planning`)
+        """
+        self.document_converter.preflight.check(job.source_file)
+        plan = self._check_plan(job)
+        if plan is not None and on_progress:
+            on_progress(0, plan.estimated_pages)
+        return plan
     
-    def _get_output_pdf_filename(self) -> str:
-        """Genera el nombre del archivo PDF temporal."""
-        return os.path.splitext(self.selected_file)[0] + ".pdf"
+    def publish_results(self, job: ConversionJob, results: List[PageResult],
+                        reconciler: Optional[RosterReconciler] = None) -> None:
+        """
+        Registra las páginas publicadas en el índice y las concilia con la nómina del trabajo.
+        
+        Las páginas ya están publicadas: un fallo del índice o de la conciliación
+        solo se advierte y no hace fallar el trabajo.
+        
+        Args:
+            job: Trabajo terminado
+            results: Resultados de las páginas publicadas
+            reconciler: Nómina ya cargada (por defecto se lee la del trabajo)
+        """
+        self.index_results(results, job.output_folder, job.job_id)
+        if job.roster_file:
+            try:
+                self.reconcile_results(results, job.output_folder, job.roster_file, reconciler)
+            except Exception as e:
+                logger.warning("No se pudo conciliar con la nómina %s: %s", job.roster_file, e)
     
-    def _get_output_folder(self) -> str:
-        """Genera el nombre de la carpeta de salida."""
-        base_name = os.path.splitext(os.path.basename(self.selected_file))[0]
-        return os.path.join(os.path.dirname(self.selected_file), base_name)
+    def _preview_job(self, job: ConversionJob, on_page: Optional[Callable[[PageResult], None]],
+                     on_progress: Optional[Callable[[int, int], None]]) -> List[PageResult]:
+        """
+        Simula un trabajo sin escribir archivos.
+        
+        Un PDF combinado se recorre extrayendo el texto de cada página; un DOCX
+        se resuelve con la planificación de sus campos de combinación, sin convertirlo.
+        """
+        if job.is_split_only:
+            results = self.pdf_processor.preview_split(job.source_file, on_page, on_progress)
+        else:
+            plan, _ = self.plan_document(job.source_file)
+            results = plan.predicted_results()
+            for result in results:
+                if on_page:
+                    on_page(result)
+            if on_progress:
+                on_progress(len(results), len(results))
+        
+        fallback = sum(1 for result in results if result.status == PAGE_STATUS_FALLBACK)
+        collisions = sum(1 for result in results if result.status == PAGE_STATUS_COLLISION)
+        logger.info("Simulación de %s: %d páginas • %d sin datos • %d nombres duplicados",
+                    job.display_name, len(results), fallback, collisions)
+        
+        if job.roster_file:
+            report = self.load_roster(job.roster_file).reconcile(results)
+            if not report.is_clean():
+                logger.warning("La simulación encontró diferencias con la nómina. %s", report.summary())
+        return results
     
-    def _cleanup_temp_file(self, filename: str) -> None:
-        """Elimina el archivo temporal de forma segura."""
+    def plan_document(self, source_file: str,
+                      roster_file: Optional[str] = None) -> Tuple[RecordPlan, Optional[ReconciliationReport]]:
+        """
+        Planifica los registros de un documento sin convertirlo.
+        
+        Args:
+            source_file: Documento Word combinado
+            roster_file: Nómina opcional contra la que conciliar los nombres previstos
+            
+        Returns:
+            Tupla con (plan, reporte_de_conciliación o None)
+            
+        Raises:
+            DocumentConversionError: Si el documento no se puede analizar
+        """
+        plan = self.record_planner.plan(source_file)
+        report = None
+        if roster_file:
+            report = self.load_roster(roster_file).reconcile(plan.predicted_results())
+        return plan, report
+    
+    def _check_plan(self, job: ConversionJob) -> Optional[RecordPlan]:
+        """
+        Planifica el trabajo y avisa de los problemas encontrados.
+        
+        Con `strict_planning` los problemas detienen el trabajo antes de convertir.
+        """
+        try:
+            plan, report = self.plan_document(job.source_file, job.roster_file)
+        except Exception as e:
+            if self.strict_planning:
+                raise DocumentConversionError(f"No se pudo planificar {job.display_name}: {str(e)}")
+            logger.warning("No se pudo planificar %s: %s", job.display_name, e)
+            return None
+        
+        problems = []
+        incomplete = plan.incomplete_records()
+        if incomplete:
+            problems.append(f"{len(incomplete)} registros sin nombre o número de registro")
+        if report is not None and not report.is_clean():
+            problems.append(f"diferencias con la nómina ({report.summary()})")
+        
+        if problems:
+            message = "; ".join(problems)
+            if self.strict_planning:
+                raise DocumentConversionError(f"La planificación de {job.display_name} encontró: {message}")
+            logger.warning("La planificación encontró: %s", message)
+        return plan
+    
+    def reconcile_results(self, results: List[PageResult], output_folder: str,
+                          roster_file: Optional[str] = None,
+                          reconciler: Optional[RosterReconciler] = None) -> ReconciliationReport:
+        """
+        Concilia las páginas generadas contra la nómina y guarda el reporte
+        junto a la carpeta de salida.
+        
+        Args:
+            results: Resultados de las páginas generadas
+            output_folder: Carpeta donde se publicaron las páginas
+            roster_file: Nómina a usar (por defecto la configurada en el modelo)
+            reconciler: Nómina ya cargada (evita leer de nuevo el archivo)
+            
+        Returns:
+            Reporte de conciliación
+        """
+        reconciler = reconciler or self.load_roster(roster_file or self.roster_file)
+        report = reconciler.reconcile(results)
+        reconciler.write_report(report, self._get_reconciliation_filename(output_folder))
+        
+        if not report.is_clean():
+            logger.warning("La conciliación encontró diferencias. %s", report.summary())
+        return report
+    
+    def reissue(self, output_folder: str, registration_numbers: List[str],
+                source_file: str, priority: int = PRIORITY_URGENT) -> ReissueReport:
+        """
+        Regenera solo los diplomas indicados de un trabajo anterior.
+        
+        Por defecto es urgente: pasa antes que los lotes en espera y hace que
+        un lote en curso le ceda el turno entre páginas.
+        
+        Args:
+            output_folder: Carpeta de salida del trabajo anterior
+            registration_numbers: Números de registro a reexpedir
+            source_file: Documento corregido (.pdf o .docx)
+            priority: Prioridad en el planificador de trabajos
+            
+        Returns:
+            Reporte de la reexpedición
+        """
+        service = ReissueService(self.pdf_processor, self.document_converter,
+                                 self.artifact_store, self.index_path, self.scratch_space)
+        label = f"reexpedición de {os.path.basename(os.path.normpath(output_folder))}"
+        with self.job_scheduler.turn(f"reexp-{uuid.uuid4().hex[:12]}", label, priority,
+                                     len(registration_numbers)):
+            return service.reissue(output_folder, registration_numbers, source_file)
+    
+    def retain_job_artifacts(self, job: ConversionJob, results: List[PageResult]) -> None:
+        """Conserva el manifiesto del trabajo (si `retain_artifacts`) sin interrumpirlo si falla."""
+        if not self.retain_artifacts:
+            return
         try:
-            if os.path.exists(filename):
-                os.remove(filename)
-                logger.info(f"Archivo temporal eliminado: {filename}")
+            self.artifact_store.save_job(job.job_id, job.source_file, job.output_folder,
+                                         results, job.output_profile)
         except Exception as e:
-            logger.warning(f"No se pudo eliminar archivo temporal {filename}: {str(e)}")
+            logger.warning("No se pudieron conservar los artefactos del trabajo %s: %s", job.job_id, e)
+    
+    def record_performance(self, job: ConversionJob, backend: Optional[str], conversion_seconds: float,
+                           split_seconds: float, pages: int) -> None:
+        """Guarda la duración de las etapas del trabajo en el historial sin interrumpirlo si falla."""
+        if self.performance_history is None:
+            return
+        try:
+            size_bytes = os.path.getsize(job.source_file)
+            if backend:
+                self.performance_history.record(STAGE_CONVERSION, backend, pages, size_bytes, conversion_seconds)
+            self.performance_history.record(STAGE_SPLIT, job.output_profile.name, pages, size_bytes, split_seconds)
+        except Exception as e:
+            logger.warning("No se pudo actualizar el historial de rendimiento: %s", e)
+    
+    def estimate_job(self, job: ConversionJob) -> Optional[JobEta]:
+        """
+        Prepara la estimación del tiempo restante de un trabajo con el historial.
+        
+        Returns:
+            Estimación que se actualiza con el avance, o None sin historial o en simulación
+        """
+        if self.performance_history is None or job.dry_run:
+            return None
+        try:
+            size_bytes = os.path.getsize(job.source_file)
+        except OSError:
+            size_bytes = 0
+        conversion = None
+        if not job.is_split_only:
+            conversion = self._conversion_model()
+        split = self.performance_history.fit(STAGE_SPLIT, job.output_profile.name)
+        return JobEta(conversion, split, size_bytes, converts=not job.is_split_only)
+    
+    def estimate_seconds(self, source_file: str) -> Optional[float]:
+        """
+        Estima la duración de un documento con el perfil de salida actual, para planificar lotes.
+        
+        Returns:
+            Segundos estimados (conversión y división), o None si falta historial
+        """
+        if self.performance_history is None:
+            return None
+        pages = self.job_scheduler.estimate_cost(source_file)
+        try:
+            size_bytes = os.path.getsize(source_file)
+        except OSError:
+            size_bytes = 0
+        seconds = self.performance_history.estimate(STAGE_SPLIT, self.output_profile.name, pages, size_bytes)
+        if seconds is None or source_file.lower().endswith(".pdf"):
+            return seconds
+        conversion = self._conversion_model()
+        return seconds + conversion.predict(pages, size_bytes) if conversion is not None else None
+    
+    def _conversion_model(self) -> Optional[StageModel]:
+        """
+        Modelo de conversión del primer motor probable que tenga historial.
+        
+        No comprueba los motores ni cuenta como selección: se llama desde la
+        interfaz, y en modo aislado el motor lo elige el proceso de trabajo.
+        """
+        for backend in self.document_converter.likely_methods:
+            model = self.performance_history.fit(STAGE_CONVERSION, backend)
+            if model is not None:
+                return model
+        return None
+    
+    def index_results(self, results: List[PageResult], output_folder: str, job_id: str) -> None:
+        """Agrega las páginas generadas al índice de búsqueda sin interrumpir el trabajo."""
+        try:
+            index = DiplomaIndex(self.index_path) if self.index_path else DiplomaIndex()
+            index.index_job(output_folder, results, job_id)
+        except Exception as e:
+            logger.warning("No se pudo actualizar el índice de diplomas: %s", e)
+    
+    def load_roster(self, roster_file: str) -> RosterReconciler:
+        """
+        Lee la nómina (.xlsx o .csv) fila por fila con las columnas configuradas.
+        
+        Raises:
+            FileNotFoundError: Si el archivo no existe
+            PDFProcessingError: Si la nómina no se puede leer
+        """
+        return RosterReconciler.from_file(roster_file, RosterReader.from_settings(self.settings))
+    
+    def _get_reconciliation_filename(self, output_folder: str) -> str:
+        """Genera el nombre del reporte de conciliación."""
+        return os.path.normpath(output_folder) + "_conciliacion.json"
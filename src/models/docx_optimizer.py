@@ -0,0 +1,417 @@
+"""
+Optimización de documentos Word antes de convertirlos.
+Reescribe una copia del .docx más liviana para que Word o LibreOffice
+decodifiquen menos datos en cada página combinada:
+- reduce las imágenes a la resolución de impresión necesaria según el tamaño
+  con el que se muestran en el documento,
+- une las imágenes idénticas en una sola parte,
+- elimina las imágenes que ninguna relación usa y las copias de vista previa
+  heredadas de VML (o:gfxdata), que Word regenera si las necesita.
+El documento original no se modifica.
+"""
+
+import hashlib
+import os
+import posixpath
+import re
+import shutil
+import time
+import zipfile
+from dataclasses import dataclass, field
+from typing import BinaryIO, Dict, List, Optional, Set, Tuple
+import fitz
+from .docx_preflight import MEDIA_PREFIX
+from .output_profile import IMAGE_DPI_TOLERANCE
+from .exceptions import DocumentConversionError, FileNotFoundError
+from src.utils import get_logger
+
+logger = get_logger("docx_optimizer")
+
+# Resolución de impresión por defecto de las imágenes (puntos por pulgada)
+DEFAULT_IMAGE_DPI = 300
+
+DEFAULT_JPEG_QUALITY = 85
+
+# Unidades de DrawingML (EMU) por pulgada
+EMU_PER_INCH = 914400
+
+CONTENT_TYPES_PART = "[Content_Types].xml"
+
+# Formatos de imagen que se pueden reducir sin cambiar su extensión ni su tipo de contenido
+_RESAMPLE_FORMATS = {".png": "png", ".jpg": "jpeg", ".jpeg": "jpeg"}
+
+_IMAGE_RELATIONSHIP = "/relationships/image"
+
+_RELATIONSHIP_ELEMENT = re.compile(r"<Relationship\b[^>]*?/>")
+_ATTRIBUTE = re.compile(r'([\w:]+)="([^"]*)"')
+
+# Recorte de a:srcRect con algún lado distinto de cero
+_CROPPED = re.compile(rb'="-?[1-9]')
+
+# Copia en base64 del dibujo que Word 2007 guardaba en el respaldo VML
+_LEGACY_PREVIEW = b' o:gfxdata="'
+
+_SCAN_CHUNK_BYTES = 256 * 1024
+
+# Bytes que se conservan entre bloques para no perder coincidencias partidas
+_SCAN_OVERLAP = 256
+
+
+@dataclass
+class DocxOptimizationReport:
+    """Resultado de la optimización de un documento."""
+    source_file: str
+    output_file: Optional[str] = None
+    original_bytes: int = 0
+    optimized_bytes: int = 0
+    downsampled: List[str] = field(default_factory=list)
+    deduplicated: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    legacy_previews: int = 0
+    elapsed: float = 0.0
+    
+    @property
+    def changed(self) -> bool:
+        """Indica si se escribió una copia optimizada."""
+        return self.output_file is not None
+    
+    @property
+    def saved_bytes(self) -> int:
+        """Bytes ahorrados respecto del original."""
+        return self.original_bytes - self.optimized_bytes if self.changed else 0
+    
+    def summary(self) -> str:
+        """Resumen en una línea."""
+        if not self.changed:
+            return f"Optimización de {os.path.basename(self.source_file)}: sin cambios • {self.elapsed * 1000:.0f} ms"
+        return (f"Optimización de {os.path.basename(self.source_file)}: "
+                f"{self.original_bytes / 1024:.0f} KB -> {self.optimized_bytes / 1024:.0f} KB • "
+                f"{len(self.downsampled)} imágenes reducidas • {len(self.deduplicated)} repetidas • "
+                f"{len(self.removed)} partes sin uso • {self.legacy_previews} vistas previas VML • "
+                f"{self.elapsed * 1000:.0f} ms")
+
+
+@dataclass
+class _Relationship:
+    """Relación de un archivo .rels y la parte a la que apunta."""
+    rels_part: str
+    rel_id: str
+    element: str
+    target: str
+    part: Optional[str]
+    is_image: bool
+
+
+class DocxOptimizer:
+    """Genera una copia más liviana de un .docx para la conversión."""
+    
+    def __init__(self, image_dpi: int = DEFAULT_IMAGE_DPI, jpeg_quality: int = DEFAULT_JPEG_QUALITY):
+        """
+        Args:
+            image_dpi: Resolución de impresión de las imágenes
+            jpeg_quality: Calidad de las imágenes JPEG recomprimidas
+        """
+        self.image_dpi = image_dpi
+        self.jpeg_quality = jpeg_quality
+    
+    def optimize(self, docx_filename: str, output_filename: str) -> DocxOptimizationReport:
+        """
+        Escribe en `output_filename` una copia optimizada del documento.
+        
+        Si no hay nada que optimizar no se escribe ningún archivo (`report.changed` es False).
+        
+        Args:
+            docx_filename: Documento Word de origen
+            output_filename: Ruta de la copia optimizada
+        
+        Returns:
+            Reporte con las imágenes reducidas, las repetidas y las partes eliminadas
+        
+        Raises:
+            FileNotFoundError: Si el documento no existe
+            DocumentConversionError: Si el documento no se puede leer o escribir
+        """
+        if not os.path.exists(docx_filename):
+            raise FileNotFoundError(f"El archivo de Word no existe: {docx_filename}")
+        
+        start = time.perf_counter()
+        report = DocxOptimizationReport(docx_filename, original_bytes=os.path.getsize(docx_filename))
+        try:
+            with zipfile.ZipFile(docx_filename) as archive:
+                replacements, removed, stripped = self._plan(archive, report)
+                if replacements or removed or stripped:
+                    self._write(archive, output_filename, replacements, removed, stripped)
+                    report.output_file = output_filename
+                    report.optimized_bytes = os.path.getsize(output_filename)
+        except zipfile.BadZipFile:
+            raise DocumentConversionError(f"{os.path.basename(docx_filename)} no es un .docx válido")
+        except (OSError, zipfile.LargeZipFile, RuntimeError, KeyError) as e:
+            raise DocumentConversionError(f"No se pudo optimizar {os.path.basename(docx_filename)}: {str(e)}")
+        
+        report.elapsed = time.perf_counter() - start
+        return report
+    
+    def _plan(self, archive: zipfile.ZipFile,
+              report: DocxOptimizationReport) -> Tuple[Dict[str, bytes], Set[str], Set[str]]:
+        """
+        Decide qué partes cambian.
+        
+        Returns:
+            Tupla (contenido nuevo por parte, partes eliminadas, partes sin vistas previas VML)
+        """
+        names = set(archive.namelist())
+        relationships = self._read_relationships(archive, names)
+        
+        # Tamaño con el que se muestra cada imagen (None: desconocido) y relaciones usadas
+        usage: Dict[str, List[Optional[float]]] = {}
+        used: Set[Tuple[str, str]] = set()
+        stripped: Set[str] = set()
+        scanned: Set[str] = set()
+        for part in sorted(names):
+            if not (part.startswith("word/") and part.endswith(".xml")):
+                continue
+            rels_part = _rels_part(part)
+            scanned.add(rels_part)
+            images = {rel.rel_id: rel for rel in relationships.get(rels_part, []) if rel.is_image and rel.part}
+            previews = self._scan_part(archive, part, images, usage, used)
+            if previews:
+                stripped.add(part)
+                report.legacy_previews += previews
+        
+        # Relaciones de imagen que el contenido nunca usa
+        changed_rels: Dict[str, str] = {}
+        
+        def rels_text(rels_part: str) -> str:
+            if rels_part not in changed_rels:
+                changed_rels[rels_part] = _read_text(archive, rels_part)
+            return changed_rels[rels_part]
+        
+        for rels_part, rels in relationships.items():
+            if rels_part not in scanned:
+                continue
+            for rel in rels:
+                if rel.is_image and rel.part and (rels_part, rel.rel_id) not in used:
+                    changed_rels[rels_part] = rels_text(rels_part).replace(rel.element, "")
+                    rel.part = None
+        
+        # Imágenes idénticas: todas las relaciones apuntan a la primera
+        canonical: Dict[str, str] = {}
+        by_digest: Dict[str, str] = {}
+        for part in sorted({rel.part for rels in relationships.values() for rel in rels if rel.is_image and rel.part}):
+            digest = hashlib.sha256(archive.read(part)).hexdigest()
+            if digest in by_digest:
+                canonical[part] = by_digest[digest]
+                report.deduplicated.append(f"{part} -> {by_digest[digest]}")
+                usage.setdefault(by_digest[digest], []).extend(usage.pop(part, []))
+            else:
+                by_digest[digest] = part
+        for rels_part, rels in relationships.items():
+            for rel in rels:
+                if rel.part in canonical:
+                    source_folder = posixpath.dirname(_source_part(rels_part)) or "."
+                    target = posixpath.relpath(canonical[rel.part], source_folder)
+                    changed_rels[rels_part] = rels_text(rels_part).replace(rel.element, rel.element.replace(
+                        f'Target="{rel.target}"', f'Target="{target}"'))
+                    rel.part = canonical[rel.part]
+        
+        # Imágenes a las que ya no apunta ninguna relación
+        targeted = {rel.part for rels in relationships.values() for rel in rels if rel.part}
+        removed = {name for name in names if name.startswith(MEDIA_PREFIX) and name not in targeted}
+        report.removed.extend(sorted(part for part in removed if part not in canonical))
+        
+        replacements: Dict[str, bytes] = {part: text.encode("utf-8") for part, text in changed_rels.items()}
+        if removed and CONTENT_TYPES_PART in names:
+            content_types = _read_text(archive, CONTENT_TYPES_PART)
+            for part in removed:
+                content_types = re.sub(rf'<Override PartName="/{re.escape(part)}"[^>]*/>', "", content_types)
+            replacements[CONTENT_TYPES_PART] = content_types.encode("utf-8")
+        
+        # Reducir cada imagen usada que supera la resolución de impresión en todos sus usos
+        for part, widths in sorted(usage.items()):
+            if part in removed or not widths or None in widths:
+                continue
+            image = self._downsample(archive.read(part), os.path.splitext(part)[1].lower(), max(widths))
+            if image is not None:
+                replacements[part] = image
+                report.downsampled.append(part)
+        
+        return replacements, removed, stripped
+    
+    @staticmethod
+    def _read_relationships(archive: zipfile.ZipFile, names: Set[str]) -> Dict[str, List[_Relationship]]:
+        """Lee las relaciones de cada archivo .rels y resuelve la parte a la que apuntan."""
+        relationships: Dict[str, List[_Relationship]] = {}
+        for rels_part in names:
+            if not rels_part.endswith(".rels"):
+                continue
+            source = _source_part(rels_part)
+            rels = []
+            for element in _RELATIONSHIP_ELEMENT.findall(_read_text(archive, rels_part)):
+                attributes = dict(_ATTRIBUTE.findall(element))
+                target = attributes.get("Target", "")
+                external = attributes.get("TargetMode") == "External"
+                part = None if external else _resolve(source, target)
+                rels.append(_Relationship(rels_part, attributes.get("Id", ""), element, target,
+                                          part if part in names else None,
+                                          attributes.get("Type", "").endswith(_IMAGE_RELATIONSHIP)))
+            relationships[rels_part] = rels
+        return relationships
+    
+    @staticmethod
+    def _scan_part(archive: zipfile.ZipFile, part: str, images: Dict[str, _Relationship],
+                   usage: Dict[str, List[Optional[float]]], used: Set[Tuple[str, str]]) -> int:
+        """
+        Recorre una parte XML por bloques buscando el uso de sus imágenes.
+        
+        Una imagen de DrawingML (a:blip) toma el ancho de su wp:extent; si se
+        recorta o se usa desde VML su tamaño se considera desconocido y no se reduce.
+        
+        Returns:
+            Número de vistas previas VML (o:gfxdata) encontradas
+        """
+        alternatives = [rb'<wp:extent cx="(?P<extent>\d+)"', rb'<a:srcRect (?P<crop>[^>]*)>',
+                        re.escape(_LEGACY_PREVIEW)]
+        if images:
+            ids = b"|".join(re.escape(rel_id.encode("utf-8")) for rel_id in images)
+            alternatives.append(rb'="(?P<id>' + ids + rb')"')
+        pattern = re.compile(b"|".join(alternatives))
+        
+        previews = 0
+        extent: Optional[int] = None
+        last_embed: Optional[str] = None
+        tail = b""
+        with archive.open(part) as source:
+            while True:
+                chunk = source.read(_SCAN_CHUNK_BYTES)
+                if not chunk:
+                    break
+                buffer = tail + chunk
+                for match in pattern.finditer(buffer):
+                    # Las coincidencias que terminan en el solapamiento ya se contaron
+                    if match.end() <= len(tail):
+                        continue
+                    if match.group("extent"):
+                        extent = int(match.group("extent"))
+                    elif match.group("crop") is not None:
+                        # Un recorte muestra solo parte de la imagen: su resolución real es mayor
+                        if last_embed is not None and _CROPPED.search(match.group("crop")):
+                            usage[last_embed][-1] = None
+                    elif images and match.group("id"):
+                        rel = images[match.group("id").decode("utf-8")]
+                        used.add((rel.rels_part, rel.rel_id))
+                        attribute = buffer[buffer.rfind(b" ", 0, match.start()) + 1:match.start()]
+                        embedded = attribute.endswith(b":embed") and extent
+                        usage.setdefault(rel.part, []).append(extent / EMU_PER_INCH if embedded else None)
+                        last_embed = rel.part
+                        extent = None
+                    else:
+                        previews += 1
+                tail = buffer[-_SCAN_OVERLAP:]
+        return previews
+    
+    def _downsample(self, data: bytes, extension: str, shown_inches: float) -> Optional[bytes]:
+        """Reduce una imagen a la resolución de impresión (None si no hace falta o no ahorra)."""
+        image_format = _RESAMPLE_FORMATS.get(extension)
+        if image_format is None or shown_inches <= 0:
+            return None
+        try:
+            pixmap = fitz.Pixmap(data)
+            dpi = pixmap.width / shown_inches
+            if dpi <= self.image_dpi * IMAGE_DPI_TOLERANCE:
+                return None
+            if pixmap.n - pixmap.alpha not in (1, 3):
+                pixmap = fitz.Pixmap(fitz.csRGB, pixmap)
+            scale = self.image_dpi / dpi
+            pixmap = fitz.Pixmap(pixmap, max(1, int(pixmap.width * scale)),
+                                 max(1, int(pixmap.height * scale)), None)
+            if image_format == "jpeg":
+                if pixmap.alpha:
+                    pixmap = fitz.Pixmap(pixmap, 0)
+                resampled = pixmap.tobytes("jpeg", jpg_quality=self.jpeg_quality)
+            else:
+                resampled = pixmap.tobytes("png")
+        except Exception as e:
+            logger.debug("No se pudo reducir una imagen %s: %s", extension, e)
+            return None
+        return resampled if len(resampled) < len(data) else None
+    
+    @staticmethod
+    def _write(archive: zipfile.ZipFile, output_filename: str, replacements: Dict[str, bytes],
+               removed: Set[str], stripped: Set[str]) -> None:
+        """Escribe la copia con las partes reemplazadas, sin las eliminadas y sin vistas previas VML."""
+        try:
+            with zipfile.ZipFile(output_filename, "w") as output:
+                for info in archive.infolist():
+                    if info.filename in removed:
+                        continue
+                    target_info = zipfile.ZipInfo(info.filename, info.date_time)
+                    target_info.compress_type = info.compress_type
+                    target_info.external_attr = info.external_attr
+                    if info.filename in replacements:
+                        output.writestr(target_info, replacements[info.filename])
+                        continue
+                    with archive.open(info) as source, \
+                            output.open(target_info, "w", force_zip64=info.file_size > zipfile.ZIP64_LIMIT) as target:
+                        if info.filename in stripped:
+                            _strip_legacy_previews(source, target)
+                        else:
+                            shutil.copyfileobj(source, target)
+        except BaseException:
+            if os.path.exists(output_filename):
+                os.remove(output_filename)
+            raise
+
+
+def _source_part(rels_part: str) -> str:
+    """Parte que describe un .rels ("word/_rels/document.xml.rels" -> "word/document.xml")."""
+    folder, name = posixpath.split(rels_part)
+    return posixpath.join(posixpath.dirname(folder), name[:-len(".rels")])
+
+
+def _rels_part(part: str) -> str:
+    """Archivo .rels de una parte ("word/document.xml" -> "word/_rels/document.xml.rels")."""
+    folder, name = posixpath.split(part)
+    return posixpath.join(folder, "_rels", name + ".rels")
+
+
+def _resolve(source: str, target: str) -> str:
+    """Nombre de la parte a la que apunta una relación, relativa a la parte de origen."""
+    if target.startswith("/"):
+        return target[1:]
+    return posixpath.normpath(posixpath.join(posixpath.dirname(source), target))
+
+
+def _read_text(archive: zipfile.ZipFile, part: str) -> str:
+    return archive.read(part).decode("utf-8")
+
+
+def _strip_legacy_previews(source: BinaryIO, target: BinaryIO) -> None:
+    """Copia una parte XML por bloques quitando los atributos o:gfxdata."""
+    pending = b""
+    skipping = False
+    while True:
+        chunk = source.read(_SCAN_CHUNK_BYTES)
+        if not chunk:
+            break
+        data = pending + chunk
+        pending = b""
+        while data:
+            if skipping:
+                end = data.find(b'"')
+                if end < 0:
+                    data = b""
+                    break
+                data = data[end + 1:]
+                skipping = False
+                continue
+            start = data.find(_LEGACY_PREVIEW)
+            if start < 0:
+                # Se reserva el final por si el atributo quedó partido entre bloques
+                keep = max(len(data) - len(_LEGACY_PREVIEW) + 1, 0)
+                target.write(data[:keep])
+                pending = data[keep:]
+                break
+            target.write(data[:start])
+            data = data[start + len(_LEGACY_PREVIEW):]
+            skipping = True
+    target.write(pending)
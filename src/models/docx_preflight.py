@@ -0,0 +1,258 @@
+"""
+Revisión previa de documentos Word antes de convertirlos.
+Lee solo el directorio central del zip y el comienzo de word/document.xml
+para detectar en milisegundos los problemas que, de otro modo, aparecen
+minutos después dentro de Word o LibreOffice: archivos dañados o copiados a
+medias, partes obligatorias ausentes, campos de combinación sin combinar e
+imágenes desproporcionadas. También estima el número de páginas.
+"""
+
+import os
+import re
+import time
+import zipfile
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+from .exceptions import DocumentConversionError, FileNotFoundError
+from .record_planner import PLANNED_FIELDS
+from .roster_reader import REGISTRATION_COLUMNS, NAME_COLUMNS, CEDULA_COLUMNS, normalize_name
+from src.utils import get_logger
+
+logger = get_logger("docx_preflight")
+
+REQUIRED_PARTS = ("[Content_Types].xml", "_rels/.rels", "word/document.xml")
+DOCUMENT_PART = "word/document.xml"
+MEDIA_PREFIX = "word/media/"
+
+# Tamaño a partir del cual una imagen se considera desproporcionada
+DEFAULT_MAX_MEDIA_BYTES = 10 * 1024 * 1024
+
+# Bytes descomprimidos de document.xml que se revisan (el resto se extrapola)
+DEFAULT_SCAN_BYTES = 8 * 1024 * 1024
+
+_SCAN_CHUNK_BYTES = 256 * 1024
+
+# Patrones contados en document.xml
+_SCAN_PATTERNS: Dict[str, "re.Pattern[bytes]"] = {
+    "merge_fields": re.compile(rb"MERGEFIELD"),
+    "section_breaks": re.compile(rb"<w:sectPr[ >]"),
+    "page_breaks": re.compile(rb"<w:br [^>]*w:type=\"page\""),
+}
+
+# Bytes que se conservan entre bloques para no perder coincidencias partidas
+_SCAN_OVERLAP = 256
+
+_APP_PAGES = re.compile(rb"<Pages>(\d+)</Pages>")
+
+# Un «Campo» visible es el resultado de un campo de combinación que nunca recibió
+# datos, pero las comillas angulares también son comillas normales en español:
+# solo cuenta como campo sin combinar si coincide con un nombre de campo conocido
+_QUOTED_TEXT = re.compile("«([^«»<]{1,60})»".encode("utf-8"))
+_MERGEFIELD_NAME = re.compile(rb'MERGEFIELD\s+"?([^"\s\\<]+)')
+
+# Campos de la plantilla y columnas de la nómina habituales
+KNOWN_FIELD_NAMES = tuple(PLANNED_FIELDS) + REGISTRATION_COLUMNS + NAME_COLUMNS + CEDULA_COLUMNS
+
+
+@dataclass
+class PreflightReport:
+    """Resultado de la revisión previa de un documento."""
+    source_file: str
+    errors: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+    estimated_pages: Optional[int] = None
+    merge_fields: int = 0
+    placeholders: int = 0
+    quoted_texts: int = 0
+    media_bytes: int = 0
+    elapsed: float = 0.0
+    
+    @property
+    def ok(self) -> bool:
+        """Indica si el documento puede convertirse."""
+        return not self.errors
+    
+    def summary(self) -> str:
+        """Resumen en una línea."""
+        pages = self.estimated_pages if self.estimated_pages is not None else "?"
+        return (f"Revisión de {os.path.basename(self.source_file)}: {len(self.errors)} errores • "
+                f"{len(self.warnings)} avisos • ~{pages} páginas • {self.elapsed * 1000:.0f} ms")
+
+
+class DocxPreflight:
+    """Revisión rápida de la estructura y el contenido de un .docx."""
+    
+    def __init__(self, max_media_bytes: int = DEFAULT_MAX_MEDIA_BYTES,
+                 scan_bytes: int = DEFAULT_SCAN_BYTES):
+        self.max_media_bytes = max_media_bytes
+        self.scan_bytes = scan_bytes
+    
+    def inspect(self, docx_filename: str) -> PreflightReport:
+        """
+        Revisa un documento sin convertirlo.
+        
+        Args:
+            docx_filename: Documento Word a revisar
+        
+        Returns:
+            Reporte con errores (impiden la conversión) y avisos
+        
+        Raises:
+            FileNotFoundError: Si el archivo no existe
+        """
+        if not os.path.exists(docx_filename):
+            raise FileNotFoundError(f"El archivo de Word no existe: {docx_filename}")
+        
+        start = time.perf_counter()
+        report = PreflightReport(docx_filename)
+        stat_before = os.stat(docx_filename)
+        
+        try:
+            with zipfile.ZipFile(docx_filename) as archive:
+                self._check_structure(archive, report)
+                if report.ok:
+                    self._check_media(archive, report)
+                    self._check_content(archive, report)
+        except zipfile.BadZipFile:
+            report.errors.append("El archivo no es un .docx válido o está incompleto "
+                                 "(dañado o todavía copiándose)")
+        except (OSError, zipfile.LargeZipFile, RuntimeError, NotImplementedError) as e:
+            report.errors.append(f"No se pudo leer el documento: {str(e)}")
+        
+        stat_after = os.stat(docx_filename)
+        if (stat_after.st_size, stat_after.st_mtime) != (stat_before.st_size, stat_before.st_mtime):
+            report.errors.append("El archivo cambió durante la revisión (todavía se está copiando)")
+        
+        report.elapsed = time.perf_counter() - start
+        return report
+    
+    def check(self, docx_filename: str) -> PreflightReport:
+        """
+        Revisa el documento, registra los avisos y rechaza los documentos con errores.
+        
+        Raises:
+            DocumentConversionError: Si el documento tiene errores
+            FileNotFoundError: Si el archivo no existe
+        """
+        report = self.inspect(docx_filename)
+        for warning in report.warnings:
+            logger.warning("Revisión previa de %s: %s", os.path.basename(docx_filename), warning)
+        if not report.ok:
+            raise DocumentConversionError(
+                f"{os.path.basename(docx_filename)} no se puede convertir: " + "; ".join(report.errors)
+            )
+        logger.info(report.summary())
+        return report
+    
+    def _check_structure(self, archive: zipfile.ZipFile, report: PreflightReport) -> None:
+        """Comprueba las partes obligatorias y que no haya partes cifradas."""
+        names = set(archive.namelist())
+        missing = [part for part in REQUIRED_PARTS if part not in names]
+        if missing:
+            report.errors.append(f"Faltan partes obligatorias: {', '.join(missing)}")
+        if any(info.flag_bits & 0x1 for info in archive.infolist()):
+            report.errors.append("El documento está protegido con contraseña")
+    
+    def _check_media(self, archive: zipfile.ZipFile, report: PreflightReport) -> None:
+        """Avisa de imágenes desproporcionadas o repetidas (solo con el directorio central)."""
+        seen: Dict[Tuple[int, int], str] = {}
+        for info in archive.infolist():
+            if not info.filename.startswith(MEDIA_PREFIX):
+                continue
+            report.media_bytes += info.file_size
+            if info.file_size > self.max_media_bytes:
+                report.warnings.append(f"Imagen muy grande: {info.filename} "
+                                       f"({info.file_size / (1024 * 1024):.1f} MB)")
+            key = (info.CRC, info.file_size)
+            if key in seen:
+                report.warnings.append(f"Imagen repetida: {info.filename} es idéntica a {seen[key]}")
+            else:
+                seen[key] = info.filename
+    
+    def _check_content(self, archive: zipfile.ZipFile, report: PreflightReport) -> None:
+        """Busca campos sin combinar y estima las páginas leyendo el comienzo de document.xml."""
+        document_size = archive.getinfo(DOCUMENT_PART).file_size
+        counts, scanned, quoted, field_names = self._scan_document(archive)
+        report.merge_fields = counts["merge_fields"]
+        known = {_field_key(name) for name in KNOWN_FIELD_NAMES} | field_names
+        report.placeholders = sum(count for text, count in quoted.items() if text in known)
+        report.quoted_texts = sum(quoted.values()) - report.placeholders
+        
+        if report.placeholders:
+            report.errors.append(f"{report.placeholders} campos de combinación sin datos («Campo»); "
+                                 "combine la plantilla con la nómina antes de convertir")
+        if report.quoted_texts:
+            report.warnings.append(f"{report.quoted_texts} textos entre comillas angulares («...») que no son "
+                                   "campos conocidos; revise que no sean campos sin combinar")
+        if report.merge_fields and self._is_merge_main_document(archive):
+            report.warnings.append("Es el documento principal de una combinación: solo se convertirá "
+                                   "el registro de vista previa")
+        
+        report.estimated_pages = self._estimate_pages(archive, counts, scanned, document_size)
+    
+    def _scan_document(self, archive: zipfile.ZipFile) -> Tuple[Dict[str, int], int, Dict[str, int], Set[str]]:
+        """
+        Recorre los primeros `scan_bytes` descomprimidos de document.xml.
+        
+        Returns:
+            Conteo de cada patrón, bytes revisados, textos entre comillas angulares
+            (normalizados, con sus apariciones) y nombres de los campos MERGEFIELD
+        """
+        counts = {name: 0 for name in _SCAN_PATTERNS}
+        quoted: Dict[str, int] = {}
+        field_names: Set[str] = set()
+        scanned = 0
+        tail = b""
+        with archive.open(DOCUMENT_PART) as document:
+            while scanned < self.scan_bytes:
+                chunk = document.read(_SCAN_CHUNK_BYTES)
+                if not chunk:
+                    break
+                scanned += len(chunk)
+                buffer = tail + chunk
+                for name, pattern in _SCAN_PATTERNS.items():
+                    # Las coincidencias que terminan en el solapamiento ya se contaron
+                    counts[name] += sum(1 for match in pattern.finditer(buffer) if match.end() > len(tail))
+                for match in _QUOTED_TEXT.finditer(buffer):
+                    if match.end() > len(tail):
+                        key = _field_key(match.group(1).decode("utf-8", "replace"))
+                        quoted[key] = quoted.get(key, 0) + 1
+                field_names.update(_field_key(match.group(1).decode("utf-8", "replace"))
+                                   for match in _MERGEFIELD_NAME.finditer(buffer))
+                tail = buffer[-_SCAN_OVERLAP:]
+        return counts, scanned, quoted, field_names
+    
+    @staticmethod
+    def _is_merge_main_document(archive: zipfile.ZipFile) -> bool:
+        """Indica si settings.xml conserva la configuración de combinación de correspondencia."""
+        try:
+            return b"<w:mailMerge>" in archive.read("word/settings.xml")
+        except KeyError:
+            return False
+    
+    @staticmethod
+    def _estimate_pages(archive: zipfile.ZipFile, counts: Dict[str, int], scanned: int,
+                        document_size: int) -> Optional[int]:
+        """
+        Estima las páginas con los saltos de sección y de página.
+        
+        Si solo se revisó una parte del documento, se extrapola por tamaño; si
+        no hay saltos se usa el número de páginas que Word guardó en app.xml.
+        """
+        breaks = counts["section_breaks"] + counts["page_breaks"]
+        if breaks and scanned < document_size:
+            # Cada salto visto cierra una página; el sectPr final todavía no se leyó
+            return max(1, round(breaks * document_size / scanned))
+        if breaks > 1 or counts["page_breaks"]:
+            # El último sectPr del cuerpo no es un salto: cierra la última página
+            return breaks
+        try:
+            match = _APP_PAGES.search(archive.read("docProps/app.xml"))
+        except KeyError:
+            match = None
+        return int(match.group(1)) if match else None
+
+
+def _field_key(name: str) -> str:
+    """Clave para comparar nombres de campo sin tildes, mayúsculas ni espacios ("Registro No" = "registro_no")."""
+    return normalize_name(name).replace(" ", "_")
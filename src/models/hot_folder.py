@@ -0,0 +1,358 @@
+"""
+Carpeta vigilada para procesar documentos sin abrir la interfaz.
+Los documentos combinados (.docx o .pdf) que se copian en la carpeta se
+procesan en cuanto terminan de copiarse: se detectan con inotify en Linux (o
+revisando la carpeta periódicamente en otros sistemas), se espera a que su
+tamaño se estabilice y se ejecutan con concurrencia limitada. Al terminar, el
+documento se mueve a la carpeta de procesados o a la de fallidos.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import shutil
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Set
+from .conversion_job import ConversionJob
+from .job_scheduler import WAITING_THREADS
+from .document_processing_model import DocumentProcessingModel
+from .pdf_processor import PageResult
+from .exceptions import FileNotFoundError
+from src.utils import get_logger
+
+logger = get_logger("hot_folder")
+
+SUPPORTED_EXTENSIONS = (".docx", ".pdf")
+
+# Subcarpetas de trabajo dentro de la carpeta vigilada
+PROCESSING_DIR_NAME = "en_proceso"
+PROCESSED_DIR_NAME = "procesados"
+FAILED_DIR_NAME = "fallidos"
+OUTPUT_DIR_NAME = "salida"
+
+# Segundos que el tamaño debe mantenerse igual para considerar la copia terminada
+DEFAULT_STABLE_SECONDS = 2.0
+
+# Intervalo de revisión de los archivos pendientes (y de la carpeta, sin inotify)
+DEFAULT_POLL_INTERVAL = 1.0
+
+# Con inotify, revisión completa de respaldo por si se perdieron eventos
+FULL_RESCAN_SECONDS = 60.0
+
+# Constantes de inotify (linux/inotify.h)
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_Q_OVERFLOW = 0x00004000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+@dataclass
+class _PendingFile:
+    """Archivo detectado que todavía puede estar copiándose."""
+    size: int
+    mtime: float
+    stable_since: float
+
+
+class _PollingWatcher:
+    """Detecta archivos nuevos revisando la carpeta en cada intervalo."""
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+    
+    def wait(self, timeout: float) -> Optional[Set[str]]:
+        """Espera el intervalo indicado; None indica que hay que revisar toda la carpeta."""
+        time.sleep(timeout)
+        return None
+    
+    def close(self) -> None:
+        pass
+
+
+class _InotifyWatcher:
+    """Detecta archivos nuevos con inotify (solo Linux)."""
+    
+    def __init__(self, directory: str):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falló")
+        mask = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_MODIFY
+        if libc.inotify_add_watch(self._fd, os.fsencode(directory), mask) < 0:
+            error = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(error, f"inotify_add_watch falló para {directory}")
+    
+    def wait(self, timeout: float) -> Optional[Set[str]]:
+        """
+        Espera eventos hasta `timeout` segundos.
+        
+        Returns:
+            Nombres de los archivos que cambiaron, o None si la cola de eventos
+            se desbordó y hay que revisar toda la carpeta
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        
+        names: Set[str] = set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return names
+        
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & _IN_Q_OVERFLOW:
+                return None
+            if name:
+                names.add(os.fsdecode(name))
+        return names
+    
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def _create_watcher(directory: str, use_inotify: bool):
+    """Usa inotify si está disponible; si no, revisión periódica."""
+    if use_inotify and hasattr(select, "select") and os.name == "posix":
+        try:
+            watcher = _InotifyWatcher(directory)
+            logger.info("Vigilando %s con inotify", directory)
+            return watcher
+        except (OSError, AttributeError, TypeError) as e:
+            logger.warning("inotify no disponible (%s); se revisará la carpeta periódicamente", e)
+    logger.info("Vigilando %s por revisión periódica", directory)
+    return _PollingWatcher(directory)
+
+
+class HotFolderService:
+    """Procesa automáticamente los documentos que llegan a una carpeta vigilada."""
+    
+    def __init__(self, watch_dir: str, model: Optional[DocumentProcessingModel] = None,
+                 output_root: Optional[str] = None, max_workers: Optional[int] = None,
+                 stable_seconds: float = DEFAULT_STABLE_SECONDS,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL, use_inotify: bool = True):
+        """
+        Args:
+            watch_dir: Carpeta donde se depositan los documentos combinados
+            model: Modelo con el que se ejecutan los trabajos
+            output_root: Carpeta de salida (por defecto la configurada o <watch_dir>/salida)
+            max_workers: Trabajos simultáneos (por defecto los de la configuración)
+            stable_seconds: Tiempo sin cambios de tamaño antes de procesar un archivo
+            poll_interval: Intervalo de revisión en segundos
+            use_inotify: Usar inotify cuando esté disponible
+        """
+        self.watch_dir = os.path.abspath(watch_dir)
+        if not os.path.isdir(self.watch_dir):
+            raise FileNotFoundError(f"La carpeta vigilada {self.watch_dir} no existe.")
+        
+        self.model = model or DocumentProcessingModel()
+        self.output_root = os.path.abspath(
+            output_root or self.model.output_root or os.path.join(self.watch_dir, OUTPUT_DIR_NAME)
+        )
+        self.processing_dir = os.path.join(self.watch_dir, PROCESSING_DIR_NAME)
+        self.processed_dir = os.path.join(self.watch_dir, PROCESSED_DIR_NAME)
+        self.failed_dir = os.path.join(self.watch_dir, FAILED_DIR_NAME)
+        self.max_workers = max_workers or self.model.settings.max_concurrent_jobs
+        self.stable_seconds = stable_seconds
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        
+        # Callback opcional invocado con (trabajo, resultados o None, error o None)
+        self.on_job_finished: Optional[Callable[[ConversionJob, Optional[List[PageResult]],
+                                                 Optional[Exception]], None]] = None
+        
+        self._pending: Dict[str, _PendingFile] = {}
+        self._active_jobs: Set[str] = set()
+        self._active_outputs: Set[str] = set()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self.processed_count = 0
+        self.failed_count = 0
+    
+    def run(self) -> None:
+        """Vigila la carpeta hasta que se llame a `stop` y espera a los trabajos en curso."""
+        for folder in (self.processing_dir, self.processed_dir, self.failed_dir, self.output_root):
+            os.makedirs(folder, exist_ok=True)
+        self._recover_interrupted()
+        
+        watcher = _create_watcher(self.watch_dir, self.use_inotify)
+        # El planificador del modelo limita los trabajos simultáneos y elige primero los
+        # documentos cortos; los hilos de sobra permiten que esperen turno sin bloquear la cola
+        self.model.job_scheduler.set_slots(self.max_workers)
+        executor = ThreadPoolExecutor(max_workers=self.max_workers + WAITING_THREADS, thread_name_prefix="hot-folder")
+        logger.info("Carpeta vigilada: %s • salida: %s • trabajos simultáneos: %d",
+                    self.watch_dir, self.output_root, self.max_workers)
+        
+        try:
+            self._scan_all()
+            last_full_scan = time.monotonic()
+            while not self._stop_event.is_set():
+                changed = watcher.wait(self.poll_interval)
+                if changed is None or time.monotonic() - last_full_scan >= FULL_RESCAN_SECONDS:
+                    self._scan_all()
+                    last_full_scan = time.monotonic()
+                else:
+                    for name in changed:
+                        self._observe(name)
+                self._submit_stable(executor)
+        finally:
+            watcher.close()
+            logger.info("Deteniendo la carpeta vigilada; esperando %d trabajos en curso", len(self._active_jobs))
+            executor.shutdown(wait=True)
+            logger.info("Carpeta vigilada detenida • %d procesados • %d fallidos",
+                        self.processed_count, self.failed_count)
+    
+    def stop(self) -> None:
+        """Pide detener la vigilancia (los trabajos en curso terminan normalmente)."""
+        self._stop_event.set()
+    
+    def _recover_interrupted(self) -> None:
+        """Devuelve a la carpeta vigilada los documentos que quedaron a medio procesar."""
+        names = os.listdir(self.processing_dir)
+        docx_stems = {os.path.splitext(name)[0] for name in names if name.lower().endswith(".docx")}
+        for name in names:
+            path = os.path.join(self.processing_dir, name)
+            stem, extension = os.path.splitext(name)
+            if extension.lower() == ".pdf" and stem in docx_stems:
+                # PDF intermedio de una conversión interrumpida (versiones anteriores lo dejaban junto al origen)
+                os.remove(path)
+                continue
+            if self._is_candidate(name):
+                target = self._move_unique(path, self.watch_dir)
+                logger.warning("Documento interrumpido devuelto a la cola: %s", os.path.basename(target))
+    
+    def _scan_all(self) -> None:
+        """Revisa todos los archivos de la carpeta vigilada."""
+        for name in os.listdir(self.watch_dir):
+            self._observe(name)
+    
+    @staticmethod
+    def _is_candidate(name: str) -> bool:
+        """Descarta archivos temporales de Word (~$...), ocultos y de otros tipos."""
+        return (name.lower().endswith(SUPPORTED_EXTENSIONS)
+                and not name.startswith(("~$", ".")))
+    
+    def _observe(self, name: str) -> None:
+        """Registra o actualiza el tamaño de un archivo detectado."""
+        if not self._is_candidate(name):
+            return
+        path = os.path.join(self.watch_dir, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self._pending.pop(name, None)
+            return
+        if not os.path.isfile(path):
+            return
+        
+        pending = self._pending.get(name)
+        if pending is None or pending.size != stat.st_size or pending.mtime != stat.st_mtime:
+            self._pending[name] = _PendingFile(stat.st_size, stat.st_mtime, time.monotonic())
+    
+    def _submit_stable(self, executor: ThreadPoolExecutor) -> None:
+        """Encola los archivos cuyo tamaño no cambió durante `stable_seconds`."""
+        now = time.monotonic()
+        for name in list(self._pending):
+            # Volver a medir: con inotify no siempre llega un evento al terminar la copia
+            self._observe(name)
+            pending = self._pending.get(name)
+            if pending is None or pending.size == 0 or now - pending.stable_since < self.stable_seconds:
+                continue
+            
+            stem = os.path.splitext(name)[0]
+            output_folder = os.path.normcase(os.path.join(self.output_root, stem))
+            with self._lock:
+                if output_folder in self._active_outputs:
+                    # Otro documento con el mismo nombre se está procesando; esperar a que termine
+                    continue
+                self._active_outputs.add(output_folder)
+            
+            try:
+                source_file = self._move_unique(os.path.join(self.watch_dir, name), self.processing_dir)
+            except OSError as e:
+                # Por ejemplo, el archivo sigue abierto por quien lo copia (Windows)
+                logger.warning("No se pudo tomar %s, se reintentará: %s", name, e)
+                pending.stable_since = now
+                with self._lock:
+                    self._active_outputs.discard(output_folder)
+                continue
+            del self._pending[name]
+            
+            job = ConversionJob.create(source_file, self.model.roster_file, self.model.output_profile,
+                                       output_root=self.output_root)
+            if os.path.normcase(job.output_folder) != output_folder:
+                # El nombre cambió al moverlo a en_proceso; reservar también la carpeta real
+                with self._lock:
+                    self._active_outputs.discard(output_folder)
+                    self._active_outputs.add(os.path.normcase(job.output_folder))
+            
+            logger.info("Documento recibido: %s (trabajo %s)", name, job.job_id)
+            with self._lock:
+                self._active_jobs.add(job.job_id)
+            executor.submit(self._run_job, job)
+    
+    def _run_job(self, job: ConversionJob) -> None:
+        """Ejecuta un trabajo y mueve el documento según el resultado."""
+        start = time.perf_counter()
+        results: Optional[List[PageResult]] = None
+        error: Optional[Exception] = None
+        try:
+            results = self.model.run_job(job)
+            target = self._move_unique(job.source_file, self.processed_dir)
+            with self._lock:
+                self.processed_count += 1
+            logger.info("Documento procesado: %s • %d páginas en %.1f s • salida: %s",
+                        os.path.basename(target), len(results), time.perf_counter() - start,
+                        job.output_folder)
+        except Exception as e:
+            error = e
+            with self._lock:
+                self.failed_count += 1
+            logger.error("Falló el documento %s: %s", job.display_name, e)
+            self._move_failed(job, e)
+        finally:
+            with self._lock:
+                self._active_outputs.discard(os.path.normcase(job.output_folder))
+                self._active_jobs.discard(job.job_id)
+        
+        if self.on_job_finished:
+            self.on_job_finished(job, results, error)
+    
+    def _move_failed(self, job: ConversionJob, error: Exception) -> None:
+        """Mueve el documento a fallidos junto con un archivo que explica el error."""
+        try:
+            target = self._move_unique(job.source_file, self.failed_dir)
+            with open(target + ".error.txt", "w", encoding="utf-8") as error_file:
+                error_file.write(f"Trabajo {job.job_id}\n{type(error).__name__}: {error}\n")
+        except OSError as e:
+            logger.error("No se pudo mover %s a fallidos: %s", job.display_name, e)
+    
+    @staticmethod
+    def _move_unique(path: str, target_dir: str) -> str:
+        """Mueve un archivo a otra carpeta sin sobrescribir uno existente con el mismo nombre."""
+        name = os.path.basename(path)
+        target = os.path.join(target_dir, name)
+        if os.path.exists(target):
+            stem, extension = os.path.splitext(name)
+            target = os.path.join(target_dir, f"{stem}_{time.strftime('%Y%m%d-%H%M%S')}{extension}")
+            counter = 2
+            while os.path.exists(target):
+                target = os.path.join(target_dir, f"{stem}_{time.strftime('%Y%m%d-%H%M%S')}_{counter}{extension}")
+                counter += 1
+        shutil.move(path, target)
+        return target
@@ -0,0 +1,155 @@
+"""
+Artefactos conservados de cada trabajo de conversión.
+Guarda un manifiesto con el resultado de cada página y la carpeta donde se
+publicó, para poder reexpedir diplomas concretos desde un documento corregido.
+"""
+
+import json
+import os
+import shutil
+from dataclasses import asdict
+from datetime import datetime
+from typing import Dict, List, Optional
+from .exceptions import FileNotFoundError
+from .output_profile import OutputProfile, PROFILE_STANDARD
+from .pdf_processor import PageResult
+from src.utils import get_logger
+
+logger = get_logger("job_artifacts")
+
+# Ubicación por defecto de los artefactos (relativa al directorio de trabajo)
+DEFAULT_ARTIFACTS_DIR = os.path.join("data", "jobs")
+
+# Número de trabajos cuyos artefactos se conservan
+DEFAULT_MAX_RETAINED_JOBS = 20
+
+MANIFEST_FILENAME = "manifest.json"
+
+
+class JobArtifactStore:
+    """Almacén local de manifiestos de trabajos anteriores."""
+    
+    def __init__(self, root_dir: str = DEFAULT_ARTIFACTS_DIR,
+                 max_retained_jobs: int = DEFAULT_MAX_RETAINED_JOBS):
+        self.root_dir = os.path.abspath(root_dir)
+        self.max_retained_jobs = max_retained_jobs
+    
+    def job_dir(self, job_id: str) -> str:
+        """Devuelve la carpeta de artefactos de un trabajo."""
+        return os.path.join(self.root_dir, job_id)
+    
+    def save_job(self, job_id: str, source_file: str, output_folder: str, results: List[PageResult],
+                 output_profile: OutputProfile = PROFILE_STANDARD) -> str:
+        """
+        Conserva el manifiesto de un trabajo terminado.
+        
+        Args:
+            job_id: Identificador del trabajo
+            source_file: Documento de origen procesado
+            output_folder: Carpeta donde se publicaron las páginas
+            results: Resultados de las páginas generadas
+            output_profile: Perfil con el que se escribieron las páginas
+        
+        Returns:
+            Carpeta de artefactos del trabajo
+        """
+        job_dir = self.job_dir(job_id)
+        os.makedirs(job_dir, exist_ok=True)
+        
+        self._write_manifest(job_id, {
+            "job_id": job_id,
+            "source_file": os.path.abspath(source_file),
+            "output_folder": os.path.abspath(output_folder),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "output_profile": asdict(output_profile),
+            "pages": [self._page_to_dict(page) for page in results]
+        })
+        
+        logger.info("Artefactos del trabajo %s conservados en: %s", job_id, job_dir)
+        self.prune()
+        return job_dir
+    
+    def load_manifest(self, job_id: str) -> Dict:
+        """
+        Carga el manifiesto de un trabajo.
+        
+        Raises:
+            FileNotFoundError: Si el trabajo no tiene artefactos conservados
+        """
+        manifest_path = os.path.join(self.job_dir(job_id), MANIFEST_FILENAME)
+        if not os.path.exists(manifest_path):
+            raise FileNotFoundError(f"No hay artefactos conservados para el trabajo {job_id}")
+        with open(manifest_path, "r", encoding="utf-8") as manifest_file:
+            return json.load(manifest_file)
+    
+    def load_pages(self, job_id: str) -> List[PageResult]:
+        """Carga los resultados de página registrados en el manifiesto."""
+        return [PageResult(**page) for page in self.load_manifest(job_id)["pages"]]
+    
+    def load_output_profile(self, job_id: str) -> OutputProfile:
+        """Carga el perfil de salida del trabajo (estándar en manifiestos antiguos)."""
+        profile = self.load_manifest(job_id).get("output_profile")
+        return OutputProfile(**profile) if profile else PROFILE_STANDARD
+    
+    def find_latest_job(self, output_folder: str) -> Optional[str]:
+        """
+        Busca el trabajo más reciente que publicó en una carpeta de salida.
+        
+        Args:
+            output_folder: Carpeta de salida
+        
+        Returns:
+            Identificador del trabajo o None si no hay artefactos
+        """
+        output_folder = os.path.abspath(output_folder)
+        latest_job, latest_date = None, ""
+        
+        for job_id in self._list_jobs():
+            try:
+                manifest = self.load_manifest(job_id)
+            except (FileNotFoundError, ValueError):
+                continue
+            if manifest.get("output_folder") == output_folder and manifest.get("created_at", "") > latest_date:
+                latest_job, latest_date = job_id, manifest["created_at"]
+        
+        return latest_job
+    
+    def update_page(self, job_id: str, page: PageResult) -> None:
+        """Actualiza en el manifiesto el resultado de una página reexpedida."""
+        manifest = self.load_manifest(job_id)
+        manifest["pages"] = [
+            self._page_to_dict(page) if entry["page_number"] == page.page_number else entry
+            for entry in manifest["pages"]
+        ]
+        self._write_manifest(job_id, manifest)
+    
+    def prune(self) -> None:
+        """Elimina los artefactos de los trabajos más antiguos."""
+        jobs = sorted(self._list_jobs(),
+                      key=lambda job_id: os.path.getmtime(self.job_dir(job_id)),
+                      reverse=True)
+        for job_id in jobs[self.max_retained_jobs:]:
+            shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+            logger.info("Artefactos del trabajo %s eliminados por antigüedad", job_id)
+    
+    def _list_jobs(self) -> List[str]:
+        """Lista los trabajos con artefactos conservados."""
+        if not os.path.isdir(self.root_dir):
+            return []
+        return [entry for entry in os.listdir(self.root_dir)
+                if os.path.isdir(os.path.join(self.root_dir, entry))]
+    
+    def _write_manifest(self, job_id: str, manifest: Dict) -> None:
+        """Escribe el manifiesto de forma atómica."""
+        manifest_path = os.path.join(self.job_dir(job_id), MANIFEST_FILENAME)
+        temp_path = manifest_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as manifest_file:
+            json.dump(manifest, manifest_file, ensure_ascii=False, indent=2)
+        os.replace(temp_path, manifest_path)
+    
+    @staticmethod
+    def _page_to_dict(page: PageResult) -> Dict:
+        """Convierte un resultado de página a diccionario sin el texto completo."""
+        page_dict = asdict(page)
+        page_dict.pop("text", None)
+        return page_dict
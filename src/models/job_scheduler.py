@@ -0,0 +1,259 @@
+"""
+Planificación de trabajos por prioridad y tamaño.
+Los trabajos piden turno antes de ejecutarse. Entre los que esperan se elige
+primero el de mayor prioridad y, a igual prioridad, el más corto (en páginas
+estimadas). La espera acorta el costo efectivo y cada cierto tiempo sube la
+prioridad, para que ningún trabajo se quede esperando indefinidamente. Un
+trabajo largo cede su turno entre páginas cuando llega uno urgente o mucho
+más corto y lo retoma cuando vuelve a ser el siguiente.
+"""
+
+import itertools
+import os
+import threading
+import time
+import fitz
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Callable, ContextManager, Dict, Iterator, List, Optional, Tuple
+from .conversion_job import PRIORITY_URGENT, PRIORITY_NORMAL
+from .docx_preflight import DocxPreflight
+from src.utils import get_logger
+
+logger = get_logger("job_scheduler")
+
+# Tiempo de espera (segundos) que sube un nivel la prioridad de un trabajo
+DEFAULT_PRIORITY_AGING_SECONDS = 600
+
+# Tiempo de espera (segundos) que reduce a la mitad el costo efectivo de un trabajo
+DEFAULT_COST_AGING_SECONDS = 120
+
+# Un trabajo en curso cede su turno a uno de igual prioridad solo si es al menos
+# esta cantidad de veces más corto que lo que le queda
+DEFAULT_PREEMPT_RATIO = 4.0
+
+# Tiempo mínimo (segundos) que corre un trabajo antes de poder ceder su turno
+DEFAULT_MIN_QUANTUM = 2.0
+
+# Hilos adicionales que se reservan para que los trabajos en espera puedan pedir turno
+WAITING_THREADS = 8
+
+# Bytes por página cuando no se puede contar ni estimar las páginas
+_FALLBACK_BYTES_PER_PAGE = 64 * 1024
+
+STATE_WAITING = "waiting"
+STATE_RUNNING = "running"
+STATE_PAUSED = "paused"
+
+
+@dataclass
+class JobTicket:
+    """Turno de un trabajo en el planificador."""
+    job_id: str
+    label: str
+    priority: int
+    cost: int
+    remaining: int
+    submitted_at: float
+    sequence: int
+    state: str = STATE_WAITING
+    started_at: Optional[float] = None
+    resumed_at: Optional[float] = None
+    preemptions: int = 0
+    waited_seconds: float = 0.0
+    _waiting_since: float = field(default=0.0, repr=False)
+    
+    def rank(self, now: float, priority_aging: float, cost_aging: float) -> Tuple[int, float, int]:
+        """Clave de orden: menor es antes (prioridad efectiva, costo efectivo, orden de llegada)."""
+        age = now - self.submitted_at
+        priority = max(PRIORITY_URGENT, self.priority - int(age // priority_aging)) if priority_aging else self.priority
+        cost = self.remaining / (1.0 + age / cost_aging) if cost_aging else float(self.remaining)
+        return priority, cost, self.sequence
+
+
+class JobScheduler:
+    """Reparte un número fijo de turnos entre los trabajos según prioridad y tamaño."""
+    
+    def __init__(self, slots: int = 2, priority_aging_seconds: float = DEFAULT_PRIORITY_AGING_SECONDS,
+                 cost_aging_seconds: float = DEFAULT_COST_AGING_SECONDS,
+                 preempt_ratio: float = DEFAULT_PREEMPT_RATIO, min_quantum: float = DEFAULT_MIN_QUANTUM):
+        """
+        Args:
+            slots: Trabajos que se ejecutan a la vez
+            priority_aging_seconds: Espera que sube un nivel la prioridad (0 desactiva)
+            cost_aging_seconds: Espera que reduce a la mitad el costo efectivo (0 desactiva)
+            preempt_ratio: Cuántas veces más corto debe ser un trabajo de igual
+                prioridad para que otro le ceda el turno (0 desactiva la cesión)
+            min_quantum: Segundos que corre un trabajo antes de poder ceder el turno
+        """
+        self.slots = max(1, slots)
+        self.priority_aging_seconds = priority_aging_seconds
+        self.cost_aging_seconds = cost_aging_seconds
+        self.preempt_ratio = preempt_ratio
+        self.min_quantum = min_quantum
+        
+        self._condition = threading.Condition()
+        self._tickets: Dict[str, JobTicket] = {}
+        self._sequence = itertools.count()
+        self._preflight = DocxPreflight()
+    
+    def set_slots(self, slots: int) -> None:
+        """Cambia el número de trabajos simultáneos."""
+        with self._condition:
+            self.slots = max(1, slots)
+            self._dispatch()
+    
+    def estimate_cost(self, source_file: str) -> int:
+        """
+        Estima el costo de un trabajo en páginas.
+        
+        Un PDF se cuenta directamente; un DOCX usa la estimación de la revisión
+        previa. Si no se puede, se estima por el tamaño del archivo.
+        """
+        try:
+            if source_file.lower().endswith(".pdf"):
+                with fitz.open(source_file) as doc:
+                    return max(1, doc.page_count)
+            if source_file.lower().endswith(".docx"):
+                pages = self._preflight.inspect(source_file).estimated_pages
+                if pages:
+                    return pages
+        except Exception as e:
+            logger.debug("No se pudieron estimar las páginas de %s: %s", source_file, e)
+        try:
+            return max(1, os.path.getsize(source_file) // _FALLBACK_BYTES_PER_PAGE)
+        except OSError:
+            return 1
+    
+    @contextmanager
+    def turn(self, job_id: str, label: str = "", priority: int = PRIORITY_NORMAL,
+             cost: Optional[int] = None, on_start: Optional[Callable[[], None]] = None) -> Iterator[JobTicket]:
+        """
+        Espera turno para un trabajo y lo libera al terminar.
+        
+        Args:
+            job_id: Identificador del trabajo
+            label: Descripción para el log
+            priority: Prioridad (PRIORITY_URGENT, PRIORITY_NORMAL o PRIORITY_LOW)
+            cost: Costo en páginas (por defecto 1)
+            on_start: Callback opcional invocado al obtener el turno
+        
+        Yields:
+            Turno del trabajo, para `checkpoint`
+        """
+        now = time.monotonic()
+        cost = max(1, cost or 1)
+        ticket = JobTicket(job_id, label, priority, cost, cost, now, next(self._sequence), _waiting_since=now)
+        with self._condition:
+            self._tickets[job_id] = ticket
+            self._dispatch()
+            if ticket.state == STATE_WAITING:
+                logger.info("Trabajo %s en espera de turno (prioridad %d • ~%d páginas • %d en curso)",
+                            label or job_id, priority, cost, self._running_count())
+            self._wait_for_turn(ticket)
+        try:
+            if on_start:
+                on_start()
+            yield ticket
+        finally:
+            with self._condition:
+                self._tickets.pop(job_id, None)
+                self._dispatch()
+    
+    def checkpoint(self, ticket: JobTicket, remaining: Optional[int] = None,
+                   on_pause: Optional[Callable[[], ContextManager]] = None) -> None:
+        """
+        Punto seguro entre páginas: si otro trabajo debe pasar antes, cede el turno y espera.
+        
+        Args:
+            ticket: Turno del trabajo en curso
+            remaining: Páginas que le quedan al trabajo
+            on_pause: Callback opcional que devuelve un administrador de contexto
+                que se mantiene abierto mientras el trabajo está en pausa
+        """
+        with self._condition:
+            if remaining is not None:
+                ticket.remaining = max(1, remaining)
+            if not self._must_yield(ticket):
+                return
+            contender = self._best_waiting()
+            ticket.state = STATE_PAUSED
+            ticket.preemptions += 1
+            ticket._waiting_since = time.monotonic()
+            logger.info("Trabajo %s cede el turno a %s (quedan ~%d páginas)",
+                        ticket.label or ticket.job_id, contender.label or contender.job_id, ticket.remaining)
+            self._dispatch()
+        
+        with on_pause() if on_pause else nullcontext():
+            with self._condition:
+                self._wait_for_turn(ticket)
+        logger.info("Trabajo %s retoma su turno", ticket.label or ticket.job_id)
+    
+    def snapshot(self) -> List[JobTicket]:
+        """Turnos actuales: primero los que corren y luego los que esperan, en el orden en que pasarían."""
+        with self._condition:
+            now = time.monotonic()
+            running = [ticket for ticket in self._tickets.values() if ticket.state == STATE_RUNNING]
+            waiting = sorted((ticket for ticket in self._tickets.values() if ticket.state != STATE_RUNNING),
+                             key=lambda ticket: self._rank(ticket, now))
+            return running + waiting
+    
+    def _wait_for_turn(self, ticket: JobTicket) -> None:
+        """Bloquea hasta que el turno pase a ejecución (con el candado tomado)."""
+        while ticket.state != STATE_RUNNING:
+            # El envejecimiento cambia el orden con el tiempo aunque nadie libere turnos
+            self._condition.wait(1.0)
+            self._dispatch()
+    
+    def _dispatch(self) -> None:
+        """Asigna los turnos libres a los mejores trabajos en espera (con el candado tomado)."""
+        changed = False
+        while self._running_count() < self.slots:
+            best = self._best_waiting()
+            if best is None:
+                break
+            now = time.monotonic()
+            best.waited_seconds += now - best._waiting_since
+            best.state = STATE_RUNNING
+            best.resumed_at = now
+            if best.started_at is None:
+                best.started_at = now
+            changed = True
+        if changed:
+            self._condition.notify_all()
+    
+    def _must_yield(self, ticket: JobTicket) -> bool:
+        """Indica si el trabajo en curso debe ceder el turno al mejor en espera (con el candado tomado)."""
+        if not self.preempt_ratio or ticket.state != STATE_RUNNING:
+            return False
+        if self._running_count() < self.slots:
+            return False
+        now = time.monotonic()
+        if ticket.resumed_at is not None and now - ticket.resumed_at < self.min_quantum:
+            return False
+        contender = self._best_waiting()
+        if contender is None:
+            return False
+        
+        # Solo cede el trabajo en curso que pasaría último
+        running = [other for other in self._tickets.values() if other.state == STATE_RUNNING]
+        if max(running, key=lambda other: self._rank(other, now)) is not ticket:
+            return False
+        
+        contender_priority = self._rank(contender, now)[0]
+        ticket_priority = self._rank(ticket, now)[0]
+        if contender_priority != ticket_priority:
+            return contender_priority < ticket_priority
+        return contender.remaining * self.preempt_ratio <= ticket.remaining
+    
+    def _best_waiting(self) -> Optional[JobTicket]:
+        """Trabajo en espera o en pausa que pasaría primero (con el candado tomado)."""
+        now = time.monotonic()
+        waiting = [ticket for ticket in self._tickets.values() if ticket.state != STATE_RUNNING]
+        return min(waiting, key=lambda ticket: self._rank(ticket, now)) if waiting else None
+    
+    def _rank(self, ticket: JobTicket, now: float) -> Tuple[int, float, int]:
+        return ticket.rank(now, self.priority_aging_seconds, self.cost_aging_seconds)
+    
+    def _running_count(self) -> int:
+        return sum(1 for ticket in self._tickets.values() if ticket.state == STATE_RUNNING)
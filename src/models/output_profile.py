@@ -0,0 +1,159 @@
+"""
+Perfiles de salida para las páginas individuales.
+El perfil "web" reduce las imágenes a resolución de pantalla, recomprime los
+flujos y escribe PDFs linealizados ("vista web rápida") para que el portal
+muestre la primera página sin esperar a descargar el archivo completo.
+"""
+
+import io
+from dataclasses import dataclass
+from typing import Dict, Optional
+import fitz
+from src.utils import get_logger
+
+# Linealización alternativa cuando PyMuPDF ya no la ofrece (>= 1.24)
+try:
+    import pikepdf
+    PIKEPDF_AVAILABLE = True
+except ImportError:
+    PIKEPDF_AVAILABLE = False
+
+logger = get_logger("output_profile")
+
+# Solo se reducen las imágenes que superan la resolución objetivo en este factor
+IMAGE_DPI_TOLERANCE = 1.25
+
+_native_linearization = True
+_linearization_warning_logged = False
+
+
+@dataclass(frozen=True)
+class OutputProfile:
+    """Opciones de escritura de cada página."""
+    name: str
+    linearize: bool = False
+    image_dpi: Optional[int] = None
+    jpeg_quality: int = 80
+    compress: bool = False
+    
+    @property
+    def is_passthrough(self) -> bool:
+        """Indica si la página se copia tal cual, sin reescribirla."""
+        return not (self.linearize or self.image_dpi or self.compress)
+
+
+PROFILE_STANDARD = OutputProfile("estandar")
+PROFILE_WEB = OutputProfile("web", linearize=True, image_dpi=150, jpeg_quality=75, compress=True)
+
+OUTPUT_PROFILES: Dict[str, OutputProfile] = {
+    profile.name: profile for profile in (PROFILE_STANDARD, PROFILE_WEB)
+}
+
+
+def get_output_profile(name: str) -> OutputProfile:
+    """
+    Obtiene un perfil de salida por nombre.
+    
+    Raises:
+        ValueError: Si el perfil no existe
+    """
+    try:
+        return OUTPUT_PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Perfil de salida desconocido: {name}. "
+                         f"Opciones: {', '.join(OUTPUT_PROFILES)}")
+
+
+def optimize_page(page_pdf: bytes, profile: OutputProfile) -> bytes:
+    """
+    Reescribe en memoria una página ya extraída aplicando el perfil indicado.
+    
+    Args:
+        page_pdf: Contenido del PDF de una sola página
+        profile: Perfil de salida a aplicar
+    
+    Returns:
+        Contenido del PDF resultante
+    """
+    doc = fitz.open(stream=page_pdf, filetype="pdf")
+    try:
+        if profile.image_dpi:
+            _downsample_images(doc, profile)
+        return _serialize(doc, profile)
+    finally:
+        doc.close()
+
+
+def _downsample_images(doc: "fitz.Document", profile: OutputProfile) -> None:
+    """Reduce las imágenes que superan la resolución del perfil y las recomprime como JPEG."""
+    threshold = int(profile.image_dpi * IMAGE_DPI_TOLERANCE)
+    if hasattr(doc, "rewrite_images"):
+        doc.rewrite_images(dpi_threshold=threshold, dpi_target=profile.image_dpi,
+                           quality=profile.jpeg_quality)
+        return
+    
+    # PyMuPDF anterior a rewrite_images: reemplazar imagen por imagen
+    for page in doc:
+        for xref, smask, width, _height, *_ in page.get_images(full=True):
+            if smask:
+                # Al reemplazarla se perdería la máscara de transparencia
+                continue
+            rects = page.get_image_rects(xref)
+            shown_inches = max((rect.width for rect in rects), default=0) / 72
+            if shown_inches <= 0 or width / shown_inches <= threshold:
+                continue
+            
+            scale = profile.image_dpi / (width / shown_inches)
+            pixmap = fitz.Pixmap(doc, xref)
+            if pixmap.n - pixmap.alpha not in (1, 3):
+                pixmap = fitz.Pixmap(fitz.csRGB, pixmap)
+            pixmap = fitz.Pixmap(pixmap, max(1, int(pixmap.width * scale)),
+                                 max(1, int(pixmap.height * scale)), None)
+            jpeg = pixmap.tobytes("jpeg", jpg_quality=profile.jpeg_quality)
+            if len(jpeg) < len(doc.xref_stream_raw(xref)):
+                page.replace_image(xref, stream=jpeg)
+
+
+def _serialize(doc: "fitz.Document", profile: OutputProfile) -> bytes:
+    """Serializa el documento comprimido y, si el perfil lo pide, linealizado."""
+    global _native_linearization
+    options = {"garbage": 3, "deflate": True, "clean": True} if profile.compress else {}
+    
+    if profile.linearize and _native_linearization:
+        try:
+            return doc.tobytes(linear=True, **options)
+        except Exception as e:
+            # PyMuPDF >= 1.24 rechaza linear=True; se recurre a pikepdf. Cualquier
+            # otro error es de esta página y no debe desactivar la linealización
+            if not _linearization_unsupported(e):
+                raise
+            _native_linearization = False
+            logger.info("PyMuPDF no puede linealizar (%s); se usará pikepdf si está instalado", e)
+    
+    data = doc.tobytes(**options)
+    if not profile.linearize:
+        return data
+    
+    if PIKEPDF_AVAILABLE:
+        output = io.BytesIO()
+        with pikepdf.open(io.BytesIO(data)) as pdf:
+            pdf.save(output, linearize=True)
+        return output.getvalue()
+    
+    _warn_linearization_unavailable()
+    return data
+
+
+def _linearization_unsupported(error: Exception) -> bool:
+    """Indica si el error es el rechazo de linear=True ("Linearisation is no longer supported")."""
+    message = str(error).lower()
+    return ("linearisation" in message or "linearization" in message) and "supported" in message
+
+
+def _warn_linearization_unavailable() -> None:
+    """Avisa una sola vez de que las páginas se escriben sin linealizar."""
+    global _linearization_warning_logged
+    if not _linearization_warning_logged:
+        _linearization_warning_logged = True
+        logger.warning("No hay soporte de linealización (instale pikepdf o PyMuPDF 1.23); "
+                       "las páginas se escriben sin vista web rápida")
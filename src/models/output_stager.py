@@ -0,0 +1,212 @@
+"""
+Publicación atómica de las salidas de un trabajo.
+Los PDFs se escriben en un directorio de preparación junto a la carpeta final
+y se publican al terminar con dos renombrados: la carpeta anterior pasa a
+".<carpeta>.previous-<trabajo>" y la de preparación ocupa su lugar. Entre
+ambos renombrados la carpeta de salida no existe durante un instante.
+"""
+
+import os
+import re
+import shutil
+import time
+import uuid
+from typing import Container, Dict, Optional, Tuple
+from .exceptions import PDFProcessingError
+from src.utils import get_logger
+
+logger = get_logger("output_stager")
+
+# Caracteres no permitidos en nombres de archivo de Windows
+_INVALID_FILENAME_CHARS = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+
+# Antigüedad mínima (segundos) para considerar abandonado un directorio de preparación
+STALE_STAGING_SECONDS = 3600
+
+
+def sanitize_filename(filename: str) -> str:
+    """
+    Elimina caracteres no válidos para el sistema de archivos de un nombre.
+    
+    Args:
+        filename: Nombre de archivo propuesto
+    
+    Returns:
+        Nombre de archivo seguro en Windows y POSIX
+    """
+    cleaned = _INVALID_FILENAME_CHARS.sub("", filename)
+    cleaned = re.sub(r"\s+", " ", cleaned).strip().rstrip(".")
+    return cleaned or "sin_nombre"
+
+
+def resolve_filename(desired_filename: str, taken_names: Container[str]) -> Tuple[str, bool]:
+    """
+    Obtiene un nombre que no choque con los ya usados.
+    
+    Las colisiones se resuelven de forma determinista agregando un sufijo
+    numérico ("Nombre (2).pdf"). La comparación ignora mayúsculas porque
+    Windows no las distingue.
+    
+    Args:
+        desired_filename: Nombre de archivo deseado
+        taken_names: Nombres ya usados, normalizados con casefold()
+    
+    Returns:
+        Tupla con (nombre_final, hubo_colision)
+    """
+    filename = sanitize_filename(desired_filename)
+    stem, extension = os.path.splitext(filename)
+    
+    candidate = filename
+    counter = 1
+    while candidate.casefold() in taken_names:
+        counter += 1
+        candidate = f"{stem} ({counter}){extension}"
+    
+    return candidate, counter > 1
+
+
+class OutputStager:
+    """Prepara los archivos de un trabajo y los publica juntos al terminar."""
+    
+    def __init__(self, output_folder: str, job_id: Optional[str] = None):
+        self.output_folder = os.path.abspath(output_folder)
+        self.job_id = job_id or uuid.uuid4().hex[:12]
+        
+        # El directorio de preparación vive junto al destino para que el
+        # renombrado final sea atómico (mismo sistema de archivos)
+        parent_dir = os.path.dirname(self.output_folder)
+        base_name = os.path.basename(self.output_folder)
+        self._staging_prefix = f".{base_name}.staging-"
+        self.staging_folder = os.path.join(parent_dir, f"{self._staging_prefix}{self.job_id}")
+        self._previous_folder = os.path.join(parent_dir, f".{base_name}.previous-{self.job_id}")
+        
+        # Índice de nombres del trabajo: clave normalizada -> nombre final
+        self._names: Dict[str, str] = {}
+        self._opened = False
+        self._committed = False
+    
+    def __enter__(self) -> "OutputStager":
+        self.open()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if not self._committed:
+            self.abort()
+    
+    @property
+    def committed(self) -> bool:
+        """Indica si las salidas ya fueron publicadas."""
+        return self._committed
+    
+    def open(self) -> None:
+        """Crea el directorio de preparación y limpia restos de trabajos abandonados."""
+        if self._opened:
+            return
+        
+        self._remove_stale_staging_folders()
+        os.makedirs(self.staging_folder, exist_ok=False)
+        self._opened = True
+        logger.debug("Directorio de preparación creado: %s", self.staging_folder)
+    
+    def reserve_name(self, desired_filename: str) -> Tuple[str, bool]:
+        """
+        Reserva un nombre único dentro del trabajo.
+        
+        Las colisiones se resuelven en el orden en que se reservan los nombres.
+        
+        Args:
+            desired_filename: Nombre de archivo deseado
+        
+        Returns:
+            Tupla con (nombre_final, hubo_colision)
+        """
+        candidate, collided = resolve_filename(desired_filename, self._names)
+        self._names[candidate.casefold()] = candidate
+        return candidate, collided
+    
+    def stage_file(self, source_path: str, desired_filename: str) -> Tuple[str, bool]:
+        """
+        Mueve un archivo al directorio de preparación con un nombre único.
+        
+        Args:
+            source_path: Archivo a mover (puede estar en otro sistema de archivos)
+            desired_filename: Nombre de archivo deseado
+        
+        Returns:
+            Tupla con (nombre_final, hubo_colision)
+        """
+        if not self._opened:
+            raise PDFProcessingError("El directorio de preparación no ha sido inicializado.")
+        
+        final_name, collided = self.reserve_name(desired_filename)
+        # shutil.move renombra si el origen está en el mismo sistema de archivos y
+        # si no (área de trabajo local o tmpfs) copia el archivo una sola vez
+        shutil.move(source_path, os.path.join(self.staging_folder, final_name))
+        return final_name, collided
+    
+    def commit(self) -> None:
+        """
+        Publica el contenido preparado reemplazando la carpeta de salida.
+        
+        Se hacen dos renombrados: la carpeta existente se aparta como
+        ".previous-<trabajo>" y luego la de preparación toma su nombre. Cada
+        renombrado es atómico, pero entre ambos la carpeta de salida no existe,
+        así que un lector del recurso compartido puede no encontrarla por un
+        instante. Nunca se ve una mezcla de archivos viejos y nuevos.
+        
+        Raises:
+            PDFProcessingError: Si no se pudo renombrar alguna de las carpetas
+        """
+        if self._committed:
+            return
+        if not self._opened:
+            raise PDFProcessingError("No hay salidas preparadas para publicar.")
+        
+        had_previous = os.path.exists(self.output_folder)
+        try:
+            if had_previous:
+                os.rename(self.output_folder, self._previous_folder)
+            try:
+                os.rename(self.staging_folder, self.output_folder)
+            except Exception:
+                # Restaurar la carpeta anterior para no dejar el destino vacío
+                if had_previous:
+                    os.rename(self._previous_folder, self.output_folder)
+                raise
+        except Exception as e:
+            raise PDFProcessingError(f"No se pudo publicar la carpeta de salida {self.output_folder}: {str(e)}")
+        
+        self._committed = True
+        logger.info("Salidas publicadas en: %s (%s archivos)", self.output_folder, len(self._names))
+        
+        if had_previous:
+            try:
+                shutil.rmtree(self._previous_folder)
+            except OSError as e:
+                logger.warning("No se pudo eliminar la carpeta anterior %s: %s", self._previous_folder, e)
+    
+    def abort(self) -> None:
+        """Descarta el contenido preparado sin tocar la carpeta de salida."""
+        if self._opened and os.path.exists(self.staging_folder):
+            shutil.rmtree(self.staging_folder, ignore_errors=True)
+            logger.info("Trabajo %s descartado, no se publicaron salidas parciales", self.job_id)
+        self._opened = False
+    
+    def _remove_stale_staging_folders(self) -> None:
+        """Elimina directorios de preparación de trabajos interrumpidos."""
+        parent_dir = os.path.dirname(self.output_folder)
+        if not os.path.isdir(parent_dir):
+            return
+        
+        now = time.time()
+        for entry in os.listdir(parent_dir):
+            if not entry.startswith(self._staging_prefix):
+                continue
+            path = os.path.join(parent_dir, entry)
+            try:
+                if now - os.path.getmtime(path) > STALE_STAGING_SECONDS:
+                    shutil.rmtree(path, ignore_errors=True)
+                    logger.warning("Directorio de preparación abandonado eliminado: %s", path)
+            except OSError as e:
+                logger.warning("No se pudo revisar el directorio %s: %s", path, e)
@@ -3,26 +3,54 @@ Modelo para el procesamiento de archivos PDF.
 Contiene la lógica para dividir PDFs y extraer información.
 """
 
+import io
 import os
 import re
 import fitz
-from typing import Optional, Tuple
+from dataclasses import dataclass, field, replace
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 from PyPDF2 import PdfReader, PdfWriter
 from .exceptions import PDFProcessingError, FileNotFoundError
+from .output_stager import OutputStager, resolve_filename
+from .output_profile import OutputProfile, PROFILE_STANDARD, optimize_page
 from src.utils import get_logger
 
 logger = get_logger("pdf_processor")
 
+# Estados posibles de una página procesada
+PAGE_STATUS_OK = "ok"
+PAGE_STATUS_FALLBACK = "fallback"
+PAGE_STATUS_COLLISION = "collision"
+
+# Origen de un PDF: ruta, contenido en memoria u objeto de archivo binario
+PdfSource = Union[str, bytes, BinaryIO]
+
+
+@dataclass(frozen=True)
+class PageResult:
+    """Resultado de procesar una página individual del PDF."""
+    page_number: int
+    filename: str
+    registration_number: Optional[str]
+    name: Optional[str]
+    status: str
+    cedula: Optional[str] = None
+    text: str = field(default="", repr=False, compare=False)
+    bytes_saved: int = field(default=0, compare=False)
+
 
 class PDFProcessor:
     """Clase responsable del procesamiento de archivos PDF."""
     
-    def extract_name_and_registration(self, pdf_filename: str) -> Tuple[Optional[str], Optional[str]]:
+    def __init__(self, output_profile: OutputProfile = PROFILE_STANDARD):
+        self.output_profile = output_profile
+    
+    def extract_name_and_registration(self, pdf_filename: PdfSource) -> Tuple[Optional[str], Optional[str]]:
         """
         Extrae el número de registro y nombre del estudiante de un PDF.
         
         Args:
-            pdf_filename: Ruta del archivo PDF
+            pdf_filename: Ruta del archivo PDF, su contenido o un archivo binario abierto
             
         Returns:
             Tupla con (número_registro, nombre) o (None, None) si no se encuentra
@@ -30,23 +58,27 @@ class PDFProcessor:
         Raises:
             PDFProcessingError: Si hay un error procesando el PDF
         """
+        text = self._read_first_page_text(pdf_filename)
+        
+        # Usar expresiones regulares para encontrar el "Registro No." y el nombre
+        registration_number = self._extract_registration_number(text)
+        name = self._extract_student_name(text)
+        
+        return registration_number, name
+    
+    def _read_first_page_text(self, pdf_filename: PdfSource) -> str:
+        """Lee el texto de la primera página de un PDF."""
         try:
             # Abrir el archivo PDF con PyMuPDF
-            doc = fitz.open(pdf_filename)
+            doc = _open_text_document(pdf_filename)
             
             # Extraer el texto de la primera página
-            page = doc[0]
-            text = page.get_text()
+            text = doc[0].get_text() if doc.page_count else ""
             doc.close()
-            
-            # Usar expresiones regulares para encontrar el "Registro No." y el nombre
-            registration_number = self._extract_registration_number(text)
-            name = self._extract_student_name(text)
-            
-            return registration_number, name
+            return text
             
         except Exception as e:
-            raise PDFProcessingError(f"Error al procesar PDF {pdf_filename}: {str(e)}")
+            raise PDFProcessingError(f"Error al procesar PDF {_describe_source(pdf_filename)}: {str(e)}")
     
     def _extract_registration_number(self, text: str) -> Optional[str]:
         """Extrae el número de registro del texto."""
@@ -58,13 +90,255 @@ class PDFProcessor:
         match = re.search(r"HACE CONSTAR QUE:\s*(.*?)(\n|$)", text)
         return match.group(1).strip() if match else None
     
-    def split_pdf_by_page(self, input_pdf_filename: str, output_folder: str) -> None:
+    def extract_cedula(self, pdf_filename: PdfSource) -> Optional[str]:
+        """
+        Extrae el número de cédula (solo dígitos) de la primera página de un PDF.
+        
+        Args:
+            pdf_filename: Ruta del archivo PDF, su contenido o un archivo binario abierto
+            
+        Returns:
+            Número de cédula sin separadores o None si no se encuentra
+            
+        Raises:
+            PDFProcessingError: Si hay un error procesando el PDF
+        """
+        return self._extract_cedula(self._read_first_page_text(pdf_filename))
+    
+    def _extract_cedula(self, text: str) -> Optional[str]:
+        """Extrae el número de cédula del texto."""
+        match = re.search(r"C\.?\s*C\.?\s*No\.?\s*([\d.,\s]*\d)", text)
+        return re.sub(r"\D", "", match.group(1)) if match else None
+    
+    def scan_output_folder(self, output_folder: str) -> List[PageResult]:
+        """
+        Extrae los datos de los PDFs individuales de una carpeta ya generada.
+        
+        Args:
+            output_folder: Carpeta con las páginas individuales
+            
+        Returns:
+            Lista con el resultado de cada archivo, ordenada por nombre
+            
+        Raises:
+            FileNotFoundError: Si la carpeta no existe
+        """
+        if not os.path.isdir(output_folder):
+            raise FileNotFoundError(f"La carpeta {output_folder} no existe.")
+        
+        results: List[PageResult] = []
+        pdf_files = sorted(f for f in os.listdir(output_folder) if f.lower().endswith('.pdf'))
+        
+        for index, filename in enumerate(pdf_files, start=1):
+            text = self._read_first_page_text(os.path.join(output_folder, filename))
+            registration_number = self._extract_registration_number(text)
+            name = self._extract_student_name(text)
+            fallback_match = re.match(r"page_(\d+)\.pdf$", filename)
+            
+            results.append(PageResult(
+                page_number=int(fallback_match.group(1)) if fallback_match else index,
+                filename=filename,
+                registration_number=registration_number,
+                name=name,
+                status=PAGE_STATUS_OK if registration_number and name else PAGE_STATUS_FALLBACK,
+                cedula=self._extract_cedula(text),
+                text=text
+            ))
+        
+        return results
+    
+    def find_pages_by_registration(self, pdf_filename: str,
+                                   registration_numbers: Iterable[str]) -> Dict[str, List[int]]:
+        """
+        Ubica las páginas de un PDF que corresponden a ciertos números de registro.
+        
+        Args:
+            pdf_filename: Ruta del PDF combinado
+            registration_numbers: Números de registro buscados
+            
+        Returns:
+            Diccionario número_registro -> números de página (desde 1), en orden
+            
+        Raises:
+            PDFProcessingError: Si hay un error leyendo el PDF
+        """
+        wanted = set(registration_numbers)
+        found: Dict[str, List[int]] = {}
+        
+        try:
+            doc = fitz.open(pdf_filename)
+            try:
+                for page_index in range(doc.page_count):
+                    registration_number = self._extract_registration_number(doc[page_index].get_text())
+                    if registration_number in wanted:
+                        found.setdefault(registration_number, []).append(page_index + 1)
+            finally:
+                doc.close()
+        except Exception as e:
+            raise PDFProcessingError(f"Error al procesar PDF {pdf_filename}: {str(e)}")
+        
+        return found
+    
+    def export_pages(self, input_pdf_filename: str, page_numbers: Iterable[int],
+                     work_folder: str,
+                     output_profile: Optional[OutputProfile] = None,
+                     on_page: Optional[Callable[[PageResult], None]] = None) -> List[Tuple[str, PageResult]]:
+        """
+        Escribe páginas concretas de un PDF en archivos temporales y extrae sus datos.
+        
+        Args:
+            input_pdf_filename: Ruta del PDF combinado
+            page_numbers: Números de página a exportar (desde 1)
+            work_folder: Carpeta donde escribir los archivos temporales
+            output_profile: Perfil de salida (por defecto el del procesador)
+            on_page: Callback opcional invocado con el resultado de cada página exportada
+            
+        Returns:
+            Lista de tuplas (archivo_temporal, resultado) con el nombre final propuesto
+            
+        Raises:
+            PDFProcessingError: Si una página no existe o no se puede escribir
+        """
+        exported: List[Tuple[str, PageResult]] = []
+        os.makedirs(work_folder, exist_ok=True)
+        
+        try:
+            with open(input_pdf_filename, 'rb') as input_pdf_file:
+                reader = PdfReader(input_pdf_file)
+                for page_number in page_numbers:
+                    if not 1 <= page_number <= len(reader.pages):
+                        raise PDFProcessingError(f"La página {page_number} no existe en {input_pdf_filename}")
+                    
+                    temp_pdf_filename = os.path.join(work_folder, f"temp_page_{page_number}.pdf")
+                    bytes_saved = self._write_page(reader, page_number - 1, temp_pdf_filename, output_profile)
+                    result = self._build_page_result(temp_pdf_filename, page_number - 1)
+                    result = replace(result, bytes_saved=bytes_saved)
+                    exported.append((temp_pdf_filename, result))
+                    if on_page:
+                        on_page(result)
+        except Exception as e:
+            if isinstance(e, PDFProcessingError):
+                raise
+            raise PDFProcessingError(f"Error al exportar páginas de {input_pdf_filename}: {str(e)}")
+        
+        return exported
+    
+    def preview_split(self, input_pdf_filename: str,
+                      on_page: Optional[Callable[[PageResult], None]] = None,
+                      on_progress: Optional[Callable[[int, int], None]] = None) -> List[PageResult]:
+        """
+        Simula la división de un PDF: extrae los datos y propone los nombres sin escribir archivos.
+        
+        Los nombres propuestos siguen las mismas reglas que `split_pdf_by_page`,
+        incluida la resolución de nombres duplicados.
+        
+        Args:
+            input_pdf_filename: Ruta del PDF combinado
+            on_page: Callback opcional invocado con el resultado de cada página
+            on_progress: Callback opcional invocado con (páginas procesadas, total de páginas)
+            
+        Returns:
+            Lista con el resultado previsto de cada página
+            
+        Raises:
+            PDFProcessingError: Si hay un error leyendo el PDF
+            FileNotFoundError: Si el archivo PDF no existe
+        """
+        if not os.path.exists(input_pdf_filename):
+            raise FileNotFoundError(f"El archivo PDF {input_pdf_filename} no existe.")
+        
+        results: List[PageResult] = []
+        taken_names = set()
+        
+        try:
+            doc = fitz.open(input_pdf_filename)
+            try:
+                num_pages = doc.page_count
+                for page_num in range(num_pages):
+                    result = self._unique_result(self._result_from_text(doc[page_num].get_text(), page_num),
+                                                 taken_names)
+                    results.append(result)
+                    if on_page:
+                        on_page(result)
+                    if on_progress:
+                        on_progress(page_num + 1, num_pages)
+            finally:
+                doc.close()
+        except Exception as e:
+            if isinstance(e, (PDFProcessingError, FileNotFoundError)):
+                raise
+            raise PDFProcessingError(f"Error al procesar PDF {input_pdf_filename}: {str(e)}")
+        
+        return results
+    
+    def iter_pages(self, source: PdfSource, output_profile: Optional[OutputProfile] = None,
+                   on_progress: Optional[Callable[[int, int], None]] = None) -> Iterator[Tuple[PageResult, bytes]]:
+        """
+        Divide un PDF en memoria y entrega cada página a medida que se procesa.
+        
+        No escribe archivos: cada página se genera como bytes con el perfil de
+        salida y el nombre propuesto sigue las mismas reglas que `split_pdf_by_page`,
+        incluida la resolución de nombres duplicados.
+        
+        Args:
+            source: Ruta del PDF combinado, su contenido o un archivo binario abierto
+            output_profile: Perfil de salida (por defecto el del procesador)
+            on_progress: Callback opcional invocado con (páginas procesadas, total de páginas)
+            
+        Yields:
+            Tuplas (resultado de la página, contenido del PDF de la página)
+            
+        Raises:
+            PDFProcessingError: Si hay un error leyendo el PDF
+            FileNotFoundError: Si la ruta del PDF no existe
+        """
+        if isinstance(source, str) and not os.path.exists(source):
+            raise FileNotFoundError(f"El archivo PDF {source} no existe.")
+        
+        data = _read_source(source)
+        taken_names: Set[str] = set()
+        try:
+            with fitz.open(stream=data, filetype="pdf") as text_doc:
+                reader = PdfReader(io.BytesIO(data))
+                num_pages = len(reader.pages)
+                for page_num in range(num_pages):
+                    page_pdf, bytes_saved = self._render_page(reader, page_num, output_profile)
+                    result = self._unique_result(self._result_from_text(text_doc[page_num].get_text(), page_num),
+                                                 taken_names)
+                    yield replace(result, bytes_saved=bytes_saved), page_pdf
+                    if on_progress:
+                        on_progress(page_num + 1, num_pages)
+        except Exception as e:
+            if isinstance(e, (PDFProcessingError, FileNotFoundError)):
+                raise
+            raise PDFProcessingError(f"Error al procesar PDF {_describe_source(source)}: {str(e)}")
+    
+    def split_pdf_by_page(self, input_pdf_filename: str, output_folder: str,
+                          job_id: Optional[str] = None, delete_input: bool = True,
+                          on_page: Optional[Callable[[PageResult], None]] = None,
+                          on_progress: Optional[Callable[[int, int], None]] = None,
+                          output_profile: Optional[OutputProfile] = None,
+                          work_folder: Optional[str] = None) -> List[PageResult]:
         """
         Divide un PDF en páginas individuales y las renombra según el contenido.
         
+        Las páginas se preparan en un directorio temporal y la carpeta de salida
+        solo se reemplaza cuando todas fueron procesadas correctamente.
+        
         Args:
             input_pdf_filename: Ruta del archivo PDF a dividir
             output_folder: Carpeta donde guardar las páginas individuales
+            job_id: Identificador opcional del trabajo
+            delete_input: Si se elimina el PDF de entrada al terminar
+            on_page: Callback opcional invocado con el resultado de cada página preparada
+            on_progress: Callback opcional invocado con (páginas procesadas, total de páginas)
+            output_profile: Perfil de salida (por defecto el del procesador); se aplica
+                al escribir cada página, sin una segunda pasada
+            work_folder: Carpeta local para las páginas temporales (por defecto el
+                directorio de preparación); cada página llega al destino ya terminada
+            
+        Returns:
+            Lista con el resultado de cada página
             
         Raises:
             PDFProcessingError: Si hay un error dividiendo el PDF
@@ -74,57 +348,188 @@ class PDFProcessor:
             if not os.path.exists(input_pdf_filename):
                 raise FileNotFoundError(f"El archivo PDF {input_pdf_filename} no existe.")
             
-            # Crear directorio de salida
-            os.makedirs(output_folder, exist_ok=True)
+            results: List[PageResult] = []
             
-            with open(input_pdf_filename, 'rb') as input_pdf_file:
-                reader = PdfReader(input_pdf_file)
-                num_pages = len(reader.pages)
+            with OutputStager(output_folder, job_id) as stager, fitz.open(input_pdf_filename) as text_doc:
+                with open(input_pdf_filename, 'rb') as input_pdf_file:
+                    reader = PdfReader(input_pdf_file)
+                    num_pages = len(reader.pages)
+                    
+                    for page_num in range(num_pages):
+                        # El texto se lee del PDF combinado, ya abierto, y no de cada página escrita
+                        result = self._process_single_page(reader, page_num, stager, output_profile,
+                                                           text_doc[page_num].get_text(), work_folder)
+                        results.append(result)
+                        if on_page:
+                            on_page(result)
+                        if on_progress:
+                            on_progress(page_num + 1, num_pages)
                 
-                for page_num in range(num_pages):
-                    self._process_single_page(reader, page_num, output_folder)
+                # Publicar todas las páginas de una sola vez
+                stager.commit()
+            
+            self._log_bytes_saved(results, output_profile or self.output_profile)
             
             # Eliminar el archivo PDF original
-            self._cleanup_original_file(input_pdf_filename)
+            if delete_input:
+                self._cleanup_original_file(input_pdf_filename)
+            return results
             
         except Exception as e:
             if isinstance(e, (PDFProcessingError, FileNotFoundError)):
                 raise
             raise PDFProcessingError(f"Error al dividir PDF: {str(e)}")
     
-    def _process_single_page(self, reader: PdfReader, page_num: int, output_folder: str) -> None:
+    def _process_single_page(self, reader: PdfReader, page_num: int, stager: OutputStager,
+                             output_profile: Optional[OutputProfile] = None,
+                             text: Optional[str] = None,
+                             work_folder: Optional[str] = None) -> PageResult:
         """Procesa una página individual del PDF."""
+        # Crear archivo temporal en el área de trabajo o dentro del directorio de preparación
+        temp_pdf_filename = os.path.join(work_folder or stager.staging_folder, f"temp_page_{page_num + 1}.pdf")
+        bytes_saved = self._write_page(reader, page_num, temp_pdf_filename, output_profile)
+        
+        # Renombrar según el contenido
+        result = self._rename_pdf_file(temp_pdf_filename, stager, page_num, text)
+        return replace(result, bytes_saved=bytes_saved)
+    
+    def _write_page(self, reader: PdfReader, page_num: int, target_filename: str,
+                    output_profile: Optional[OutputProfile] = None) -> int:
+        """
+        Escribe una página del PDF como un archivo independiente.
+        
+        Returns:
+            Bytes ahorrados por el perfil de salida respecto a la copia directa
+        """
+        output_profile = output_profile or self.output_profile
+        if output_profile.is_passthrough:
+            writer = PdfWriter()
+            writer.add_page(reader.pages[page_num])
+            with open(target_filename, 'wb') as target_file:
+                writer.write(target_file)
+            return 0
+        
+        page_pdf, bytes_saved = self._render_page(reader, page_num, output_profile)
+        with open(target_filename, 'wb') as target_file:
+            target_file.write(page_pdf)
+        return bytes_saved
+    
+    def _render_page(self, reader: PdfReader, page_num: int,
+                     output_profile: Optional[OutputProfile] = None) -> Tuple[bytes, int]:
+        """
+        Genera en memoria el PDF de una página con el perfil de salida.
+        
+        Returns:
+            Tupla con (contenido del PDF, bytes ahorrados respecto a la copia directa)
+        """
+        output_profile = output_profile or self.output_profile
         writer = PdfWriter()
         writer.add_page(reader.pages[page_num])
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        page_pdf = buffer.getvalue()
         
-        # Crear archivo temporal
-        temp_pdf_filename = os.path.join(output_folder, f"temp_page_{page_num + 1}.pdf")
+        if output_profile.is_passthrough:
+            return page_pdf, 0
+        optimized = optimize_page(page_pdf, output_profile)
+        return optimized, len(page_pdf) - len(optimized)
+    
+    def _log_bytes_saved(self, results: List[PageResult], output_profile: OutputProfile) -> None:
+        """Registra el ahorro total del perfil de salida."""
+        if output_profile.is_passthrough:
+            return
+        bytes_saved = sum(result.bytes_saved for result in results)
+        logger.info("Perfil de salida '%s': %d bytes ahorrados en %d páginas",
+                    output_profile.name, bytes_saved, len(results))
+    
+    def _rename_pdf_file(self, temp_pdf_filename: str, stager: OutputStager, page_num: int,
+                         text: Optional[str] = None) -> PageResult:
+        """Renombra el archivo PDF según su contenido."""
+        if text is None:
+            proposed = self._build_page_result(temp_pdf_filename, page_num)
+        else:
+            proposed = self._result_from_text(text, page_num)
+        new_filename, collided = stager.stage_file(temp_pdf_filename, proposed.filename)
         
-        with open(temp_pdf_filename, 'wb') as temp_pdf_file:
-            writer.write(temp_pdf_file)
+        if proposed.status == PAGE_STATUS_FALLBACK:
+            logger.warning("Error al extraer datos de la página %d. Guardado como %s", page_num + 1, new_filename,
+                           extra={"page": page_num + 1, "status": PAGE_STATUS_FALLBACK})
+            status = PAGE_STATUS_FALLBACK
+        elif collided:
+            logger.warning("Nombre duplicado en la página %d. Guardado como: %s", page_num + 1, new_filename,
+                           extra={"page": page_num + 1, "status": PAGE_STATUS_COLLISION})
+            status = PAGE_STATUS_COLLISION
+        else:
+            # Registro muestreado por página (ver PageSamplingFilter); se formatea fuera de este hilo
+            logger.info("Página %d guardada como: %s", page_num + 1, new_filename,
+                        extra={"page": page_num + 1, "status": PAGE_STATUS_OK})
+            status = PAGE_STATUS_OK
         
-        # Renombrar según el contenido
-        self._rename_pdf_file(temp_pdf_filename, output_folder, page_num)
+        return replace(proposed, filename=new_filename, status=status)
     
-    def _rename_pdf_file(self, temp_pdf_filename: str, output_folder: str, page_num: int) -> None:
-        """Renombra el archivo PDF según su contenido."""
-        registration_number, name = self.extract_name_and_registration(temp_pdf_filename)
+    def _build_page_result(self, page_pdf_filename: str, page_num: int) -> PageResult:
+        """Extrae los datos de una página y propone su nombre de archivo."""
+        return self._result_from_text(self._read_first_page_text(page_pdf_filename), page_num)
+    
+    @staticmethod
+    def _unique_result(proposed: PageResult, taken_names: Set[str]) -> PageResult:
+        """Asigna al resultado un nombre que no choque con los ya usados y lo reserva."""
+        filename, collided = resolve_filename(proposed.filename, taken_names)
+        taken_names.add(filename.casefold())
+        status = PAGE_STATUS_COLLISION if collided and proposed.status == PAGE_STATUS_OK else proposed.status
+        return replace(proposed, filename=filename, status=status)
+    
+    def _result_from_text(self, text: str, page_num: int) -> PageResult:
+        """Propone el nombre de archivo de una página a partir de su texto."""
+        registration_number = self._extract_registration_number(text)
+        name = self._extract_student_name(text)
         
         if registration_number and name:
-            new_filename = f"{registration_number} - {name}.pdf"
-            new_pdf_filename = os.path.join(output_folder, new_filename)
-            os.rename(temp_pdf_filename, new_pdf_filename)
-            logger.info(f"Página {page_num + 1} guardada como: {new_filename}")
+            filename = f"{registration_number} - {name}.pdf"
+            status = PAGE_STATUS_OK
         else:
-            fallback_filename = os.path.join(output_folder, f"page_{page_num + 1}.pdf")
-            os.rename(temp_pdf_filename, fallback_filename)
-            logger.warning(f"Error al extraer datos de la página {page_num + 1}. Guardado como page_{page_num + 1}.pdf")
+            filename = f"page_{page_num + 1}.pdf"
+            status = PAGE_STATUS_FALLBACK
+        
+        return PageResult(
+            page_number=page_num + 1,
+            filename=filename,
+            registration_number=registration_number,
+            name=name,
+            status=status,
+            cedula=self._extract_cedula(text),
+            text=text
+        )
     
     def _cleanup_original_file(self, filename: str) -> None:
         """Elimina el archivo PDF original de forma segura."""
         try:
             if os.path.exists(filename):
                 os.remove(filename)
-                logger.info(f"Archivo PDF original eliminado: {filename}")
+                logger.info("Archivo PDF original eliminado: %s", filename)
         except Exception as e:
-            logger.warning(f"No se pudo eliminar el archivo {filename}: {str(e)}")
+            logger.warning("No se pudo eliminar el archivo %s: %s", filename, e)
+
+
+def _read_source(source: PdfSource) -> bytes:
+    """Obtiene el contenido de un origen (ruta, bytes o archivo binario abierto)."""
+    if isinstance(source, str):
+        with open(source, 'rb') as source_file:
+            return source_file.read()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    return source.read()
+
+
+def _open_text_document(source: PdfSource) -> "fitz.Document":
+    """Abre un origen con PyMuPDF sin escribirlo en disco."""
+    if isinstance(source, str):
+        return fitz.open(source)
+    return fitz.open(stream=_read_source(source), filetype="pdf")
+
+
+def _describe_source(source: PdfSource) -> str:
+    """Nombre del origen para los mensajes de error."""
+    if isinstance(source, str):
+        return source
+    return getattr(source, "name", None) or "(en memoria)"
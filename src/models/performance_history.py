@@ -0,0 +1,412 @@
+"""
+Historial de rendimiento y estimación del tiempo restante de los trabajos.
+Cada trabajo terminado guarda en SQLite cuánto tardaron su conversión y su
+división, con el motor usado, el equipo, las páginas y el tamaño del
+documento. Con ese historial se ajusta por mínimos cuadrados un modelo de
+costo por etapa (segundos = fijo + por página · páginas + por MB · MB) que
+sirve para estimar la duración de un lote antes de encolarlo y para mostrar
+un tiempo restante que se corrige con el ritmo real a medida que avanzan las
+páginas. El reporte por equipo permite detectar máquinas más lentas que el
+resto cuando varias comparten el mismo historial.
+"""
+
+import os
+import socket
+import sqlite3
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from .exceptions import PDFProcessingError
+from src.utils import get_logger
+
+logger = get_logger("performance_history")
+
+# Ubicación por defecto del historial (relativa al directorio de trabajo, como el índice)
+DEFAULT_HISTORY_PATH = os.path.join("data", "performance_history.db")
+
+STAGE_CONVERSION = "conversion"
+STAGE_SPLIT = "division"
+
+# Filas que se conservan; las más antiguas se descartan al registrar
+MAX_HISTORY_ROWS = 20000
+
+# Ejecuciones más recientes que se usan para ajustar cada modelo
+MAX_FIT_SAMPLES = 200
+
+# Muestras mínimas para ajustar el término fijo y para sumar el término por MB
+MIN_SAMPLES_FIXED = 3
+MIN_SAMPLES_SIZE = 8
+
+# Segundos durante los que se reutiliza un modelo ajustado (otros procesos pueden registrar)
+FIT_CACHE_SECONDS = 60.0
+
+# Páginas observadas con las que el ritmo real pesa lo mismo que el del modelo
+OBSERVED_PAGES_WEIGHT = 20
+
+# Un equipo es lento si tarda por página más de estas veces la mediana de los equipos
+SLOW_HOST_RATIO = 1.5
+
+_BYTES_PER_MB = 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stage_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recorded_at TEXT NOT NULL,
+    host TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    backend TEXT NOT NULL,
+    pages INTEGER NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    seconds REAL NOT NULL
+)
+"""
+
+_INDEX = "CREATE INDEX IF NOT EXISTS stage_runs_model ON stage_runs (stage, backend, host, id)"
+
+
+@dataclass(frozen=True)
+class StageModel:
+    """Modelo de costo de una etapa: segundos = fijo + por página · páginas + por MB · MB."""
+    stage: str
+    backend: str
+    fixed_seconds: float
+    seconds_per_page: float
+    seconds_per_mb: float
+    samples: int
+    host: Optional[str] = None
+    
+    def predict(self, pages: int, size_bytes: int = 0) -> float:
+        """Segundos estimados para un documento."""
+        return (self.fixed_seconds + self.seconds_per_page * max(pages, 0)
+                + self.seconds_per_mb * max(size_bytes, 0) / _BYTES_PER_MB)
+    
+    def page_rate(self, pages: int, size_bytes: int = 0) -> float:
+        """Segundos por página, sin el término fijo, para un documento de este tamaño."""
+        if pages <= 0:
+            return self.seconds_per_page
+        return max(self.predict(pages, size_bytes) - self.fixed_seconds, 0.0) / pages
+    
+    def summary(self) -> str:
+        """Resumen en una línea."""
+        scope = f" • equipo {self.host}" if self.host else ""
+        return (f"{self.stage}/{self.backend}: {self.fixed_seconds:.1f} s + "
+                f"{self.seconds_per_page:.3f} s/página + {self.seconds_per_mb:.2f} s/MB "
+                f"({self.samples} ejecuciones{scope})")
+
+
+@dataclass(frozen=True)
+class HostThroughput:
+    """Rendimiento de un equipo en una etapa."""
+    host: str
+    stage: str
+    runs: int
+    pages: int
+    seconds: float
+    median_seconds_per_page: float
+    slow: bool = False
+    
+    def summary(self) -> str:
+        """Resumen en una línea."""
+        flag = " ⚠️ más lento que el resto" if self.slow else ""
+        return (f"{self.host} • {self.stage}: {self.runs} ejecuciones • {self.pages} páginas • "
+                f"{self.median_seconds_per_page:.3f} s/página (mediana){flag}")
+
+
+class PerformanceHistory:
+    """Historial SQLite de la duración de cada etapa y modelos de costo ajustados con él."""
+    
+    def __init__(self, history_path: str = DEFAULT_HISTORY_PATH, host: Optional[str] = None):
+        """
+        Args:
+            history_path: Base de datos SQLite (puede compartirse entre equipos)
+            host: Nombre de este equipo en el historial (por defecto el del sistema)
+        """
+        self.history_path = os.path.abspath(history_path)
+        self.host = host or socket.gethostname()
+        self._ready = False
+        self._lock = threading.Lock()
+        self._fits: Dict[Tuple[str, str], Tuple[float, Optional[StageModel]]] = {}
+    
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Abre una conexión por operación (segura entre hilos) y confirma los cambios."""
+        self._ensure_schema()
+        connection = sqlite3.connect(self.history_path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+    
+    def _ensure_schema(self) -> None:
+        """Crea la base de datos al primer uso, para no tocar el disco si no se usa."""
+        if self._ready:
+            return
+        with self._lock:
+            if self._ready:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.history_path), exist_ok=True)
+                connection = sqlite3.connect(self.history_path, timeout=30)
+                try:
+                    with connection:
+                        connection.execute(_SCHEMA)
+                        connection.execute(_INDEX)
+                finally:
+                    connection.close()
+            except (OSError, sqlite3.Error) as e:
+                raise PDFProcessingError(f"No se pudo abrir el historial de rendimiento {self.history_path}: {str(e)}")
+            self._ready = True
+    
+    def record(self, stage: str, backend: str, pages: int, size_bytes: int, seconds: float) -> None:
+        """
+        Registra la duración de una etapa.
+        
+        Args:
+            stage: STAGE_CONVERSION o STAGE_SPLIT
+            backend: Motor de conversión o perfil de salida de la división
+            pages: Páginas del documento
+            size_bytes: Tamaño del documento de origen
+            seconds: Duración de la etapa (sin las esperas de turno)
+        """
+        if pages <= 0 or seconds <= 0:
+            return
+        recorded_at = datetime.now().isoformat(timespec="seconds")
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "INSERT INTO stage_runs (recorded_at, host, stage, backend, pages, size_bytes, seconds) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (recorded_at, self.host, stage, backend, pages, size_bytes, seconds)
+            )
+            connection.execute("DELETE FROM stage_runs WHERE id <= ?", (cursor.lastrowid - MAX_HISTORY_ROWS,))
+        
+        with self._lock:
+            self._fits.pop((stage, backend), None)
+        logger.debug("Rendimiento registrado: %s/%s • %d páginas • %.1f s", stage, backend, pages, seconds)
+    
+    def fit(self, stage: str, backend: str) -> Optional[StageModel]:
+        """
+        Ajusta el modelo de costo de una etapa y un motor con las ejecuciones más recientes.
+        
+        Usa las de este equipo si hay suficientes; si no, las de todos los equipos.
+        
+        Returns:
+            Modelo ajustado, o None si todavía no hay historial
+        """
+        key = (stage, backend)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._fits.get(key)
+        if cached is not None and now - cached[0] < FIT_CACHE_SECONDS:
+            return cached[1]
+        
+        try:
+            model = self._fit(stage, backend)
+        except (PDFProcessingError, sqlite3.Error) as e:
+            logger.warning("No se pudo leer el historial de rendimiento: %s", e)
+            model = None
+        with self._lock:
+            self._fits[key] = (now, model)
+        return model
+    
+    def estimate(self, stage: str, backend: str, pages: int, size_bytes: int = 0) -> Optional[float]:
+        """Segundos estimados para una etapa, o None si no hay historial."""
+        model = self.fit(stage, backend)
+        return model.predict(pages, size_bytes) if model else None
+    
+    def models(self) -> List[StageModel]:
+        """Modelos de todas las etapas y motores con historial."""
+        with self._connect() as connection:
+            keys = connection.execute(
+                "SELECT DISTINCT stage, backend FROM stage_runs ORDER BY stage, backend"
+            ).fetchall()
+        return [model for model in (self.fit(stage, backend) for stage, backend in keys) if model]
+    
+    def host_throughput(self) -> List[HostThroughput]:
+        """
+        Rendimiento de cada equipo por etapa.
+        
+        Un equipo se marca como lento si su mediana de segundos por página
+        supera SLOW_HOST_RATIO veces la mediana de los equipos en esa etapa.
+        """
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT host, stage, pages, seconds FROM stage_runs ORDER BY id DESC LIMIT ?",
+                (MAX_HISTORY_ROWS,)
+            ).fetchall()
+        
+        grouped: Dict[Tuple[str, str], List[Tuple[int, float]]] = {}
+        for host, stage, pages, seconds in rows:
+            grouped.setdefault((stage, host), []).append((pages, seconds))
+        
+        report = []
+        for stage in sorted({stage for stage, _ in grouped}):
+            hosts = {host: runs for (run_stage, host), runs in grouped.items() if run_stage == stage}
+            rates = {host: statistics.median(seconds / pages for pages, seconds in runs)
+                     for host, runs in hosts.items()}
+            typical = statistics.median(rates.values())
+            for host in sorted(hosts):
+                runs = hosts[host]
+                report.append(HostThroughput(
+                    host, stage, len(runs), sum(pages for pages, _ in runs),
+                    sum(seconds for _, seconds in runs), rates[host],
+                    slow=len(rates) > 1 and rates[host] > typical * SLOW_HOST_RATIO
+                ))
+        return report
+    
+    def _fit(self, stage: str, backend: str) -> Optional[StageModel]:
+        """Ajusta el modelo con el historial de este equipo o, si no alcanza, con el de todos."""
+        with self._connect() as connection:
+            samples = connection.execute(
+                "SELECT pages, size_bytes, seconds FROM stage_runs WHERE stage = ? AND backend = ? "
+                "AND host = ? ORDER BY id DESC LIMIT ?",
+                (stage, backend, self.host, MAX_FIT_SAMPLES)
+            ).fetchall()
+            host: Optional[str] = self.host
+            if len(samples) < MIN_SAMPLES_FIXED:
+                samples = connection.execute(
+                    "SELECT pages, size_bytes, seconds FROM stage_runs WHERE stage = ? AND backend = ? "
+                    "ORDER BY id DESC LIMIT ?",
+                    (stage, backend, MAX_FIT_SAMPLES)
+                ).fetchall()
+                host = None
+        if not samples:
+            return None
+        
+        fixed, per_page, per_mb = _fit_cost(samples)
+        return StageModel(stage, backend, fixed, per_page, per_mb, len(samples), host)
+
+
+def _fit_cost(samples: Sequence[Tuple[int, int, float]]) -> Tuple[float, float, float]:
+    """
+    Ajusta (fijo, por página, por MB) por mínimos cuadrados.
+    
+    Con pocas muestras, o si algún coeficiente sale negativo (páginas y tamaño
+    muy correlacionados), se usa un modelo más simple: fijo + por página y,
+    como último recurso, solo la proporción segundos / páginas.
+    """
+    seconds = [float(run_seconds) for _, _, run_seconds in samples]
+    if len(samples) >= MIN_SAMPLES_SIZE:
+        rows = [(1.0, float(pages), size_bytes / _BYTES_PER_MB) for pages, size_bytes, _ in samples]
+        coefficients = _least_squares(rows, seconds)
+        if coefficients is not None and min(coefficients) >= 0:
+            return coefficients[0], coefficients[1], coefficients[2]
+    if len(samples) >= MIN_SAMPLES_FIXED:
+        rows = [(1.0, float(pages)) for pages, _, _ in samples]
+        coefficients = _least_squares(rows, seconds)
+        if coefficients is not None and min(coefficients) >= 0:
+            return coefficients[0], coefficients[1], 0.0
+    return 0.0, sum(seconds) / max(sum(pages for pages, _, _ in samples), 1), 0.0
+
+
+def _least_squares(rows: Sequence[Sequence[float]], targets: Sequence[float]) -> Optional[List[float]]:
+    """Resuelve las ecuaciones normales por eliminación de Gauss (None si el sistema es singular)."""
+    size = len(rows[0])
+    matrix = [[sum(row[i] * row[j] for row in rows) for j in range(size)]
+              + [sum(row[i] * target for row, target in zip(rows, targets))]
+              for i in range(size)]
+    for column in range(size):
+        pivot = max(range(column, size), key=lambda r: abs(matrix[r][column]))
+        if abs(matrix[pivot][column]) < 1e-9:
+            return None
+        matrix[column], matrix[pivot] = matrix[pivot], matrix[column]
+        for r in range(size):
+            if r != column:
+                factor = matrix[r][column] / matrix[column][column]
+                matrix[r] = [a - factor * b for a, b in zip(matrix[r], matrix[column])]
+    return [matrix[i][size] / matrix[i][i] for i in range(size)]
+
+
+class JobEta:
+    """
+    Tiempo restante de un trabajo en curso.
+    
+    Durante la conversión descuenta el tiempo transcurrido de lo que predice
+    el modelo. Durante la división combina el ritmo del modelo con el ritmo
+    observado, que pesa más a medida que se procesan páginas.
+    """
+    
+    def __init__(self, conversion: Optional[StageModel], split: Optional[StageModel],
+                 size_bytes: int = 0, converts: bool = True):
+        """
+        Args:
+            conversion: Modelo de la conversión (None si no hay historial)
+            split: Modelo de la división (None si no hay historial)
+            size_bytes: Tamaño del documento de origen
+            converts: Si el trabajo convierte un DOCX (un PDF combinado solo se divide)
+        """
+        self.conversion = conversion if converts else None
+        self.split = split
+        self.size_bytes = size_bytes
+        self.converts = converts
+        self.total: Optional[int] = None
+        self.done = 0
+        self._conversion_started: Optional[float] = None
+        self._split_started: Optional[float] = None
+        self._split_first_done = 0
+        self._updated_at: Optional[float] = None
+    
+    def update(self, done: int, total: int, now: Optional[float] = None) -> None:
+        """Registra el avance informado por el trabajo (páginas procesadas, total)."""
+        now = time.monotonic() if now is None else now
+        self.total = max(total, 1)
+        if done <= 0:
+            # Total estimado antes de convertir: empieza la conversión
+            if self._conversion_started is None:
+                self._conversion_started = now
+        elif self._split_started is None:
+            self._split_started = now
+            self._split_first_done = done
+        self.done = max(done, 0)
+        self._updated_at = now
+    
+    def remaining(self, now: Optional[float] = None) -> Optional[float]:
+        """Segundos restantes estimados, o None si todavía no se puede estimar."""
+        if self.total is None:
+            return None
+        now = time.monotonic() if now is None else now
+        
+        if self._split_started is None:
+            split_seconds = self.split.predict(self.total, self.size_bytes) if self.split else None
+            if split_seconds is None:
+                return None
+            if not self.converts:
+                return split_seconds
+            if self.conversion is None:
+                return None
+            elapsed = now - self._conversion_started if self._conversion_started is not None else 0.0
+            return max(self.conversion.predict(self.total, self.size_bytes) - elapsed, 0.0) + split_seconds
+        
+        rate = self._page_rate()
+        if rate is None:
+            return None
+        since_update = now - self._updated_at
+        return max((self.total - self.done) * rate - since_update, 0.0)
+    
+    def _page_rate(self) -> Optional[float]:
+        """Segundos por página: el del modelo ajustado con el observado en este trabajo."""
+        observed_pages = self.done - self._split_first_done
+        observed = ((self._updated_at - self._split_started) / observed_pages
+                    if observed_pages > 0 else None)
+        predicted = self.split.page_rate(self.total, self.size_bytes) if self.split else None
+        if observed is None:
+            return predicted
+        if predicted is None:
+            return observed
+        return ((predicted * OBSERVED_PAGES_WEIGHT + observed * observed_pages)
+                / (OBSERVED_PAGES_WEIGHT + observed_pages))
+
+
+def format_duration(seconds: float) -> str:
+    """Duración aproximada legible ("~40 s", "~3 min", "~1 h 05 min")."""
+    seconds = max(int(round(seconds)), 0)
+    if seconds < 60:
+        return f"~{max(seconds, 1)} s"
+    minutes = int(round(seconds / 60))
+    if minutes < 60:
+        return f"~{minutes} min"
+    return f"~{minutes // 60} h {minutes % 60:02d} min"
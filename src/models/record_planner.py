@@ -0,0 +1,375 @@
+"""
+Planificación de registros antes de la conversión.
+Lee en streaming el word/document.xml del documento combinado y obtiene, por
+cada registro, el resultado de los campos de combinación (MERGEFIELD), de modo
+que los nombres de salida, la conciliación con la nómina y el tamaño de los
+trabajos se conocen en segundos, sin esperar a la conversión a PDF.
+"""
+
+import math
+import os
+import re
+import zipfile
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set
+from xml.etree.ElementTree import iterparse, ParseError
+from .exceptions import DocumentConversionError, FileNotFoundError
+from .output_stager import resolve_filename
+from .pdf_processor import PageResult, PAGE_STATUS_OK, PAGE_STATUS_FALLBACK, PAGE_STATUS_COLLISION
+from src.utils import get_logger
+
+logger = get_logger("record_planner")
+
+WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MARKUP_COMPATIBILITY_NAMESPACE = "{http://schemas.openxmlformats.org/markup-compatibility/2006}"
+
+# Campos de combinación usados por la plantilla de diplomas
+FIELD_NAME = "Nombre"
+FIELD_CEDULA = "Formato_cedula"
+FIELD_REGISTRATION = "Registro_No"
+PLANNED_FIELDS = (FIELD_NAME, FIELD_CEDULA, FIELD_REGISTRATION)
+
+# Límites de registro
+BOUNDARY_SECTION = "section"
+BOUNDARY_PAGE = "page"
+
+# Registros que conviene asignar como mínimo a cada trabajador
+DEFAULT_RECORDS_PER_WORKER = 200
+
+# Vista previa VML en base64 (cientos de KB por cuadro de texto) que no se necesita leer
+_GFXDATA_ATTRIBUTE = b' o:gfxdata="'
+_READ_CHUNK_SIZE = 1024 * 1024
+
+_MERGEFIELD_PATTERN = re.compile(r'^\s*MERGEFIELD\s+"?([^"\s\\]+)"?', re.IGNORECASE)
+
+_W_T = WORD_NAMESPACE + "t"
+_W_BR = WORD_NAMESPACE + "br"
+_W_TYPE = WORD_NAMESPACE + "type"
+_W_VAL = WORD_NAMESPACE + "val"
+_W_INSTR = WORD_NAMESPACE + "instr"
+_W_FLD_CHAR = WORD_NAMESPACE + "fldChar"
+_W_FLD_CHAR_TYPE = WORD_NAMESPACE + "fldCharType"
+_W_FLD_SIMPLE = WORD_NAMESPACE + "fldSimple"
+_W_INSTR_TEXT = WORD_NAMESPACE + "instrText"
+_W_SECT_PR = WORD_NAMESPACE + "sectPr"
+_W_PAGE_BREAK_BEFORE = WORD_NAMESPACE + "pageBreakBefore"
+_MC_FALLBACK = MARKUP_COMPATIBILITY_NAMESPACE + "Fallback"
+
+
+@dataclass
+class PlannedRecord:
+    """Registro del documento combinado con el resultado de sus campos."""
+    index: int
+    fields: Dict[str, str] = field(default_factory=dict)
+    pages: int = 1
+    
+    @property
+    def name(self) -> Optional[str]:
+        """Nombre del estudiante."""
+        return self.fields.get(FIELD_NAME) or None
+    
+    @property
+    def registration_number(self) -> Optional[str]:
+        """Número de registro (solo la parte numérica, como en la extracción del PDF)."""
+        match = re.search(r"\d+", self.fields.get(FIELD_REGISTRATION, ""))
+        return match.group(0) if match else None
+    
+    @property
+    def cedula(self) -> Optional[str]:
+        """Número de cédula sin separadores."""
+        digits = re.sub(r"\D", "", self.fields.get(FIELD_CEDULA, ""))
+        return digits or None
+
+
+@dataclass
+class RecordPlan:
+    """Resultado de planificar un documento combinado."""
+    source_file: str
+    records: List[PlannedRecord]
+    boundary: str
+    section_breaks: int = 0
+    page_breaks: int = 0
+    
+    @property
+    def record_count(self) -> int:
+        """Número de registros encontrados."""
+        return len(self.records)
+    
+    @property
+    def estimated_pages(self) -> int:
+        """Páginas que se esperan en el PDF combinado."""
+        return sum(record.pages for record in self.records)
+    
+    def predicted_results(self) -> List[PageResult]:
+        """
+        Predice el resultado de la división como si cada registro fuera una página.
+        
+        Los nombres siguen las mismas reglas que `PDFProcessor` (incluida la
+        resolución de nombres duplicados), por lo que el resultado se puede
+        conciliar contra la nómina antes de convertir.
+        """
+        results: List[PageResult] = []
+        taken_names: Set[str] = set()
+        
+        for record in self.records:
+            if record.registration_number and record.name:
+                desired = f"{record.registration_number} - {record.name}.pdf"
+                status = PAGE_STATUS_OK
+            else:
+                desired = f"page_{record.index}.pdf"
+                status = PAGE_STATUS_FALLBACK
+            
+            filename, collided = resolve_filename(desired, taken_names)
+            taken_names.add(filename.casefold())
+            if collided and status == PAGE_STATUS_OK:
+                status = PAGE_STATUS_COLLISION
+            
+            results.append(PageResult(
+                page_number=record.index,
+                filename=filename,
+                registration_number=record.registration_number,
+                name=record.name,
+                status=status,
+                cedula=record.cedula
+            ))
+        
+        return results
+    
+    def incomplete_records(self) -> List[PlannedRecord]:
+        """Registros a los que les falta el nombre o el número de registro."""
+        return [record for record in self.records if not (record.name and record.registration_number)]
+    
+    def suggested_workers(self, max_workers: int,
+                          records_per_worker: int = DEFAULT_RECORDS_PER_WORKER) -> int:
+        """
+        Número de trabajadores que compensa usar para este documento.
+        
+        Args:
+            max_workers: Máximo de trabajadores disponibles
+            records_per_worker: Registros mínimos por trabajador
+        """
+        needed = math.ceil(self.record_count / max(1, records_per_worker))
+        return max(1, min(max_workers, needed))
+    
+    def summary(self) -> str:
+        """Devuelve un resumen legible del plan."""
+        return (f"Registros: {self.record_count} • Páginas estimadas: {self.estimated_pages} • "
+                f"Incompletos: {len(self.incomplete_records())} • "
+                f"Límite: {'sección' if self.boundary == BOUNDARY_SECTION else 'página'}")
+
+
+class _GfxDataFilter:
+    """
+    Envuelve el flujo del XML y descarta los atributos o:gfxdata.
+    
+    Analizar esos atributos es la mayor parte del costo de iterparse en las
+    plantillas con cuadros de texto, y su contenido no aporta nada al plan.
+    """
+    
+    def __init__(self, stream):
+        self._stream = stream
+        self._pending = b""
+        self._in_attribute = False
+    
+    def read(self, size: int = -1) -> bytes:
+        while True:
+            chunk = self._stream.read(_READ_CHUNK_SIZE)
+            if not chunk:
+                data, self._pending = self._pending, b""
+                return b"" if self._in_attribute else data
+            
+            data, self._pending = self._pending + chunk, b""
+            output = bytearray()
+            position = 0
+            while True:
+                if self._in_attribute:
+                    end = data.find(b'"', position)
+                    if end < 0:
+                        break
+                    self._in_attribute = False
+                    position = end + 1
+                    continue
+                
+                start = data.find(_GFXDATA_ATTRIBUTE, position)
+                if start < 0:
+                    # Conservar la cola por si el marcador quedó partido entre bloques
+                    cut = max(position, len(data) - len(_GFXDATA_ATTRIBUTE) + 1)
+                    output += data[position:cut]
+                    self._pending = data[cut:]
+                    break
+                output += data[position:start]
+                position = start + len(_GFXDATA_ATTRIBUTE)
+                self._in_attribute = True
+            
+            if output:
+                return bytes(output)
+
+
+@dataclass
+class _Segment:
+    """Fragmento del documento entre dos saltos de página o de sección."""
+    fields: Dict[str, str] = field(default_factory=dict)
+    has_text: bool = False
+    ends_section: bool = False
+
+
+class RecordPlanner:
+    """Planifica los registros de un DOCX combinado leyendo su XML en streaming."""
+    
+    def __init__(self, field_names: Iterable[str] = PLANNED_FIELDS):
+        self.field_names = set(field_names)
+    
+    def plan(self, docx_filename: str) -> RecordPlan:
+        """
+        Analiza un documento combinado.
+        
+        Los registros se separan por saltos de sección (así los genera la
+        combinación de correspondencia de Word); si el documento no tiene
+        saltos de sección, por saltos de página.
+        
+        Args:
+            docx_filename: Ruta del documento Word combinado
+        
+        Returns:
+            Plan con los registros encontrados
+        
+        Raises:
+            FileNotFoundError: Si el documento no existe
+            DocumentConversionError: Si el documento no es un DOCX válido
+        """
+        if not os.path.exists(docx_filename):
+            raise FileNotFoundError(f"El archivo {docx_filename} no existe.")
+        
+        try:
+            with zipfile.ZipFile(docx_filename) as archive:
+                with archive.open("word/document.xml") as document_xml:
+                    segments = self._read_segments(_GfxDataFilter(document_xml))
+        except (zipfile.BadZipFile, KeyError, ParseError) as e:
+            raise DocumentConversionError(f"No se pudo analizar {docx_filename}: {str(e)}")
+        
+        section_breaks = sum(1 for segment in segments[:-1] if segment.ends_section)
+        page_breaks = len(segments) - 1 - section_breaks
+        boundary = BOUNDARY_SECTION if section_breaks else BOUNDARY_PAGE
+        
+        plan = RecordPlan(
+            source_file=os.path.abspath(docx_filename),
+            records=self._group_records(segments, boundary),
+            boundary=boundary,
+            section_breaks=section_breaks,
+            page_breaks=page_breaks
+        )
+        logger.info("Plan de %s: %s", os.path.basename(docx_filename), plan.summary())
+        return plan
+    
+    def _read_segments(self, document_xml) -> List[_Segment]:
+        """Recorre el XML una sola vez y lo divide en fragmentos por saltos."""
+        segments: List[_Segment] = [_Segment()]
+        field_stack: List[dict] = []
+        fallback_depth = 0
+        depth = 0
+        body = None
+        
+        for event, elem in iterparse(document_xml, events=("start", "end")):
+            tag = elem.tag
+            
+            if event == "start":
+                depth += 1
+                if depth == 2:
+                    body = elem
+                if tag == _MC_FALLBACK:
+                    # Copia VML del mismo cuadro de texto: se ignora para no duplicar campos
+                    fallback_depth += 1
+                elif fallback_depth:
+                    continue
+                elif tag == _W_FLD_SIMPLE:
+                    field_stack.append({"field": self._field_name(elem.get(_W_INSTR, "")),
+                                        "instr": [], "result": [], "in_result": True})
+                elif tag == _W_PAGE_BREAK_BEFORE and elem.get(_W_VAL, "1") not in ("0", "false"):
+                    self._close_segment(segments, ends_section=False)
+                continue
+            
+            depth -= 1
+            if tag == _MC_FALLBACK:
+                fallback_depth -= 1
+            elif fallback_depth:
+                pass
+            elif tag == _W_T:
+                text = elem.text or ""
+                if text.strip():
+                    segments[-1].has_text = True
+                if field_stack and field_stack[-1]["in_result"]:
+                    field_stack[-1]["result"].append(text)
+            elif tag == _W_INSTR_TEXT:
+                if field_stack and not field_stack[-1]["in_result"]:
+                    field_stack[-1]["instr"].append(elem.text or "")
+            elif tag == _W_FLD_CHAR:
+                self._handle_field_char(elem.get(_W_FLD_CHAR_TYPE), field_stack, segments[-1])
+            elif tag == _W_FLD_SIMPLE:
+                if field_stack:
+                    self._store_field(field_stack.pop(), segments[-1])
+            elif tag == _W_BR:
+                if elem.get(_W_TYPE) == "page":
+                    self._close_segment(segments, ends_section=False)
+            elif tag == _W_SECT_PR and depth > 2:
+                # sectPr dentro de un párrafo: salto de sección (el del cuerpo cierra el documento)
+                section_type = elem.find(_W_TYPE)
+                if section_type is None or section_type.get(_W_VAL) != "continuous":
+                    self._close_segment(segments, ends_section=True)
+            
+            if depth == 2 and body is not None:
+                # Elemento de primer nivel ya procesado: liberar memoria
+                body.clear()
+        
+        segments[-1].ends_section = True
+        return segments
+    
+    def _handle_field_char(self, char_type: Optional[str], field_stack: List[dict], segment: _Segment) -> None:
+        """Sigue el inicio, separador y fin de un campo complejo."""
+        if char_type == "begin":
+            field_stack.append({"field": None, "instr": [], "result": [], "in_result": False})
+        elif char_type == "separate" and field_stack:
+            current = field_stack[-1]
+            current["field"] = self._field_name("".join(current["instr"]))
+            current["in_result"] = True
+        elif char_type == "end" and field_stack:
+            self._store_field(field_stack.pop(), segment)
+    
+    def _field_name(self, instruction: str) -> Optional[str]:
+        """Devuelve el campo de combinación de la instrucción si es uno de los planificados."""
+        match = _MERGEFIELD_PATTERN.match(instruction)
+        if match and match.group(1) in self.field_names:
+            return match.group(1)
+        return None
+    
+    @staticmethod
+    def _store_field(current: dict, segment: _Segment) -> None:
+        """Guarda el resultado de un campo (la primera aparición en el registro prevalece)."""
+        value = re.sub(r"\s+", " ", "".join(current["result"])).strip()
+        if current["field"] and value and current["field"] not in segment.fields:
+            segment.fields[current["field"]] = value
+    
+    @staticmethod
+    def _close_segment(segments: List[_Segment], ends_section: bool) -> None:
+        """Cierra el fragmento actual y abre uno nuevo."""
+        segments[-1].ends_section = ends_section
+        segments.append(_Segment())
+    
+    @staticmethod
+    def _group_records(segments: List[_Segment], boundary: str) -> List[PlannedRecord]:
+        """Agrupa los fragmentos en registros según el tipo de límite."""
+        records: List[PlannedRecord] = []
+        current: Optional[PlannedRecord] = None
+        
+        for segment in segments:
+            if segment.has_text or segment.fields:
+                if current is None:
+                    current = PlannedRecord(index=len(records) + 1, pages=0)
+                current.pages += 1
+                for name, value in segment.fields.items():
+                    current.fields.setdefault(name, value)
+            
+            if current is not None and (boundary == BOUNDARY_PAGE or segment.ends_section):
+                records.append(current)
+                current = None
+        
+        return records
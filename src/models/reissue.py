@@ -0,0 +1,185 @@
+"""
+Reexpedición selectiva de diplomas.
+Regenera solo los números de registro indicados a partir de un documento
+corregido y los reemplaza en la carpeta de salida de un trabajo anterior,
+usando los artefactos conservados de ese trabajo.
+"""
+
+import os
+import shutil
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterable, List, Optional
+from .document_converter import DocumentConverter
+from .exceptions import DocumentConversionError, FileNotFoundError
+from .job_artifacts import JobArtifactStore
+from .output_stager import resolve_filename
+from .pdf_processor import PDFProcessor, PageResult, PAGE_STATUS_OK, PAGE_STATUS_COLLISION, PAGE_STATUS_FALLBACK
+from .scratch_space import ScratchSpace
+from .diploma_index import DiplomaIndex
+from src.utils import get_logger
+
+logger = get_logger("reissue")
+
+
+@dataclass
+class ReissueReport:
+    """Resultado de una reexpedición selectiva."""
+    job_id: str
+    reissued: List[PageResult] = field(default_factory=list)
+    replaced: Dict[str, str] = field(default_factory=dict)
+    not_found: List[str] = field(default_factory=list)
+    
+    def summary(self) -> str:
+        """Devuelve un resumen legible de la reexpedición."""
+        return (f"Trabajo {self.job_id} • Reexpedidos: {len(self.reissued)} • "
+                f"No encontrados: {len(self.not_found)}")
+
+
+class ReissueService:
+    """Regenera diplomas concretos sin repetir la conversión del lote completo."""
+    
+    def __init__(self, pdf_processor: Optional[PDFProcessor] = None,
+                 document_converter: Optional[DocumentConverter] = None,
+                 artifact_store: Optional[JobArtifactStore] = None,
+                 index_path: Optional[str] = None,
+                 scratch_space: Optional[ScratchSpace] = None):
+        self.pdf_processor = pdf_processor or PDFProcessor()
+        self.document_converter = document_converter
+        self.artifact_store = artifact_store or JobArtifactStore()
+        self.index_path = index_path
+        self.scratch_space = scratch_space or ScratchSpace()
+    
+    def reissue(self, output_folder: str, registration_numbers: Iterable[str],
+                source_file: str) -> ReissueReport:
+        """
+        Regenera los diplomas indicados y los reemplaza en la carpeta de salida.
+        
+        Las páginas se ubican por su número de registro en el documento corregido
+        (PDF o DOCX, que puede contener solo los registros a corregir). Si un
+        número aparecía en varias páginas del lote original, sus páginas se
+        reemplazan en orden con las del documento corregido.
+        
+        Args:
+            output_folder: Carpeta de salida del trabajo anterior
+            registration_numbers: Números de registro a reexpedir
+            source_file: Documento corregido (.pdf o .docx)
+        
+        Returns:
+            Reporte de la reexpedición
+        
+        Raises:
+            ValueError: Si no se indica el documento corregido
+            FileNotFoundError: Si no hay artefactos conservados para la carpeta
+                o el documento corregido no existe
+            DocumentConversionError: Si no se pudo convertir el documento corregido
+        """
+        if not source_file:
+            # Sin un documento corregido solo se volverían a publicar las mismas páginas
+            raise ValueError("La reexpedición requiere el documento corregido (.pdf o .docx)")
+        
+        output_folder = os.path.abspath(output_folder)
+        job_id = self.artifact_store.find_latest_job(output_folder)
+        if not job_id:
+            raise FileNotFoundError(f"No hay artefactos conservados para la carpeta {output_folder}")
+        
+        requested = list(dict.fromkeys(str(number).strip() for number in registration_numbers
+                                       if str(number).strip()))
+        # Por número de página: un mismo registro puede aparecer en varias páginas
+        previous_pages = {page.page_number: page for page in self.artifact_store.load_pages(job_id)}
+        previous_by_number: Dict[str, List[PageResult]] = {}
+        for page_number in sorted(previous_pages):
+            page = previous_pages[page_number]
+            if page.registration_number in requested:
+                previous_by_number.setdefault(page.registration_number, []).append(page)
+        
+        # Las páginas reexpedidas se escriben con el mismo perfil que el lote original
+        output_profile = self.artifact_store.load_output_profile(job_id)
+        report = ReissueReport(job_id=job_id)
+        report.not_found = [number for number in requested if number not in previous_by_number]
+        requested = [number for number in requested if number in previous_by_number]
+        if not requested:
+            return report
+        
+        with self.scratch_space.job_area(f"reexp-{job_id}",
+                                         self.scratch_space.estimate_bytes(source_file)) as scratch_folder:
+            source_pdf = self._prepare_source_pdf(source_file, scratch_folder)
+            page_map = self.pdf_processor.find_pages_by_registration(source_pdf, requested)
+            report.not_found.extend(number for number in requested if number not in page_map)
+            
+            targets: List[PageResult] = []
+            source_pages: List[int] = []
+            for number in requested:
+                previous, corrected = previous_by_number[number], page_map.get(number, [])
+                if corrected and len(previous) != len(corrected):
+                    logger.warning("El registro %s aparece en %d páginas del lote y en %d del documento corregido; "
+                                   "se reemplazan en orden", number, len(previous), len(corrected))
+                for previous_page, source_page in zip(previous, corrected):
+                    targets.append(previous_page)
+                    source_pages.append(source_page)
+            
+            exported = self.pdf_processor.export_pages(source_pdf, source_pages,
+                                                       os.path.join(scratch_folder, "paginas"), output_profile)
+            for previous_page, (temp_pdf_filename, page) in zip(targets, exported):
+                reissued_page = self._replace_output(output_folder, temp_pdf_filename,
+                                                     replace(page, page_number=previous_page.page_number),
+                                                     previous_page)
+                report.reissued.append(reissued_page)
+                report.replaced[previous_page.filename] = reissued_page.filename
+                self._record_reissue(job_id, output_folder, previous_page, reissued_page)
+        
+        logger.info("Reexpedición terminada. %s", report.summary())
+        return report
+    
+    def _prepare_source_pdf(self, source_file: str, scratch_folder: str) -> str:
+        """Devuelve un PDF a partir del documento corregido, convirtiéndolo si es DOCX en el área de trabajo."""
+        if not os.path.exists(source_file):
+            raise FileNotFoundError(f"El archivo de origen no existe: {source_file}")
+        if source_file.lower().endswith(".pdf"):
+            return source_file
+        
+        converter = self.document_converter or DocumentConverter()
+        output_pdf_filename = os.path.join(scratch_folder, "source.pdf")
+        converter.convert_word_to_pdf(source_file, output_pdf_filename)
+        if not os.path.exists(output_pdf_filename):
+            raise DocumentConversionError("No se pudo generar el PDF del documento corregido.")
+        return output_pdf_filename
+    
+    def _replace_output(self, output_folder: str, temp_pdf_filename: str,
+                        page: PageResult, previous_page: PageResult) -> PageResult:
+        """Reemplaza el diploma anterior por el regenerado sin dejar huecos visibles."""
+        taken_names = {name.casefold() for name in os.listdir(output_folder)
+                       if name.casefold() != previous_page.filename.casefold()}
+        new_filename, collided = resolve_filename(page.filename, taken_names)
+        
+        # El área de trabajo puede estar en otro disco: se copia a un nombre oculto
+        # dentro de la carpeta y se renombra, para que el reemplazo sea atómico
+        staged_path = os.path.join(output_folder, f".{new_filename}.reexp")
+        try:
+            shutil.copyfile(temp_pdf_filename, staged_path)
+            # Primero se publica el nuevo archivo y luego se retira el anterior
+            os.replace(staged_path, os.path.join(output_folder, new_filename))
+        finally:
+            if os.path.exists(staged_path):
+                os.remove(staged_path)
+        if new_filename.casefold() != previous_page.filename.casefold():
+            previous_path = os.path.join(output_folder, previous_page.filename)
+            if os.path.exists(previous_path):
+                os.remove(previous_path)
+        
+        if page.status == PAGE_STATUS_FALLBACK:
+            status = PAGE_STATUS_FALLBACK
+        else:
+            status = PAGE_STATUS_COLLISION if collided else PAGE_STATUS_OK
+        
+        logger.info("Diploma reexpedido: %s -> %s", previous_page.filename, new_filename)
+        return replace(page, filename=new_filename, status=status)
+    
+    def _record_reissue(self, job_id: str, output_folder: str, previous_page: PageResult,
+                        reissued_page: PageResult) -> None:
+        """Actualiza el manifiesto y el índice de búsqueda."""
+        self.artifact_store.update_page(job_id, reissued_page)
+        try:
+            index = DiplomaIndex(self.index_path) if self.index_path else DiplomaIndex()
+            index.replace_entry(os.path.join(output_folder, previous_page.filename), reissued_page, job_id)
+        except Exception as e:
+            logger.warning("No se pudo actualizar el índice de diplomas: %s", e)
@@ -0,0 +1,420 @@
+"""
+Regulador de recursos para la concurrencia adaptativa.
+Las conversiones (cada instancia de soffice ocupa cientos de MB) y las
+divisiones de PDF piden turno antes de empezar. El regulador mide la memoria
+del proceso y de sus hijos, la memoria disponible del sistema y la carga de
+CPU, y solo admite una tarea nueva si cabe dentro de los límites
+configurados. Bajo presión las tareas esperan hasta que se libere espacio.
+Cada decisión queda registrada en las métricas.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+from src.utils import AppSettings, get_logger
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+logger = get_logger("resource_governor")
+
+TASK_CONVERSION = "conversion"
+TASK_SPLIT = "split"
+
+# Memoria prevista por tarea hasta que el regulador la haya medido
+DEFAULT_TASK_BYTES = {
+    TASK_CONVERSION: 400 * 1024 * 1024,
+    TASK_SPLIT: 150 * 1024 * 1024,
+}
+
+# Intervalo (segundos) entre mediciones mientras hay tareas en curso
+DEFAULT_SAMPLE_INTERVAL = 0.5
+
+# Peso de cada medición nueva en la estimación de memoria por tarea
+_ESTIMATE_WEIGHT = 0.3
+
+REASON_PROCESS_MEMORY = "memoria del proceso"
+REASON_SYSTEM_MEMORY = "memoria del sistema"
+REASON_CPU_LOAD = "carga de CPU"
+
+
+@dataclass(frozen=True)
+class ResourceSample:
+    """Medición de los recursos en un instante (None si no se pudo medir)."""
+    process_rss: Optional[int]
+    available_memory: Optional[int]
+    load_per_cpu: Optional[float]
+    taken_at: float
+
+
+@dataclass
+class GovernorMetrics:
+    """Decisiones y mediciones acumuladas del regulador."""
+    admitted: Dict[str, int] = field(default_factory=dict)
+    delayed: Dict[str, int] = field(default_factory=dict)
+    throttle_reasons: Dict[str, int] = field(default_factory=dict)
+    wait_seconds: float = 0.0
+    running: Dict[str, int] = field(default_factory=dict)
+    task_estimates: Dict[str, int] = field(default_factory=dict)
+    peak_process_rss: int = 0
+    last_sample: Optional[ResourceSample] = None
+    
+    def summary(self) -> str:
+        """Resumen en una línea."""
+        admitted = sum(self.admitted.values())
+        delayed = sum(self.delayed.values())
+        estimates = ", ".join(f"{kind} ~{size / (1024 * 1024):.0f} MB"
+                              for kind, size in sorted(self.task_estimates.items()))
+        reasons = ", ".join(f"{reason}: {count}" for reason, count in sorted(self.throttle_reasons.items()))
+        return (f"{admitted} tareas admitidas • {delayed} en espera ({self.wait_seconds:.1f} s"
+                f"{'; ' + reasons if reasons else ''}) • pico {self.peak_process_rss / (1024 * 1024):.0f} MB"
+                f"{' • ' + estimates if estimates else ''}")
+
+
+class _RunningTask:
+    """Tarea admitida y la memoria observada mientras se ejecuta."""
+    
+    def __init__(self, kind: str, baseline_rss: Optional[int], concurrency: int):
+        self.kind = kind
+        self.thread_id = threading.get_ident()
+        self.paused = False
+        self.baseline_rss = baseline_rss
+        self.peak_rss = baseline_rss
+        self.max_concurrency = concurrency
+    
+    @property
+    def growth(self) -> int:
+        """Memoria que el proceso ganó desde que empezó la tarea."""
+        if self.baseline_rss is None or self.peak_rss is None:
+            return 0
+        return max(0, self.peak_rss - self.baseline_rss)
+
+
+class ResourceGovernor:
+    """Admite tareas solo mientras la memoria y la CPU están dentro de los límites."""
+    
+    def __init__(self, memory_budget_bytes: int = 0, min_free_bytes: int = 0,
+                 max_load_per_cpu: float = 0.0, sample_interval: float = DEFAULT_SAMPLE_INTERVAL):
+        """
+        Args:
+            memory_budget_bytes: Memoria máxima del proceso y sus hijos (0 sin límite)
+            min_free_bytes: Memoria del sistema que debe quedar disponible (0 sin límite)
+            max_load_per_cpu: Carga media por núcleo a partir de la cual no se
+                admiten tareas nuevas (0 sin límite)
+            sample_interval: Segundos entre mediciones mientras hay tareas en curso
+        """
+        self.memory_budget_bytes = memory_budget_bytes
+        self.min_free_bytes = min_free_bytes
+        self.max_load_per_cpu = max_load_per_cpu
+        self.sample_interval = sample_interval
+        
+        self._condition = threading.Condition()
+        self._tasks: List[_RunningTask] = []
+        self._estimates: Dict[str, int] = dict(DEFAULT_TASK_BYTES)
+        self._metrics = GovernorMetrics()
+        self._sample: Optional[ResourceSample] = None
+        self._sampler: Optional[threading.Thread] = None
+        
+        if (memory_budget_bytes or min_free_bytes) and not _memory_measurable():
+            logger.warning("No se puede medir la memoria en este sistema (instale psutil); "
+                           "el regulador solo limitará por carga de CPU")
+    
+    @classmethod
+    def from_settings(cls, settings: AppSettings) -> "ResourceGovernor":
+        """Crea el regulador con los límites de la configuración."""
+        return cls(settings.memory_budget_mb * 1024 * 1024,
+                   settings.min_free_memory_mb * 1024 * 1024,
+                   settings.max_load_per_cpu)
+    
+    @property
+    def enabled(self) -> bool:
+        """Indica si hay algún límite configurado."""
+        return bool(self.memory_budget_bytes or self.min_free_bytes or self.max_load_per_cpu)
+    
+    @contextmanager
+    def slot(self, kind: str, label: str = "") -> Iterator[None]:
+        """
+        Espera turno para una tarea y la registra mientras se ejecuta.
+        
+        Si no hay ninguna tarea en curso se admite siempre, para que el trabajo
+        avance aunque el equipo esté al límite.
+        
+        Args:
+            kind: Tipo de tarea (TASK_CONVERSION o TASK_SPLIT)
+            label: Descripción para el log (por ejemplo el documento)
+        """
+        task = self._admit(kind, label)
+        try:
+            yield
+        finally:
+            self._release(task)
+    
+    @contextmanager
+    def paused(self) -> Iterator[None]:
+        """
+        Marca como en pausa las tareas del hilo actual mientras dure el bloque.
+        
+        Una tarea en pausa (por ejemplo un trabajo largo que cedió su turno) no
+        impide admitir otras: si todas las tareas en curso están en pausa, la
+        siguiente se admite siempre.
+        """
+        thread_id = threading.get_ident()
+        with self._condition:
+            tasks = [task for task in self._tasks if task.thread_id == thread_id and not task.paused]
+            for task in tasks:
+                task.paused = True
+            self._condition.notify_all()
+        try:
+            yield
+        finally:
+            with self._condition:
+                for task in tasks:
+                    task.paused = False
+    
+    def sample(self) -> ResourceSample:
+        """Mide la memoria del proceso y sus hijos, la memoria disponible y la carga."""
+        sample = _measure()
+        with self._condition:
+            self._record_sample(sample)
+        return sample
+    
+    def metrics(self) -> GovernorMetrics:
+        """Copia de las métricas actuales."""
+        with self._condition:
+            metrics = self._metrics
+            return GovernorMetrics(
+                admitted=dict(metrics.admitted),
+                delayed=dict(metrics.delayed),
+                throttle_reasons=dict(metrics.throttle_reasons),
+                wait_seconds=metrics.wait_seconds,
+                running=self._running_by_kind(),
+                task_estimates=dict(self._estimates),
+                peak_process_rss=metrics.peak_process_rss,
+                last_sample=self._sample
+            )
+    
+    def _admit(self, kind: str, label: str) -> _RunningTask:
+        """Bloquea hasta que la tarea quepa dentro de los límites."""
+        if not self.enabled:
+            # Sin límites no hay nada que medir: se admite de inmediato
+            with self._condition:
+                return self._register(kind, None)
+        
+        start = time.monotonic()
+        delayed = False
+        with self._condition:
+            while True:
+                sample = self._fresh_sample()
+                reason = self._refusal(kind, sample)
+                if reason is None:
+                    break
+                if not delayed:
+                    delayed = True
+                    self._metrics.delayed[kind] = self._metrics.delayed.get(kind, 0) + 1
+                    self._metrics.throttle_reasons[reason] = self._metrics.throttle_reasons.get(reason, 0) + 1
+                    logger.info("Regulador: %s de %s en espera por %s (%d tareas en curso)",
+                                kind, label or "-", reason, len(self._tasks))
+                self._condition.wait(self.sample_interval)
+            
+            task = self._register(kind, sample.process_rss)
+            if delayed:
+                waited = time.monotonic() - start
+                self._metrics.wait_seconds += waited
+                logger.info("Regulador: %s de %s admitida tras %.1f s", kind, label or "-", waited)
+            self._ensure_sampler()
+        return task
+    
+    def _register(self, kind: str, baseline_rss: Optional[int]) -> _RunningTask:
+        """Agrega la tarea admitida a las que están en curso (con el candado tomado)."""
+        task = _RunningTask(kind, baseline_rss, len(self._tasks) + 1)
+        self._tasks.append(task)
+        for other in self._tasks:
+            other.max_concurrency = max(other.max_concurrency, len(self._tasks))
+        self._metrics.admitted[kind] = self._metrics.admitted.get(kind, 0) + 1
+        return task
+    
+    def _release(self, task: _RunningTask) -> None:
+        """Retira la tarea, aprende cuánta memoria usó y despierta a las que esperan."""
+        sample = _measure() if self.enabled else None
+        with self._condition:
+            if sample is not None:
+                self._record_sample(sample)
+            self._tasks.remove(task)
+            if task.baseline_rss is not None:
+                # Con tareas simultáneas el crecimiento se reparte entre ellas
+                observed = task.growth // task.max_concurrency
+                previous = self._estimates.get(task.kind, observed)
+                self._estimates[task.kind] = int(previous + _ESTIMATE_WEIGHT * (observed - previous))
+            self._condition.notify_all()
+    
+    def _refusal(self, kind: str, sample: ResourceSample) -> Optional[str]:
+        """Motivo por el que la tarea no cabe ahora, o None si puede empezar."""
+        active = [task for task in self._tasks if not task.paused]
+        if not active or not self.enabled:
+            return None
+        
+        # Memoria que todavía pueden pedir las tareas en curso (soffice tarda en crecer)
+        pending = sum(max(0, self._estimates.get(task.kind, 0) - task.growth) for task in active)
+        needed = self._estimates.get(kind, 0) + pending
+        
+        if self.memory_budget_bytes and sample.process_rss is not None:
+            if sample.process_rss + needed > self.memory_budget_bytes:
+                return REASON_PROCESS_MEMORY
+        if self.min_free_bytes and sample.available_memory is not None:
+            if sample.available_memory - needed < self.min_free_bytes:
+                return REASON_SYSTEM_MEMORY
+        if self.max_load_per_cpu and sample.load_per_cpu is not None:
+            if sample.load_per_cpu > self.max_load_per_cpu:
+                return REASON_CPU_LOAD
+        return None
+    
+    def _fresh_sample(self) -> ResourceSample:
+        """
+        Última medición, o una nueva si es más antigua que el intervalo.
+        
+        Se llama con el candado tomado, pero lo suelta mientras mide para no
+        serializar las demás admisiones detrás de la lectura de /proc o psutil.
+        """
+        sample = self._sample
+        if sample is not None and time.monotonic() - sample.taken_at < self.sample_interval:
+            return sample
+        self._condition.release()
+        try:
+            sample = _measure()
+        finally:
+            self._condition.acquire()
+        # Otro hilo pudo registrar una medición más reciente mientras tanto
+        if self._sample is None or self._sample.taken_at < sample.taken_at:
+            self._record_sample(sample)
+        return sample
+    
+    def _record_sample(self, sample: ResourceSample) -> None:
+        """Guarda la medición y actualiza los picos de las tareas en curso (con el candado tomado)."""
+        self._sample = sample
+        if sample.process_rss is None:
+            return
+        self._metrics.peak_process_rss = max(self._metrics.peak_process_rss, sample.process_rss)
+        for task in self._tasks:
+            if task.peak_rss is not None:
+                task.peak_rss = max(task.peak_rss, sample.process_rss)
+    
+    def _ensure_sampler(self) -> None:
+        """Inicia el hilo de medición si hay límites y no está activo (con el candado tomado)."""
+        if not self.enabled or not _memory_measurable() or \
+                (self._sampler is not None and self._sampler.is_alive()):
+            return
+        self._sampler = threading.Thread(target=self._sample_while_busy, name="resource-governor", daemon=True)
+        self._sampler.start()
+    
+    def _sample_while_busy(self) -> None:
+        """Mide periódicamente mientras haya tareas en curso."""
+        with self._condition:
+            while self._tasks:
+                self._condition.release()
+                try:
+                    sample = _measure()
+                finally:
+                    self._condition.acquire()
+                self._record_sample(sample)
+                self._condition.wait(self.sample_interval)
+            self._sampler = None
+    
+    def _running_by_kind(self) -> Dict[str, int]:
+        """Tareas en curso por tipo."""
+        running: Dict[str, int] = {}
+        for task in self._tasks:
+            running[task.kind] = running.get(task.kind, 0) + 1
+        return running
+
+
+def _measure() -> ResourceSample:
+    """Mide los recursos ahora (sin tomar el candado del regulador)."""
+    return ResourceSample(_process_tree_rss(), _available_memory(), _load_per_cpu(), time.monotonic())
+
+
+def _memory_measurable() -> bool:
+    """Indica si se puede medir la memoria del proceso."""
+    return PSUTIL_AVAILABLE or os.path.isdir("/proc/self")
+
+
+def _process_tree_rss() -> Optional[int]:
+    """Memoria residente del proceso y de todos sus descendientes (por ejemplo soffice)."""
+    if PSUTIL_AVAILABLE:
+        try:
+            process = psutil.Process()
+            total = process.memory_info().rss
+            for child in process.children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except psutil.Error:
+                    pass
+            return total
+        except psutil.Error:
+            return None
+    
+    if not os.path.isdir("/proc/self"):
+        return None
+    
+    # Sin psutil se recorre /proc: padre de cada proceso y páginas residentes
+    parents: Dict[int, int] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as stat_file:
+                # El nombre del proceso va entre paréntesis y puede contener espacios
+                fields = stat_file.read().rsplit(b")", 1)[1].split()
+            parents[int(entry)] = int(fields[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    
+    children: Dict[int, List[int]] = {}
+    for pid, ppid in parents.items():
+        children.setdefault(ppid, []).append(pid)
+    
+    tree = {os.getpid()}
+    pending = [os.getpid()]
+    while pending:
+        for pid in children.get(pending.pop(), []):
+            if pid not in tree:
+                tree.add(pid)
+                pending.append(pid)
+    
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    for pid in tree:
+        try:
+            with open(f"/proc/{pid}/statm", "rb") as statm_file:
+                total += int(statm_file.read().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+    return total
+
+
+def _available_memory() -> Optional[int]:
+    """Memoria del sistema disponible sin recurrir al intercambio."""
+    if PSUTIL_AVAILABLE:
+        return psutil.virtual_memory().available
+    try:
+        with open("/proc/meminfo", "r") as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _load_per_cpu() -> Optional[float]:
+    """Carga media del último minuto por núcleo."""
+    try:
+        load = psutil.getloadavg()[0] if PSUTIL_AVAILABLE else os.getloadavg()[0]
+    except (AttributeError, OSError):
+        return None
+    return load / (os.cpu_count() or 1)
@@ -0,0 +1,289 @@
+"""
+Lectura en flujo de la nómina (.xlsx o .csv).
+Las filas se leen una a una, con openpyxl en modo de solo lectura o con el
+módulo csv, de modo que la memoria no crece con el tamaño del archivo. Cada
+fila se normaliza (espacios, cédula y registro solo con dígitos) y se entrega
+como un RosterEntry compacto; los registros y cédulas repetidos se detectan
+al leer.
+"""
+
+import csv
+import os
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Set
+from .exceptions import FileNotFoundError, PDFProcessingError
+from src.utils import AppSettings, get_logger
+
+logger = get_logger("roster_reader")
+
+# Nombres aceptados para cada columna de la nómina (normalizados)
+REGISTRATION_COLUMNS = ("registro_no", "registro", "no_registro")
+NAME_COLUMNS = ("nombre", "nombres")
+CEDULA_COLUMNS = ("cedula", "formato_cedula")
+
+EXCEL_EXTENSIONS = (".xlsx", ".xlsm")
+CSV_EXTENSIONS = (".csv", ".txt")
+
+# Delimitadores probados en los CSV (Excel en español exporta con ";")
+CSV_DELIMITERS = ";,\t|"
+
+# Bytes del comienzo del CSV usados para detectar el delimitador
+_CSV_SNIFF_BYTES = 64 * 1024
+
+# Repeticiones que se registran una por una antes de resumirlas
+MAX_DUPLICATE_WARNINGS = 20
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """Normaliza un nombre para compararlo sin tildes, mayúsculas ni espacios extra."""
+    if not name:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", name)
+    without_accents = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return re.sub(r"\s+", " ", without_accents).strip().casefold()
+
+
+def normalize_text(value) -> Optional[str]:
+    """Quita los espacios sobrantes de un valor de texto (None si queda vacío)."""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = re.sub(r"\s+", " ", str(value)).strip()
+    return text or None
+
+
+def normalize_identifier(value) -> Optional[str]:
+    """Normaliza un número de registro o cédula dejando solo sus dígitos."""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    digits = re.sub(r"\D", "", str(value))
+    return digits or None
+
+
+def column_key(header) -> str:
+    """Normaliza el nombre de una columna ("Formato cédula" -> "formato_cedula")."""
+    return re.sub(r"[^a-z0-9]+", "_", normalize_name(str(header or ""))).strip("_")
+
+
+@dataclass(frozen=True)
+class RosterEntry:
+    """Fila de la nómina con los campos usados en la combinación."""
+    __slots__ = ("row_number", "registration_number", "name", "cedula")
+    row_number: int
+    registration_number: Optional[str]
+    name: Optional[str]
+    cedula: Optional[str]
+
+
+@dataclass(frozen=True)
+class RosterColumns:
+    """Columnas de la nómina; las no indicadas se buscan entre los nombres habituales."""
+    registration: Optional[str] = None
+    name: Optional[str] = None
+    cedula: Optional[str] = None
+    
+    @classmethod
+    def from_settings(cls, settings: AppSettings) -> "RosterColumns":
+        """Crea el mapeo con las columnas configuradas."""
+        return cls(settings.roster_registration_column, settings.roster_name_column,
+                   settings.roster_cedula_column)
+    
+    def locate(self, header: Sequence) -> Dict[str, int]:
+        """
+        Ubica las columnas de registro, nombre y cédula en el encabezado.
+        
+        Returns:
+            Diccionario campo -> índice de columna (solo los encontrados)
+        
+        Raises:
+            PDFProcessingError: Si una columna configurada no está en el encabezado
+        """
+        keys = [column_key(h) for h in header]
+        columns: Dict[str, int] = {}
+        for field_name, configured, candidates in (("registration", self.registration, REGISTRATION_COLUMNS),
+                                                   ("name", self.name, NAME_COLUMNS),
+                                                   ("cedula", self.cedula, CEDULA_COLUMNS)):
+            if configured:
+                if column_key(configured) not in keys:
+                    raise PDFProcessingError(
+                        f"La columna '{configured}' no está en la nómina. "
+                        f"Columnas: {', '.join(str(h) for h in header if h is not None)}"
+                    )
+                columns[field_name] = keys.index(column_key(configured))
+                continue
+            for candidate in candidates:
+                if candidate in keys:
+                    columns[field_name] = keys.index(candidate)
+                    break
+        return columns
+
+
+@dataclass
+class RosterStats:
+    """Conteo de la última lectura."""
+    rows: int = 0
+    entries: int = 0
+    empty_rows: int = 0
+    duplicate_registrations: int = 0
+    duplicate_cedulas: int = 0
+    
+    def summary(self) -> str:
+        """Resumen en una línea."""
+        return (f"Filas: {self.rows} • Registros: {self.entries} • Vacías: {self.empty_rows} • "
+                f"Registros repetidos: {self.duplicate_registrations} • "
+                f"Cédulas repetidas: {self.duplicate_cedulas}")
+
+
+class RosterReader:
+    """Lee la nómina fila por fila con un mapeo de columnas configurable."""
+    
+    def __init__(self, columns: Optional[RosterColumns] = None, csv_encoding: str = "utf-8-sig"):
+        """
+        Args:
+            columns: Columnas de registro, nombre y cédula (por defecto se detectan)
+            csv_encoding: Codificación de los archivos CSV
+        """
+        self.columns = columns or RosterColumns()
+        self.csv_encoding = csv_encoding
+        self.stats = RosterStats()
+    
+    @classmethod
+    def from_settings(cls, settings: AppSettings) -> "RosterReader":
+        """Crea el lector con las columnas configuradas."""
+        return cls(RosterColumns.from_settings(settings))
+    
+    def iter_entries(self, roster_filename: str) -> Iterator[RosterEntry]:
+        """
+        Recorre las filas de la nómina sin cargar el archivo completo.
+        
+        Al terminar, `stats` tiene el conteo de filas, vacías y repetidas.
+        
+        Args:
+            roster_filename: Ruta del .xlsx o .csv con la nómina
+        
+        Yields:
+            Una entrada por fila con datos (la fila 1 es el encabezado)
+        
+        Raises:
+            FileNotFoundError: Si el archivo no existe
+            PDFProcessingError: Si el archivo no se puede leer
+        """
+        if not os.path.exists(roster_filename):
+            raise FileNotFoundError(f"El archivo de nómina no existe: {roster_filename}")
+        
+        extension = os.path.splitext(roster_filename)[1].lower()
+        if extension in EXCEL_EXTENSIONS:
+            rows = self._excel_rows(roster_filename)
+        elif extension in CSV_EXTENSIONS:
+            rows = self._csv_rows(roster_filename)
+        else:
+            raise PDFProcessingError(f"Formato de nómina no admitido: {extension or roster_filename} "
+                                     f"(use {', '.join(EXCEL_EXTENSIONS + CSV_EXTENSIONS)})")
+        
+        self.stats = RosterStats()
+        try:
+            yield from self._entries(rows)
+        except (PDFProcessingError, FileNotFoundError):
+            raise
+        except Exception as e:
+            raise PDFProcessingError(f"Error al leer la nómina {roster_filename}: {str(e)}")
+        finally:
+            rows.close()
+        
+        logger.info("Nómina leída desde %s. %s", roster_filename, self.stats.summary())
+    
+    def read(self, roster_filename: str) -> List[RosterEntry]:
+        """Lee todas las entradas de la nómina (ver `iter_entries`)."""
+        return list(self.iter_entries(roster_filename))
+    
+    def _entries(self, rows: Iterator[Sequence]) -> Iterator[RosterEntry]:
+        """Normaliza las filas y detecta registros y cédulas repetidos."""
+        header = next(rows, None)
+        if not header:
+            return
+        columns = self.columns.locate(header)
+        if not columns:
+            logger.warning("La nómina no tiene columnas de registro, nombre ni cédula reconocibles")
+        
+        seen_registrations: Set[str] = set()
+        seen_cedulas: Set[str] = set()
+        for row_number, row in enumerate(rows, start=2):
+            self.stats.rows += 1
+            entry = self._build_entry(row_number, row, columns)
+            if entry is None:
+                self.stats.empty_rows += 1
+                continue
+            
+            if entry.registration_number:
+                if entry.registration_number in seen_registrations:
+                    self.stats.duplicate_registrations += 1
+                    self._warn_duplicate("Registro", entry.registration_number, row_number)
+                seen_registrations.add(entry.registration_number)
+            if entry.cedula:
+                if entry.cedula in seen_cedulas:
+                    self.stats.duplicate_cedulas += 1
+                    self._warn_duplicate("Cédula", entry.cedula, row_number)
+                seen_cedulas.add(entry.cedula)
+            
+            self.stats.entries += 1
+            yield entry
+    
+    @staticmethod
+    def _build_entry(row_number: int, row: Sequence, columns: Dict[str, int]) -> Optional[RosterEntry]:
+        """Construye una entrada de la nómina o None si la fila está vacía."""
+        def cell(key: str):
+            index = columns.get(key)
+            return row[index] if index is not None and index < len(row) else None
+        
+        registration_number = normalize_identifier(cell("registration"))
+        name = normalize_text(cell("name"))
+        cedula = normalize_identifier(cell("cedula"))
+        
+        if not (registration_number or name or cedula):
+            return None
+        return RosterEntry(row_number, registration_number, name, cedula)
+    
+    def _warn_duplicate(self, label: str, value: str, row_number: int) -> None:
+        """Registra las primeras repeticiones; el resto queda en el resumen."""
+        duplicates = self.stats.duplicate_registrations + self.stats.duplicate_cedulas
+        if duplicates <= MAX_DUPLICATE_WARNINGS:
+            logger.warning("%s repetido en la nómina: %s (fila %d)", label, value, row_number)
+        if duplicates == MAX_DUPLICATE_WARNINGS:
+            logger.warning("Demasiadas repeticiones en la nómina; el resto se resume al terminar")
+    
+    @staticmethod
+    def _excel_rows(roster_filename: str) -> Iterator[Sequence]:
+        """Filas de la hoja activa en modo de solo lectura (valores calculados)."""
+        try:
+            import openpyxl
+        except ImportError:
+            raise PDFProcessingError("Se requiere openpyxl para leer la nómina: pip install openpyxl")
+        
+        try:
+            workbook = openpyxl.load_workbook(roster_filename, read_only=True, data_only=True)
+        except Exception as e:
+            raise PDFProcessingError(f"Error al leer la nómina {roster_filename}: {str(e)}")
+        try:
+            yield from workbook.active.iter_rows(values_only=True)
+        finally:
+            workbook.close()
+    
+    def _csv_rows(self, roster_filename: str) -> Iterator[Sequence]:
+        """Filas del CSV, detectando el delimitador en el comienzo del archivo."""
+        try:
+            csv_file = open(roster_filename, "r", encoding=self.csv_encoding, newline="")
+        except OSError as e:
+            raise PDFProcessingError(f"Error al leer la nómina {roster_filename}: {str(e)}")
+        with csv_file:
+            sample = csv_file.read(_CSV_SNIFF_BYTES)
+            csv_file.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=CSV_DELIMITERS)
+            except csv.Error:
+                dialect = csv.excel
+            yield from csv.reader(csv_file, dialect)
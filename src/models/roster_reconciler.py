@@ -0,0 +1,148 @@
+"""
+Conciliación de las páginas generadas contra la nómina de la hoja de cálculo.
+Verifica que cada fila de la nómina haya producido exactamente un PDF.
+"""
+
+import json
+import os
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Iterable, List, Optional
+from .pdf_processor import PageResult
+from .roster_reader import RosterEntry, RosterReader, normalize_identifier, normalize_name
+from src.utils import get_logger
+
+logger = get_logger("roster_reconciler")
+
+
+@dataclass
+class ReconciliationReport:
+    """Resultado de conciliar las páginas generadas contra la nómina."""
+    total_roster: int = 0
+    total_pages: int = 0
+    matched: int = 0
+    missing: List[RosterEntry] = field(default_factory=list)
+    duplicated: List[Dict] = field(default_factory=list)
+    mismatched_name: List[Dict] = field(default_factory=list)
+    unparsed: List[PageResult] = field(default_factory=list)
+    unknown: List[PageResult] = field(default_factory=list)
+    
+    def is_clean(self) -> bool:
+        """Indica si la conciliación no encontró ninguna diferencia."""
+        return not (self.missing or self.duplicated or self.mismatched_name
+                    or self.unparsed or self.unknown)
+    
+    def summary(self) -> str:
+        """Devuelve un resumen legible de la conciliación."""
+        return (
+            f"Nómina: {self.total_roster} filas • Páginas: {self.total_pages} • "
+            f"Conciliadas: {self.matched} • Faltantes: {len(self.missing)} • "
+            f"Duplicadas: {len(self.duplicated)} • Nombre distinto: {len(self.mismatched_name)} • "
+            f"Sin datos: {len(self.unparsed)} • No están en la nómina: {len(self.unknown)}"
+        )
+    
+    def to_dict(self) -> Dict:
+        """Convierte el reporte en un diccionario serializable (sin el texto de las páginas)."""
+        return asdict(self, dict_factory=lambda items: {k: v for k, v in items if k != "text"})
+
+
+class RosterReconciler:
+    """Concilia páginas extraídas contra una nómina indexada en memoria."""
+    
+    def __init__(self, entries: Iterable[RosterEntry]):
+        self.entries: List[RosterEntry] = []
+        self._by_registration: Dict[str, RosterEntry] = {}
+        self._by_cedula: Dict[str, RosterEntry] = {}
+        
+        for entry in entries:
+            self.entries.append(entry)
+            # Las repeticiones se avisan al leer la nómina; gana la primera fila
+            if entry.registration_number:
+                self._by_registration.setdefault(entry.registration_number, entry)
+            if entry.cedula:
+                self._by_cedula.setdefault(entry.cedula, entry)
+    
+    @classmethod
+    def from_file(cls, roster_filename: str, reader: Optional[RosterReader] = None) -> "RosterReconciler":
+        """
+        Crea un conciliador a partir de la nómina (.xlsx o .csv), leída fila por fila.
+        
+        Args:
+            roster_filename: Ruta del archivo con la nómina
+            reader: Lector con el mapeo de columnas (por defecto se detectan)
+        
+        Returns:
+            Conciliador con la nómina indexada
+        
+        Raises:
+            FileNotFoundError: Si el archivo no existe
+            PDFProcessingError: Si la nómina no se puede leer
+        """
+        return cls((reader or RosterReader()).iter_entries(roster_filename))
+    
+    @classmethod
+    def from_excel(cls, roster_filename: str) -> "RosterReconciler":
+        """Compatibilidad: equivale a `from_file` con las columnas detectadas."""
+        return cls.from_file(roster_filename)
+    
+    def reconcile(self, pages: Iterable[PageResult]) -> ReconciliationReport:
+        """
+        Concilia las páginas generadas contra la nómina en una sola pasada.
+        
+        Args:
+            pages: Resultados de las páginas generadas
+        
+        Returns:
+            Reporte con las filas faltantes, duplicadas, con nombre distinto y sin datos
+        """
+        report = ReconciliationReport(total_roster=len(self.entries))
+        pages_by_entry: Dict[int, List[PageResult]] = {}
+        
+        for page in pages:
+            report.total_pages += 1
+            registration_number = normalize_identifier(page.registration_number)
+            cedula = normalize_identifier(page.cedula)
+            
+            if not registration_number and not cedula:
+                report.unparsed.append(page)
+                continue
+            
+            entry = self._by_registration.get(registration_number) if registration_number else None
+            if entry is None and cedula:
+                entry = self._by_cedula.get(cedula)
+            if entry is None:
+                report.unknown.append(page)
+                continue
+            
+            pages_by_entry.setdefault(entry.row_number, []).append(page)
+            if normalize_name(page.name) != normalize_name(entry.name):
+                report.mismatched_name.append({"roster": entry, "page": page})
+        
+        for entry in self.entries:
+            matched_pages = pages_by_entry.get(entry.row_number)
+            if not matched_pages:
+                report.missing.append(entry)
+            elif len(matched_pages) > 1:
+                report.duplicated.append({"roster": entry, "pages": matched_pages})
+            else:
+                report.matched += 1
+        
+        logger.info("Conciliación terminada. %s", report.summary())
+        return report
+    
+    def write_report(self, report: ReconciliationReport, report_filename: str) -> str:
+        """
+        Guarda el reporte de conciliación en formato JSON.
+        
+        Args:
+            report: Reporte a guardar
+            report_filename: Ruta del archivo de salida
+        
+        Returns:
+            Ruta absoluta del reporte guardado
+        """
+        report_filename = os.path.abspath(report_filename)
+        os.makedirs(os.path.dirname(report_filename), exist_ok=True)
+        with open(report_filename, "w", encoding="utf-8") as report_file:
+            json.dump(report.to_dict(), report_file, ensure_ascii=False, indent=2)
+        logger.info("Reporte de conciliación guardado en: %s", report_filename)
+        return report_filename
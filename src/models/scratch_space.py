@@ -0,0 +1,136 @@
+"""
+Área de trabajo local para los archivos intermedios de cada trabajo.
+El PDF combinado y las páginas temporales se escriben aquí (en memoria, con
+tmpfs, cuando está disponible) y no junto al origen ni en el destino, que
+pueden estar en una unidad de red. Solo las salidas finales llegan al destino.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Set
+from .exceptions import DocumentConversionError
+from src.utils import get_logger
+
+logger = get_logger("scratch_space")
+
+# Sistemas de archivos en memoria que se prefieren cuando no se configura una carpeta
+TMPFS_CANDIDATES = ("/dev/shm",)
+
+SCRATCH_PREFIX = "doctopdf-job-"
+
+# Espacio previsto para los intermedios: el PDF combinado más una página en
+# curso ocupan, como mucho, unas dos veces el documento de origen
+SCRATCH_SIZE_FACTOR = 2
+MIN_SCRATCH_BYTES = 16 * 1024 * 1024
+
+# Margen que se deja libre para no agotar la memoria o el disco del equipo
+SCRATCH_RESERVE_BYTES = 64 * 1024 * 1024
+
+# Antigüedad mínima (segundos) para considerar abandonada el área de un trabajo
+STALE_SCRATCH_SECONDS = 6 * 3600
+
+
+class ScratchSpace:
+    """Reparte carpetas de trabajo aisladas por trabajo y garantiza su limpieza."""
+    
+    def __init__(self, base_dir: Optional[str] = None):
+        """
+        Args:
+            base_dir: Carpeta configurada para los intermedios; por defecto tmpfs
+                si está disponible y, si no, la carpeta temporal del sistema
+        """
+        self.base_dir = os.path.abspath(base_dir) if base_dir else None
+        self._cleaned: Set[str] = set()
+    
+    def candidates(self) -> List[str]:
+        """Carpetas donde pueden crearse las áreas de trabajo, en orden de preferencia."""
+        if self.base_dir:
+            return [self.base_dir]
+        candidates = [path for path in TMPFS_CANDIDATES if _is_writable_dir(path)]
+        candidates.append(tempfile.gettempdir())
+        return candidates
+    
+    @staticmethod
+    def estimate_bytes(source_file: str) -> int:
+        """Espacio previsto para los intermedios de un documento."""
+        try:
+            size = os.path.getsize(source_file)
+        except OSError:
+            size = 0
+        return max(MIN_SCRATCH_BYTES, size * SCRATCH_SIZE_FACTOR)
+    
+    @contextmanager
+    def job_area(self, job_id: str, required_bytes: int = MIN_SCRATCH_BYTES) -> Iterator[str]:
+        """
+        Crea una carpeta exclusiva del trabajo y la elimina al salir, incluso si falla.
+        
+        Se usa la primera carpeta candidata con espacio suficiente; si tmpfs no
+        alcanza, se recurre a la carpeta temporal en disco.
+        
+        Args:
+            job_id: Identificador del trabajo (forma parte del nombre de la carpeta)
+            required_bytes: Espacio previsto para los intermedios
+        
+        Yields:
+            Ruta de la carpeta de trabajo
+        
+        Raises:
+            DocumentConversionError: Si ninguna carpeta tiene espacio suficiente
+        """
+        base_dir = self._choose_base(required_bytes)
+        self._remove_stale_areas(base_dir)
+        area = tempfile.mkdtemp(prefix=f"{SCRATCH_PREFIX}{job_id}-", dir=base_dir)
+        logger.debug("Área de trabajo creada: %s", area)
+        try:
+            yield area
+        finally:
+            shutil.rmtree(area, ignore_errors=True)
+            logger.debug("Área de trabajo eliminada: %s", area)
+    
+    def _choose_base(self, required_bytes: int) -> str:
+        """Elige la primera carpeta candidata con espacio libre suficiente."""
+        shortages = []
+        for base_dir in self.candidates():
+            try:
+                os.makedirs(base_dir, exist_ok=True)
+                free = shutil.disk_usage(base_dir).free
+            except OSError as e:
+                shortages.append(f"{base_dir} ({str(e)})")
+                continue
+            if free - SCRATCH_RESERVE_BYTES >= required_bytes:
+                if shortages:
+                    logger.warning("Sin espacio para intermedios en %s; se usa %s",
+                                   ", ".join(shortages), base_dir)
+                return base_dir
+            shortages.append(f"{base_dir} ({free / (1024 * 1024):.0f} MB libres)")
+        
+        raise DocumentConversionError(
+            f"No hay espacio para los archivos intermedios ({required_bytes / (1024 * 1024):.0f} MB "
+            f"necesarios): {', '.join(shortages)}"
+        )
+    
+    def _remove_stale_areas(self, base_dir: str) -> None:
+        """Elimina, una vez por carpeta, las áreas de trabajos interrumpidos."""
+        if base_dir in self._cleaned:
+            return
+        self._cleaned.add(base_dir)
+        
+        now = time.time()
+        for entry in os.listdir(base_dir):
+            if not entry.startswith(SCRATCH_PREFIX):
+                continue
+            path = os.path.join(base_dir, entry)
+            try:
+                if now - os.path.getmtime(path) > STALE_SCRATCH_SECONDS:
+                    shutil.rmtree(path, ignore_errors=True)
+                    logger.warning("Área de trabajo abandonada eliminada: %s", path)
+            except OSError as e:
+                logger.warning("No se pudo revisar el área de trabajo %s: %s", path, e)
+
+
+def _is_writable_dir(path: str) -> bool:
+    """Indica si la carpeta existe y admite escritura."""
+    return os.path.isdir(path) and os.access(path, os.W_OK | os.X_OK)
@@ -0,0 +1,145 @@
+"""
+API en memoria para servicios que reciben documentos como bytes o flujos.
+Acepta el contenido de un DOCX o un PDF (bytes u objeto de archivo binario)
+y entrega cada página como (datos del registro, bytes del PDF) desde un
+generador. Solo la conversión de Word toca el disco, porque los motores
+necesitan un archivo; se hace en el área de trabajo local y se borra al terminar.
+"""
+
+import os
+import uuid
+from typing import BinaryIO, Callable, Iterator, Optional, Tuple, Union
+from .document_processing_model import DocumentProcessingModel
+from .output_profile import OutputProfile
+from .pdf_processor import PageResult
+from .resource_governor import TASK_CONVERSION
+from .scratch_space import MIN_SCRATCH_BYTES, SCRATCH_SIZE_FACTOR
+from .exceptions import DocumentConversionError
+from src.utils import get_logger
+
+logger = get_logger("stream_processing")
+
+# Contenido de un documento: bytes u objeto de archivo binario abierto
+DocumentSource = Union[bytes, BinaryIO]
+
+KIND_PDF = "pdf"
+KIND_DOCX = "docx"
+
+_PDF_MAGIC = b"%PDF-"
+_ZIP_MAGIC = b"PK\x03\x04"
+
+
+def detect_kind(data: bytes) -> str:
+    """
+    Identifica el tipo de documento por su firma.
+    
+    Raises:
+        DocumentConversionError: Si no es un PDF ni un DOCX
+    """
+    # Algunos generadores escriben basura antes de la cabecera %PDF-
+    if _PDF_MAGIC in data[:1024]:
+        return KIND_PDF
+    if data.startswith(_ZIP_MAGIC):
+        return KIND_DOCX
+    raise DocumentConversionError("El contenido no es un PDF ni un documento Word (.docx)")
+
+
+class StreamProcessor:
+    """Convierte y divide documentos recibidos en memoria."""
+    
+    def __init__(self, model: Optional[DocumentProcessingModel] = None):
+        """
+        Args:
+            model: Modelo con la configuración, el conversor y el procesador de PDF
+        """
+        self.model = model or DocumentProcessingModel()
+    
+    def convert(self, source: DocumentSource, preflight: bool = True) -> bytes:
+        """
+        Convierte un documento Word recibido en memoria a PDF.
+        
+        El documento se escribe en un área de trabajo local (tmpfs si está
+        disponible) solo mientras dura la conversión.
+        
+        Args:
+            source: Contenido del .docx o archivo binario abierto
+            preflight: Revisar el documento antes de convertirlo
+        
+        Returns:
+            Contenido del PDF generado
+        
+        Raises:
+            DocumentConversionError: Si la conversión falla
+        """
+        data = _read(source)
+        job_id = f"stream-{uuid.uuid4().hex[:8]}"
+        scratch_space = self.model.scratch_space
+        required_bytes = max(MIN_SCRATCH_BYTES, len(data) * SCRATCH_SIZE_FACTOR)
+        
+        with scratch_space.job_area(job_id, required_bytes) as work_folder:
+            docx_filename = os.path.join(work_folder, "documento.docx")
+            pdf_filename = os.path.join(work_folder, "documento.pdf")
+            with open(docx_filename, 'wb') as docx_file:
+                docx_file.write(data)
+            
+            with self.model.resource_governor.slot(TASK_CONVERSION, job_id):
+                self.model.document_converter.convert_word_to_pdf(docx_filename, pdf_filename, preflight)
+            with open(pdf_filename, 'rb') as pdf_file:
+                return pdf_file.read()
+    
+    def split(self, source: DocumentSource, output_profile: Optional[OutputProfile] = None,
+              on_progress: Optional[Callable[[int, int], None]] = None) -> Iterator[Tuple[PageResult, bytes]]:
+        """
+        Divide un PDF recibido en memoria sin escribir archivos.
+        
+        Args:
+            source: Contenido del PDF combinado o archivo binario abierto
+            output_profile: Perfil de salida (por defecto el del modelo)
+            on_progress: Callback opcional invocado con (páginas procesadas, total de páginas)
+        
+        Yields:
+            Tuplas (datos del registro de la página, contenido del PDF de la página)
+        
+        Raises:
+            PDFProcessingError: Si hay un error leyendo el PDF
+        """
+        return self.model.pdf_processor.iter_pages(_read(source), output_profile or self.model.output_profile,
+                                                   on_progress)
+    
+    def process(self, source: DocumentSource, output_profile: Optional[OutputProfile] = None,
+                on_progress: Optional[Callable[[int, int], None]] = None,
+                preflight: bool = True) -> Iterator[Tuple[PageResult, bytes]]:
+        """
+        Procesa un DOCX o un PDF recibido en memoria: lo convierte si hace falta y lo divide.
+        
+        La conversión ocurre al pedir la primera página.
+        
+        Args:
+            source: Contenido del documento o archivo binario abierto
+            output_profile: Perfil de salida (por defecto el del modelo)
+            on_progress: Callback opcional invocado con (páginas procesadas, total de páginas)
+            preflight: Revisar el documento Word antes de convertirlo
+        
+        Yields:
+            Tuplas (datos del registro de la página, contenido del PDF de la página)
+        
+        Raises:
+            DocumentConversionError: Si el contenido no es válido o la conversión falla
+            PDFProcessingError: Si hay un error dividiendo el PDF
+        """
+        data = _read(source)
+        if detect_kind(data) == KIND_DOCX:
+            data = self.convert(data, preflight)
+        
+        pages = 0
+        for page in self.split(data, output_profile, on_progress):
+            pages += 1
+            yield page
+        logger.info("Documento en memoria procesado: %d páginas", pages)
+
+
+def _read(source: DocumentSource) -> bytes:
+    """Obtiene el contenido de bytes o de un archivo binario abierto."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    return source.read()
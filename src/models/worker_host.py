@@ -0,0 +1,414 @@
+"""
+Proceso de trabajo aislado para la conversión y la división.
+La interfaz gráfica delega los trabajos en un proceso hijo y se comunica con
+él por una tubería con mensajes breves (inicio, progreso, páginas, resultado,
+cancelación). Así el trabajo de PyPDF2 y PyMuPDF, que retiene el GIL, nunca
+compite con el bucle de eventos de Qt. Si el proceso hijo termina de forma
+inesperada, los trabajos en curso fallan, el proceso se reinicia y los
+trabajos en cola se reenvían.
+"""
+
+import multiprocessing
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, List, Optional, Set
+from .conversion_job import ConversionJob
+from .pdf_processor import PageResult
+from .exceptions import DocumentConversionError, PDFProcessingError, FileNotFoundError
+from src.utils import AppSettings, get_logger
+
+logger = get_logger("worker_host")
+
+# Espera (segundos) antes de reiniciar el proceso tras un fallo; se duplica si
+# vuelve a fallar pronto, hasta el máximo
+DEFAULT_RESTART_DELAY = 1.0
+MAX_RESTART_DELAY = 30.0
+
+# Un proceso que funcionó al menos este tiempo se considera estable al fallar
+STABLE_RUN_SECONDS = 60.0
+
+# Espera máxima (segundos) a que el proceso termine tras pedirle que se detenga
+SHUTDOWN_GRACE_SECONDS = 10.0
+
+# Mensajes de la interfaz al proceso de trabajo
+MSG_SUBMIT = "submit"
+MSG_CANCEL = "cancel"
+MSG_SLOTS = "slots"
+MSG_SHUTDOWN = "shutdown"
+
+# Eventos del proceso de trabajo a la interfaz
+EVENT_STARTED = "started"
+EVENT_PROGRESS = "progress"
+EVENT_PAGE = "page"
+EVENT_SUCCEEDED = "succeeded"
+EVENT_FAILED = "failed"
+EVENT_CANCELLED = "cancelled"
+
+# Opciones del modelo que se replican en el proceso de trabajo
+MODEL_OPTIONS = ("index_path", "retain_artifacts", "strict_planning")
+
+CANCELLED_MESSAGE = "Trabajo cancelado"
+
+
+class _JobCancelled(PDFProcessingError):
+    """Detiene un trabajo cancelado en su siguiente punto seguro."""
+    pass
+
+
+@dataclass
+class _HostedJob:
+    """Trabajo enviado al proceso de trabajo junto con sus callbacks."""
+    job: ConversionJob
+    on_start: Optional[Callable[[], None]]
+    on_page: Optional[Callable[[PageResult], None]]
+    on_progress: Optional[Callable[[int, int], None]]
+    on_success: Optional[Callable[[List[PageResult]], None]]
+    on_failure: Optional[Callable[[str], None]]
+    started: bool = False
+
+
+class WorkerHost:
+    """Ejecuta los trabajos en un proceso hijo y lo reinicia si se cae."""
+    
+    def __init__(self, settings: Optional[AppSettings] = None, model_options: Optional[Dict[str, Any]] = None,
+                 slots: Optional[int] = None, log_queue: Any = None,
+                 restart_delay: float = DEFAULT_RESTART_DELAY):
+        """
+        Args:
+            settings: Configuración con la que se crea el modelo del proceso hijo
+            model_options: Atributos del modelo a replicar (ver MODEL_OPTIONS)
+            slots: Trabajos simultáneos (por defecto max_concurrent_jobs)
+            log_queue: Cola de logging del proceso principal (por defecto `get_process_log_queue`)
+            restart_delay: Espera inicial antes de reiniciar el proceso tras un fallo
+        """
+        self.settings = settings or AppSettings()
+        self.model_options = dict(model_options or {})
+        self.slots = max(1, slots or self.settings.max_concurrent_jobs)
+        self.log_queue = log_queue
+        self.restart_delay = restart_delay
+        self.restarts = 0
+        
+        self._context = multiprocessing.get_context("spawn")
+        self._lock = threading.RLock()
+        self._jobs: Dict[str, _HostedJob] = {}
+        self._process = None
+        self._connection = None
+        self._reader: Optional[threading.Thread] = None
+        self._started_at = 0.0
+        self._next_delay = restart_delay
+        self._stopping = False
+    
+    @classmethod
+    def for_model(cls, model, slots: Optional[int] = None) -> "WorkerHost":
+        """Crea un anfitrión con la configuración y las opciones de un modelo existente."""
+        options = {name: getattr(model, name) for name in MODEL_OPTIONS}
+        return cls(model.settings, options, slots)
+    
+    @property
+    def pid(self) -> Optional[int]:
+        """PID del proceso de trabajo actual (None si no está en marcha)."""
+        process = self._process
+        return process.pid if process is not None and process.is_alive() else None
+    
+    def submit(self, job: ConversionJob,
+               on_start: Optional[Callable[[], None]] = None,
+               on_page: Optional[Callable[[PageResult], None]] = None,
+               on_progress: Optional[Callable[[int, int], None]] = None,
+               on_success: Optional[Callable[[List[PageResult]], None]] = None,
+               on_failure: Optional[Callable[[str], None]] = None) -> None:
+        """
+        Envía un trabajo al proceso de trabajo (lo inicia si hace falta).
+        
+        Los callbacks se invocan desde un hilo lector de este proceso, nunca
+        desde el hilo de la interfaz.
+        """
+        with self._lock:
+            if self._stopping:
+                raise DocumentConversionError("El proceso de trabajo se está deteniendo")
+            self._jobs[job.job_id] = _HostedJob(job, on_start, on_page, on_progress, on_success, on_failure)
+            if not self._ensure_running():
+                self._send(MSG_SUBMIT, job)
+    
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancela un trabajo en cola o en curso.
+        
+        Un trabajo en cola no llega a empezar; uno en curso se detiene entre
+        páginas sin publicar salidas (la conversión con Word o LibreOffice no
+        se interrumpe a medias).
+        
+        Returns:
+            False si el trabajo no está pendiente
+        """
+        with self._lock:
+            hosted = self._jobs.get(job_id)
+            if hosted is None:
+                return False
+            if self._connection is not None:
+                self._send(MSG_CANCEL, job_id)
+                return True
+            # El proceso se está reiniciando: el trabajo en cola se descarta aquí
+            del self._jobs[job_id]
+        if hosted.on_failure:
+            hosted.on_failure(CANCELLED_MESSAGE)
+        return True
+    
+    def set_slots(self, slots: int) -> None:
+        """Cambia el número de trabajos simultáneos del proceso de trabajo."""
+        with self._lock:
+            self.slots = max(1, slots)
+            if self._process is not None:
+                self._send(MSG_SLOTS, self.slots)
+    
+    def pending_count(self) -> int:
+        """Trabajos enviados que aún no terminaron."""
+        with self._lock:
+            return len(self._jobs)
+    
+    def shutdown(self, timeout: float = SHUTDOWN_GRACE_SECONDS) -> None:
+        """
+        Descarta los trabajos en cola, espera a los que están en curso y detiene el proceso.
+        
+        Args:
+            timeout: Espera máxima tras la que el proceso se termina a la fuerza
+                (None espera indefinidamente)
+        """
+        with self._lock:
+            self._stopping = True
+            process, reader = self._process, self._reader
+            if process is None:
+                return
+            self._send(MSG_SHUTDOWN)
+        
+        process.join(timeout)
+        if process.is_alive():
+            logger.warning("El proceso de trabajo no terminó a tiempo; se detiene a la fuerza")
+            process.terminate()
+            process.join()
+        if reader is not None:
+            reader.join(SHUTDOWN_GRACE_SECONDS)
+        with self._lock:
+            self._process = None
+            self._connection = None
+    
+    def _ensure_running(self) -> bool:
+        """
+        Inicia el proceso de trabajo si no está en marcha y le envía los trabajos pendientes (con el candado tomado).
+        
+        Returns:
+            True si se inició un proceso nuevo
+        """
+        if self._process is not None:
+            return False
+        
+        if self.log_queue is None:
+            from src.utils import get_process_log_queue
+            self.log_queue = get_process_log_queue()
+        
+        parent_connection, child_connection = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_connection, self.settings, self.model_options, self.slots, self.log_queue),
+            name="doctopdf-trabajo",
+            daemon=True
+        )
+        process.start()
+        child_connection.close()
+        
+        self._process = process
+        self._connection = parent_connection
+        self._started_at = time.monotonic()
+        self._reader = threading.Thread(target=self._read_events, args=(process, parent_connection),
+                                        name="worker-host-reader", daemon=True)
+        self._reader.start()
+        logger.info("Proceso de trabajo iniciado (PID %d)", process.pid)
+        
+        for hosted in self._jobs.values():
+            self._send(MSG_SUBMIT, hosted.job)
+        return True
+    
+    def _send(self, *message) -> None:
+        """Envía un mensaje al proceso de trabajo (con el candado tomado)."""
+        try:
+            self._connection.send(message)
+        except (OSError, EOFError, ValueError) as e:
+            # El hilo lector detecta la caída y reenvía los trabajos en cola
+            logger.warning("No se pudo enviar %s al proceso de trabajo: %s", message[0], e)
+    
+    def _read_events(self, process, connection) -> None:
+        """Recibe los eventos del proceso de trabajo hasta que termina."""
+        while True:
+            try:
+                event = connection.recv()
+            except (EOFError, OSError):
+                break
+            self._dispatch(event)
+        
+        process.join()
+        with self._lock:
+            if self._stopping or process is not self._process:
+                return
+            delay = self._handle_crash(process)
+        if delay is None:
+            return
+        
+        time.sleep(delay)
+        with self._lock:
+            # Un envío durante la espera pudo haber iniciado ya otro proceso
+            if not self._stopping and self._process is None and self._jobs:
+                self.restarts += 1
+                self._ensure_running()
+    
+    def _dispatch(self, event: tuple) -> None:
+        """Entrega un evento a los callbacks de su trabajo."""
+        kind, job_id, *payload = event
+        with self._lock:
+            hosted = self._jobs.get(job_id)
+            if hosted is not None and kind in (EVENT_SUCCEEDED, EVENT_FAILED, EVENT_CANCELLED):
+                del self._jobs[job_id]
+            if hosted is not None and kind == EVENT_STARTED:
+                hosted.started = True
+        if hosted is None:
+            return
+        
+        try:
+            if kind == EVENT_STARTED and hosted.on_start:
+                hosted.on_start()
+            elif kind == EVENT_PROGRESS and hosted.on_progress:
+                hosted.on_progress(*payload)
+            elif kind == EVENT_PAGE and hosted.on_page:
+                hosted.on_page(*payload)
+            elif kind == EVENT_SUCCEEDED and hosted.on_success:
+                hosted.on_success(*payload)
+            elif kind == EVENT_FAILED and hosted.on_failure:
+                hosted.on_failure(*payload)
+            elif kind == EVENT_CANCELLED and hosted.on_failure:
+                hosted.on_failure(CANCELLED_MESSAGE)
+        except Exception as e:
+            logger.error("Error en el callback %s del trabajo %s: %s", kind, job_id, e)
+    
+    def _handle_crash(self, process) -> Optional[float]:
+        """
+        Falla los trabajos que estaban en curso al caer el proceso (con el candado tomado).
+        
+        Returns:
+            Espera antes de reiniciar el proceso, o None si no quedan trabajos en cola
+        """
+        exit_code = process.exitcode
+        lost = [hosted for hosted in self._jobs.values() if hosted.started]
+        for hosted in lost:
+            del self._jobs[hosted.job.job_id]
+        self._process = None
+        self._connection = None
+        
+        logger.error("El proceso de trabajo terminó inesperadamente (código %s); %d trabajos en curso fallaron",
+                     exit_code, len(lost))
+        message = f"El proceso de trabajo terminó inesperadamente (código {exit_code})"
+        for hosted in lost:
+            if hosted.on_failure:
+                try:
+                    hosted.on_failure(message)
+                except Exception as e:
+                    logger.error("Error en el callback de fallo del trabajo %s: %s", hosted.job.job_id, e)
+        
+        # Un proceso que vuelve a caer enseguida espera cada vez más antes de reiniciarse
+        if time.monotonic() - self._started_at >= STABLE_RUN_SECONDS:
+            self._next_delay = self.restart_delay
+        delay = self._next_delay
+        self._next_delay = min(MAX_RESTART_DELAY, self._next_delay * 2)
+        if not self._jobs:
+            return None
+        
+        logger.info("Reiniciando el proceso de trabajo en %.1f s (%d trabajos en cola)", delay, len(self._jobs))
+        return delay
+
+
+def _worker_main(connection, settings: AppSettings, model_options: Dict[str, Any], slots: int,
+                 log_queue: Any) -> None:
+    """Punto de entrada del proceso de trabajo."""
+    if log_queue is not None:
+        from src.utils import configure_worker_logging
+        configure_worker_logging(log_queue, settings.log_level, settings.page_log_every)
+    
+    # Importación diferida: el modelo completo solo se carga en el proceso hijo
+    from .document_processing_model import DocumentProcessingModel
+    model = DocumentProcessingModel(settings)
+    for name, value in model_options.items():
+        setattr(model, name, value)
+    model.job_scheduler.set_slots(slots)
+    
+    send_lock = threading.Lock()
+    cancelled: Set[str] = set()
+    started: Set[str] = set()
+    threads: Dict[str, threading.Thread] = {}
+    
+    def send(*event) -> None:
+        with send_lock:
+            try:
+                connection.send(event)
+            except (OSError, EOFError):
+                # El proceso principal ya no escucha; el trabajo termina igual
+                pass
+    
+    def run(job: ConversionJob) -> None:
+        job_id = job.job_id
+        
+        def check_cancelled() -> None:
+            if job_id in cancelled:
+                raise _JobCancelled(f"{CANCELLED_MESSAGE}: {job.display_name}")
+        
+        def on_start() -> None:
+            check_cancelled()
+            started.add(job_id)
+            send(EVENT_STARTED, job_id)
+        
+        def on_progress(done: int, total: int) -> None:
+            check_cancelled()
+            send(EVENT_PROGRESS, job_id, done, total)
+        
+        def on_page(result: PageResult) -> None:
+            # El texto de la página no se envía: la interfaz no lo usa y agranda los mensajes
+            send(EVENT_PAGE, job_id, replace(result, text=""))
+        
+        try:
+            results = model.run_job(job, on_page, on_progress, on_start)
+            send(EVENT_SUCCEEDED, job_id, [replace(result, text="") for result in results])
+        except _JobCancelled:
+            logger.info("Trabajo %s cancelado", job.display_name, extra={"job_id": job_id})
+            send(EVENT_CANCELLED, job_id)
+        except (DocumentConversionError, PDFProcessingError, FileNotFoundError) as e:
+            send(EVENT_FAILED, job_id, str(e))
+        except Exception as e:
+            send(EVENT_FAILED, job_id, f"Error inesperado durante la conversión: {str(e)}")
+        finally:
+            started.discard(job_id)
+            cancelled.discard(job_id)
+    
+    while True:
+        try:
+            message = connection.recv()
+        except (EOFError, OSError):
+            # El proceso principal terminó: no hay a quién entregar los resultados
+            message = (MSG_SHUTDOWN,)
+        
+        kind = message[0]
+        if kind == MSG_SUBMIT:
+            job = message[1]
+            for finished_id in [job_id for job_id, thread in threads.items() if not thread.is_alive()]:
+                del threads[finished_id]
+            thread = threading.Thread(target=run, args=(job,), name=f"trabajo-{job.job_id}", daemon=True)
+            threads[job.job_id] = thread
+            thread.start()
+        elif kind == MSG_CANCEL:
+            cancelled.add(message[1])
+        elif kind == MSG_SLOTS:
+            model.job_scheduler.set_slots(message[1])
+        elif kind == MSG_SHUTDOWN:
+            # Los trabajos que aún esperan turno se descartan; los que corren terminan
+            cancelled.update(job_id for job_id in threads if job_id not in started)
+            break
+    
+    for thread in threads.values():
+        thread.join()
+    connection.close()
@@ -0,0 +1,200 @@
+"""
+Cola de trabajos de conversión.
+Ejecuta varios trabajos inmutables a la vez y notifica el avance de cada uno
+mediante señales de Qt. Por defecto los trabajos corren en un proceso de
+trabajo aparte, de modo que la división de PDFs nunca frena la interfaz.
+"""
+
+import os
+from typing import Dict, List, Optional
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from ..models import (
+    ConversionJob, DocumentProcessingModel, DocumentConversionError, PDFProcessingError, FileNotFoundError
+)
+from ..models.conversion_job import JOB_STATUS_QUEUED, JOB_STATUS_RUNNING
+from ..models.job_scheduler import WAITING_THREADS
+from ..models.worker_host import WorkerHost
+from src.utils import get_logger
+
+logger = get_logger("job_queue")
+
+# Trabajos que se ejecutan a la vez por defecto
+DEFAULT_MAX_CONCURRENT_JOBS = 2
+
+
+class JobSignals(QObject):
+    """Señales emitidas desde los hilos del pool (se entregan en el hilo de la interfaz)."""
+    
+    started = pyqtSignal(object)
+    progress = pyqtSignal(object, int, int)
+    page_processed = pyqtSignal(object, object)
+    succeeded = pyqtSignal(object, object)
+    failed = pyqtSignal(object, str)
+
+
+class JobRunnable(QRunnable):
+    """Ejecuta un trabajo en un hilo del pool."""
+    
+    def __init__(self, model: DocumentProcessingModel, job: ConversionJob, signals: JobSignals):
+        super().__init__()
+        self.model = model
+        self.job = job
+        self.signals = signals
+    
+    def run(self) -> None:
+        job = self.job
+        try:
+            results = self.model.run_job(
+                job,
+                on_page=lambda result: self.signals.page_processed.emit(job, result),
+                on_progress=lambda done, total: self.signals.progress.emit(job, done, total),
+                on_start=lambda: self.signals.started.emit(job)
+            )
+            self.signals.succeeded.emit(job, results)
+        except (DocumentConversionError, PDFProcessingError, FileNotFoundError) as e:
+            self.signals.failed.emit(job, str(e))
+        except Exception as e:
+            self.signals.failed.emit(job, f"Error inesperado durante la conversión: {str(e)}")
+
+
+class JobQueue(QObject):
+    """
+    Cola de trabajos con un número máximo de trabajos simultáneos.
+    
+    El orden de ejecución lo decide el planificador del modelo (prioridad y
+    tamaño). Con `isolated` los trabajos se ejecutan en un proceso de trabajo
+    (ver WorkerHost) que se reinicia solo si falla; sin él, en un pool de
+    hilos de este proceso con hilos de sobra para que los trabajos en espera
+    puedan pedir turno y adelantarse a un lote largo.
+    """
+    
+    job_started = pyqtSignal(object)
+    job_progress = pyqtSignal(object, int, int)
+    job_page_processed = pyqtSignal(object, object)
+    job_succeeded = pyqtSignal(object, object)
+    job_failed = pyqtSignal(object, str)
+    idle = pyqtSignal()
+    
+    def __init__(self, model: DocumentProcessingModel,
+                 max_workers: int = DEFAULT_MAX_CONCURRENT_JOBS, parent=None, isolated: bool = True):
+        super().__init__(parent)
+        self.model = model
+        self._host: Optional[WorkerHost] = WorkerHost.for_model(model, max_workers) if isolated else None
+        self._pool = QThreadPool(self)
+        self.set_max_workers(max_workers)
+        self._jobs: Dict[str, ConversionJob] = {}
+        self._statuses: Dict[str, str] = {}
+        
+        self._signals = JobSignals()
+        self._signals.started.connect(self._on_started)
+        self._signals.progress.connect(self.job_progress)
+        self._signals.page_processed.connect(self.job_page_processed)
+        self._signals.succeeded.connect(self._on_succeeded)
+        self._signals.failed.connect(self._on_failed)
+    
+    @property
+    def max_workers(self) -> int:
+        """Número máximo de trabajos simultáneos."""
+        return self.model.job_scheduler.slots
+    
+    def set_max_workers(self, max_workers: int) -> None:
+        """Cambia el número máximo de trabajos simultáneos."""
+        self.model.job_scheduler.set_slots(max_workers)
+        if self._host is not None:
+            self._host.set_slots(max_workers)
+        else:
+            self._pool.setMaxThreadCount(self.model.job_scheduler.slots + WAITING_THREADS)
+    
+    def submit(self, job: ConversionJob) -> bool:
+        """
+        Encola un trabajo.
+        
+        Args:
+            job: Trabajo a ejecutar
+        
+        Returns:
+            False si ya hay un trabajo pendiente con la misma carpeta de salida
+        """
+        output_folder = os.path.normcase(job.output_folder)
+        if any(os.path.normcase(active.output_folder) == output_folder for active in self._jobs.values()):
+            logger.warning("Ya hay un trabajo pendiente para %s; se omite", job.display_name,
+                           extra={"job_id": job.job_id})
+            return False
+        
+        self._jobs[job.job_id] = job
+        self._statuses[job.job_id] = JOB_STATUS_QUEUED
+        if self._host is not None:
+            signals = self._signals
+            self._host.submit(
+                job,
+                on_start=lambda: signals.started.emit(job),
+                on_page=lambda result: signals.page_processed.emit(job, result),
+                on_progress=lambda done, total: signals.progress.emit(job, done, total),
+                on_success=lambda results: signals.succeeded.emit(job, results),
+                on_failure=lambda message: signals.failed.emit(job, message)
+            )
+        else:
+            self._pool.start(JobRunnable(self.model, job, self._signals))
+        logger.info("Trabajo %s encolado: %s", job.job_id, job.source_file, extra={"job_id": job.job_id})
+        return True
+    
+    def cancel(self, job: ConversionJob) -> bool:
+        """
+        Cancela un trabajo en cola o en curso (solo con el proceso de trabajo).
+        
+        El trabajo termina con la señal `job_failed` y no publica salidas.
+        
+        Returns:
+            False si el trabajo no está pendiente o la cola corre en hilos
+        """
+        if self._host is None:
+            return False
+        return self._host.cancel(job.job_id)
+    
+    def active_jobs(self) -> List[ConversionJob]:
+        """Trabajos en cola o en ejecución."""
+        return list(self._jobs.values())
+    
+    def running_count(self) -> int:
+        """Número de trabajos en ejecución."""
+        return sum(1 for status in self._statuses.values() if status == JOB_STATUS_RUNNING)
+    
+    def queued_count(self) -> int:
+        """Número de trabajos esperando turno."""
+        return sum(1 for status in self._statuses.values() if status == JOB_STATUS_QUEUED)
+    
+    def is_busy(self) -> bool:
+        """Indica si hay trabajos pendientes."""
+        return bool(self._jobs)
+    
+    def shutdown(self) -> None:
+        """Descarta los trabajos en cola y espera a que terminen los que están en ejecución."""
+        if self._host is not None:
+            self._host.shutdown(timeout=None)
+            return
+        self._pool.clear()
+        self._pool.waitForDone()
+    
+    def _on_started(self, job: ConversionJob) -> None:
+        self._statuses[job.job_id] = JOB_STATUS_RUNNING
+        self.job_started.emit(job)
+    
+    def _on_succeeded(self, job: ConversionJob, results: object) -> None:
+        self._forget(job)
+        logger.info("Trabajo %s completado", job.job_id, extra={"job_id": job.job_id})
+        self.job_succeeded.emit(job, results)
+        self._emit_idle_if_done()
+    
+    def _on_failed(self, job: ConversionJob, error_message: str) -> None:
+        self._forget(job)
+        logger.error("Trabajo %s falló: %s", job.job_id, error_message, extra={"job_id": job.job_id})
+        self.job_failed.emit(job, error_message)
+        self._emit_idle_if_done()
+    
+    def _forget(self, job: ConversionJob) -> None:
+        self._jobs.pop(job.job_id, None)
+        self._statuses.pop(job.job_id, None)
+    
+    def _emit_idle_if_done(self) -> None:
+        if not self._jobs:
+            self.idle.emit()
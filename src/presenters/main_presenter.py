@@ -4,67 +4,88 @@ Implementa la lógica de presentación según el patrón MVP con PyQt5.
 """
 
 import threading
-from typing import Optional
-from PyQt5.QtCore import QObject, QThread, pyqtSignal
-from ..models import DocumentProcessingModel, DocumentConversionError, PDFProcessingError
+from dataclasses import replace
+from typing import Dict, List, Optional
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from ..models import ConversionJob, DocumentProcessingModel, PageResult, PROFILE_STANDARD, PROFILE_WEB
+from ..models.contact_sheet import ContactSheetBuilder
+from ..models.pdf_processor import PAGE_STATUS_OK
+from ..models.conversion_job import JOB_STATUS_RUNNING, JOB_STATUS_COMPLETED, JOB_STATUS_FAILED
+from ..models.performance_history import JobEta, format_duration
 from ..views import MainView
-from src.utils import get_logger
+from ..views.preview_panel import ThumbnailCache
+from .job_queue import JobQueue
+from src.utils import AppSettings, get_logger
 
 logger = get_logger("main_presenter")
 
-
-class ConversionWorker(QObject):
-    """Worker thread para manejar la conversión en segundo plano."""
-    
-    finished = pyqtSignal()
-    error = pyqtSignal(str)
-    success = pyqtSignal()
-    
-    def __init__(self, model: DocumentProcessingModel):
-        super().__init__()
-        self.model = model
-    
-    def process(self):
-        """Procesa la conversión del documento."""
-        try:
-            self.model.process_document()
-            self.success.emit()
-        except (DocumentConversionError, PDFProcessingError) as e:
-            self.error.emit(str(e))
-        except Exception as e:
-            self.error.emit(f"Error inesperado durante la conversión: {str(e)}")
-        finally:
-            self.finished.emit()
+# Intervalo (ms) con el que se refresca el tiempo restante de los trabajos en curso
+ETA_REFRESH_MS = 1000
 
 
 class MainPresenter(QObject):
     """Presentador principal que coordina la vista y el modelo."""
     
-    def __init__(self):
+    contact_sheet_finished = pyqtSignal(str, bool)
+    
+    def __init__(self, settings: Optional[AppSettings] = None):
         super().__init__()
-        self.model = DocumentProcessingModel()
+        settings = settings or AppSettings()
+        self.settings = settings
+        self.model = DocumentProcessingModel(settings)
         self.view = MainView()
-        self.worker_thread: Optional[QThread] = None
-        self.worker: Optional[ConversionWorker] = None
+        self.view.set_web_profile_checked(self.model.output_profile == PROFILE_WEB)
+        self.job_queue = JobQueue(self.model, settings.max_concurrent_jobs, parent=self)
+        self.jobs: Dict[str, ConversionJob] = {}
+        self.job_results: Dict[str, List[PageResult]] = {}
+        self.finished_job_ids: set = set()
+        self.failed_jobs: Dict[str, str] = {}
+        self.batch_job_ids: List[str] = []
+        self.displayed_job_id: Optional[str] = None
+        self.last_output_folder: Optional[str] = None
+        self.thumbnail_cache = ThumbnailCache(settings.thumbnail_cache_mb * 1024 * 1024)
+        self.job_etas: Dict[str, JobEta] = {}
+        self.eta_timer = QTimer(self)
+        self.eta_timer.setInterval(ETA_REFRESH_MS)
+        self.eta_timer.timeout.connect(self._refresh_etas)
+        self.contact_sheet_finished.connect(self._on_contact_sheet_finished)
         self._setup_view_callbacks()
+        self._setup_queue_signals()
     
     def _setup_view_callbacks(self) -> None:
         """Configura los callbacks de la vista."""
         self.view.on_file_select = self.handle_file_selection
         self.view.on_convert_start = self.handle_conversion_start
         self.view.on_close = self.shutdown
+        self.view.on_preview_open = self.handle_preview_open
+        self.view.on_results_open = self.handle_results_open
+        self.view.on_job_selected = self.handle_job_selected
+        self.view.on_web_profile_toggled = self.handle_web_profile_toggled
+        self.view.on_dry_run_toggled = self.handle_dry_run_toggled
+    
+    def _setup_queue_signals(self) -> None:
+        """Conecta las señales de la cola de trabajos."""
+        self.job_queue.job_started.connect(self._on_job_started)
+        self.job_queue.job_progress.connect(self._on_job_progress)
+        self.job_queue.job_page_processed.connect(self._on_job_page_processed)
+        self.job_queue.job_succeeded.connect(self._on_job_succeeded)
+        self.job_queue.job_failed.connect(self._on_job_failed)
+        self.job_queue.idle.connect(self._on_queue_idle)
     
-    def handle_file_selection(self, file_path: str) -> None:
+    def handle_file_selection(self, file_paths: List[str]) -> None:
         """
-        Maneja la selección de un archivo.
+        Maneja la selección de uno o varios archivos.
         
         Args:
-            file_path: Ruta del archivo seleccionado
+            file_paths: Rutas de los archivos seleccionados
         """
-        if file_path:
-            self.model.set_selected_file(file_path)
-            self.view.update_selected_file(file_path)
-            self.view.show_info_message("Archivo seleccionado correctamente.")
+        if file_paths:
+            self.model.set_selected_files(file_paths)
+            self.view.update_selected_files(file_paths)
+            if len(file_paths) == 1:
+                self.view.show_info_message("Archivo seleccionado correctamente.")
+            else:
+                self.view.show_info_message(f"{len(file_paths)} archivos seleccionados correctamente.")
         else:
             self.view.show_warning_message("No se seleccionó ningún archivo.")
     
@@ -77,7 +98,7 @@ class MainPresenter(QObject):
         # Verificar método de conversión disponible
         try:
             converter = self.model.get_converter()
-            method = converter._conversion_method
+            method = converter.conversion_method
             
             # Mostrar información sobre el método que se usará
             if method == "word":
@@ -91,60 +112,217 @@ class MainPresenter(QObject):
         except:
             pass
         
-        # Mostrar estado de carga
-        self.view.show_loading()
+        # Encolar un trabajo inmutable por archivo; la selección queda libre para el siguiente lote
+        skipped = []
+        for job in self.model.create_jobs():
+            if self.job_queue.submit(job):
+                self.jobs[job.job_id] = job
+                self.job_results[job.job_id] = []
+                self.batch_job_ids.append(job.job_id)
+                self.view.job_list.add_job(job)
+            else:
+                skipped.append(job.display_name)
         
-        # Crear worker y thread
-        self.worker = ConversionWorker(self.model)
-        self.worker_thread = QThread()
+        self.model.clear_selected_file()
+        self.view.clear_selected_file()
+        self._update_queue_status()
         
-        # Mover worker al thread
-        self.worker.moveToThread(self.worker_thread)
+        if skipped:
+            self.view.show_warning_message(
+                "Estos archivos ya tienen un trabajo en curso y no se encolaron de nuevo:\n\n• "
+                + "\n• ".join(skipped)
+            )
+    
+    def handle_preview_open(self) -> None:
+        """Abre la vista previa de los diplomas del último trabajo."""
+        if not self.last_output_folder:
+            self.view.show_warning_message("Aún no hay un trabajo terminado para previsualizar.")
+            return
         
-        # Conectar señales
-        self.worker_thread.started.connect(self.worker.process)
-        self.worker.finished.connect(self.worker_thread.quit)
-        self.worker.finished.connect(self.worker.deleteLater)
-        self.worker_thread.finished.connect(self.worker_thread.deleteLater)
-        self.worker_thread.finished.connect(lambda: setattr(self, 'worker_thread', None))
-        self.worker_thread.finished.connect(lambda: setattr(self, 'worker', None))
+        panel = self.view.show_preview(self.last_output_folder, self.thumbnail_cache)
+        panel.on_export_contact_sheet = self.handle_contact_sheet_export
+    
+    def handle_results_open(self) -> None:
+        """Muestra nuevamente la tabla de resultados del último trabajo."""
+        self.view.show_results_panel()
+    
+    def handle_web_profile_toggled(self, enabled: bool) -> None:
+        """Aplica el perfil web (o el estándar) a los próximos trabajos encolados."""
+        self.model.set_output_profile(PROFILE_WEB if enabled else PROFILE_STANDARD)
+        logger.info("Perfil de salida seleccionado: %s", self.model.output_profile.name)
+    
+    def handle_dry_run_toggled(self, enabled: bool) -> None:
+        """Activa o desactiva la simulación para los próximos trabajos encolados."""
+        self.model.set_dry_run(enabled)
+        logger.info("Modo simulación %s", "activado" if enabled else "desactivado")
+    
+    def handle_job_selected(self, job_id: str) -> None:
+        """Muestra en la tabla de resultados el trabajo elegido en la lista."""
+        if job_id in self.jobs:
+            self._display_job(job_id)
+            self.view.set_results_available(True)
+    
+    def _display_job(self, job_id: str) -> None:
+        """Carga en la tabla de resultados las páginas recibidas de un trabajo."""
+        panel = self.view.show_results_panel()
+        self.displayed_job_id = job_id
+        panel.start_job(self.jobs[job_id].output_folder)
+        for result in self.job_results.get(job_id, []):
+            panel.add_result(result)
+        if job_id in self.finished_job_ids:
+            panel.finish_job()
+    
+    def handle_contact_sheet_export(self, output_folder: str, target_filename: str) -> None:
+        """
+        Genera la hoja de contacto en segundo plano.
         
-        self.worker.success.connect(self._on_conversion_success)
-        self.worker.error.connect(self._on_conversion_error)
-        self.worker.finished.connect(self._on_conversion_finished)
+        Args:
+            output_folder: Carpeta con los PDFs individuales
+            target_filename: Ruta del PDF de la hoja de contacto
+        """
+        def build():
+            try:
+                count = ContactSheetBuilder().build(output_folder, target_filename)
+                self.contact_sheet_finished.emit(
+                    f"Hoja de contacto con {count} diplomas guardada en:\n{target_filename}", True
+                )
+            except Exception as e:
+                logger.error("Error al generar la hoja de contacto: %s", e)
+                self.contact_sheet_finished.emit(str(e), False)
         
-        # Iniciar thread
-        self.worker_thread.start()
-    
-    def _on_conversion_success(self) -> None:
-        """Maneja el éxito de la conversión."""
-        self.view.show_success_message(
-            "🎉 ¡Conversión completada con éxito!\n\n"
-            "Los archivos PDF individuales se han guardado en la carpeta correspondiente.\n"
-            "Cada página ha sido renombrada automáticamente con el número de registro y nombre del estudiante."
-        )
-        # Limpiar el archivo seleccionado para evitar conversiones duplicadas
-        self.model.clear_selected_file()
-        self.view.clear_selected_file()
+        threading.Thread(target=build, daemon=True).start()
+    
+    def _on_contact_sheet_finished(self, message: str, succeeded: bool) -> None:
+        """Informa el resultado de la exportación de la hoja de contacto."""
+        if succeeded:
+            self.view.show_success_message(message)
+        else:
+            self.view.show_error_message(f"❌ No se pudo generar la hoja de contacto:\n\n{message}")
+    
+    def _on_job_started(self, job: ConversionJob) -> None:
+        """Marca un trabajo como en ejecución."""
+        self.view.job_list.set_job_status(job.job_id, JOB_STATUS_RUNNING)
+        self._update_queue_status()
+        
+        eta = self.model.estimate_job(job)
+        if eta is not None:
+            self.job_etas[job.job_id] = eta
+            if not self.eta_timer.isActive():
+                self.eta_timer.start()
+        
+        # La tabla de resultados sigue al trabajo más reciente si el mostrado ya terminó
+        if self.displayed_job_id is None or self.displayed_job_id in self.finished_job_ids:
+            self._display_job(job.job_id)
+            self.view.set_results_available(True)
+    
+    def _on_job_progress(self, job: ConversionJob, done: int, total: int) -> None:
+        """Actualiza el avance por páginas de un trabajo y su tiempo restante."""
+        eta = self.job_etas.get(job.job_id)
+        if eta is not None:
+            eta.update(done, total)
+        self.view.job_list.set_job_progress(job.job_id, done, total, self._remaining_text(eta))
+    
+    def _refresh_etas(self) -> None:
+        """Descuenta el tiempo transcurrido del tiempo restante mostrado (también durante la conversión)."""
+        if not self.job_etas:
+            self.eta_timer.stop()
+            return
+        for job_id, eta in self.job_etas.items():
+            if eta.total is not None:
+                self.view.job_list.set_job_progress(job_id, eta.done, eta.total, self._remaining_text(eta))
     
-    def _on_conversion_error(self, error_message: str) -> None:
+    @staticmethod
+    def _remaining_text(eta: Optional[JobEta]) -> str:
+        remaining = eta.remaining() if eta is not None else None
+        return format_duration(remaining) if remaining else ""
+    
+    def _on_job_page_processed(self, job: ConversionJob, result: PageResult) -> None:
+        """Guarda el resultado de una página y lo muestra si el trabajo está a la vista."""
+        # El texto extraído no se muestra; no se retiene en memoria durante la sesión
+        result = replace(result, text="")
+        self.job_results.setdefault(job.job_id, []).append(result)
+        if job.job_id == self.displayed_job_id and self.view.results_panel is not None:
+            self.view.results_panel.add_result(result)
+    
+    def _on_job_succeeded(self, job: ConversionJob, results: List[PageResult]) -> None:
+        """Maneja el éxito de un trabajo."""
+        self.finished_job_ids.add(job.job_id)
+        self.job_etas.pop(job.job_id, None)
+        if job.dry_run:
+            # La simulación no escribe archivos: sus resultados solo se revisan en la tabla
+            fallback = sum(1 for result in results if result.status != PAGE_STATUS_OK)
+            self.view.job_list.set_job_status(job.job_id, JOB_STATUS_COMPLETED,
+                                              f"• simulación: {len(results)} páginas")
+            self.view.job_list.set_job_tooltip(job.job_id, f"Simulación sin archivos • {fallback} páginas con problemas")
+            self._finish_displayed_job(job)
+            self._update_queue_status()
+            return
+        
+        self.view.job_list.set_job_status(job.job_id, JOB_STATUS_COMPLETED, f"• {len(results)} páginas")
+        bytes_saved = sum(result.bytes_saved for result in results)
+        tooltip = job.output_folder
+        if bytes_saved:
+            tooltip += f"\nPerfil {job.output_profile.name}: {bytes_saved / (1024 * 1024):.1f} MB ahorrados"
+        self.view.job_list.set_job_tooltip(job.job_id, tooltip)
+        self.last_output_folder = job.output_folder
+        self.view.set_preview_available(True)
+        self._finish_displayed_job(job)
+        self._update_queue_status()
+    
+    def _on_job_failed(self, job: ConversionJob, error_message: str) -> None:
         """
-        Maneja los errores de conversión.
+        Maneja el error de un trabajo.
         
         Args:
+            job: Trabajo que falló
             error_message: Mensaje de error a mostrar
         """
-        self.view.show_error_message(
-            f"❌ Error durante la conversión:\n\n{error_message}\n\n"
-            "Por favor, verifica que:\n"
-            "• Microsoft Word esté instalado\n"
-            "• El archivo no esté abierto en otra aplicación\n"
-            "• Tengas permisos de escritura en la carpeta"
-        )
-    
-    def _on_conversion_finished(self) -> None:
-        """Limpia los recursos cuando termina la conversión."""
-        self.view.hide_loading()
+        self.finished_job_ids.add(job.job_id)
+        self.job_etas.pop(job.job_id, None)
+        self.failed_jobs[job.job_id] = error_message
+        self.view.job_list.set_job_status(job.job_id, JOB_STATUS_FAILED)
+        self.view.job_list.set_job_tooltip(job.job_id, error_message)
+        self._finish_displayed_job(job)
+        self._update_queue_status()
+    
+    def _finish_displayed_job(self, job: ConversionJob) -> None:
+        """Inserta las filas pendientes si el trabajo terminado está a la vista."""
+        if job.job_id == self.displayed_job_id and self.view.results_panel is not None:
+            self.view.results_panel.finish_job()
+    
+    def _on_queue_idle(self) -> None:
+        """Informa el resultado del lote cuando la cola queda vacía."""
+        self._update_queue_status()
+        batch = [self.jobs[job_id] for job_id in self.batch_job_ids]
+        self.batch_job_ids = []
+        
+        if self.failed_jobs:
+            failures = "\n".join(f"• {self.jobs[job_id].display_name}: {message}"
+                                 for job_id, message in self.failed_jobs.items())
+            self.failed_jobs = {}
+            self.view.show_error_message(
+                f"❌ Error durante la conversión:\n\n{failures}\n\n"
+                "Por favor, verifica que:\n"
+                "• Microsoft Word esté instalado\n"
+                "• El archivo no esté abierto en otra aplicación\n"
+                "• Tengas permisos de escritura en la carpeta"
+            )
+        elif batch and all(job.dry_run for job in batch):
+            self.view.show_success_message(
+                "🔍 Simulación completada\n\n"
+                "No se escribió ningún archivo.\n"
+                "Revisa en 📋 Resultados los nombres propuestos y las páginas sin datos."
+            )
+        else:
+            self.view.show_success_message(
+                "🎉 ¡Conversión completada con éxito!\n\n"
+                "Los archivos PDF individuales se han guardado en la carpeta correspondiente.\n"
+                "Cada página ha sido renombrada automáticamente con el número de registro y nombre del estudiante."
+            )
+    
+    def _update_queue_status(self) -> None:
+        """Refleja en la ventana cuántos trabajos hay en proceso y en cola."""
+        self.view.set_queue_status(self.job_queue.running_count(), self.job_queue.queued_count())
     
     def run(self) -> None:
         """Inicia la aplicación."""
@@ -152,9 +330,7 @@ class MainPresenter(QObject):
     
     def shutdown(self) -> None:
         """Cierra la aplicación de forma limpia."""
-        # Esperar a que termine el thread si está ejecutando
-        if self.worker_thread and self.worker_thread.isRunning():
-            self.worker_thread.quit()
-            self.worker_thread.wait()
+        # Descartar los trabajos en cola y esperar a los que están en ejecución
+        self.job_queue.shutdown()
         
         self.view.close()
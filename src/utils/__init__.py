@@ -12,6 +12,8 @@ from .file_utils import (
     get_resource_path,
     get_app_icon
 )
+from .log_pipeline import log_context, get_process_log_queue, configure_worker_logging, stop_logging_pipeline
+from .settings import AppSettings, SettingsError, load_settings, add_settings_arguments, settings_from_args, log_settings
 
 try:
     from .styles import COLORS, MAIN_STYLE, BUTTON_STYLE_PRIMARY, BUTTON_STYLE_SECONDARY
@@ -27,7 +29,17 @@ __all__ = [
     'safe_file_removal',
     'get_file_size_mb',
     'get_resource_path',
-    'get_app_icon'
+    'get_app_icon',
+    'log_context',
+    'get_process_log_queue',
+    'configure_worker_logging',
+    'stop_logging_pipeline',
+    'AppSettings',
+    'SettingsError',
+    'load_settings',
+    'add_settings_arguments',
+    'settings_from_args',
+    'log_settings'
 ]
 
 if STYLES_AVAILABLE:
@@ -7,20 +7,30 @@ import logging
 import logging.handlers
 from typing import Optional
 from datetime import datetime
+from .log_pipeline import JsonFormatter, start_logging_pipeline, DEFAULT_PAGE_LOG_EVERY
 
 
-def setup_logging(log_level: str = "INFO") -> logging.Logger:
+def setup_logging(log_level: str = "INFO", page_log_every: int = DEFAULT_PAGE_LOG_EVERY,
+                  log_dir: str = "logs", max_bytes: int = 5 * 1024 * 1024,
+                  backup_count: int = 5) -> logging.Logger:
     """
     Configura el sistema de logging de la aplicación con rotación automática.
     
+    Los loggers solo encolan los registros; la escritura del archivo (JSON por
+    línea, con job_id y página cuando existen) y de la consola ocurre en un
+    hilo en segundo plano.
+    
     Args:
         log_level: Nivel de logging (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+        page_log_every: Registrar una de cada N páginas en trabajos grandes (1 = todas)
+        log_dir: Carpeta de los archivos de log
+        max_bytes: Tamaño máximo de cada archivo antes de rotar
+        backup_count: Cantidad de archivos rotados que se conservan
         
     Returns:
         Logger configurado para la aplicación
     """
     # Crear directorio de logs si no existe
-    log_dir = "logs"
     if not os.path.exists(log_dir):
         os.makedirs(log_dir)
     
@@ -30,17 +40,15 @@ def setup_logging(log_level: str = "INFO") -> logging.Logger:
     
     # Evitar duplicar handlers si ya están configurados
     if not logger.handlers:
-        # Formato detallado para logs
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s'
-        )
+        # Formato estructurado (JSON por línea) para logs
+        formatter = JsonFormatter()
         
-        # Handler para archivo con rotación (máximo 5MB, mantener 5 archivos)
+        # Handler para archivo con rotación (por defecto 5MB, mantener 5 archivos)
         log_file = os.path.join(log_dir, "document_converter.log")
         file_handler = logging.handlers.RotatingFileHandler(
             log_file, 
-            maxBytes=5*1024*1024,  # 5MB
-            backupCount=5,
+            maxBytes=max_bytes,
+            backupCount=backup_count,
             encoding='utf-8'
         )
         file_handler.setFormatter(formatter)
@@ -53,12 +61,11 @@ def setup_logging(log_level: str = "INFO") -> logging.Logger:
         # Solo mostrar WARNING y superiores en consola
         console_handler.setLevel(logging.WARNING)
         
-        # Agregar handlers
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+        # Los handlers se atienden desde el listener de la cola
+        logger.addHandler(start_logging_pipeline([file_handler, console_handler], page_log_every))
         
         # Log inicial
-        logger.info(f"=== DocToPDF Manager iniciado - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===")
+        logger.info("=== DocToPDF Manager iniciado - %s ===", datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
     
     return logger
 
@@ -0,0 +1,214 @@
+"""
+Canal de logging asíncrono.
+Los hilos y procesos de trabajo solo encolan los registros; un QueueListener
+los formatea como JSON (uno por línea) y los escribe en segundo plano, de modo
+que la rotación y la escritura en disco quedan fuera del bucle de división.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import multiprocessing
+import queue
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+# Campos estructurados que se copian del registro al JSON si están presentes
+STRUCTURED_FIELDS = ("job_id", "page", "stage", "source_file", "output_folder", "status")
+
+# Muestreo por defecto de los registros por página (los WARNING o superiores nunca se descartan)
+DEFAULT_PAGE_LOG_FIRST = 10
+DEFAULT_PAGE_LOG_EVERY = 50
+
+_log_context: ContextVar[Dict[str, Any]] = ContextVar("log_context", default={})
+
+_thread_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+_process_queue: Optional[Any] = None
+_listeners: List[logging.handlers.QueueListener] = []
+_output_handlers: List[logging.Handler] = []
+
+
+@contextmanager
+def log_context(**fields: Any) -> Iterator[None]:
+    """
+    Agrega campos (por ejemplo job_id) a todos los registros emitidos dentro del bloque.
+    
+    El contexto es propio de cada hilo, por lo que varios trabajos simultáneos
+    no mezclan sus identificadores.
+    """
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """Copia al registro los campos del contexto activo."""
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in _log_context.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class PageSamplingFilter(logging.Filter):
+    """
+    Descarta parte de los registros por página en trabajos grandes.
+    
+    Se conservan las primeras páginas y luego una de cada `every`; los registros
+    sin campo `page` o de nivel WARNING o superior pasan siempre.
+    """
+    
+    def __init__(self, first: int = DEFAULT_PAGE_LOG_FIRST, every: int = DEFAULT_PAGE_LOG_EVERY):
+        super().__init__()
+        self.first = first
+        self.every = max(1, every)
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        page = getattr(record, "page", None)
+        if page is None or record.levelno >= logging.WARNING or self.every == 1:
+            return True
+        return page <= self.first or page % self.every == 0
+
+
+class JsonFormatter(logging.Formatter):
+    """Formatea cada registro como un objeto JSON en una sola línea."""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        for key in STRUCTURED_FIELDS:
+            value = getattr(record, key, None)
+            if value is not None:
+                data[key] = value
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data["exception"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler para hilos del mismo proceso.
+    
+    A diferencia del QueueHandler estándar, no combina el mensaje con sus
+    argumentos al encolar: el formateo ocurre en el hilo del listener. Los
+    argumentos deben ser valores que no cambien después de registrar el mensaje.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class ProcessQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler para procesos hijos.
+    
+    Combina mensaje y argumentos para que el registro sea serializable, pero
+    conserva la traza de la excepción aparte para el campo "exception" del JSON.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def start_logging_pipeline(handlers: List[logging.Handler], page_log_every: int = DEFAULT_PAGE_LOG_EVERY,
+                           page_log_first: int = DEFAULT_PAGE_LOG_FIRST) -> logging.Handler:
+    """
+    Inicia el listener que escribe en los handlers indicados.
+    
+    Args:
+        handlers: Handlers de salida (archivo, consola) atendidos en segundo plano
+        page_log_every: Conservar un registro por página de cada N (1 = todos)
+        page_log_first: Páginas iniciales que siempre se registran
+    
+    Returns:
+        Handler que los loggers de la aplicación deben usar
+    """
+    if _listeners:
+        stop_logging_pipeline()
+    else:
+        atexit.register(stop_logging_pipeline)
+    
+    _output_handlers[:] = handlers
+    listener = logging.handlers.QueueListener(_thread_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+    
+    queue_handler = DeferredQueueHandler(_thread_queue)
+    queue_handler.addFilter(ContextFilter())
+    queue_handler.addFilter(PageSamplingFilter(page_log_first, page_log_every))
+    return queue_handler
+
+
+def get_process_log_queue() -> Any:
+    """
+    Devuelve la cola que deben usar los procesos hijos (ver `configure_worker_logging`).
+    
+    Se crea al primer uso, junto con un listener propio que escribe en los mismos handlers.
+    """
+    global _process_queue
+    if _process_queue is None:
+        # Creada con "spawn" para que sirva también a los procesos que no se crean con fork
+        _process_queue = multiprocessing.get_context("spawn").Queue(-1)
+        listener = logging.handlers.QueueListener(_process_queue, *_output_handlers,
+                                                  respect_handler_level=True)
+        listener.start()
+        _listeners.append(listener)
+    return _process_queue
+
+
+def configure_worker_logging(log_queue: Any, log_level: str = "INFO",
+                             page_log_every: int = DEFAULT_PAGE_LOG_EVERY,
+                             page_log_first: int = DEFAULT_PAGE_LOG_FIRST) -> None:
+    """
+    Configura el logging de un proceso hijo para enviar sus registros al proceso principal.
+    
+    Args:
+        log_queue: Cola obtenida con `get_process_log_queue` en el proceso principal
+        log_level: Nivel de logging del proceso hijo
+        page_log_every: Conservar un registro por página de cada N (1 = todos)
+        page_log_first: Páginas iniciales que siempre se registran
+    """
+    logger = logging.getLogger("DocToPDF-Manager")
+    logger.setLevel(getattr(logging, log_level.upper()))
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    
+    queue_handler = ProcessQueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+    queue_handler.addFilter(PageSamplingFilter(page_log_first, page_log_every))
+    logger.addHandler(queue_handler)
+
+
+def stop_logging_pipeline() -> None:
+    """Vacía las colas pendientes y detiene los listeners."""
+    global _process_queue
+    _process_queue = None
+    while _listeners:
+        listener = _listeners.pop()
+        try:
+            listener.stop()
+        except Exception:
+            pass
@@ -0,0 +1,256 @@
+"""
+Configuración de la aplicación por capas.
+Los valores por defecto se sobrescriben, en este orden, con el archivo de
+configuración (JSON), las variables de entorno DOCTOPDF_* y las opciones de
+línea de comandos. Todo se valida al iniciar y se puede consultar el valor
+efectivo de cada parámetro junto con su origen.
+"""
+
+import argparse
+import json
+import logging
+import os
+import tempfile
+from dataclasses import dataclass, field, fields, replace
+from typing import Any, Dict, List, Mapping, Optional, Union, get_type_hints
+
+# Archivo de configuración opcional (relativo al directorio de trabajo)
+DEFAULT_SETTINGS_FILE = os.path.join("config", "settings.json")
+
+# Prefijo de las variables de entorno (por ejemplo DOCTOPDF_MAX_CONCURRENT_JOBS=8)
+ENV_PREFIX = "DOCTOPDF_"
+ENV_CONFIG_FILE = ENV_PREFIX + "CONFIG"
+
+SOURCE_DEFAULT = "predeterminado"
+SOURCE_FILE = "archivo"
+SOURCE_ENV = "entorno"
+SOURCE_CLI = "línea de comandos"
+
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+
+
+class SettingsError(ValueError):
+    """Error al cargar o validar la configuración."""
+    pass
+
+
+@dataclass(frozen=True)
+class AppSettings:
+    """Parámetros de operación de la aplicación."""
+    # Concurrencia y regulación de recursos (0 desactiva el límite)
+    max_concurrent_jobs: int = 2
+    memory_budget_mb: int = 0
+    min_free_memory_mb: int = 512
+    max_load_per_cpu: float = 0.0
+    # Tiempos de espera (segundos)
+    conversion_timeout: float = 30.0
+    probe_timeout: float = 5.0
+    libreoffice_executable: str = "soffice"
+    # Aceptar un PDF de solo texto (docx2txt) si ningún motor con formato completo responde (1 lo permite)
+    allow_degraded_conversion: int = 0
+    # Optimización del DOCX antes de convertir: resolución de impresión de sus imágenes (0 la desactiva)
+    docx_image_dpi: int = 0
+    # Logging
+    log_level: str = "INFO"
+    log_dir: str = "logs"
+    log_max_bytes: int = 5 * 1024 * 1024
+    log_backup_count: int = 5
+    page_log_every: int = 50
+    # Cachés y retención
+    thumbnail_cache_mb: int = 64
+    retained_jobs: int = 20
+    # Rutas y destinos de salida
+    scratch_dir: Optional[str] = None
+    output_root: Optional[str] = None
+    artifacts_dir: str = os.path.join("data", "jobs")
+    index_path: str = os.path.join("data", "diplomas_index.db")
+    # Historial de duraciones para estimar el tiempo restante (vacío lo desactiva)
+    history_path: Optional[str] = os.path.join("data", "performance_history.db")
+    output_profile: str = "estandar"
+    # Columnas de la nómina (vacío: se detectan por los nombres habituales)
+    roster_registration_column: Optional[str] = None
+    roster_name_column: Optional[str] = None
+    roster_cedula_column: Optional[str] = None
+    # Origen de cada valor (predeterminado, archivo, entorno o línea de comandos)
+    sources: Dict[str, str] = field(default_factory=dict, compare=False, repr=False)
+    
+    def describe(self) -> List[str]:
+        """Devuelve una línea por parámetro con su valor efectivo y su origen."""
+        return [
+            f"{name} = {getattr(self, name)!r} ({self.sources.get(name, SOURCE_DEFAULT)})"
+            for name in setting_names()
+        ]
+
+
+def setting_names() -> List[str]:
+    """Nombres de los parámetros configurables."""
+    return [f.name for f in fields(AppSettings) if f.name != "sources"]
+
+
+def load_settings(config_file: Optional[str] = None,
+                  overrides: Optional[Mapping[str, Any]] = None,
+                  environ: Optional[Mapping[str, str]] = None) -> AppSettings:
+    """
+    Carga la configuración combinando todas las capas y la valida.
+    
+    Args:
+        config_file: Archivo JSON de configuración (por defecto DOCTOPDF_CONFIG
+            o config/settings.json si existe)
+        overrides: Valores indicados en la línea de comandos
+        environ: Variables de entorno (por defecto os.environ)
+    
+    Returns:
+        Configuración efectiva
+    
+    Raises:
+        SettingsError: Si algún valor no es válido
+    """
+    environ = os.environ if environ is None else environ
+    values: Dict[str, Any] = {}
+    sources: Dict[str, str] = {}
+    
+    config_file = config_file or environ.get(ENV_CONFIG_FILE)
+    if config_file or os.path.exists(DEFAULT_SETTINGS_FILE):
+        for name, value in _read_settings_file(config_file or DEFAULT_SETTINGS_FILE).items():
+            values[name], sources[name] = value, SOURCE_FILE
+    
+    for name in setting_names():
+        env_value = environ.get(ENV_PREFIX + name.upper())
+        if env_value is not None:
+            values[name], sources[name] = env_value, SOURCE_ENV
+    
+    for name, value in (overrides or {}).items():
+        if value is not None:
+            _check_known(name, SOURCE_CLI)
+            values[name], sources[name] = value, SOURCE_CLI
+    
+    hints = get_type_hints(AppSettings)
+    errors: List[str] = []
+    coerced: Dict[str, Any] = {}
+    for name, value in values.items():
+        try:
+            coerced[name] = _coerce(value, hints[name])
+        except (TypeError, ValueError):
+            errors.append(f"{name}: valor inválido {value!r} ({sources[name]})")
+    if errors:
+        raise SettingsError("Configuración inválida:\n  " + "\n  ".join(errors))
+    
+    settings = replace(AppSettings(), sources=sources, **coerced)
+    validate_settings(settings)
+    return settings
+
+
+def validate_settings(settings: AppSettings) -> None:
+    """
+    Comprueba rangos, niveles y rutas de la configuración.
+    
+    Raises:
+        SettingsError: Con todos los problemas encontrados
+    """
+    errors: List[str] = []
+    
+    def check(condition: bool, name: str, message: str) -> None:
+        if not condition:
+            source = settings.sources.get(name, SOURCE_DEFAULT)
+            errors.append(f"{name}: {message} (valor {getattr(settings, name)!r}, {source})")
+    
+    check(1 <= settings.max_concurrent_jobs <= 256, "max_concurrent_jobs", "debe estar entre 1 y 256")
+    check(settings.memory_budget_mb >= 0, "memory_budget_mb", "no puede ser negativo")
+    check(settings.min_free_memory_mb >= 0, "min_free_memory_mb", "no puede ser negativo")
+    check(settings.max_load_per_cpu >= 0, "max_load_per_cpu", "no puede ser negativo")
+    check(settings.conversion_timeout > 0, "conversion_timeout", "debe ser mayor que 0")
+    check(settings.probe_timeout > 0, "probe_timeout", "debe ser mayor que 0")
+    check(settings.allow_degraded_conversion in (0, 1), "allow_degraded_conversion",
+          "debe ser 0 (no permitir) o 1 (permitir)")
+    check(settings.docx_image_dpi == 0 or settings.docx_image_dpi >= 72, "docx_image_dpi",
+          "debe ser 0 (desactivada) o al menos 72")
+    check(settings.log_level.upper() in LOG_LEVELS, "log_level", f"debe ser uno de {', '.join(LOG_LEVELS)}")
+    check(settings.log_max_bytes >= 1024, "log_max_bytes", "debe ser de al menos 1024 bytes")
+    check(settings.log_backup_count >= 0, "log_backup_count", "no puede ser negativo")
+    check(settings.page_log_every >= 1, "page_log_every", "debe ser al menos 1")
+    check(settings.thumbnail_cache_mb >= 1, "thumbnail_cache_mb", "debe ser al menos 1")
+    check(settings.retained_jobs >= 0, "retained_jobs", "no puede ser negativo")
+    
+    # Importación diferida: los modelos dependen de este paquete
+    from src.models.output_profile import OUTPUT_PROFILES
+    check(settings.output_profile in OUTPUT_PROFILES, "output_profile",
+          f"debe ser uno de {', '.join(OUTPUT_PROFILES)}")
+    
+    for name in ("scratch_dir", "output_root"):
+        path = getattr(settings, name)
+        if path:
+            check(_is_writable_dir(path), name, "la carpeta no existe o no tiene permisos de escritura")
+    
+    if errors:
+        raise SettingsError("Configuración inválida:\n  " + "\n  ".join(errors))
+
+
+def add_settings_arguments(parser: argparse.ArgumentParser) -> None:
+    """Agrega al analizador --config y una opción por parámetro (por ejemplo --max-concurrent-jobs)."""
+    group = parser.add_argument_group("configuración")
+    group.add_argument("--config", help=f"Archivo JSON de configuración (por defecto {DEFAULT_SETTINGS_FILE})")
+    for name in setting_names():
+        group.add_argument(f"--{name.replace('_', '-')}", dest=f"setting_{name}", metavar="VALOR")
+
+
+def settings_from_args(args: argparse.Namespace, environ: Optional[Mapping[str, str]] = None) -> AppSettings:
+    """Carga la configuración usando las opciones agregadas con `add_settings_arguments`."""
+    overrides = {name: getattr(args, f"setting_{name}", None) for name in setting_names()}
+    return load_settings(getattr(args, "config", None), overrides, environ)
+
+
+def log_settings(settings: AppSettings, logger: logging.Logger) -> None:
+    """Registra los valores efectivos de la configuración."""
+    for line in settings.describe():
+        logger.info("Configuración: %s", line)
+
+
+def _read_settings_file(config_file: str) -> Dict[str, Any]:
+    """Lee el archivo JSON de configuración y rechaza claves desconocidas."""
+    try:
+        with open(config_file, "r", encoding="utf-8") as settings_file:
+            data = json.load(settings_file)
+    except OSError as e:
+        raise SettingsError(f"No se pudo leer el archivo de configuración {config_file}: {str(e)}")
+    except ValueError as e:
+        raise SettingsError(f"El archivo de configuración {config_file} no es JSON válido: {str(e)}")
+    
+    if not isinstance(data, dict):
+        raise SettingsError(f"El archivo de configuración {config_file} debe contener un objeto JSON")
+    for name in data:
+        _check_known(name, f"{SOURCE_FILE} {config_file}")
+    return data
+
+
+def _check_known(name: str, source: str) -> None:
+    """Rechaza parámetros desconocidos para que los errores de escritura no pasen inadvertidos."""
+    if name not in setting_names():
+        raise SettingsError(f"Parámetro de configuración desconocido: {name} ({source})")
+
+
+def _coerce(value: Any, target_type: Any) -> Any:
+    """Convierte un valor (texto si viene del entorno o la línea de comandos) al tipo del parámetro."""
+    if getattr(target_type, "__origin__", None) is Union:
+        if value is None or (isinstance(value, str) and value.strip() == ""):
+            return None
+        target_type = next(arg for arg in target_type.__args__ if arg is not type(None))
+    if isinstance(value, bool) or value is None:
+        raise TypeError(f"{value!r} no es un valor admitido")
+    if target_type is int:
+        if isinstance(value, float) and not value.is_integer():
+            raise ValueError(f"{value!r} no es un entero")
+        return int(value)
+    if target_type is float:
+        return float(value)
+    return str(value)
+
+
+def _is_writable_dir(path: str) -> bool:
+    """Indica si la carpeta existe (o se puede crear) y admite escritura."""
+    try:
+        os.makedirs(path, exist_ok=True)
+        with tempfile.TemporaryFile(dir=path):
+            pass
+        return True
+    except OSError:
+        return False
@@ -0,0 +1,148 @@
+"""
+Lista de trabajos de conversión.
+Muestra cada trabajo encolado con su estado y su propia barra de progreso.
+"""
+
+from typing import Dict, Optional
+from PyQt5.QtWidgets import (
+    QWidget, QHBoxLayout, QVBoxLayout, QLabel, QListWidget, QListWidgetItem, QProgressBar,
+    QAbstractItemView
+)
+from PyQt5.QtCore import Qt, QSize, pyqtSignal
+from src.models.conversion_job import (
+    ConversionJob, JOB_STATUS_QUEUED, JOB_STATUS_RUNNING, JOB_STATUS_COMPLETED, JOB_STATUS_FAILED
+)
+
+JOB_STATUS_LABELS = {
+    JOB_STATUS_QUEUED: ("⏳ En cola", "#718096"),
+    JOB_STATUS_RUNNING: ("⚡ Procesando", "#667eea"),
+    JOB_STATUS_COMPLETED: ("✅ Completado", "#38a169"),
+    JOB_STATUS_FAILED: ("❌ Error", "#e53e3e"),
+}
+
+JOB_ROW_HEIGHT = 46
+
+
+class JobItemWidget(QWidget):
+    """Fila de la lista con el nombre, el estado y el progreso de un trabajo."""
+    
+    def __init__(self, job: ConversionJob, parent=None):
+        super().__init__(parent)
+        self.job = job
+        
+        self.name_label = QLabel(job.display_name)
+        self.name_label.setStyleSheet("color: #2d3748; font-weight: 600; background: transparent;")
+        self.name_label.setToolTip(job.source_file)
+        
+        self.status_label = QLabel()
+        self.status_label.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 1)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.setFixedHeight(6)
+        self.progress_bar.setStyleSheet("""
+            QProgressBar {
+                border: none;
+                border-radius: 3px;
+                background-color: #edf2f7;
+            }
+            QProgressBar::chunk {
+                border-radius: 3px;
+                background-color: #667eea;
+            }
+        """)
+        
+        header_layout = QHBoxLayout()
+        header_layout.setContentsMargins(0, 0, 0, 0)
+        header_layout.addWidget(self.name_label, 1)
+        header_layout.addWidget(self.status_label)
+        
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(8, 4, 8, 4)
+        layout.setSpacing(4)
+        layout.addLayout(header_layout)
+        layout.addWidget(self.progress_bar)
+        
+        self.set_status(JOB_STATUS_QUEUED)
+    
+    def set_status(self, status: str, detail: str = "") -> None:
+        """Actualiza el estado mostrado."""
+        text, color = JOB_STATUS_LABELS.get(status, (status, "#4a5568"))
+        self.status_label.setText(f"{text} {detail}".strip())
+        self.status_label.setStyleSheet(f"color: {color}; font-weight: 500; background: transparent;")
+        
+        if status == JOB_STATUS_RUNNING and self.progress_bar.maximum() <= 1 and self.progress_bar.value() == 0:
+            # Sin total de páginas todavía (conversión en curso): modo indeterminado
+            self.progress_bar.setRange(0, 0)
+        elif status in (JOB_STATUS_COMPLETED, JOB_STATUS_FAILED):
+            self.progress_bar.setRange(0, 1)
+            self.progress_bar.setValue(1 if status == JOB_STATUS_COMPLETED else 0)
+    
+    def set_progress(self, done: int, total: int, remaining: str = "") -> None:
+        """Actualiza el avance por páginas y, si se conoce, el tiempo restante."""
+        self.progress_bar.setRange(0, max(total, 1))
+        self.progress_bar.setValue(done)
+        detail = f"{done}/{total}"
+        if remaining:
+            detail += f" • quedan {remaining}"
+        self.set_status(JOB_STATUS_RUNNING, detail)
+
+
+class JobListWidget(QListWidget):
+    """Lista de los trabajos de la sesión, del más reciente al más antiguo."""
+    
+    job_activated = pyqtSignal(str)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._items: Dict[str, QListWidgetItem] = {}
+        self.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.setStyleSheet("""
+            QListWidget {
+                background: #f8fafc;
+                border: 1px solid #e2e8f0;
+                border-radius: 10px;
+                padding: 4px;
+            }
+            QListWidget::item:selected {
+                background: #ebf4ff;
+                border-radius: 6px;
+            }
+        """)
+        self.itemClicked.connect(self._on_item_clicked)
+    
+    def add_job(self, job: ConversionJob) -> None:
+        """Agrega un trabajo encolado al principio de la lista."""
+        item = QListWidgetItem()
+        item.setData(Qt.UserRole, job.job_id)
+        item.setSizeHint(QSize(0, JOB_ROW_HEIGHT))
+        self.insertItem(0, item)
+        self.setItemWidget(item, JobItemWidget(job))
+        self._items[job.job_id] = item
+    
+    def set_job_status(self, job_id: str, status: str, detail: str = "") -> None:
+        """Actualiza el estado de un trabajo."""
+        widget = self._widget(job_id)
+        if widget is not None:
+            widget.set_status(status, detail)
+    
+    def set_job_progress(self, job_id: str, done: int, total: int, remaining: str = "") -> None:
+        """Actualiza el avance por páginas de un trabajo (y el tiempo restante estimado)."""
+        widget = self._widget(job_id)
+        if widget is not None:
+            widget.set_progress(done, total, remaining)
+    
+    def set_job_tooltip(self, job_id: str, text: str) -> None:
+        """Muestra información adicional (por ejemplo el error) al pasar el cursor."""
+        widget = self._widget(job_id)
+        if widget is not None:
+            widget.setToolTip(text)
+    
+    def _widget(self, job_id: str) -> Optional[JobItemWidget]:
+        item = self._items.get(job_id)
+        return self.itemWidget(item) if item is not None else None
+    
+    def _on_item_clicked(self, item: QListWidgetItem) -> None:
+        self.job_activated.emit(item.data(Qt.UserRole))
@@ -5,15 +5,18 @@ Implementa una interfaz moderna y profesional según el patrón MVP.
 
 import sys
 import os
-from typing import Callable, Optional
+from typing import Callable, List, Optional
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QFileDialog, QProgressBar, QMessageBox,
-    QFrame, QSizePolicy, QSpacerItem, QGraphicsDropShadowEffect
+    QFrame, QSizePolicy, QSpacerItem, QGraphicsDropShadowEffect, QCheckBox
 )
 from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QPropertyAnimation, QEasingCurve, QUrl
 from PyQt5.QtGui import QFont, QPixmap, QIcon, QPalette, QColor, QLinearGradient, QDragEnterEvent, QDropEvent
 from src.utils import get_logger, get_app_icon
+from .preview_panel import PreviewPanel, ThumbnailCache
+from .results_view import ResultsPanel
+from .job_list import JobListWidget
 
 logger = get_logger("main_view")
 
@@ -159,10 +162,14 @@ class ModernProgressBar(QProgressBar):
         self.setGraphicsEffect(shadow)
 
 
+# Documentos Word a convertir o PDFs ya combinados (solo se dividen)
+SUPPORTED_EXTENSIONS = ('.docx', '.pdf')
+
+
 class DropArea(QLabel):
     """Área personalizada para arrastrar y soltar archivos."""
     
-    file_dropped = pyqtSignal(str)
+    files_dropped = pyqtSignal(list)
     
     def __init__(self, text: str):
         super().__init__(text)
@@ -203,22 +210,34 @@ class DropArea(QLabel):
         """
         self.setStyleSheet(self.default_style)
     
+    @staticmethod
+    def _supported_paths(event) -> List[str]:
+        """Devuelve las rutas arrastradas si todas son archivos .docx o .pdf."""
+        if not event.mimeData().hasUrls():
+            return []
+        file_paths = [url.toLocalFile() for url in event.mimeData().urls()]
+        if file_paths and all(path.lower().endswith(SUPPORTED_EXTENSIONS) for path in file_paths):
+            return file_paths
+        return []
+    
     def dragEnterEvent(self, event: QDragEnterEvent):
         """Maneja el evento cuando un archivo es arrastrado sobre el área."""
         try:
             if event.mimeData().hasUrls():
-                urls = event.mimeData().urls()
-                if len(urls) == 1:
-                    file_path = urls[0].toLocalFile()
-                    if file_path.lower().endswith('.docx'):
-                        self.setStyleSheet(self.hover_style)
-                        self.setText("📥  ¡Suelta aquí tu archivo!\nPerfecto, es un archivo .docx")
-                        event.acceptProposedAction()
+                file_paths = self._supported_paths(event)
+                if len(file_paths) == 1:
+                    self.setStyleSheet(self.hover_style)
+                    if file_paths[0].lower().endswith('.pdf'):
+                        self.setText("📥  ¡Suelta aquí tu archivo!\nEs un PDF combinado: solo se dividirá")
                     else:
-                        self.setText("❌  Solo archivos .docx\nEste tipo de archivo no es compatible")
-                        event.ignore()
+                        self.setText("📥  ¡Suelta aquí tu archivo!\nPerfecto, es un archivo .docx")
+                    event.acceptProposedAction()
+                elif file_paths:
+                    self.setStyleSheet(self.hover_style)
+                    self.setText(f"📥  ¡Suelta aquí tus {len(file_paths)} archivos!\nSe encolará un trabajo por archivo")
+                    event.acceptProposedAction()
                 else:
-                    self.setText("❌  Solo un archivo a la vez\nPor favor selecciona un solo archivo")
+                    self.setText("❌  Solo archivos .docx o .pdf\nEste tipo de archivo no es compatible")
                     event.ignore()
             else:
                 event.ignore()
@@ -237,17 +256,10 @@ class DropArea(QLabel):
     def dropEvent(self, event: QDropEvent):
         """Maneja el evento cuando un archivo es soltado en el área."""
         try:
-            if event.mimeData().hasUrls():
-                urls = event.mimeData().urls()
-                if len(urls) == 1:
-                    file_path = urls[0].toLocalFile()
-                    if file_path.lower().endswith('.docx'):
-                        self.file_dropped.emit(file_path)
-                        event.acceptProposedAction()
-                    else:
-                        event.ignore()
-                else:
-                    event.ignore()
+            file_paths = self._supported_paths(event)
+            if file_paths:
+                self.files_dropped.emit(file_paths)
+                event.acceptProposedAction()
             else:
                 event.ignore()
             
@@ -270,9 +282,14 @@ class MainView(QMainWindow):
         super().__init__()
         
         # Callbacks que serán asignados por el Presenter
-        self.on_file_select: Optional[Callable[[str], None]] = None
+        self.on_file_select: Optional[Callable[[List[str]], None]] = None
         self.on_convert_start: Optional[Callable[[], None]] = None
         self.on_close: Optional[Callable[[], None]] = None
+        self.on_preview_open: Optional[Callable[[], None]] = None
+        self.on_results_open: Optional[Callable[[], None]] = None
+        self.on_job_selected: Optional[Callable[[str], None]] = None
+        self.on_web_profile_toggled: Optional[Callable[[bool], None]] = None
+        self.on_dry_run_toggled: Optional[Callable[[bool], None]] = None
         
         # Widgets principales
         self.central_widget: Optional[QWidget] = None
@@ -281,6 +298,13 @@ class MainView(QMainWindow):
         self.progress_bar: Optional[ModernProgressBar] = None
         self.progress_label: Optional[QLabel] = None
         self.file_label: Optional[DropArea] = None
+        self.preview_button: Optional[ModernButton] = None
+        self.preview_panel: Optional[PreviewPanel] = None
+        self.results_button: Optional[ModernButton] = None
+        self.results_panel: Optional[ResultsPanel] = None
+        self.job_list: Optional[JobListWidget] = None
+        self.web_profile_checkbox: Optional[QCheckBox] = None
+        self.dry_run_checkbox: Optional[QCheckBox] = None
         
         self._setup_ui()
     
@@ -294,7 +318,7 @@ class MainView(QMainWindow):
     def _setup_window(self) -> None:
         """Configura la ventana principal con diseño profesional."""
         self.setWindowTitle("DocToPDF Manager • Conversión Profesional de Documentos")
-        self.setFixedSize(650, 620)
+        self.setFixedSize(650, 720)
         self._center_window()
         
         # Configurar icono de la aplicación
@@ -404,7 +428,7 @@ class MainView(QMainWindow):
         self.content_frame.setGraphicsEffect(content_shadow)
         
         # Sección de instrucciones con icono
-        self.instruction_label = QLabel("📄  Selecciona un archivo Word (.docx)\npara comenzar la conversión")
+        self.instruction_label = QLabel("📄  Selecciona uno o varios archivos Word (.docx)\npara comenzar la conversión")
         self.instruction_label.setAlignment(Qt.AlignCenter)
         instruction_font = QFont("Segoe UI", 13, QFont.Normal)
         self.instruction_label.setFont(instruction_font)
@@ -421,14 +445,37 @@ class MainView(QMainWindow):
         file_font = QFont("Segoe UI", 11)
         self.file_label.setFont(file_font)
         
+        # Lista de trabajos con su estado y progreso individual
+        self.job_list = JobListWidget()
+        self.job_list.setFixedHeight(150)
+        
+        # Perfil de salida para publicar en el portal
+        self.web_profile_checkbox = QCheckBox("🌐  Optimizar para web")
+        self.web_profile_checkbox.setToolTip("PDF linealizado (vista web rápida) e imágenes reducidas")
+        self.web_profile_checkbox.setStyleSheet("color: #4a5568; background: transparent;")
+        self.web_profile_checkbox.toggled.connect(self._handle_web_profile_toggled)
+        
+        # Simulación: solo extrae los datos y propone los nombres
+        self.dry_run_checkbox = QCheckBox("🔍  Solo simular")
+        self.dry_run_checkbox.setToolTip("Muestra los nombres propuestos y las páginas sin datos sin escribir archivos")
+        self.dry_run_checkbox.setStyleSheet("color: #4a5568; background: transparent;")
+        self.dry_run_checkbox.toggled.connect(self._handle_dry_run_toggled)
+        self.job_list.job_activated.connect(self._handle_job_selected)
+        
         # Botones con nuevos estilos
         self.select_button = ModernButton("📁  Seleccionar Archivo", primary=False)
         self.convert_button = ModernButton("🚀  Iniciar Conversión", primary=True)
+        self.preview_button = ModernButton("🖼️  Vista Previa", primary=False)
+        self.preview_button.hide()
+        self.results_button = ModernButton("📋  Resultados", primary=False)
+        self.results_button.hide()
         
         # Configurar callbacks
         self.select_button.clicked.connect(self._handle_file_selection)
         self.convert_button.clicked.connect(self._handle_conversion_start)
-        self.file_label.file_dropped.connect(self._handle_file_dropped)
+        self.preview_button.clicked.connect(self._handle_preview_open)
+        self.results_button.clicked.connect(self._handle_results_open)
+        self.file_label.files_dropped.connect(self._handle_file_dropped)
         
         # Elementos de progreso con mejor diseño
         self.progress_label = QLabel("⚡  Procesando documento...")
@@ -483,8 +530,16 @@ class MainView(QMainWindow):
         content_layout.addWidget(self.instruction_label)
         content_layout.addWidget(self.file_label)
         
-        # Espacio mucho más grande entre file_label y botones para bajarlos considerablemente más
-        content_layout.addItem(QSpacerItem(20, 160, QSizePolicy.Minimum, QSizePolicy.Fixed))
+        content_layout.addWidget(self.job_list)
+        
+        # Opciones de los próximos trabajos
+        options_layout = QHBoxLayout()
+        options_layout.setSpacing(30)
+        options_layout.addItem(QSpacerItem(20, 20, QSizePolicy.Expanding, QSizePolicy.Minimum))
+        options_layout.addWidget(self.web_profile_checkbox)
+        options_layout.addWidget(self.dry_run_checkbox)
+        options_layout.addItem(QSpacerItem(20, 20, QSizePolicy.Expanding, QSizePolicy.Minimum))
+        content_layout.addLayout(options_layout)
         
         # Layout para botones con mejor espaciado
         button_layout = QHBoxLayout()
@@ -496,8 +551,18 @@ class MainView(QMainWindow):
         
         content_layout.addLayout(button_layout)
         
+        # Botones del último trabajo (visibles cuando hay resultados)
+        job_button_layout = QHBoxLayout()
+        job_button_layout.setSpacing(20)
+        job_button_layout.addItem(QSpacerItem(20, 20, QSizePolicy.Expanding, QSizePolicy.Minimum))
+        job_button_layout.addWidget(self.results_button)
+        job_button_layout.addWidget(self.preview_button)
+        job_button_layout.addItem(QSpacerItem(20, 20, QSizePolicy.Expanding, QSizePolicy.Minimum))
+        
+        content_layout.addLayout(job_button_layout)
+        
         # Espacio mayor entre botones y elementos de progreso para evitar superposición
-        content_layout.addItem(QSpacerItem(20, 40, QSizePolicy.Minimum, QSizePolicy.Fixed))
+        content_layout.addItem(QSpacerItem(20, 15, QSizePolicy.Minimum, QSizePolicy.Fixed))
         
         # Elementos de progreso
         content_layout.addWidget(self.progress_label)
@@ -513,42 +578,70 @@ class MainView(QMainWindow):
     
     def _handle_file_selection(self) -> None:
         """Maneja la selección de archivo."""
-        file_path, _ = QFileDialog.getOpenFileName(
+        file_paths, _ = QFileDialog.getOpenFileNames(
             self,
-            "Seleccionar archivo Word",
+            "Seleccionar archivos Word o PDF combinados",
             "",
-            "Archivos Word (*.docx);;Todos los archivos (*.*)"
+            "Documentos (*.docx *.pdf);;Archivos Word (*.docx);;PDF combinado (*.pdf);;Todos los archivos (*.*)"
         )
         
-        if file_path and self.on_file_select:
-            self.on_file_select(file_path)
+        if file_paths and self.on_file_select:
+            self.on_file_select(file_paths)
     
     def _handle_conversion_start(self) -> None:
         """Maneja el inicio de la conversión."""
         if self.on_convert_start:
             self.on_convert_start()
     
-    def _handle_file_dropped(self, file_path: str) -> None:
-        """Maneja el archivo arrastrado y soltado."""
+    def _handle_preview_open(self) -> None:
+        """Maneja la apertura de la vista previa."""
+        if self.on_preview_open:
+            self.on_preview_open()
+    
+    def _handle_results_open(self) -> None:
+        """Maneja la apertura de los resultados del trabajo."""
+        if self.on_results_open:
+            self.on_results_open()
+    
+    def _handle_job_selected(self, job_id: str) -> None:
+        """Maneja la selección de un trabajo de la lista."""
+        if self.on_job_selected:
+            self.on_job_selected(job_id)
+    
+    def _handle_web_profile_toggled(self, checked: bool) -> None:
+        """Maneja el cambio del perfil de salida."""
+        if self.on_web_profile_toggled:
+            self.on_web_profile_toggled(checked)
+    
+    def _handle_dry_run_toggled(self, checked: bool) -> None:
+        """Maneja el cambio del modo simulación."""
+        if self.on_dry_run_toggled:
+            self.on_dry_run_toggled(checked)
+    
+    def _handle_file_dropped(self, file_paths: List[str]) -> None:
+        """Maneja los archivos arrastrados y soltados."""
         try:
             # Actualizar la interfaz
-            self._update_file_display(file_path)
+            self._update_file_display(file_paths)
             
             # Notificar al presenter si el callback está configurado
             if self.on_file_select:
-                self.on_file_select(file_path)
+                self.on_file_select(file_paths)
                 
         except Exception as e:
             logger.error(f"Error en _handle_file_dropped: {e}")
             self._show_file_error()
 
-    def _update_file_display(self, file_path: str) -> None:
-        """Actualiza solo la visualización del archivo sin causar recursión."""
+    def _update_file_display(self, file_paths: List[str]) -> None:
+        """Actualiza solo la visualización de los archivos sin causar recursión."""
         try:
-            filename = os.path.basename(file_path)
-            # Si el nombre es muy largo, cortarlo y agregar "..."
-            if len(filename) > 40:
-                filename = filename[:37] + "..."
+            if len(file_paths) == 1:
+                filename = os.path.basename(file_paths[0])
+                # Si el nombre es muy largo, cortarlo y agregar "..."
+                if len(filename) > 40:
+                    filename = filename[:37] + "..."
+            else:
+                filename = f"{len(file_paths)} archivos seleccionados"
             
             self.file_label.setText(f"✅  {filename}")
             
@@ -595,9 +688,9 @@ class MainView(QMainWindow):
         except Exception as e:
             logger.critical(f"Error crítico en _show_file_error: {e}")
 
-    def update_selected_file(self, file_path: str) -> None:
-        """Actualiza la etiqueta del archivo seleccionado con animación."""
-        self._update_file_display(file_path)
+    def update_selected_files(self, file_paths: List[str]) -> None:
+        """Actualiza la etiqueta de los archivos seleccionados."""
+        self._update_file_display(file_paths)
     
     def clear_selected_file(self) -> None:
         """Limpia la selección de archivo y restaura el estado inicial."""
@@ -643,33 +736,84 @@ class MainView(QMainWindow):
         except Exception as e:
             logger.error(f"Error al limpiar archivo seleccionado: {e}")
 
-    def show_loading(self) -> None:
-        """Muestra el estado de carga con mejor diseño."""
-        self.select_button.setEnabled(False)
-        self.convert_button.setEnabled(False)
-        self.progress_label.show()
-        self.progress_bar.show()
-        self.status_label.setText("⚡  Conversión en progreso • Por favor espera...")
-        self.status_label.setStyleSheet("""
-            color: #ed8936; 
-            margin-top: 15px;
-            background: transparent;
-            font-weight: 500;
-        """)
+    def set_preview_available(self, available: bool) -> None:
+        """Muestra u oculta el botón de vista previa del último trabajo."""
+        self.preview_button.setVisible(available)
     
-    def hide_loading(self) -> None:
-        """Oculta el estado de carga y restaura la interfaz."""
-        self.progress_label.hide()
-        self.progress_bar.hide()
-        self.select_button.setEnabled(True)
-        self.convert_button.setEnabled(True)
-        self.status_label.setText("✨  Todo listo para convertir tus documentos")
-        self.status_label.setStyleSheet("""
-            color: #48bb78; 
-            margin-top: 15px;
-            background: transparent;
-            font-weight: 500;
-        """)
+    def set_results_available(self, available: bool) -> None:
+        """Muestra u oculta el botón de resultados del último trabajo."""
+        self.results_button.setVisible(available)
+    
+    def set_web_profile_checked(self, checked: bool) -> None:
+        """Marca la casilla del perfil web según el perfil configurado."""
+        self.web_profile_checkbox.setChecked(checked)
+    
+    def show_results_panel(self) -> ResultsPanel:
+        """
+        Muestra el panel de resultados del trabajo.
+        
+        Returns:
+            Panel de resultados (se reutiliza entre trabajos)
+        """
+        if self.results_panel is None:
+            self.results_panel = ResultsPanel(parent=self)
+            icon_path = get_app_icon()
+            if icon_path:
+                self.results_panel.setWindowIcon(QIcon(icon_path))
+        
+        self.results_panel.show()
+        self.results_panel.raise_()
+        return self.results_panel
+    
+    def show_preview(self, output_folder: str, cache: ThumbnailCache) -> PreviewPanel:
+        """
+        Abre el panel de vista previa con los diplomas de una carpeta.
+        
+        Args:
+            output_folder: Carpeta con los PDFs individuales
+            cache: Caché de miniaturas compartida entre aperturas del panel
+            
+        Returns:
+            Panel de vista previa mostrado
+        """
+        if self.preview_panel is None:
+            self.preview_panel = PreviewPanel(cache, parent=self)
+            icon_path = get_app_icon()
+            if icon_path:
+                self.preview_panel.setWindowIcon(QIcon(icon_path))
+        
+        self.preview_panel.load_folder(output_folder)
+        self.preview_panel.show()
+        self.preview_panel.raise_()
+        return self.preview_panel
+    
+    def set_queue_status(self, running: int, queued: int) -> None:
+        """
+        Muestra el estado de la cola de trabajos.
+        
+        Args:
+            running: Trabajos en ejecución
+            queued: Trabajos esperando un hilo libre
+        """
+        if running or queued:
+            self.progress_label.setText(f"⚡  {running} en proceso • {queued} en cola")
+            self.progress_label.show()
+            self.status_label.setText("⚡  Conversión en progreso • Puedes seguir agregando archivos")
+            self.status_label.setStyleSheet("""
+                color: #ed8936; 
+                margin-top: 15px;
+                background: transparent;
+                font-weight: 500;
+            """)
+        else:
+            self.progress_label.hide()
+            self.status_label.setText("✨  Todo listo para convertir tus documentos")
+            self.status_label.setStyleSheet("""
+                color: #48bb78; 
+                margin-top: 15px;
+                background: transparent;
+                font-weight: 500;
+            """)
     
     def show_success_message(self, message: str) -> None:
         """Muestra un mensaje de éxito con diseño moderno."""
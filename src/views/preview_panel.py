@@ -0,0 +1,291 @@
+"""
+Panel de vista previa con miniaturas de los diplomas generados.
+Las miniaturas se renderizan con PyMuPDF en un pool de hilos en segundo plano,
+se guardan en una caché LRU limitada por tamaño y se cargan solo al hacerse visibles.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+import fitz
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QListWidget, QListWidgetItem,
+    QListView, QAbstractItemView, QFileDialog, QPushButton
+)
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, QTimer, QSize, QPoint, QUrl, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap, QIcon, QColor, QDesktopServices
+from src.utils import get_logger
+
+logger = get_logger("preview_panel")
+
+# Ancho de las miniaturas en píxeles
+THUMBNAIL_WIDTH = 160
+
+# Memoria máxima de la caché de miniaturas (bytes)
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+# Miniaturas adicionales que se precargan fuera del área visible
+LOOKAHEAD_ITEMS = 8
+
+CacheKey = Tuple[str, int, int]
+
+
+class ThumbnailCache:
+    """Caché LRU de miniaturas limitada por el tamaño total de las imágenes."""
+    
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._images: "OrderedDict[CacheKey, QImage]" = OrderedDict()
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(pdf_filename: str, width: int = THUMBNAIL_WIDTH) -> Optional[CacheKey]:
+        """Genera la clave de caché (archivo, fecha de modificación, ancho)."""
+        try:
+            return os.path.abspath(pdf_filename), os.stat(pdf_filename).st_mtime_ns, width
+        except OSError:
+            return None
+    
+    def get(self, key: CacheKey) -> Optional[QImage]:
+        """Devuelve una miniatura y la marca como usada recientemente."""
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+            return image
+    
+    def put(self, key: CacheKey, image: QImage) -> None:
+        """Guarda una miniatura y descarta las menos usadas si se excede el límite."""
+        size = image.sizeInBytes()
+        with self._lock:
+            previous = self._images.pop(key, None)
+            if previous is not None:
+                self._current_bytes -= previous.sizeInBytes()
+            
+            self._images[key] = image
+            self._current_bytes += size
+            
+            while self._current_bytes > self.max_bytes and len(self._images) > 1:
+                _, evicted = self._images.popitem(last=False)
+                self._current_bytes -= evicted.sizeInBytes()
+    
+    @property
+    def current_bytes(self) -> int:
+        """Memoria ocupada actualmente por las miniaturas."""
+        return self._current_bytes
+    
+    def __len__(self) -> int:
+        return len(self._images)
+
+
+class ThumbnailSignals(QObject):
+    """Señales emitidas por las tareas de renderizado."""
+    
+    rendered = pyqtSignal(object, QImage)
+    failed = pyqtSignal(object, str)
+
+
+class ThumbnailTask(QRunnable):
+    """Renderiza la primera página de un PDF como miniatura en un hilo del pool."""
+    
+    def __init__(self, key: CacheKey, signals: ThumbnailSignals):
+        super().__init__()
+        self.key = key
+        self.signals = signals
+    
+    def run(self) -> None:
+        pdf_filename, _, width = self.key
+        try:
+            doc = fitz.open(pdf_filename)
+            try:
+                page = doc[0]
+                zoom = width / page.rect.width
+                pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+                # copy() desacopla la imagen del búfer de PyMuPDF antes de cerrarlo
+                image = QImage(pixmap.samples, pixmap.width, pixmap.height,
+                               pixmap.stride, QImage.Format_RGB888).copy()
+            finally:
+                doc.close()
+            self.signals.rendered.emit(self.key, image)
+        except Exception as e:
+            self.signals.failed.emit(self.key, str(e))
+
+
+class PreviewPanel(QWidget):
+    """Ventana con las miniaturas de todos los diplomas de una carpeta de salida."""
+    
+    def __init__(self, cache: Optional[ThumbnailCache] = None, max_workers: int = 2, parent=None):
+        super().__init__(parent, Qt.Window)
+        self.cache = cache if cache is not None else ThumbnailCache()
+        self.output_folder: Optional[str] = None
+        
+        # Callback asignado por el Presenter para exportar la hoja de contacto
+        self.on_export_contact_sheet: Optional[Callable[[str, str], None]] = None
+        
+        self._thread_pool = QThreadPool(self)
+        self._thread_pool.setMaxThreadCount(max(1, max_workers))
+        self._signals = ThumbnailSignals()
+        self._signals.rendered.connect(self._on_thumbnail_rendered)
+        self._signals.failed.connect(self._on_thumbnail_failed)
+        self._pending: dict = {}
+        
+        # Agrupa los eventos de desplazamiento para no encolar renders en cada píxel
+        self._visible_timer = QTimer(self)
+        self._visible_timer.setSingleShot(True)
+        self._visible_timer.setInterval(50)
+        self._visible_timer.timeout.connect(self._request_visible_thumbnails)
+        
+        self._setup_ui()
+    
+    def _setup_ui(self) -> None:
+        """Configura la interfaz del panel."""
+        self.setWindowTitle("Vista previa de diplomas")
+        self.resize(900, 650)
+        
+        self.summary_label = QLabel("")
+        self.summary_label.setStyleSheet("color: #4a5568; font-weight: 500;")
+        
+        self.export_button = QPushButton("📑  Exportar hoja de contacto")
+        self.export_button.setStyleSheet("""
+            QPushButton {
+                background: #edf2f7;
+                color: #4a5568;
+                border: 2px solid #e2e8f0;
+                padding: 8px 16px;
+                border-radius: 8px;
+                font-weight: 600;
+            }
+            QPushButton:hover {
+                background: #e2e8f0;
+                border-color: #cbd5e0;
+            }
+        """)
+        self.export_button.clicked.connect(self._handle_export)
+        
+        self.list_widget = QListWidget()
+        self.list_widget.setViewMode(QListView.IconMode)
+        self.list_widget.setResizeMode(QListView.Adjust)
+        self.list_widget.setMovement(QListView.Static)
+        self.list_widget.setUniformItemSizes(True)
+        self.list_widget.setIconSize(QSize(THUMBNAIL_WIDTH, int(THUMBNAIL_WIDTH * 1.42)))
+        self.list_widget.setGridSize(QSize(THUMBNAIL_WIDTH + 30, int(THUMBNAIL_WIDTH * 1.42) + 45))
+        self.list_widget.setWordWrap(True)
+        self.list_widget.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.list_widget.verticalScrollBar().valueChanged.connect(lambda _: self._visible_timer.start())
+        self.list_widget.itemDoubleClicked.connect(self._open_item)
+        
+        header_layout = QHBoxLayout()
+        header_layout.addWidget(self.summary_label)
+        header_layout.addStretch()
+        header_layout.addWidget(self.export_button)
+        
+        layout = QVBoxLayout(self)
+        layout.addLayout(header_layout)
+        layout.addWidget(self.list_widget)
+    
+    def load_folder(self, output_folder: str) -> None:
+        """
+        Muestra los diplomas de una carpeta; las miniaturas se cargan al hacerse visibles.
+        
+        Args:
+            output_folder: Carpeta con los PDFs individuales
+        """
+        self.output_folder = output_folder
+        self._pending.clear()
+        self.list_widget.clear()
+        
+        placeholder = QPixmap(self.list_widget.iconSize())
+        placeholder.fill(QColor("#edf2f7"))
+        placeholder_icon = QIcon(placeholder)
+        
+        pdf_files = sorted(f for f in os.listdir(output_folder) if f.lower().endswith(".pdf"))
+        for filename in pdf_files:
+            item = QListWidgetItem(placeholder_icon, filename)
+            item.setData(Qt.UserRole, os.path.join(output_folder, filename))
+            item.setToolTip(filename)
+            self.list_widget.addItem(item)
+        
+        self.summary_label.setText(f"📄  {len(pdf_files)} diplomas en {os.path.basename(output_folder)}")
+        self._visible_timer.start()
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._visible_timer.start()
+    
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._visible_timer.start()
+    
+    def _request_visible_thumbnails(self) -> None:
+        """Encola el renderizado de las miniaturas visibles (y algunas siguientes)."""
+        count = self.list_widget.count()
+        if not count:
+            return
+        
+        viewport = self.list_widget.viewport()
+        grid = self.list_widget.gridSize()
+        capacity = (viewport.width() // grid.width() + 1) * (viewport.height() // grid.height() + 1)
+        
+        first_index = self.list_widget.indexAt(QPoint(grid.width() // 2, 5))
+        first_row = first_index.row() if first_index.isValid() else 0
+        last_row = min(count - 1, first_row + capacity + LOOKAHEAD_ITEMS)
+        
+        for row in range(first_row, last_row + 1):
+            self._request_thumbnail(self.list_widget.item(row))
+    
+    def _request_thumbnail(self, item: QListWidgetItem) -> None:
+        """Usa la caché o encola el renderizado de una miniatura."""
+        if item.data(Qt.UserRole + 1):
+            return
+        
+        key = ThumbnailCache.make_key(item.data(Qt.UserRole))
+        if key is None or key in self._pending:
+            return
+        
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._apply_thumbnail(item, cached)
+            return
+        
+        self._pending[key] = item
+        self._thread_pool.start(ThumbnailTask(key, self._signals))
+    
+    def _on_thumbnail_rendered(self, key: CacheKey, image: QImage) -> None:
+        """Recibe una miniatura renderizada en segundo plano (hilo de la interfaz)."""
+        self.cache.put(key, image)
+        item = self._pending.pop(key, None)
+        if item is not None and self.list_widget.row(item) >= 0:
+            self._apply_thumbnail(item, image)
+    
+    def _on_thumbnail_failed(self, key: CacheKey, error_message: str) -> None:
+        """Registra una miniatura que no se pudo renderizar."""
+        self._pending.pop(key, None)
+        logger.warning("No se pudo generar la miniatura de %s: %s", key[0], error_message)
+    
+    def _apply_thumbnail(self, item: QListWidgetItem, image: QImage) -> None:
+        """Muestra una miniatura en su elemento de la lista."""
+        item.setIcon(QIcon(QPixmap.fromImage(image)))
+        item.setData(Qt.UserRole + 1, True)
+    
+    def _open_item(self, item: QListWidgetItem) -> None:
+        """Abre el diploma en el visor predeterminado del sistema."""
+        QDesktopServices.openUrl(QUrl.fromLocalFile(item.data(Qt.UserRole)))
+    
+    def _handle_export(self) -> None:
+        """Pide la ruta de la hoja de contacto y delega la exportación."""
+        if not self.output_folder:
+            return
+        
+        default_name = os.path.normpath(self.output_folder) + "_hoja_contacto.pdf"
+        target, _ = QFileDialog.getSaveFileName(self, "Exportar hoja de contacto", default_name,
+                                                "Archivos PDF (*.pdf)")
+        if target and self.on_export_contact_sheet:
+            self.on_export_contact_sheet(self.output_folder, target)
+    
+    def closeEvent(self, event):
+        """Descarta los renders pendientes al cerrar el panel."""
+        self._thread_pool.clear()
+        self._pending.clear()
+        super().closeEvent(event)
@@ -0,0 +1,259 @@
+"""
+Vista de resultados de un trabajo.
+Muestra en una tabla virtualizada cada página generada a medida que se procesa,
+con filtro por estado y apertura directa de los archivos.
+"""
+
+import os
+from typing import Any, Dict, List, Optional, Set
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QTableView,
+    QHeaderView, QAbstractItemView
+)
+from PyQt5.QtCore import (
+    Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel, QTimer, QUrl
+)
+from PyQt5.QtGui import QColor, QDesktopServices
+from src.models.pdf_processor import PageResult, PAGE_STATUS_OK, PAGE_STATUS_FALLBACK, PAGE_STATUS_COLLISION
+from src.utils import get_logger
+
+logger = get_logger("results_view")
+
+# Intervalo (ms) para agrupar las filas recibidas antes de insertarlas
+FLUSH_INTERVAL_MS = 100
+
+STATUS_LABELS = {
+    PAGE_STATUS_OK: "✅ Correcto",
+    PAGE_STATUS_FALLBACK: "⚠️ Sin datos",
+    PAGE_STATUS_COLLISION: "🔁 Nombre duplicado",
+}
+
+STATUS_COLORS = {
+    PAGE_STATUS_OK: QColor("#276749"),
+    PAGE_STATUS_FALLBACK: QColor("#c05621"),
+    PAGE_STATUS_COLLISION: QColor("#b7791f"),
+}
+
+# Opciones del filtro: (texto, estados incluidos)
+STATUS_FILTERS = [
+    ("Todos los estados", None),
+    ("Solo con problemas", {PAGE_STATUS_FALLBACK, PAGE_STATUS_COLLISION}),
+    ("Sin datos (page_N.pdf)", {PAGE_STATUS_FALLBACK}),
+    ("Nombres duplicados", {PAGE_STATUS_COLLISION}),
+    ("Correctos", {PAGE_STATUS_OK}),
+]
+
+
+class JobResultsTableModel(QAbstractTableModel):
+    """Modelo de tabla con el resultado de cada página de un trabajo."""
+    
+    COLUMNS = ["Página", "Archivo", "Registro", "Nombre", "Estado"]
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: List[PageResult] = []
+        self._status_counts: Dict[str, int] = {}
+        self._bytes_saved = 0
+    
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+    
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.COLUMNS)
+    
+    def headerData(self, section: int, orientation, role: int = Qt.DisplayRole) -> Any:
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return None
+    
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        
+        result = self._rows[index.row()]
+        column = index.column()
+        
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return result.page_number
+            if column == 1:
+                return result.filename
+            if column == 2:
+                return result.registration_number or "—"
+            if column == 3:
+                return result.name or "—"
+            return STATUS_LABELS.get(result.status, result.status)
+        if role == Qt.ForegroundRole and column == 4:
+            return STATUS_COLORS.get(result.status)
+        if role == Qt.UserRole:
+            return result
+        return None
+    
+    def append_results(self, results: List[PageResult]) -> None:
+        """Agrega un lote de filas con una sola notificación a la vista."""
+        if not results:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(results) - 1)
+        self._rows.extend(results)
+        for result in results:
+            self._status_counts[result.status] = self._status_counts.get(result.status, 0) + 1
+            self._bytes_saved += result.bytes_saved
+        self.endInsertRows()
+    
+    def clear(self) -> None:
+        """Elimina todas las filas."""
+        self.beginResetModel()
+        self._rows = []
+        self._status_counts = {}
+        self._bytes_saved = 0
+        self.endResetModel()
+    
+    def count_by_status(self, status: str) -> int:
+        """Cuenta las filas con un estado dado."""
+        return self._status_counts.get(status, 0)
+    
+    @property
+    def bytes_saved(self) -> int:
+        """Bytes ahorrados por el perfil de salida en las filas cargadas."""
+        return self._bytes_saved
+
+
+class StatusFilterProxyModel(QSortFilterProxyModel):
+    """Filtra las filas del modelo de resultados por estado."""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._statuses: Optional[Set[str]] = None
+    
+    def set_statuses(self, statuses: Optional[Set[str]]) -> None:
+        """Define los estados visibles (None muestra todos)."""
+        self._statuses = statuses
+        self.invalidateFilter()
+    
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
+        if self._statuses is None:
+            return True
+        index = self.sourceModel().index(source_row, 0, source_parent)
+        return self.sourceModel().data(index, Qt.UserRole).status in self._statuses
+
+
+class ResultsPanel(QWidget):
+    """Ventana con los resultados de un trabajo, actualizada en vivo."""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent, Qt.Window)
+        self.output_folder: Optional[str] = None
+        self._buffer: List[PageResult] = []
+        
+        self.table_model = JobResultsTableModel(self)
+        self.proxy_model = StatusFilterProxyModel(self)
+        self.proxy_model.setSourceModel(self.table_model)
+        
+        # Las filas se insertan por lotes para mantener fluida la tabla en trabajos grandes
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setInterval(FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self._flush_buffer)
+        
+        self._setup_ui()
+    
+    def _setup_ui(self) -> None:
+        """Configura la interfaz del panel."""
+        self.setWindowTitle("Resultados del trabajo")
+        self.resize(900, 600)
+        
+        self.summary_label = QLabel("")
+        self.summary_label.setStyleSheet("color: #4a5568; font-weight: 500;")
+        
+        self.filter_combo = QComboBox()
+        for label, _ in STATUS_FILTERS:
+            self.filter_combo.addItem(label)
+        self.filter_combo.currentIndexChanged.connect(self._on_filter_changed)
+        
+        self.table_view = QTableView()
+        self.table_view.setModel(self.proxy_model)
+        self.table_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table_view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table_view.setAlternatingRowColors(True)
+        self.table_view.setSortingEnabled(False)
+        self.table_view.setWordWrap(False)
+        # Altura fija: la vista no mide cada fila, solo pinta las visibles
+        vertical_header = self.table_view.verticalHeader()
+        vertical_header.setSectionResizeMode(QHeaderView.Fixed)
+        vertical_header.setDefaultSectionSize(24)
+        vertical_header.hide()
+        horizontal_header = self.table_view.horizontalHeader()
+        horizontal_header.setSectionResizeMode(QHeaderView.Interactive)
+        horizontal_header.setStretchLastSection(True)
+        for column, width in enumerate((60, 320, 90, 250)):
+            self.table_view.setColumnWidth(column, width)
+        self.table_view.doubleClicked.connect(self._open_index)
+        
+        header_layout = QHBoxLayout()
+        header_layout.addWidget(self.summary_label)
+        header_layout.addStretch()
+        header_layout.addWidget(QLabel("Filtrar:"))
+        header_layout.addWidget(self.filter_combo)
+        
+        layout = QVBoxLayout(self)
+        layout.addLayout(header_layout)
+        layout.addWidget(self.table_view)
+    
+    def start_job(self, output_folder: str) -> None:
+        """
+        Prepara el panel para un trabajo nuevo.
+        
+        Args:
+            output_folder: Carpeta donde se publicarán las páginas
+        """
+        self.output_folder = output_folder
+        self._buffer = []
+        self.table_model.clear()
+        self.setWindowTitle(f"Resultados • {os.path.basename(output_folder)}")
+        self._update_summary()
+        self._flush_timer.start()
+    
+    def add_result(self, result: PageResult) -> None:
+        """Recibe el resultado de una página (se inserta en el siguiente lote)."""
+        self._buffer.append(result)
+    
+    def finish_job(self) -> None:
+        """Inserta las filas pendientes y detiene las actualizaciones en vivo."""
+        self._flush_timer.stop()
+        self._flush_buffer()
+    
+    def _flush_buffer(self) -> None:
+        """Inserta en la tabla las filas acumuladas desde el último lote."""
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        self.table_model.append_results(batch)
+        self._update_summary()
+    
+    def _update_summary(self) -> None:
+        """Actualiza los contadores del encabezado."""
+        summary = (
+            f"📄  {self.table_model.rowCount()} páginas • "
+            f"⚠️ {self.table_model.count_by_status(PAGE_STATUS_FALLBACK)} sin datos • "
+            f"🔁 {self.table_model.count_by_status(PAGE_STATUS_COLLISION)} duplicados"
+        )
+        if self.table_model.bytes_saved:
+            summary += f" • 💾 {self.table_model.bytes_saved / (1024 * 1024):.1f} MB ahorrados"
+        self.summary_label.setText(summary)
+    
+    def _on_filter_changed(self, position: int) -> None:
+        """Aplica el filtro de estado seleccionado."""
+        self.proxy_model.set_statuses(STATUS_FILTERS[position][1])
+    
+    def _open_index(self, proxy_index: QModelIndex) -> None:
+        """Abre el archivo de la fila en el visor predeterminado del sistema."""
+        result = self.proxy_model.data(proxy_index, Qt.UserRole)
+        if result is None or not self.output_folder:
+            return
+        
+        file_path = os.path.join(self.output_folder, result.filename)
+        if os.path.exists(file_path):
+            QDesktopServices.openUrl(QUrl.fromLocalFile(file_path))
+        else:
+            logger.warning("El archivo aún no está publicado: %s", file_path)
@@ -0,0 +1,242 @@
+"""
+Pruebas del registro de motores de conversión con motores simulados.
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+from src.models import converter_backends
+from src.models.converter_backends import (
+    ConverterBackend, ConverterRegistry, FIDELITY_FULL, FIDELITY_TEXT
+)
+from src.models.document_converter import DocumentConverter
+from src.models.exceptions import DocumentConversionError
+
+
+class StubBackend(ConverterBackend):
+    """Motor simulado: escribe un PDF vacío o falla según se indique."""
+    
+    def __init__(self, name, fidelity=FIDELITY_FULL, seconds_per_mb=1.0, available=True):
+        self.name = name
+        self.fidelity = fidelity
+        self.nominal_seconds_per_mb = seconds_per_mb
+        self.available = available
+        self.failure = None
+        self.calls = 0
+    
+    def is_available(self):
+        return self.available
+    
+    def convert(self, docx_filename, output_pdf_filename, timeout):
+        self.calls += 1
+        if self.failure is not None:
+            raise self.failure
+        with open(output_pdf_filename, "wb") as output:
+            output.write(b"%PDF-1.4\n")
+
+
+@pytest.fixture
+def docx(tmp_path):
+    path = tmp_path / "documento.docx"
+    path.write_bytes(b"x" * 1024)
+    return str(path)
+
+
+@pytest.fixture
+def backends():
+    return {
+        "word": StubBackend("word", seconds_per_mb=5.0),
+        "libreoffice": StubBackend("libreoffice", seconds_per_mb=2.0),
+        "texto": StubBackend("texto", FIDELITY_TEXT, seconds_per_mb=0.1),
+    }
+
+
+def names(candidates):
+    return [backend.name for backend in candidates]
+
+
+def test_select_orders_by_estimated_latency(backends, docx):
+    registry = ConverterRegistry(list(backends.values()))
+    assert names(registry.select(docx)) == ["libreoffice", "word"]
+    assert names(registry.select(docx, allow_degraded=True)) == ["libreoffice", "word", "texto"]
+
+
+def test_unavailable_backend_is_skipped(backends, docx):
+    backends["libreoffice"].available = False
+    registry = ConverterRegistry(list(backends.values()))
+    assert names(registry.select(docx, allow_degraded=True)) == ["word", "texto"]
+
+
+def test_failover_to_next_backend(backends, docx, tmp_path):
+    backends["libreoffice"].failure = DocumentConversionError("falló")
+    registry = ConverterRegistry(list(backends.values()))
+    
+    used = registry.convert(docx, str(tmp_path / "salida.pdf"))
+    
+    assert used == "word"
+    stats = registry.stats()
+    assert stats["libreoffice"].failures == 1
+    assert stats["word"].successes == 1
+    assert backends["texto"].calls == 0
+
+
+def test_timeout_quarantines_backend(backends, docx, tmp_path):
+    backends["libreoffice"].failure = subprocess.TimeoutExpired("soffice", 30)
+    registry = ConverterRegistry(list(backends.values()))
+    
+    assert registry.convert(docx, str(tmp_path / "salida.pdf")) == "word"
+    
+    stats = registry.stats()["libreoffice"]
+    assert stats.timeouts == 1
+    assert stats.unhealthy_since is not None
+    assert names(registry.select(docx)) == ["word", "libreoffice"]
+
+
+def test_quarantined_full_fidelity_precedes_degraded(backends, docx, tmp_path):
+    backends["word"].available = False
+    backends["libreoffice"].failure = subprocess.TimeoutExpired("soffice", 30)
+    registry = ConverterRegistry(list(backends.values()))
+    with pytest.raises(DocumentConversionError):
+        registry.convert(docx, str(tmp_path / "salida.pdf"))
+    
+    # Tras un solo cuelgue no se cambia a un PDF de solo texto mientras dure la cuarentena
+    assert names(registry.select(docx)) == ["libreoffice"]
+    assert names(registry.select(docx, allow_degraded=True)) == ["libreoffice", "texto"]
+    
+    backends["libreoffice"].failure = None
+    assert registry.convert(docx, str(tmp_path / "salida.pdf"), allow_degraded=True) == "libreoffice"
+    assert backends["texto"].calls == 0
+
+
+def test_repeated_failures_quarantine_backend(backends, docx, tmp_path):
+    backends["word"].available = False
+    backends["libreoffice"].failure = DocumentConversionError("falló")
+    registry = ConverterRegistry(list(backends.values()))
+    
+    with pytest.raises(DocumentConversionError):
+        registry.convert(docx, str(tmp_path / "salida.pdf"))
+    assert registry.stats()["libreoffice"].unhealthy_since is None
+    with pytest.raises(DocumentConversionError):
+        registry.convert(docx, str(tmp_path / "salida.pdf"))
+    assert registry.stats()["libreoffice"].unhealthy_since is not None
+
+
+def test_recovery_after_cooldown(backends, docx, tmp_path, monkeypatch):
+    backends["libreoffice"].failure = subprocess.TimeoutExpired("soffice", 30)
+    backends["word"].failure = DocumentConversionError("falló")
+    registry = ConverterRegistry(list(backends.values()))
+    with pytest.raises(DocumentConversionError):
+        registry.convert(docx, str(tmp_path / "salida.pdf"))
+    assert names(registry.select(docx)) == ["word", "libreoffice"]
+    
+    monkeypatch.setattr(converter_backends, "UNHEALTHY_COOLDOWN_SECONDS", 0)
+    assert names(registry.select(docx)) == ["libreoffice", "word"]
+    backends["libreoffice"].failure = None
+    assert registry.convert(docx, str(tmp_path / "salida.pdf")) == "libreoffice"
+    
+    stats = registry.stats()["libreoffice"]
+    assert stats.unhealthy_since is None
+    assert stats.consecutive_failures == 0
+
+
+def test_degraded_backend_requires_permission(backends, docx, tmp_path):
+    backends["word"].failure = DocumentConversionError("falló")
+    backends["libreoffice"].failure = DocumentConversionError("falló")
+    registry = ConverterRegistry(list(backends.values()))
+    
+    with pytest.raises(DocumentConversionError):
+        registry.convert(docx, str(tmp_path / "salida.pdf"))
+    assert backends["texto"].calls == 0
+    assert registry.convert(docx, str(tmp_path / "salida.pdf"), allow_degraded=True) == "texto"
+
+
+def test_document_converter_does_not_degrade_by_default(backends, docx, tmp_path):
+    backends["word"].available = False
+    backends["libreoffice"].failure = DocumentConversionError("falló")
+    converter = DocumentConverter(ConverterRegistry(list(backends.values())))
+    
+    with pytest.raises(DocumentConversionError):
+        converter.convert_word_to_pdf(docx, str(tmp_path / "salida.pdf"), preflight=False)
+    assert backends["texto"].calls == 0
+
+
+def test_no_available_backend(docx, tmp_path):
+    registry = ConverterRegistry([StubBackend("word", available=False)])
+    with pytest.raises(DocumentConversionError):
+        registry.convert(docx, str(tmp_path / "salida.pdf"))
+
+
+def test_preferred_backends_has_no_side_effects(backends, docx, tmp_path):
+    probes = []
+    backends["word"].is_available = lambda: probes.append("word") or False
+    registry = ConverterRegistry(list(backends.values()))
+    
+    assert registry.preferred_backends() == ["libreoffice", "word"]
+    assert probes == []
+    assert registry._selections == 0
+    
+    registry.convert(docx, str(tmp_path / "salida.pdf"))
+    assert probes == ["word"]
+    assert registry.preferred_backends() == ["libreoffice"]
+    assert registry._selections == 1
+
+
+class FakeDocument:
+    def __init__(self, release):
+        self.release = release
+    
+    def ExportAsFixedFormat(self, OutputFileName, **kwargs):
+        self.release.wait()
+        with open(OutputFileName, "wb") as output:
+            output.write(b"%PDF-1.4\n")
+    
+    def Close(self, SaveChanges):
+        pass
+
+
+@pytest.fixture
+def fake_word(monkeypatch):
+    """Simula comtypes/pythoncom; Word exporta solo cuando se libera el evento."""
+    release = threading.Event()
+    word_app = types.SimpleNamespace(
+        Documents=types.SimpleNamespace(Open=lambda filename, ReadOnly: FakeDocument(release)),
+        Quit=lambda: None
+    )
+    client = types.SimpleNamespace(CreateObject=lambda name: word_app)
+    monkeypatch.setitem(sys.modules, "comtypes", types.SimpleNamespace(client=client))
+    monkeypatch.setitem(sys.modules, "comtypes.client", client)
+    monkeypatch.setitem(sys.modules, "pythoncom",
+                        types.SimpleNamespace(CoInitialize=lambda: None, CoUninitialize=lambda: None))
+    return release
+
+
+def test_word_backend_converts_in_time(fake_word, docx, tmp_path):
+    fake_word.set()
+    output = tmp_path / "salida.pdf"
+    
+    converter_backends.WordBackend().convert(docx, str(output), timeout=5)
+    
+    assert output.read_bytes().startswith(b"%PDF")
+    assert sorted(os.listdir(tmp_path)) == ["documento.docx", "salida.pdf"]
+
+
+def test_word_backend_enforces_timeout(fake_word, docx, tmp_path):
+    output = tmp_path / "salida.pdf"
+    
+    started = time.monotonic()
+    with pytest.raises(subprocess.TimeoutExpired):
+        converter_backends.WordBackend().convert(docx, str(output), timeout=0.2)
+    assert time.monotonic() - started < 2
+    
+    # Un Word tardío no deja archivos ni escribe en el destino
+    fake_word.set()
+    deadline = time.monotonic() + 5
+    while len(os.listdir(tmp_path)) > 1 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert os.listdir(tmp_path) == ["documento.docx"]
@@ -0,0 +1,111 @@
+"""
+Pruebas del protocolo de arrendamiento con nodos lanzados como procesos locales.
+"""
+
+import multiprocessing
+import os
+import sqlite3
+import time
+
+import fitz
+import pytest
+
+from src.models import DocumentProcessingModel
+from src.models.conversion_job import ConversionJob
+from src.models.distributed import (
+    DistributedCoordinator, WorkQueue, QUEUE_FILENAME, SHARD_DONE, run_local_worker
+)
+from src.models.exceptions import PDFProcessingError
+from src.utils import AppSettings
+
+LEASE_SECONDS = 2.0
+
+
+def make_batch(path, count):
+    doc = fitz.open()
+    for number in range(1, count + 1):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"PERSONA {number}")
+        page.insert_text((72, 92), f"Registro No. {100 + number}")
+    doc.save(str(path))
+    doc.close()
+
+
+@pytest.fixture
+def coordinator(tmp_path):
+    settings = AppSettings(artifacts_dir=str(tmp_path / "jobs"), index_path=str(tmp_path / "indice.db"),
+                           history_path=None)
+    return DistributedCoordinator(str(tmp_path / "compartida"), DocumentProcessingModel(settings),
+                                  shard_pages=1, lease_seconds=LEASE_SECONDS, poll_interval=0.2)
+
+
+def start_workers(work_dir, count):
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=run_local_worker, args=(work_dir,),
+                               kwargs={"idle_exit_seconds": LEASE_SECONDS * 2, "lease_seconds": LEASE_SECONDS})
+               for _ in range(count)]
+    for worker in workers:
+        worker.start()
+    return workers
+
+
+def shard_rows(work_dir, job_id):
+    connection = sqlite3.connect(os.path.join(work_dir, QUEUE_FILENAME))
+    try:
+        return connection.execute(
+            "SELECT first_page, status, worker_id, attempts FROM shards WHERE job_id = ? ORDER BY first_page",
+            (job_id,)
+        ).fetchall()
+    finally:
+        connection.close()
+
+
+def test_workers_complete_job_and_take_over_expired_lease(coordinator, tmp_path):
+    batch = tmp_path / "lote.pdf"
+    make_batch(batch, 4)
+    job = ConversionJob.create(str(batch))
+    work_dir = coordinator.queue.work_dir
+    assert coordinator.submit(job) == 4
+    
+    # Un nodo que toma el primer fragmento y desaparece sin renovarlo
+    abandoned = WorkQueue(work_dir, LEASE_SECONDS).lease("nodo-caido")
+    assert abandoned.first_page == 1
+    
+    workers = start_workers(work_dir, 2)
+    try:
+        deadline = time.monotonic() + 60
+        while not coordinator.queue.progress(job.job_id).finished:
+            assert time.monotonic() < deadline, "los nodos no terminaron el trabajo"
+            time.sleep(0.2)
+        
+        rows = shard_rows(work_dir, job.job_id)
+        assert [row[1] for row in rows] == [SHARD_DONE] * 4
+        _, _, worker_id, attempts = rows[0]
+        assert worker_id != "nodo-caido"
+        assert attempts == 2
+        
+        results = coordinator.wait(job, timeout=10)
+    finally:
+        for worker in workers:
+            worker.join(30)
+            if worker.is_alive():
+                worker.terminate()
+    
+    assert [result.page_number for result in results] == [1, 2, 3, 4]
+    assert len(os.listdir(job.output_folder)) == 4
+    assert not coordinator.queue.has_job(job.job_id)
+    assert all(worker.exitcode == 0 for worker in workers)
+
+
+def test_wait_timeout_removes_job_from_queue(coordinator, tmp_path):
+    batch = tmp_path / "lote.pdf"
+    make_batch(batch, 2)
+    job = ConversionJob.create(str(batch))
+    coordinator.submit(job)
+    
+    with pytest.raises(PDFProcessingError):
+        coordinator.wait(job, timeout=0)
+    
+    assert not coordinator.queue.has_job(job.job_id)
+    assert coordinator.queue.lease("nodo") is None
+    assert not os.path.exists(coordinator.queue.job_dir(job.job_id))
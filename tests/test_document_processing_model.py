@@ -0,0 +1,57 @@
+"""
+Pruebas de las etapas de un trabajo en el modelo de procesamiento.
+"""
+
+import os
+
+import fitz
+import pytest
+
+from src.models import DocumentProcessingModel
+from src.models.conversion_job import ConversionJob
+from src.models.exceptions import FileNotFoundError
+from src.utils import AppSettings
+
+
+def make_batch(path, count):
+    doc = fitz.open()
+    for number in range(1, count + 1):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"PERSONA {number}")
+        page.insert_text((72, 92), f"Registro No. {100 + number}")
+    doc.save(str(path))
+    doc.close()
+
+
+@pytest.fixture
+def model(tmp_path):
+    settings = AppSettings(artifacts_dir=str(tmp_path / "jobs"), index_path=str(tmp_path / "indice.db"),
+                           history_path=None)
+    return DocumentProcessingModel(settings)
+
+
+def test_missing_roster_fails_before_publishing(model, tmp_path):
+    batch = tmp_path / "lote.pdf"
+    make_batch(batch, 3)
+    job = ConversionJob.create(str(batch), roster_file=str(tmp_path / "noexiste.csv"))
+    
+    with pytest.raises(FileNotFoundError):
+        model.run_job(job)
+    assert not os.path.exists(job.output_folder)
+
+
+def test_reconciliation_failure_after_publishing_only_warns(model, tmp_path, monkeypatch):
+    batch = tmp_path / "lote.pdf"
+    make_batch(batch, 3)
+    roster = tmp_path / "nomina.csv"
+    roster.write_text("registro,nombre,cedula\n101,PERSONA 1,1\n", encoding="utf-8")
+    job = ConversionJob.create(str(batch), roster_file=str(roster))
+    
+    def fail(*args, **kwargs):
+        raise OSError("disco lleno")
+    monkeypatch.setattr(model, "reconcile_results", fail)
+    
+    results = model.run_job(job)
+    
+    assert len(results) == 3
+    assert len(os.listdir(job.output_folder)) == 3
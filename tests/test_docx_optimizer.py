@@ -0,0 +1,215 @@
+"""
+Pruebas de la optimización de .docx: relaciones, tipos de contenido e imágenes.
+"""
+
+import os
+import random
+import zipfile
+
+import fitz
+import pytest
+
+from src.models import docx_optimizer
+from src.models.docx_optimizer import CONTENT_TYPES_PART, DocxOptimizer, _strip_legacy_previews
+from src.models.exceptions import DocumentConversionError
+
+IMAGE_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/image"
+LINK_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/hyperlink"
+
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="png" ContentType="image/png"/>'
+    '<Override PartName="/word/document.xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/media/image1.png" ContentType="image/png"/>'
+    '<Override PartName="/word/media/image2.png" ContentType="image/png"/>'
+    '<Override PartName="/word/media/image3.png" ContentType="image/png"/>'
+    '</Types>'
+)
+
+
+def png(width, height, seed=0):
+    """PNG de ruido (no se comprime, así reducirlo sí ahorra bytes)."""
+    samples = random.Random(seed).randbytes(width * height * 3)
+    return fitz.Pixmap(fitz.csRGB, width, height, samples, 0).tobytes("png")
+
+
+def relationship(rel_id, target, rel_type=IMAGE_TYPE, external=False):
+    mode = ' TargetMode="External"' if external else ""
+    return f'<Relationship Id="{rel_id}" Type="{rel_type}" Target="{target}"{mode}/>'
+
+
+def rels(*elements):
+    return ('<?xml version="1.0" encoding="UTF-8"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            + "".join(elements) + '</Relationships>')
+
+
+def drawing(rel_id, width_inches=1.0, crop=""):
+    return (f'<w:drawing><wp:inline><wp:extent cx="{int(width_inches * 914400)}" cy="914400"/>'
+            f'<a:blip r:embed="{rel_id}"/>{crop}</wp:inline></w:drawing>')
+
+
+def document(*body):
+    return '<?xml version="1.0" encoding="UTF-8"?><w:document><w:body>' + "".join(body) + '</w:body></w:document>'
+
+
+def build_docx(path, parts):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in parts.items():
+            archive.writestr(name, data)
+    return str(path)
+
+
+def read_parts(path):
+    with zipfile.ZipFile(path) as archive:
+        return {name: archive.read(name) for name in archive.namelist()}
+
+
+@pytest.fixture
+def small_images():
+    return png(8, 8, seed=1), png(8, 8, seed=2)
+
+
+def test_duplicate_and_unused_images_rewrite_rels_and_content_types(tmp_path, small_images):
+    first, other = small_images
+    source = build_docx(tmp_path / "origen.docx", {
+        CONTENT_TYPES_PART: CONTENT_TYPES,
+        "word/document.xml": document(drawing("rId1"), drawing("rId2")),
+        "word/_rels/document.xml.rels": rels(
+            relationship("rId1", "media/image1.png"),
+            relationship("rId2", "media/image2.png"),
+            relationship("rId3", "media/image3.png"),
+            relationship("rId9", "https://example.com/", LINK_TYPE, external=True),
+        ),
+        "word/media/image1.png": first,
+        "word/media/image2.png": first,
+        "word/media/image3.png": other,
+    })
+    output = str(tmp_path / "optimizado.docx")
+    
+    report = DocxOptimizer().optimize(source, output)
+    
+    assert report.changed
+    assert report.deduplicated == ["word/media/image2.png -> word/media/image1.png"]
+    assert report.removed == ["word/media/image3.png"]
+    assert report.downsampled == []
+    
+    parts = read_parts(output)
+    assert sorted(name for name in parts if name.startswith("word/media/")) == ["word/media/image1.png"]
+    
+    document_rels = parts["word/_rels/document.xml.rels"].decode("utf-8")
+    assert relationship("rId1", "media/image1.png") in document_rels
+    assert relationship("rId2", "media/image1.png") in document_rels
+    assert 'Id="rId3"' not in document_rels
+    assert relationship("rId9", "https://example.com/", LINK_TYPE, external=True) in document_rels
+    
+    content_types = parts[CONTENT_TYPES_PART].decode("utf-8")
+    assert 'PartName="/word/media/image1.png"' in content_types
+    assert 'PartName="/word/media/image2.png"' not in content_types
+    assert 'PartName="/word/media/image3.png"' not in content_types
+    assert 'Extension="png"' in content_types
+    assert parts["word/document.xml"] == read_parts(source)["word/document.xml"]
+
+
+def test_duplicate_target_is_relative_to_each_part(tmp_path, small_images):
+    first, _ = small_images
+    source = build_docx(tmp_path / "origen.docx", {
+        CONTENT_TYPES_PART: CONTENT_TYPES,
+        "word/document.xml": document(drawing("rId1")),
+        "word/_rels/document.xml.rels": rels(relationship("rId1", "media/image1.png")),
+        "word/glossary/document.xml": document(drawing("rId5")),
+        "word/glossary/_rels/document.xml.rels": rels(relationship("rId5", "/word/media/image2.png")),
+        "word/media/image1.png": first,
+        "word/media/image2.png": first,
+    })
+    output = str(tmp_path / "optimizado.docx")
+    
+    DocxOptimizer().optimize(source, output)
+    
+    parts = read_parts(output)
+    assert relationship("rId5", "../media/image1.png") in parts["word/glossary/_rels/document.xml.rels"].decode()
+    assert "word/media/image2.png" not in parts
+
+
+def test_large_image_is_downsampled_unless_cropped_or_unknown(tmp_path):
+    big = png(1200, 40, seed=3)
+    crop = '<a:srcRect l="10000" t="0" r="0" b="0">'
+    source = build_docx(tmp_path / "origen.docx", {
+        CONTENT_TYPES_PART: CONTENT_TYPES,
+        "word/document.xml": document(drawing("rId1"), drawing("rId2", crop=crop),
+                                      '<v:imagedata r:id="rId3"/>'),
+        "word/_rels/document.xml.rels": rels(
+            relationship("rId1", "media/image1.png"),
+            relationship("rId2", "media/image2.png"),
+            relationship("rId3", "media/image3.png"),
+        ),
+        "word/media/image1.png": big,
+        "word/media/image2.png": png(1200, 40, seed=4),
+        "word/media/image3.png": png(1200, 40, seed=5),
+    })
+    output = str(tmp_path / "optimizado.docx")
+    
+    report = DocxOptimizer(image_dpi=300).optimize(source, output)
+    
+    assert report.downsampled == ["word/media/image1.png"]
+    assert report.removed == []
+    reduced = fitz.Pixmap(read_parts(output)["word/media/image1.png"])
+    assert reduced.width == 300
+
+
+def test_unchanged_document_writes_nothing(tmp_path, small_images):
+    first, _ = small_images
+    source = build_docx(tmp_path / "origen.docx", {
+        CONTENT_TYPES_PART: CONTENT_TYPES,
+        "word/document.xml": document(drawing("rId1")),
+        "word/_rels/document.xml.rels": rels(relationship("rId1", "media/image1.png")),
+        "word/media/image1.png": first,
+    })
+    output = tmp_path / "optimizado.docx"
+    
+    report = DocxOptimizer().optimize(source, str(output))
+    
+    assert not report.changed
+    assert report.saved_bytes == 0
+    assert not output.exists()
+
+
+def test_legacy_previews_are_stripped(tmp_path, small_images):
+    first, _ = small_images
+    shape = '<v:shape id="s1" o:gfxdata="UEsDBBQABgAIAAAAIQ" style="x"/>'
+    source = build_docx(tmp_path / "origen.docx", {
+        CONTENT_TYPES_PART: CONTENT_TYPES,
+        "word/document.xml": document(drawing("rId1"), shape, shape),
+        "word/_rels/document.xml.rels": rels(relationship("rId1", "media/image1.png")),
+        "word/media/image1.png": first,
+    })
+    output = str(tmp_path / "optimizado.docx")
+    
+    report = DocxOptimizer().optimize(source, output)
+    
+    assert report.legacy_previews == 2
+    text = read_parts(output)["word/document.xml"].decode("utf-8")
+    assert "gfxdata" not in text
+    assert text.count('<v:shape id="s1" style="x"/>') == 2
+
+
+def test_strip_legacy_previews_across_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(docx_optimizer, "_SCAN_CHUNK_BYTES", 7)
+    source = tmp_path / "parte.xml"
+    source.write_bytes(b'<a x="1" o:gfxdata="AAAAAAAAAAAAAAAAAAAA"/><b o:gfxdata="B"/>fin')
+    target = tmp_path / "salida.xml"
+    
+    with open(source, "rb") as reader, open(target, "wb") as writer:
+        _strip_legacy_previews(reader, writer)
+    
+    assert target.read_bytes() == b'<a x="1"/><b/>fin'
+
+
+def test_invalid_docx(tmp_path):
+    source = tmp_path / "roto.docx"
+    source.write_bytes(b"no es un zip")
+    
+    with pytest.raises(DocumentConversionError):
+        DocxOptimizer().optimize(str(source), str(tmp_path / "salida.docx"))
+    assert not os.path.exists(tmp_path / "salida.docx")
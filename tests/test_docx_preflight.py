@@ -0,0 +1,61 @@
+"""
+Pruebas de la revisión previa de documentos Word.
+"""
+
+import zipfile
+
+import pytest
+
+from src.models.docx_preflight import DocxPreflight
+from src.models.exceptions import DocumentConversionError
+
+
+def make_docx(path, body):
+    document = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                f'<w:body>{body}<w:sectPr/></w:body></w:document>')
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("[Content_Types].xml", "<Types/>")
+        archive.writestr("_rels/.rels", "<Relationships/>")
+        archive.writestr("word/document.xml", document)
+    return str(path)
+
+
+def paragraph(text):
+    return f"<w:p><w:r><w:t>{text}</w:t></w:r></w:p>"
+
+
+def test_spanish_quotes_are_not_merge_fields(tmp_path):
+    docx = make_docx(tmp_path / "ok.docx", paragraph("obtuvo el título de «Bachiller Académico»"))
+    
+    report = DocxPreflight().inspect(docx)
+    
+    assert report.ok
+    assert report.placeholders == 0
+    assert report.quoted_texts == 1
+    assert len(report.warnings) == 1
+
+
+def test_known_field_name_is_an_unmerged_field(tmp_path):
+    docx = make_docx(tmp_path / "plantilla.docx", paragraph("Registro No. «Registro_No»"))
+    
+    report = DocxPreflight().inspect(docx)
+    
+    assert not report.ok
+    assert report.placeholders == 1
+    with pytest.raises(DocumentConversionError):
+        DocxPreflight().check(docx)
+
+
+def test_mergefield_result_is_an_unmerged_field(tmp_path):
+    field = ('<w:p><w:r><w:fldChar w:fldCharType="begin"/></w:r>'
+             '<w:r><w:instrText> MERGEFIELD Programa \\* MERGEFORMAT </w:instrText></w:r>'
+             '<w:r><w:fldChar w:fldCharType="separate"/></w:r>'
+             '<w:r><w:t>«Programa»</w:t></w:r>'
+             '<w:r><w:fldChar w:fldCharType="end"/></w:r></w:p>')
+    docx = make_docx(tmp_path / "campo.docx", field + paragraph("de «Bachiller Académico»"))
+    
+    report = DocxPreflight().inspect(docx)
+    
+    assert report.placeholders == 1
+    assert report.quoted_texts == 1
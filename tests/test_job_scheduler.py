@@ -0,0 +1,179 @@
+"""
+Pruebas del planificador de trabajos: orden, envejecimiento y cesión del turno.
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.models.conversion_job import PRIORITY_LOW, PRIORITY_NORMAL, PRIORITY_URGENT
+from src.models.job_scheduler import STATE_RUNNING, JobScheduler, JobTicket
+
+
+def make_ticket(priority=PRIORITY_NORMAL, cost=100, submitted_at=0.0, sequence=0):
+    return JobTicket("t", "t", priority, cost, cost, submitted_at, sequence)
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            pytest.fail("La condición no se cumplió a tiempo")
+        time.sleep(0.01)
+
+
+class Waiter:
+    """Trabajo en otro hilo que pide turno y anota cuándo lo obtiene."""
+    
+    def __init__(self, scheduler, job_id, order, priority=PRIORITY_NORMAL, cost=1):
+        self.thread = threading.Thread(
+            target=self._run, args=(scheduler, job_id, order, priority, cost), daemon=True
+        )
+        self.thread.start()
+    
+    @staticmethod
+    def _run(scheduler, job_id, order, priority, cost):
+        with scheduler.turn(job_id, priority=priority, cost=cost):
+            order.append(job_id)
+    
+    def join(self):
+        self.thread.join(5)
+        assert not self.thread.is_alive()
+
+
+def queued(scheduler, count):
+    return lambda: len(scheduler.snapshot()) == count
+
+
+def test_priority_ages_one_level_per_period():
+    ticket = make_ticket(priority=PRIORITY_LOW)
+    
+    assert ticket.rank(599, 600, 0)[0] == PRIORITY_LOW
+    assert ticket.rank(600, 600, 0)[0] == PRIORITY_NORMAL
+    assert ticket.rank(5000, 600, 0)[0] == PRIORITY_URGENT
+    assert ticket.rank(5000, 0, 0)[0] == PRIORITY_LOW
+
+
+def test_cost_halves_after_cost_aging_period():
+    ticket = make_ticket(cost=100)
+    
+    assert ticket.rank(0, 0, 120)[1] == 100
+    assert ticket.rank(120, 0, 120)[1] == 50
+    assert ticket.rank(120, 0, 0)[1] == 100
+
+
+def test_old_long_job_overtakes_new_short_job():
+    old = make_ticket(cost=100, submitted_at=0.0, sequence=0)
+    new = make_ticket(cost=10, submitted_at=1000.0, sequence=1)
+    
+    assert new.rank(1000, 0, 120) < old.rank(1000, 0, 120)
+    assert old.rank(1000, 0, 0) > new.rank(1000, 0, 0)
+
+
+def test_waiting_jobs_run_by_priority_then_cost():
+    scheduler = JobScheduler(slots=1, priority_aging_seconds=0, cost_aging_seconds=0, preempt_ratio=0)
+    order = []
+    
+    with scheduler.turn("en-curso"):
+        waiters = [Waiter(scheduler, "largo", order, cost=50)]
+        wait_until(queued(scheduler, 2))
+        waiters.append(Waiter(scheduler, "corto", order, cost=5))
+        wait_until(queued(scheduler, 3))
+        waiters.append(Waiter(scheduler, "baja", order, priority=PRIORITY_LOW, cost=1))
+        wait_until(queued(scheduler, 4))
+        waiters.append(Waiter(scheduler, "urgente", order, priority=PRIORITY_URGENT, cost=80))
+        wait_until(queued(scheduler, 5))
+        
+        assert [ticket.job_id for ticket in scheduler.snapshot()] == [
+            "en-curso", "urgente", "corto", "largo", "baja"
+        ]
+    
+    for waiter in waiters:
+        waiter.join()
+    assert order == ["urgente", "corto", "largo", "baja"]
+
+
+def test_long_job_yields_to_much_shorter_job():
+    scheduler = JobScheduler(slots=1, cost_aging_seconds=0, min_quantum=0)
+    order = []
+    
+    with scheduler.turn("largo", cost=100) as ticket:
+        waiter = Waiter(scheduler, "corto", order, cost=10)
+        wait_until(queued(scheduler, 2))
+        
+        scheduler.checkpoint(ticket, remaining=100)
+        
+        # El corto ya terminó cuando el largo retoma su turno
+        assert order == ["corto"]
+        assert ticket.preemptions == 1
+        assert ticket.state == STATE_RUNNING
+    waiter.join()
+
+
+def test_long_job_keeps_turn_when_contender_is_not_short_enough():
+    scheduler = JobScheduler(slots=1, cost_aging_seconds=0, min_quantum=0)
+    order = []
+    
+    with scheduler.turn("largo", cost=100) as ticket:
+        waiter = Waiter(scheduler, "mediano", order, cost=50)
+        wait_until(queued(scheduler, 2))
+        
+        scheduler.checkpoint(ticket, remaining=100)
+        assert ticket.preemptions == 0
+        
+        # Si ahora le queda menos que al que espera, tampoco cede el turno
+        scheduler.checkpoint(ticket, remaining=1)
+        assert ticket.preemptions == 0
+        assert order == []
+    waiter.join()
+    assert order == ["mediano"]
+
+
+def test_urgent_job_preempts_regardless_of_size():
+    scheduler = JobScheduler(slots=1, cost_aging_seconds=0, min_quantum=0)
+    order = []
+    
+    with scheduler.turn("normal", cost=5) as ticket:
+        waiter = Waiter(scheduler, "urgente", order, priority=PRIORITY_URGENT, cost=500)
+        wait_until(queued(scheduler, 2))
+        
+        scheduler.checkpoint(ticket)
+        assert order == ["urgente"]
+        assert ticket.preemptions == 1
+    waiter.join()
+
+
+def test_min_quantum_delays_preemption():
+    scheduler = JobScheduler(slots=1, cost_aging_seconds=0, min_quantum=60)
+    order = []
+    
+    with scheduler.turn("normal", cost=100) as ticket:
+        waiter = Waiter(scheduler, "urgente", order, priority=PRIORITY_URGENT)
+        wait_until(queued(scheduler, 2))
+        
+        scheduler.checkpoint(ticket)
+        assert ticket.preemptions == 0
+    waiter.join()
+    assert order == ["urgente"]
+
+
+def test_preemption_disabled_with_zero_ratio():
+    scheduler = JobScheduler(slots=1, preempt_ratio=0, min_quantum=0)
+    order = []
+    
+    with scheduler.turn("normal", cost=100) as ticket:
+        waiter = Waiter(scheduler, "urgente", order, priority=PRIORITY_URGENT)
+        wait_until(queued(scheduler, 2))
+        
+        scheduler.checkpoint(ticket)
+        assert ticket.preemptions == 0
+    waiter.join()
+
+
+def test_free_slot_means_no_preemption():
+    scheduler = JobScheduler(slots=2, min_quantum=0)
+    
+    with scheduler.turn("normal", cost=100) as ticket:
+        scheduler.checkpoint(ticket)
+        assert ticket.preemptions == 0
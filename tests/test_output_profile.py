@@ -0,0 +1,50 @@
+"""
+Pruebas de los perfiles de salida.
+"""
+
+import fitz
+import pytest
+
+from src.models import output_profile
+from src.models.output_profile import PROFILE_WEB, optimize_page
+
+
+class BrokenDocument:
+    """Documento que falla al serializarse con un error propio de la página."""
+    
+    def tobytes(self, **options):
+        raise RuntimeError("cannot find object in xref")
+
+
+@pytest.fixture(autouse=True)
+def native_linearization(monkeypatch):
+    monkeypatch.setattr(output_profile, "_native_linearization", True)
+
+
+def single_page_pdf() -> bytes:
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "REG-001")
+    try:
+        return doc.tobytes()
+    finally:
+        doc.close()
+
+
+def test_page_error_does_not_disable_linearization():
+    with pytest.raises(RuntimeError):
+        output_profile._serialize(BrokenDocument(), PROFILE_WEB)
+    assert output_profile._native_linearization
+
+
+def test_unsupported_linearization_falls_back():
+    data = optimize_page(single_page_pdf(), PROFILE_WEB)
+    
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        assert doc.page_count == 1
+    supported = True
+    with fitz.open(stream=single_page_pdf(), filetype="pdf") as doc:
+        try:
+            doc.tobytes(linear=True)
+        except Exception as e:
+            supported = not output_profile._linearization_unsupported(e)
+    assert output_profile._native_linearization == supported
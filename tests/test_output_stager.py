@@ -0,0 +1,137 @@
+"""
+Pruebas de la publicación de salidas mediante el directorio de preparación.
+"""
+
+import os
+
+import pytest
+
+from src.models import output_stager
+from src.models.exceptions import PDFProcessingError
+from src.models.output_stager import OutputStager, resolve_filename, sanitize_filename
+
+
+def make_file(folder, name, content=b"%PDF-1.4\n"):
+    path = folder / name
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_sanitize_filename():
+    assert sanitize_filename('Pérez: "Ana"?.pdf') == "Pérez Ana.pdf"
+    assert sanitize_filename("  ...  ") == "sin_nombre"
+
+
+def test_collisions_are_resolved_in_reservation_order():
+    stager = OutputStager("/tmp/no-usada", job_id="orden")
+    
+    assert stager.reserve_name("Ana.pdf") == ("Ana.pdf", False)
+    assert stager.reserve_name("ANA.pdf") == ("ANA (2).pdf", True)
+    assert stager.reserve_name("ana.pdf") == ("ana (3).pdf", True)
+    assert stager.reserve_name("Luis.pdf") == ("Luis.pdf", False)
+
+
+def test_resolve_filename_skips_taken_suffixes():
+    taken = {"ana.pdf", "ana (2).pdf"}
+    assert resolve_filename("Ana.pdf", taken) == ("Ana (3).pdf", True)
+
+
+def test_commit_publishes_staged_files(tmp_path):
+    output = tmp_path / "salida"
+    
+    with OutputStager(str(output), job_id="nuevo") as stager:
+        stager.stage_file(make_file(tmp_path, "a.pdf"), "Ana.pdf")
+        stager.stage_file(make_file(tmp_path, "b.pdf"), "Ana.pdf")
+        stager.commit()
+    
+    assert sorted(os.listdir(output)) == ["Ana (2).pdf", "Ana.pdf"]
+    assert not os.path.exists(stager.staging_folder)
+
+
+def test_commit_replaces_existing_folder(tmp_path):
+    output = tmp_path / "salida"
+    output.mkdir()
+    make_file(output, "viejo.pdf")
+    
+    with OutputStager(str(output), job_id="reemplazo") as stager:
+        stager.stage_file(make_file(tmp_path, "a.pdf"), "nuevo.pdf")
+        stager.commit()
+    
+    assert os.listdir(output) == ["nuevo.pdf"]
+    assert sorted(os.listdir(tmp_path)) == ["salida"]
+
+
+def test_failed_rename_restores_previous_folder(tmp_path, monkeypatch):
+    output = tmp_path / "salida"
+    output.mkdir()
+    make_file(output, "viejo.pdf")
+    stager = OutputStager(str(output), job_id="fallo")
+    stager.open()
+    
+    real_rename = os.rename
+    
+    def rename(src, dst):
+        if src == stager.staging_folder:
+            raise OSError("disco lleno")
+        real_rename(src, dst)
+    
+    monkeypatch.setattr(output_stager.os, "rename", rename)
+    with pytest.raises(PDFProcessingError):
+        stager.commit()
+    
+    assert os.listdir(output) == ["viejo.pdf"]
+    assert not stager.committed
+
+
+def test_previous_folder_removal_failure_is_logged(tmp_path, monkeypatch, caplog):
+    output = tmp_path / "salida"
+    output.mkdir()
+    
+    def rmtree(path, *args, **kwargs):
+        raise OSError("en uso")
+    
+    with OutputStager(str(output), job_id="en-uso") as stager:
+        stager.stage_file(make_file(tmp_path, "a.pdf"), "nuevo.pdf")
+        monkeypatch.setattr(output_stager.shutil, "rmtree", rmtree)
+        stager.commit()
+    
+    assert stager.committed
+    assert os.listdir(output) == ["nuevo.pdf"]
+    assert "No se pudo eliminar la carpeta anterior" in caplog.text
+
+
+def test_abort_discards_staging_and_keeps_output(tmp_path):
+    output = tmp_path / "salida"
+    output.mkdir()
+    make_file(output, "viejo.pdf")
+    
+    with pytest.raises(RuntimeError):
+        with OutputStager(str(output), job_id="cancelado") as stager:
+            stager.stage_file(make_file(tmp_path, "a.pdf"), "nuevo.pdf")
+            assert os.path.isdir(stager.staging_folder)
+            raise RuntimeError("cancelado")
+    
+    assert not os.path.exists(stager.staging_folder)
+    assert os.listdir(output) == ["viejo.pdf"]
+    assert not stager.committed
+
+
+def test_stage_file_requires_open(tmp_path):
+    stager = OutputStager(str(tmp_path / "salida"))
+    with pytest.raises(PDFProcessingError):
+        stager.stage_file(make_file(tmp_path, "a.pdf"), "Ana.pdf")
+
+
+def test_stale_staging_folders_are_removed(tmp_path):
+    stale = tmp_path / ".salida.staging-viejo"
+    stale.mkdir()
+    os.utime(stale, (0, 0))
+    recent = tmp_path / ".salida.staging-activo"
+    recent.mkdir()
+    
+    stager = OutputStager(str(tmp_path / "salida"), job_id="actual")
+    stager.open()
+    
+    assert not stale.exists()
+    assert recent.exists()
+    stager.abort()
@@ -0,0 +1,82 @@
+"""
+Pruebas de la reexpedición selectiva.
+"""
+
+import os
+
+import fitz
+import pytest
+
+from src.models import DocumentProcessingModel
+from src.models.conversion_job import ConversionJob
+from src.utils import AppSettings
+
+
+def make_pdf(path, people):
+    doc = fitz.open()
+    for registration_number, name in people:
+        page = doc.new_page()
+        y = 72
+        for line in ("LA INSTITUCION", "HACE CONSTAR QUE:", name, "C.C. No. 1.234.567",
+                     "Curso de prueba", f"Registro No. {registration_number}"):
+            page.insert_text((72, y), line)
+            y += 20
+    doc.save(str(path))
+    doc.close()
+
+
+@pytest.fixture
+def model(tmp_path):
+    (tmp_path / "scratch").mkdir()
+    settings = AppSettings(artifacts_dir=str(tmp_path / "jobs"), index_path=str(tmp_path / "indice.db"),
+                           history_path=None, scratch_dir=str(tmp_path / "scratch"))
+    return DocumentProcessingModel(settings)
+
+
+@pytest.fixture
+def output_folder(model, tmp_path):
+    batch = tmp_path / "lote.pdf"
+    make_pdf(batch, [("101", "ANA PEREZ"), ("102", "LUIS GOMEZ"), ("101", "ANA PEREZ")])
+    model.run_job(ConversionJob.create(str(batch)))
+    return tmp_path / "lote"
+
+
+def test_reissue_requires_corrected_source(model, output_folder):
+    with pytest.raises(ValueError):
+        model.reissue(str(output_folder), ["101"], None)
+
+
+def test_reissue_replaces_every_page_of_a_duplicated_number(model, output_folder, tmp_path):
+    corrected = tmp_path / "corregido.pdf"
+    make_pdf(corrected, [("101", "ANA MARIA PEREZ"), ("101", "ANA LUCIA PEREZ")])
+    
+    report = model.reissue(str(output_folder), ["101"], str(corrected))
+    
+    assert sorted(report.replaced) == ["101 - ANA PEREZ (2).pdf", "101 - ANA PEREZ.pdf"]
+    assert sorted(os.listdir(output_folder)) == [
+        "101 - ANA LUCIA PEREZ.pdf", "101 - ANA MARIA PEREZ.pdf", "102 - LUIS GOMEZ.pdf"
+    ]
+    assert [page.page_number for page in report.reissued] == [1, 3]
+    assert report.not_found == []
+
+
+def test_reissue_stages_temporaries_in_scratch_space(model, output_folder, tmp_path):
+    corrected = tmp_path / "corregido.pdf"
+    make_pdf(corrected, [("102", "LUIS ALBERTO GOMEZ")])
+    
+    report = model.reissue(str(output_folder), ["102", "999"], str(corrected))
+    
+    assert report.replaced == {"102 - LUIS GOMEZ.pdf": "102 - LUIS ALBERTO GOMEZ.pdf"}
+    assert report.not_found == ["999"]
+    assert not [name for name in os.listdir(tmp_path) if name.startswith(".")]
+    assert not [name for name in os.listdir(output_folder) if name.startswith(".")]
+    assert os.listdir(tmp_path / "scratch") == []
+
+
+def test_only_the_manifest_is_retained(model, output_folder, tmp_path):
+    corrected = tmp_path / "corregido.pdf"
+    make_pdf(corrected, [("102", "LUIS ALBERTO GOMEZ")])
+    model.reissue(str(output_folder), ["102"], str(corrected))
+    
+    retained = [sorted(files) for _, _, files in os.walk(tmp_path / "jobs") if files]
+    assert retained == [["manifest.json"]]
@@ -0,0 +1,69 @@
+"""
+Pruebas del regulador de recursos.
+"""
+
+import threading
+
+from src.models import resource_governor
+from src.models.resource_governor import ResourceGovernor, ResourceSample, TASK_CONVERSION, TASK_SPLIT
+
+
+def test_disabled_governor_does_not_measure(monkeypatch):
+    def fail():
+        raise AssertionError("no debe medir sin límites")
+    monkeypatch.setattr(resource_governor, "_measure", fail)
+    governor = ResourceGovernor()
+    
+    with governor.slot(TASK_CONVERSION):
+        with governor.slot(TASK_SPLIT):
+            assert governor._sampler is None
+    
+    metrics = governor.metrics()
+    assert metrics.admitted == {TASK_CONVERSION: 1, TASK_SPLIT: 1}
+    assert metrics.running == {}
+
+
+def test_sample_is_taken_without_holding_the_lock(monkeypatch):
+    governor = ResourceGovernor(max_load_per_cpu=100.0)
+    lock_free = []
+    
+    def try_lock():
+        acquired = governor._condition.acquire(timeout=1)
+        lock_free.append(acquired)
+        if acquired:
+            governor._condition.release()
+    
+    def measure():
+        # Otro hilo debe poder tomar el candado mientras se mide
+        probe = threading.Thread(target=try_lock)
+        probe.start()
+        probe.join()
+        return ResourceSample(None, None, 0.1, resource_governor.time.monotonic())
+    monkeypatch.setattr(resource_governor, "_measure", measure)
+    
+    with governor.slot(TASK_CONVERSION):
+        pass
+    
+    assert lock_free and all(lock_free)
+
+
+def test_cpu_limit_delays_second_task(monkeypatch):
+    load = {"value": 5.0}
+    monkeypatch.setattr(resource_governor, "_measure", lambda: ResourceSample(
+        None, None, load["value"], resource_governor.time.monotonic()))
+    governor = ResourceGovernor(max_load_per_cpu=1.0, sample_interval=0.01)
+    admitted = threading.Event()
+    
+    def second():
+        with governor.slot(TASK_SPLIT):
+            admitted.set()
+    
+    with governor.slot(TASK_CONVERSION):
+        thread = threading.Thread(target=second)
+        thread.start()
+        assert not admitted.wait(0.1)
+        load["value"] = 0.5
+        assert admitted.wait(2)
+    thread.join()
+    
+    assert governor.metrics().delayed == {TASK_SPLIT: 1}
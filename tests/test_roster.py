@@ -0,0 +1,173 @@
+"""
+Pruebas de la lectura, normalización y conciliación de la nómina.
+"""
+
+import pytest
+
+from src.models import roster_reader
+from src.models.exceptions import FileNotFoundError, PDFProcessingError
+from src.models.pdf_processor import PageResult
+from src.models.roster_reader import (
+    RosterColumns, RosterReader, column_key, normalize_identifier, normalize_name, normalize_text
+)
+from src.models.roster_reconciler import RosterReconciler
+
+
+def write_csv(tmp_path, content, name="nomina.csv"):
+    path = tmp_path / name
+    path.write_text(content, encoding="utf-8")
+    return str(path)
+
+
+def page(number, registration=None, name=None, cedula=None):
+    return PageResult(number, f"{number}.pdf", registration, name, "ok", cedula)
+
+
+def test_normalize_name_ignores_accents_case_and_spaces():
+    assert normalize_name("  JOSÉ   Pérez\tÑuñez ") == "jose perez nunez"
+    assert normalize_name(None) == ""
+
+
+def test_normalize_identifier_keeps_only_digits():
+    assert normalize_identifier("1.023.456-7") == "10234567"
+    assert normalize_identifier(1234.0) == "1234"
+    assert normalize_identifier(" N/A ") is None
+    assert normalize_identifier(None) is None
+
+
+def test_normalize_text_and_column_key():
+    assert normalize_text("  Ana \n María ") == "Ana María"
+    assert normalize_text(42.0) == "42"
+    assert normalize_text("   ") is None
+    assert column_key(" Formato Cédula ") == "formato_cedula"
+    assert column_key("Registro No.") == "registro_no"
+
+
+def test_csv_with_semicolons_is_normalized(tmp_path):
+    roster = write_csv(tmp_path, (
+        "Registro No.;Nombre;Formato Cédula\n"
+        "00123;  Ana   María ;1.023.456\n"
+        ";;\n"
+        "124;Luis;\n"
+    ))
+    reader = RosterReader()
+    
+    entries = reader.read(roster)
+    
+    assert [(e.row_number, e.registration_number, e.name, e.cedula) for e in entries] == [
+        (2, "00123", "Ana María", "1023456"),
+        (4, "124", "Luis", None),
+    ]
+    assert reader.stats.rows == 3
+    assert reader.stats.entries == 2
+    assert reader.stats.empty_rows == 1
+
+
+def test_duplicates_are_counted_after_normalization(tmp_path):
+    roster = write_csv(tmp_path, (
+        "registro,nombre,cedula\n"
+        "100,Ana,1.000\n"
+        "0-100,Ana bis,2000\n"
+        "101,Luis,1000\n"
+    ))
+    reader = RosterReader()
+    
+    entries = reader.read(roster)
+    
+    assert len(entries) == 3
+    assert reader.stats.duplicate_registrations == 0
+    assert reader.stats.duplicate_cedulas == 1
+    
+    roster = write_csv(tmp_path, "registro,nombre\n100,Ana\n100,Ana\n100,Ana\n", "repetidos.csv")
+    reader.read(roster)
+    assert reader.stats.duplicate_registrations == 2
+
+
+def test_duplicate_warnings_are_capped(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(roster_reader, "MAX_DUPLICATE_WARNINGS", 2)
+    rows = "".join("7,Ana\n" for _ in range(6))
+    reader = RosterReader()
+    
+    reader.read(write_csv(tmp_path, "registro,nombre\n" + rows))
+    
+    assert reader.stats.duplicate_registrations == 5
+    assert caplog.text.count("Registro repetido en la nómina") == 2
+    assert "Demasiadas repeticiones" in caplog.text
+
+
+def test_configured_column_must_exist(tmp_path):
+    roster = write_csv(tmp_path, "registro,nombre\n1,Ana\n")
+    
+    with pytest.raises(PDFProcessingError):
+        RosterReader(RosterColumns(cedula="Documento")).read(roster)
+    
+    entries = RosterReader(RosterColumns(name="REGISTRO")).read(roster)
+    assert entries[0].name == "1"
+
+
+def test_missing_and_unsupported_files(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        RosterReader().read(str(tmp_path / "no-existe.csv"))
+    
+    other = tmp_path / "nomina.ods"
+    other.write_bytes(b"")
+    with pytest.raises(PDFProcessingError):
+        RosterReader().read(str(other))
+
+
+def test_excel_roster(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["Registro", "Nombres", "Cédula"])
+    sheet.append([555.0, "Marta  Gómez", 123456789])
+    path = str(tmp_path / "nomina.xlsx")
+    workbook.save(path)
+    
+    entries = RosterReader().read(path)
+    
+    assert [(e.registration_number, e.name, e.cedula) for e in entries] == [("555", "Marta Gómez", "123456789")]
+
+
+def test_reconcile_classifies_pages(tmp_path):
+    roster = write_csv(tmp_path, (
+        "registro;nombre;cedula\n"
+        "1;José Pérez;111\n"
+        "2;Ana Ruiz;222\n"
+        "3;Luis Mora;333\n"
+        "4;Eva Sol;444\n"
+    ))
+    reconciler = RosterReconciler.from_file(roster)
+    
+    report = reconciler.reconcile([
+        page(1, "N.º 1", "JOSE  PEREZ"),
+        page(2, None, "Ana Ruiz", "2.2.2"),
+        page(3, "3", "Luis Mora"),
+        page(4, "3", "Luis Mora"),
+        page(5, "99", "Desconocido"),
+        page(6),
+    ])
+    
+    assert report.total_roster == 4
+    assert report.total_pages == 6
+    assert report.matched == 2
+    assert [entry.registration_number for entry in report.missing] == ["4"]
+    assert [item["roster"].registration_number for item in report.duplicated] == ["3"]
+    assert report.mismatched_name == []
+    assert [p.page_number for p in report.unknown] == [5]
+    assert [p.page_number for p in report.unparsed] == [6]
+    assert not report.is_clean()
+
+
+def test_reconcile_reports_name_mismatch_and_first_duplicate_wins(tmp_path):
+    roster = write_csv(tmp_path, "registro,nombre\n10,Ana Ruiz\n10,Otra Persona\n")
+    reconciler = RosterReconciler.from_file(roster)
+    
+    report = reconciler.reconcile([page(1, "10", "Ana Ruíz"), page(2, "10", "Ana Ruiz")])
+    
+    assert len(report.mismatched_name) == 0
+    assert report.duplicated[0]["roster"].row_number == 2
+    
+    report = reconciler.reconcile([page(1, "10", "Ana María Ruiz")])
+    assert report.mismatched_name[0]["roster"].row_number == 2
+    assert [entry.row_number for entry in report.missing] == [3]